@@ -11,47 +11,69 @@ import { validateAdminCredentials } from "@/lib/config"
 import { verifyPassword } from "@/lib/utils/password"
 import { logInfo, logWarn, logError } from "@/lib/logger"
 import jwt from "jsonwebtoken"
+import { createHash } from "crypto"
+import { clustered, pruneShared, readShared, removeShared, writeShared } from "@/lib/shared-store"
 
 const JWT_SECRET = process.env.JWT_SECRET || "fallback-dev-secret"
 const COOKIE_MAX_AGE_REMEMBER = 60 * 60 * 24 * 15 // 15 days
 
-// ── Rate limiting en memoria ────────────────────────────────────────────────
+// ── Rate limiting ───────────────────────────────────────────────────────────
+// En memoria del proceso; en cluster, en el almacén compartido: si no, cada
+// worker llevaría su propia cuenta y los intentos se multiplicarían por N.
 const MAX_ATTEMPTS = 5
 const WINDOW_MS = 15 * 60 * 1000   // ventana de 15 min
 const BLOCK_MS  = 15 * 60 * 1000   // bloqueo de 15 min tras agotar intentos
 
 interface RateLimitRecord { count: number; firstAttempt: number; blockedUntil?: number }
 const _loginAttempts = new Map<string, RateLimitRecord>()
+let _lastPrune = 0
 
 function _rlKey(req: NextRequest, email: string) {
   const ip = req.headers.get("x-forwarded-for")?.split(",")[0]?.trim()
            || req.headers.get("x-real-ip")
            || "unknown"
-  return `${ip}:${email}`
+  // Hash: la clave termina siendo un nombre de archivo en el almacén compartido.
+  return createHash("sha256").update(`${ip}:${email}`).digest("hex")
 }
 
-function _checkRL(key: string): { blocked: boolean; retryAfterMs: number } {
+async function _loadRL(key: string): Promise<RateLimitRecord | null> {
+  return clustered ? readShared<RateLimitRecord>("login-attempts", key) : _loginAttempts.get(key) ?? null
+}
+
+async function _saveRL(key: string, r: RateLimitRecord) {
+  if (!clustered) { _loginAttempts.set(key, r); return }
+  await writeShared("login-attempts", key, r)
+  if (Date.now() - _lastPrune > WINDOW_MS) {
+    _lastPrune = Date.now()
+    void pruneShared("login-attempts", WINDOW_MS + BLOCK_MS)
+  }
+}
+
+async function _checkRL(key: string): Promise<{ blocked: boolean; retryAfterMs: number }> {
   const now = Date.now()
-  const r = _loginAttempts.get(key)
+  const r = await _loadRL(key)
   if (!r) return { blocked: false, retryAfterMs: 0 }
   if (r.blockedUntil && now < r.blockedUntil) return { blocked: true, retryAfterMs: r.blockedUntil - now }
-  if (now - r.firstAttempt > WINDOW_MS) { _loginAttempts.delete(key); return { blocked: false, retryAfterMs: 0 } }
+  if (now - r.firstAttempt > WINDOW_MS) { await _clearRL(key); return { blocked: false, retryAfterMs: 0 } }
   return { blocked: false, retryAfterMs: 0 }
 }
 
-function _recordFail(key: string) {
+async function _recordFail(key: string) {
   const now = Date.now()
-  const r = _loginAttempts.get(key)
+  const r = await _loadRL(key)
   if (!r || now - r.firstAttempt > WINDOW_MS) {
-    _loginAttempts.set(key, { count: 1, firstAttempt: now })
+    await _saveRL(key, { count: 1, firstAttempt: now })
   } else {
     r.count++
     if (r.count >= MAX_ATTEMPTS) r.blockedUntil = now + BLOCK_MS
-    _loginAttempts.set(key, r)
+    await _saveRL(key, r)
   }
 }
 
-function _clearRL(key: string) { _loginAttempts.delete(key) }
+async function _clearRL(key: string) {
+  if (clustered) await removeShared("login-attempts", key)
+  else _loginAttempts.delete(key)
+}
 
 const TOKEN_VERSION = parseInt(process.env.APP_TOKEN_VERSION || "1")
 
@@ -85,7 +107,7 @@ export async function POST(request: NextRequest) {
 
     // Rate limit check
     const rlKey = _rlKey(request, email)
-    const { blocked, retryAfterMs } = _checkRL(rlKey)
+    const { blocked, retryAfterMs } = await _checkRL(rlKey)
     if (blocked) {
       const mins = Math.ceil(retryAfterMs / 60000)
       logWarn("Login bloqueado por exceso de intentos", { module: "auth", action: "rate_limited", meta: { email } })
@@ -98,7 +120,7 @@ export async function POST(request: NextRequest) {
     // 1. Check against ADMIN_EMAIL / ADMIN_PASSWORD from .env
     const adminCheck = validateAdminCredentials(email, pin)
     if (adminCheck.valid) {
-      _clearRL(rlKey)
+      await _clearRL(rlKey)
       logInfo("Inicio de sesión exitoso (admin env)", {
         module: "auth", action: "login_success", user: adminCheck.user?.id ?? "admin_env",
       })
@@ -128,7 +150,7 @@ export async function POST(request: NextRequest) {
 
       const pinValid = await verifyPassword(pin, pin_hash)
       if (!pinValid) {
-        _recordFail(rlKey)
+        await _recordFail(rlKey)
         logWarn("PIN incorrecto para voluntario", {
           module: "auth", action: "login_failed", user: volunteer.id, meta: { email },
         })
@@ -157,7 +179,7 @@ export async function POST(request: NextRequest) {
         enrollments,
       }
 
-      _clearRL(rlKey)
+      await _clearRL(rlKey)
       logInfo("Inicio de sesión exitoso", { module: "auth", action: "login_success", user: volunteer.id, meta: { role, remember } })
       logActivityEvent({ event_type: "login", user_type: "voluntario", user_id: volunteer.id, role }).catch(() => {})
       return makeAuthResponse(user, remember)
@@ -179,7 +201,7 @@ export async function POST(request: NextRequest) {
 
       const pinValid = await verifyPassword(pin, pin_hash)
       if (!pinValid) {
-        _recordFail(rlKey)
+        await _recordFail(rlKey)
         logWarn("PIN incorrecto para participante", {
           module: "auth", action: "login_failed", user: participant.id, meta: { email },
         })
@@ -218,14 +240,14 @@ export async function POST(request: NextRequest) {
         enrollments: { workshops: [], groups: [], activities: [] },
       }
 
-      _clearRL(rlKey)
+      await _clearRL(rlKey)
       logInfo("Inicio de sesión exitoso", { module: "auth", action: "login_success", user: participant.id, meta: { role: "participante", remember } })
       logActivityEvent({ event_type: "login", user_type: "participante", user_id: participant.id, role: "participante" }).catch(() => {})
       return makeAuthResponse(user, remember)
     }
 
     // 4. Not found in any table
-    _recordFail(rlKey)
+    await _recordFail(rlKey)
     logWarn("Email no registrado", { module: "auth", action: "login_failed", meta: { email } })
     return NextResponse.json({ error: "Credenciales inválidas" }, { status: 401 })
 
@@ -1,9 +1,6 @@
 import { NextRequest, NextResponse } from 'next/server'
-import {
-  countCalendarInstancesBulk,
-  deleteCalendarInstancesBulk,
-  BulkDeleteFilters,
-} from '@/lib/data-manager'
+import { countCalendarInstancesBulk, BulkDeleteFilters } from '@/lib/data-manager'
+import { startCalendarJob } from '@/lib/calendar-jobs'
 import { getSessionUser } from '@/lib/serverAuth'
 import { can } from '@/lib/permissions'
 import { logInfo, logWarn, logError } from '@/lib/logger'
@@ -52,7 +49,7 @@ export async function GET(req: NextRequest) {
   }
 }
 
-// DELETE: bulk delete — admin only
+// DELETE: bulk delete (trabajo en segundo plano) — admin only
 export async function DELETE(req: NextRequest) {
   const session = getSessionUser(req)
   if (!session) return NextResponse.json({ error: 'No autorizado' }, { status: 401 })
@@ -74,9 +71,11 @@ export async function DELETE(req: NextRequest) {
     if (scope === 'type' || scope === 'series') { filters.type = type }
     if (scope === 'series') { filters.source_id = source_id ?? null }
 
-    const result = await deleteCalendarInstancesBulk(filters)
-    logInfo("Eliminación masiva de instancias de calendario ejecutada", { module: "calendarios", action: "bulk_delete", user: session.id, meta: { scope, ...(year ? { year } : {}), ...(month ? { month } : {}), ...(type ? { type } : {}) } })
-    return NextResponse.json(result)
+    // Se borra en segundo plano y por tandas: la respuesta es el trabajo, y
+    // el progreso se consulta en /api/calendarios/jobs?id=...
+    const job = await startCalendarJob({ kind: 'delete', filters }, session.id)
+    logInfo("Eliminación masiva de instancias de calendario encolada", { module: "calendarios", action: "bulk_delete", user: session.id, meta: { job: job.id, total: job.total, scope, ...(year ? { year } : {}), ...(month ? { month } : {}), ...(type ? { type } : {}) } })
+    return NextResponse.json({ job }, { status: 202 })
   } catch (err: any) {
     logError("Error en eliminación masiva de calendario", { module: "calendarios", action: "bulk_delete", user: session.id, error: err })
     return NextResponse.json({ error: err.message }, { status: 500 })
@@ -1,5 +1,5 @@
 import { NextRequest, NextResponse } from 'next/server'
-import { generateCalendarInstances, createCalendarInstance } from '@/lib/data-manager'
+import { startCalendarJob, CalendarJobInstance } from '@/lib/calendar-jobs'
 import { getSessionUser } from '@/lib/serverAuth'
 import { can } from '@/lib/permissions'
 import { logInfo, logWarn, logError } from '@/lib/logger'
@@ -31,29 +31,22 @@ export async function POST(req: NextRequest) {
         return NextResponse.json({ error: 'Se requiere al menos una instancia' }, { status: 400 })
       }
 
-      const created = []
-      for (const item of items) {
-        if (!item.date || !item.type || !item.start_time || !item.end_time) continue
-        const inst = await createCalendarInstance({
-          type: item.type,
-          date: item.date,
-          start_time: item.start_time,
-          end_time: item.end_time,
-          source_id: item.source_id ?? null,
-          notes: null,
-          status: 'programado',
-        })
-        created.push(inst)
-      }
+      const instances: CalendarJobInstance[] = items
+        .filter((item) => item.date && item.type && item.start_time && item.end_time)
+        .map((item) => ({ ...item, source_id: item.source_id ?? null }))
+
+      // Se crean en segundo plano y por tandas; el progreso se consulta en
+      // /api/calendarios/jobs?id=...
+      const job = await startCalendarJob({ kind: 'generate', instances }, session.id)
 
-      logInfo('Generación personalizada de calendario confirmada', {
+      logInfo('Generación personalizada de calendario encolada', {
         module: 'calendar',
         action: 'generate_activity',
         user: session.id,
-        meta: { count: created.length, mode: 'custom' },
+        meta: { job: job.id, count: job.total, mode: 'custom' },
       })
 
-      return NextResponse.json({ created: created.length, instances: created }, { status: 201 })
+      return NextResponse.json({ job }, { status: 202 })
     }
 
     // ── Modo "alternating" (ALMA Clásico) — comportamiento existente ─────────
@@ -64,7 +57,9 @@ export async function POST(req: NextRequest) {
       )
     }
 
-    const result = await generateCalendarInstances({
+    // Lo expande /calendar/generate, como siempre; el trabajo sólo se lo
+    // pide por tramos de fechas en vez de en una sola transacción.
+    const pattern = {
       start_date: body.start_date,
       end_date: body.end_date,
       first_type: body.first_type,
@@ -72,21 +67,23 @@ export async function POST(req: NextRequest) {
       interval_days: body.interval_days,
       source_group_id: body.source_group_id || null,
       source_workshop_id: body.source_workshop_id || null,
-    })
+    }
+    const job = await startCalendarJob({ kind: 'generate', pattern }, session.id)
 
-    logInfo('Generación ALMA Clásico de calendario confirmada', {
+    logInfo('Generación ALMA Clásico de calendario encolada', {
       module: 'calendar',
       action: 'generate_activity',
       user: session.id,
       meta: {
-        count: result.created,
+        job: job.id,
+        count: job.total,
         mode: 'alternating',
         start_date: body.start_date,
         end_date: body.end_date,
       },
     })
 
-    return NextResponse.json(result, { status: 201 })
+    return NextResponse.json({ job }, { status: 202 })
   } catch (err: any) {
     logError('Error al generar instancias de calendario', {
       module: 'calendar', action: 'generate_activity', user: session.id, error: err,
@@ -1,6 +1,6 @@
 import { type NextRequest, NextResponse } from "next/server"
 import {
-  enrollInEvent, unenrollFromEvent, getParticipantEventIds,
+  updateEventEnrollments, getParticipantEventIds,
   logActivityEvent, toUserType,
 } from "@/lib/data-manager"
 import { getSessionUser } from "@/lib/serverAuth"
@@ -11,13 +11,26 @@ import { logInfo, logError } from "@/lib/logger"
  *
  * La unidad de inscripción es el encuentro (calendar_event_participants), no el
  * programa: así el número refleja quién va a ESA sesión. Es directa (sin
- * aprobación) y sin cupo.
+ * aprobación); si el evento tiene cupo, el backend lo hace respetar.
  *
  * GET  → ids de los eventos a los que el participante ya se anotó
- * POST → { event_id } se anota
- * DELETE ?event_id=N → se desanota
+ * POST → { event_id } o { event_ids: [...] } se anota (409 si no hubo lugar)
+ * DELETE ?event_id=N (o N,M,…) → se desanota
+ *
+ * POST y DELETE devuelven `event_ids`, el set actualizado: la pantalla no
+ * tiene que volver a pedirlo.
  */
 
+/** `7`, `"7"`, `[7, 8]` o `"7,8"` → ids válidos, sin repetir. */
+function parseEventIds(value: unknown): number[] {
+  const raw = Array.isArray(value) ? value : String(value ?? "").split(",")
+  const ids = raw.map(v => Number.parseInt(String(v), 10)).filter(n => Number.isInteger(n) && n > 0)
+  return [...new Set(ids)]
+}
+
+/** Tope por pedido: un lote es lo que un participante marca en una pantalla. */
+const MAX_BATCH = 50
+
 export async function GET(request: NextRequest) {
   const session = getSessionUser(request)
   if (!session) return NextResponse.json({ error: "No autorizado" }, { status: 401 })
@@ -40,14 +53,31 @@ export async function POST(request: NextRequest) {
     return NextResponse.json({ error: "Solo los participantes se inscriben a eventos" }, { status: 403 })
   }
   try {
-    const { event_id } = await request.json()
-    const eventId = Number.parseInt(String(event_id ?? 0), 10)
-    if (!eventId) return NextResponse.json({ error: "Falta el evento" }, { status: 400 })
+    const { event_id, event_ids } = await request.json()
+    const eventIds = parseEventIds(event_ids ?? event_id)
+    if (eventIds.length === 0) return NextResponse.json({ error: "Falta el evento" }, { status: 400 })
+    if (eventIds.length > MAX_BATCH) {
+      return NextResponse.json({ error: `Como máximo ${MAX_BATCH} eventos por pedido` }, { status: 400 })
+    }
 
-    await enrollInEvent(eventId, session.id)
-    logInfo("Participante anotado a evento", { module: "calendarios", action: "enroll_event", user: session.id, meta: { event_id: eventId } })
-    logActivityEvent({ event_type: "create", module: "calendarios", action: "enroll_event", user_type: toUserType(session.role), user_id: session.id, role: session.role }).catch(() => {})
-    return NextResponse.json({ ok: true })
+    const result = await updateEventEnrollments(session.id, { enroll: eventIds })
+    if (result.enrolled.length > 0) {
+      logInfo("Participante anotado a evento", { module: "calendarios", action: "enroll_event", user: session.id, meta: { event_ids: result.enrolled } })
+      logActivityEvent({ event_type: "create", module: "calendarios", action: "enroll_event", user_type: toUserType(session.role), user_id: session.id, role: session.role }).catch(() => {})
+    }
+    if (result.enrolled.length === 0 && result.full.length > 0) {
+      return NextResponse.json(
+        { error: "El evento ya no tiene lugar", full: result.full, event_ids: result.event_ids },
+        { status: 409 },
+      )
+    }
+    return NextResponse.json({
+      ok: true,
+      enrolled: result.enrolled,
+      full: result.full,
+      not_found: result.not_found,
+      event_ids: result.event_ids,
+    })
   } catch (error) {
     logError("Error al anotar participante a evento", { module: "calendarios", action: "enroll_event", user: session.id, error })
     return NextResponse.json({ error: "Error del servidor" }, { status: 500 })
@@ -61,12 +91,15 @@ export async function DELETE(request: NextRequest) {
     return NextResponse.json({ error: "Sin permisos" }, { status: 403 })
   }
   try {
-    const eventId = Number.parseInt(new URL(request.url).searchParams.get("event_id") || "0", 10)
-    if (!eventId) return NextResponse.json({ error: "Falta el evento" }, { status: 400 })
+    const eventIds = parseEventIds(new URL(request.url).searchParams.get("event_id"))
+    if (eventIds.length === 0) return NextResponse.json({ error: "Falta el evento" }, { status: 400 })
+    if (eventIds.length > MAX_BATCH) {
+      return NextResponse.json({ error: `Como máximo ${MAX_BATCH} eventos por pedido` }, { status: 400 })
+    }
 
-    await unenrollFromEvent(eventId, session.id)
-    logInfo("Participante desanotado de evento", { module: "calendarios", action: "unenroll_event", user: session.id, meta: { event_id: eventId } })
-    return NextResponse.json({ ok: true })
+    const result = await updateEventEnrollments(session.id, { unenroll: eventIds })
+    logInfo("Participante desanotado de evento", { module: "calendarios", action: "unenroll_event", user: session.id, meta: { event_ids: result.unenrolled } })
+    return NextResponse.json({ ok: true, event_ids: result.event_ids })
   } catch (error) {
     logError("Error al desanotar participante de evento", { module: "calendarios", action: "unenroll_event", user: session.id, error })
     return NextResponse.json({ error: "Error del servidor" }, { status: 500 })
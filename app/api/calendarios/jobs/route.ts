@@ -0,0 +1,48 @@
+import { NextRequest, NextResponse } from 'next/server'
+import { getCalendarJob, requestCalendarJobAction, CalendarJob } from '@/lib/calendar-jobs'
+import { getSessionUser, SessionUser } from '@/lib/serverAuth'
+import { can } from '@/lib/permissions'
+import { logInfo, logWarn } from '@/lib/logger'
+
+/** Ver o tocar un trabajo pide el mismo permiso que lanzarlo. */
+function canHandle(session: SessionUser, job: CalendarJob): boolean {
+  return can(session, job.kind === 'delete' ? 'calendar:delete' : 'calendar:generate')
+}
+
+// GET: progreso de un trabajo masivo (borrado / generación)
+export async function GET(req: NextRequest) {
+  const session = getSessionUser(req)
+  if (!session) return NextResponse.json({ error: 'No autorizado' }, { status: 401 })
+
+  const id = new URL(req.url).searchParams.get('id') || ''
+  const job = await getCalendarJob(id)
+  if (!job) return NextResponse.json({ error: 'Trabajo no encontrado' }, { status: 404 })
+  if (!canHandle(session, job)) return NextResponse.json({ error: 'Sin permisos' }, { status: 403 })
+
+  return NextResponse.json({ job })
+}
+
+// PATCH: { id, action: 'cancel' | 'resume' }
+export async function PATCH(req: NextRequest) {
+  const session = getSessionUser(req)
+  if (!session) return NextResponse.json({ error: 'No autorizado' }, { status: 401 })
+
+  const body = await req.json().catch(() => ({}))
+  const { id, action } = body as { id?: string; action?: string }
+  if (action !== 'cancel' && action !== 'resume') {
+    return NextResponse.json({ error: 'action inválida' }, { status: 400 })
+  }
+
+  const current = await getCalendarJob(id || '')
+  if (!current) return NextResponse.json({ error: 'Trabajo no encontrado' }, { status: 404 })
+  if (!canHandle(session, current)) {
+    logWarn('Permiso denegado sobre trabajo masivo de calendario', { module: 'calendarios', action: `job_${action}`, user: session.id, meta: { job: current.id } })
+    return NextResponse.json({ error: 'Sin permisos' }, { status: 403 })
+  }
+
+  const job = await requestCalendarJobAction(current.id, action)
+  logInfo(action === 'cancel' ? 'Trabajo masivo de calendario cancelado' : 'Trabajo masivo de calendario reanudado', {
+    module: 'calendarios', action: `job_${action}`, user: session.id, meta: { job: current.id, done: current.done, total: current.total },
+  })
+  return NextResponse.json({ job })
+}
@@ -1,5 +1,7 @@
 import { type NextRequest, NextResponse } from "next/server"
-import { issueCertificate, issueCertificatesBulk } from "@/lib/data-manager"
+import { issueCertificate } from "@/lib/data-manager"
+import { startCertificateJob, getCertificateJob } from "@/lib/certificate-jobs"
+import { forgetCertificatePdfs } from "@/lib/certificate-store"
 import { getSessionUser } from "@/lib/serverAuth"
 import { can } from "@/lib/permissions"
 import { detalleDeValidacion } from "@/lib/api-errors"
@@ -8,9 +10,11 @@ import { logInfo, logError } from "@/lib/logger"
 /**
  * POST /api/certificados/emitir — emisión a mano.
  *
- * Con `person_ids` (arreglo) emite a varios de una; con `person_id` emite a
- * uno. Es la vía para los cursos presenciales y para cualquier caso que la
- * emisión automática no cubra.
+ * Con `person_ids` (arreglo) emite a varios: se encola un trabajo (ver
+ * lib/certificate-jobs) y se responde 202 con su id; el progreso se consulta
+ * con GET ?id=. Con `person_id` emite a uno, en el momento. Es la vía para
+ * los cursos presenciales y para cualquier caso que la emisión automática no
+ * cubra.
  *
  * Emitir de nuevo sobre alguien que ya tiene su certificado lo ACTUALIZA y
  * conserva el código: el link que ya circuló sigue funcionando.
@@ -33,17 +37,13 @@ export async function POST(request: NextRequest) {
         return NextResponse.json({ error: "Falta la capacitación" }, { status: 422 })
       }
 
-      const emitidos = await issueCertificatesBulk({
-        person_ids: data.person_ids,
-        training_id: data.training_id,
-        issued_by_volunteer_id: session.id || null,
-      })
+      const job = startCertificateJob(Number(data.training_id), data.person_ids.map(Number), session.id)
 
-      logInfo("Emisión masiva de certificados", {
+      logInfo("Emisión masiva de certificados encolada", {
         module: "certificados", action: "emitir_masivo", user: session.id,
-        meta: { training_id: data.training_id, pedidos: data.person_ids.length, emitidos: emitidos.length },
+        meta: { training_id: data.training_id, pedidos: job.requested, job: job.id },
       })
-      return NextResponse.json(emitidos)
+      return NextResponse.json({ job }, { status: 202 })
     }
 
     if (!data?.person_id) {
@@ -55,6 +55,8 @@ export async function POST(request: NextRequest) {
       training_id: data.training_id ?? null,
       issued_by_volunteer_id: session.id || null,
     })
+    // Si era una reemisión, el PDF guardado del mismo código ya no vale.
+    await forgetCertificatePdfs(certificado.code)
 
     logInfo("Certificado emitido", {
       module: "certificados", action: "emitir", user: session.id,
@@ -75,3 +77,16 @@ export async function POST(request: NextRequest) {
     return NextResponse.json({ error: "Error del servidor" }, { status: 500 })
   }
 }
+
+/** GET /api/certificados/emitir?id=<job> — progreso de una emisión masiva. */
+export async function GET(request: NextRequest) {
+  const session = getSessionUser(request)
+  if (!session) return NextResponse.json({ error: "No autorizado" }, { status: 401 })
+  if (!can(session, "capacitaciones:manage")) {
+    return NextResponse.json({ error: "Sin permisos" }, { status: 403 })
+  }
+
+  const job = await getCertificateJob(new URL(request.url).searchParams.get("id") || "")
+  if (!job) return NextResponse.json({ error: "Trabajo no encontrado" }, { status: 404 })
+  return NextResponse.json({ job })
+}
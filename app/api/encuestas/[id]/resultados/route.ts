@@ -4,7 +4,12 @@ import { getSessionUser } from "@/lib/serverAuth"
 import { can } from "@/lib/permissions"
 import { logError } from "@/lib/logger"
 
-/** GET /api/encuestas/[id]/resultados — quiénes rindieron y cómo les fue (admin) */
+/**
+ * GET /api/encuestas/[id]/resultados — quiénes rindieron y cómo les fue (admin)
+ *
+ * Sale del cache (lib/training-cache): se vuelve a pedir al backend
+ * cuando alguien rinde o cambian las preguntas.
+ */
 export async function GET(request: NextRequest, { params }: { params: Promise<{ id: string }> }) {
   const session = getSessionUser(request)
   if (!session) return NextResponse.json({ error: "No autorizado" }, { status: 401 })
@@ -1,7 +1,12 @@
 import { type NextRequest, NextResponse } from "next/server"
-import { getFileRaw } from "@/lib/data-manager"
+import { getFileRaw, getFileMeta } from "@/lib/data-manager"
 import { getSessionUser } from "@/lib/serverAuth"
 import { logError } from "@/lib/logger"
+import { parseRange, sliceStream } from "@/lib/http-range"
+import { snapWidth, variantSize, isVariantResponse, openCachedVariant, cacheVariantWhileStreaming } from "@/lib/file-variants"
+
+// private: es contenido de la plataforma, no debe quedar en caches compartidas.
+const CACHE_CONTROL = "private, max-age=31536000, immutable"
 
 /**
  * GET /api/files/[guid]/raw — los BYTES del archivo.
@@ -9,6 +14,10 @@ import { logError } from "@/lib/logger"
  * Es lo que consume un <img src="/api/files/<guid>/raw">. Se pasan tal cual
  * vienen del backend, con su Content-Type y su Cache-Control: como el guid es
  * inmutable, el navegador lo baja una sola vez y después lo sirve de cache.
+ *
+ * Los bytes van en stream (nunca se junta el archivo en memoria) y se
+ * respeta `Range`, así un video o un PDF grande se pueden adelantar sin
+ * bajarlos enteros. Con `?w=320` se sirve la miniatura (ver lib/file-variants).
  */
 export async function GET(request: NextRequest, { params }: { params: Promise<{ guid: string }> }) {
   const session = getSessionUser(request)
@@ -17,18 +26,12 @@ export async function GET(request: NextRequest, { params }: { params: Promise<{
   const { guid } = await params
 
   try {
-    const upstream = await getFileRaw(guid)
-    const body = await upstream.arrayBuffer()
-
-    return new NextResponse(body, {
-      status: 200,
-      headers: {
-        "Content-Type": upstream.headers.get("Content-Type") || "application/octet-stream",
-        // private: es contenido de la plataforma, no debe quedar en caches compartidas.
-        "Cache-Control": "private, max-age=31536000, immutable",
-        "Content-Length": String(body.byteLength),
-      },
-    })
+    const width = Number(new URL(request.url).searchParams.get("w")) || 0
+    if (width > 0) {
+      const variant = await serveVariant(guid, width)
+      if (variant) return variant
+    }
+    return await serveOriginal(request, guid)
   } catch (error: any) {
     if (String(error?.message ?? "").includes("404")) {
       return NextResponse.json({ error: "Archivo no encontrado" }, { status: 404 })
@@ -37,3 +40,76 @@ export async function GET(request: NextRequest, { params }: { params: Promise<{
     return NextResponse.json({ error: "Error del servidor" }, { status: 500 })
   }
 }
+
+async function serveOriginal(request: NextRequest, guid: string): Promise<NextResponse> {
+  const range = request.headers.get("Range")
+  const upstream = await getFileRaw(guid, { range, ifNoneMatch: request.headers.get("If-None-Match") })
+
+  const headers: Record<string, string> = {
+    "Content-Type": upstream.headers.get("Content-Type") || "application/octet-stream",
+    "Cache-Control": CACHE_CONTROL,
+    "Accept-Ranges": "bytes",
+  }
+  const etag = upstream.headers.get("ETag")
+  if (etag) headers["ETag"] = etag
+
+  if (upstream.status === 304) return new NextResponse(null, { status: 304, headers })
+
+  // El backend ya resolvió el rango: se pasa tal cual.
+  if (upstream.status === 206) {
+    for (const h of ["Content-Range", "Content-Length"]) {
+      const v = upstream.headers.get(h)
+      if (v) headers[h] = v
+    }
+    return new NextResponse(upstream.body, { status: 206, headers })
+  }
+
+  const length = Number(upstream.headers.get("Content-Length")) || null
+  const wanted = range && length !== null ? parseRange(range, length) : null
+
+  if (wanted === "unsatisfiable") {
+    await upstream.body?.cancel()
+    return new NextResponse(null, { status: 416, headers: { ...headers, "Content-Range": `bytes */${length}` } })
+  }
+
+  // El backend mandó el archivo entero: el rango se recorta acá, al vuelo.
+  if (wanted && upstream.body) {
+    headers["Content-Range"] = `bytes ${wanted.start}-${wanted.end}/${length}`
+    headers["Content-Length"] = String(wanted.end - wanted.start + 1)
+    return new NextResponse(sliceStream(upstream.body, wanted), { status: 206, headers })
+  }
+
+  if (length !== null) headers["Content-Length"] = String(length)
+  return new NextResponse(upstream.body, { status: 200, headers })
+}
+
+/** null = no corresponde variante (sin dimensiones o ya es chico): va el original. */
+async function serveVariant(guid: string, requested: number): Promise<NextResponse | null> {
+  // Lo ya guardado sale de disco sin preguntarle nada al backend.
+  const cached = await openCachedVariant(guid, snapWidth(requested))
+  if (cached) {
+    return new NextResponse(cached.stream, {
+      status: 200,
+      headers: { "Content-Type": cached.contentType, "Cache-Control": CACHE_CONTROL, "Content-Length": String(cached.size) },
+    })
+  }
+
+  const meta = await getFileMeta(guid)
+  const size = variantSize(meta, requested)
+  if (!size) return null
+
+  const upstream = await getFileRaw(guid, { variant: size })
+  if (!upstream.body) return null
+  const contentType = upstream.headers.get("Content-Type") || "application/octet-stream"
+  if (!isVariantResponse(upstream.headers, size.width, meta.size_bytes)) {
+    // El backend no recortó: se sirve lo que mandó, pero no queda como variante.
+    return new NextResponse(upstream.body, {
+      status: 200,
+      headers: { "Content-Type": contentType, "Cache-Control": CACHE_CONTROL },
+    })
+  }
+  return new NextResponse(cacheVariantWhileStreaming(guid, size.width, contentType, upstream.body), {
+    status: 200,
+    headers: { "Content-Type": contentType, "Cache-Control": CACHE_CONTROL },
+  })
+}
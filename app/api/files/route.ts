@@ -1,5 +1,6 @@
 import { type NextRequest, NextResponse } from "next/server"
-import { uploadFile, getFiles, logActivityEvent, toUserType } from "@/lib/data-manager"
+import { createHash } from "crypto"
+import { uploadFile, uploadFileStream, deleteFile, getFiles, logActivityEvent, toUserType, type FileMeta } from "@/lib/data-manager"
 import { getSessionUser } from "@/lib/serverAuth"
 import { can } from "@/lib/permissions"
 import { logInfo, logWarn, logError } from "@/lib/logger"
@@ -25,7 +26,15 @@ export async function GET(request: NextRequest) {
   }
 }
 
-/** POST /api/files — subida en base64. El backend valida tipo real, tamaño y optimiza. */
+/**
+ * POST /api/files — subida de un archivo. El backend valida tipo real, tamaño y optimiza.
+ *
+ * Dos formas:
+ *   - binario: el cuerpo son los bytes (Content-Type = tipo del archivo) y la
+ *     metadata va en la query (?name=&purpose=&owner_type=&owner_id=). Viaja
+ *     como stream hasta el backend: la memoria no crece con el tamaño.
+ *   - JSON con `data_base64`: la forma anterior, para clientes viejos.
+ */
 export async function POST(request: NextRequest) {
   const session = getSessionUser(request)
   if (!session) return NextResponse.json({ error: "No autorizado" }, { status: 401 })
@@ -35,21 +44,11 @@ export async function POST(request: NextRequest) {
   }
 
   try {
-    const data = await request.json()
-    if (!data.name?.trim() || !data.purpose?.trim() || !data.data_base64) {
-      return NextResponse.json({ error: "Faltan datos del archivo" }, { status: 422 })
-    }
-
-    const file = await uploadFile({
-      name: data.name.trim(),
-      mime_type: data.mime_type || "",
-      purpose: data.purpose.trim(),
-      data_base64: data.data_base64,
-      owner_type: data.owner_type?.trim() || null,
-      owner_id: data.owner_id ?? null,
-      // El admin por env tiene id 0 y no existe en `voluntarios` → se guarda NULL.
-      uploaded_by_volunteer_id: session.id || null,
-    })
+    const contentType = request.headers.get("Content-Type") || ""
+    const file = contentType.includes("application/json")
+      ? await uploadBase64(request, session.id)
+      : await uploadBinary(request, session.id, contentType)
+    if (file instanceof NextResponse) return file
 
     logInfo("Archivo subido", {
       module: "files", action: "upload", user: session.id,
@@ -68,3 +67,71 @@ export async function POST(request: NextRequest) {
     return NextResponse.json({ error: "Error del servidor" }, { status: 500 })
   }
 }
+
+async function uploadBase64(request: NextRequest, userId: number): Promise<FileMeta | NextResponse> {
+  const data = await request.json()
+  if (!data.name?.trim() || !data.purpose?.trim() || !data.data_base64) {
+    return NextResponse.json({ error: "Faltan datos del archivo" }, { status: 422 })
+  }
+
+  return uploadFile({
+    name: data.name.trim(),
+    mime_type: data.mime_type || "",
+    purpose: data.purpose.trim(),
+    data_base64: data.data_base64,
+    owner_type: data.owner_type?.trim() || null,
+    owner_id: data.owner_id ?? null,
+    // El admin por env tiene id 0 y no existe en `voluntarios` → se guarda NULL.
+    uploaded_by_volunteer_id: userId || null,
+  })
+}
+
+async function uploadBinary(request: NextRequest, userId: number, contentType: string): Promise<FileMeta | NextResponse> {
+  const url = new URL(request.url)
+  const name = url.searchParams.get("name")?.trim()
+  const purpose = url.searchParams.get("purpose")?.trim()
+  if (!name || !purpose || !request.body) {
+    return NextResponse.json({ error: "Faltan datos del archivo" }, { status: 422 })
+  }
+
+  // El sha256 se calcula a medida que pasan los bytes, sin juntarlos.
+  const hash = createHash("sha256")
+  let received = 0
+  const counted = request.body.pipeThrough(
+    new TransformStream<Uint8Array, Uint8Array>({
+      transform(chunk, controller) {
+        hash.update(chunk)
+        received += chunk.byteLength
+        controller.enqueue(chunk)
+      },
+    }),
+  )
+
+  const ownerId = url.searchParams.get("owner_id")
+  const declared = Number(request.headers.get("Content-Length")) || null
+  const file = await uploadFileStream(
+    {
+      name,
+      mime_type: contentType.split(";")[0].trim(),
+      purpose,
+      owner_type: url.searchParams.get("owner_type")?.trim() || null,
+      owner_id: ownerId ? Number.parseInt(ownerId, 10) : null,
+      uploaded_by_volunteer_id: userId || null,
+      size_bytes: declared,
+    },
+    counted,
+  )
+
+  // Si el backend guardó los bytes tal cual (no los optimizó), su checksum
+  // tiene que coincidir con el nuestro. Si no coincide, se corrompió en el camino.
+  const sha256 = hash.digest("hex")
+  if (file.size_bytes === received && file.checksum_sha256 && file.checksum_sha256 !== sha256) {
+    await deleteFile(file.guid, { purge: true }).catch(() => {})
+    logError("Checksum distinto al subir archivo", {
+      module: "files", action: "upload", user: userId,
+      meta: { guid: file.guid, esperado: sha256, recibido: file.checksum_sha256 },
+    })
+    return NextResponse.json({ error: "El archivo llegó dañado; intentá de nuevo" }, { status: 502 })
+  }
+  return file
+}
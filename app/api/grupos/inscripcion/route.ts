@@ -1,5 +1,5 @@
 import { type NextRequest, NextResponse } from "next/server"
-import { getGroups, getUserEnrollments, createEnrollment, updateGroup, getVolunteerById } from "@/lib/data-manager"
+import { getGroups, getUserEnrollments, createEnrollment, getVolunteerById } from "@/lib/data-manager"
 
 export async function POST(request: NextRequest) {
   try {
@@ -24,7 +24,7 @@ export async function POST(request: NextRequest) {
       return NextResponse.json({ error: "Ya está inscrito en este grupo" }, { status: 400 })
     }
 
-    // Create enrollment record
+    // Create enrollment record (participants lo suma el backend)
     const enrollment = await createEnrollment({
       user_id: userId,
       type: "grupo",
@@ -33,9 +33,6 @@ export async function POST(request: NextRequest) {
       status: "confirmada",
     })
 
-    // Increment participants count
-    await updateGroup(groupId, { participants: group.participants + 1 })
-
     // Send confirmation email
     await fetch("/api/emails", {
       method: "POST",
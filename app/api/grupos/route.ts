@@ -53,13 +53,13 @@ export async function PUT(request: NextRequest) {
     const url = new URL(request.url)
     const id = Number.parseInt(url.searchParams.get("id") || "0")
     const data = await request.json()
+    // participants no se edita: lo mantienen las inscripciones (init_db.py, 3d).
     const group = await updateGroup(id, {
       name: data.name,
       description: data.description,
       coordinator: data.coordinator,
       day: data.day,
       schedule: data.schedule,
-      participants: data.participants,
       status: data.status,
     })
     logInfo("Grupo actualizado", { module: "grupos", action: "edit_group", user: session.id, meta: { id } })
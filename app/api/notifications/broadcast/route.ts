@@ -1,9 +1,10 @@
 import { type NextRequest, NextResponse } from "next/server"
-import { broadcastNotification } from "@/lib/data-manager"
+import { startBroadcastJob, getBroadcastJob } from "@/lib/broadcast-jobs"
 import { getSessionUser } from "@/lib/serverAuth"
 import { logInfo, logError } from "@/lib/logger"
 
-// POST /api/notifications/broadcast → lanza una notificación a una audiencia.
+// POST /api/notifications/broadcast → encola una notificación a una audiencia
+// y responde enseguida con el id del trabajo (la entrega sigue en segundo plano).
 // SOLO admin.
 export async function POST(request: NextRequest) {
   const session = getSessionUser(request)
@@ -30,7 +31,7 @@ export async function POST(request: NextRequest) {
       ? volunteer_ids.map((n: any) => Number(n)).filter((n: number) => Number.isFinite(n))
       : null
 
-    const result = await broadcastNotification({
+    const job = startBroadcastJob({
       title: title.trim(),
       body: (body || "").trim(),
       audience: audience || "voluntario",
@@ -41,24 +42,34 @@ export async function POST(request: NextRequest) {
       email_subject: (email_subject || "").trim() || null,
       email_body: (email_body || "").trim() || null,
       volunteer_ids: ids && ids.length > 0 ? ids : null,
-    })
-    logInfo("Broadcast lanzado", {
+    }, session.id)
+    logInfo("Broadcast encolado", {
       module: "notifications",
       action: "broadcast",
       user: session.id,
       meta: {
         audience: audience || "voluntario",
         targeted: ids && ids.length > 0 ? ids.length : "audiencia",
-        recipients: result.recipients,
+        job: job.id,
         vias: [conNotificacion && "campanita", also_popup && "popup", send_email && "mail"]
           .filter(Boolean)
           .join("+"),
-        emails: result.emails_queued,
       },
     })
-    return NextResponse.json(result)
+    return NextResponse.json({ job }, { status: 202 })
   } catch (error) {
     logError("Error al lanzar broadcast", { module: "notifications", action: "broadcast", user: session.id, error })
     return NextResponse.json({ error: "Error al enviar la notificación" }, { status: 500 })
   }
 }
+
+// GET /api/notifications/broadcast?id=... → progreso del envío. SOLO admin.
+export async function GET(request: NextRequest) {
+  const session = getSessionUser(request)
+  if (!session) return NextResponse.json({ error: "No autenticado" }, { status: 401 })
+  if (!session.is_admin) return NextResponse.json({ error: "Solo administradores" }, { status: 403 })
+
+  const job = await getBroadcastJob(new URL(request.url).searchParams.get("id") || "")
+  if (!job) return NextResponse.json({ error: "Envío no encontrado" }, { status: 404 })
+  return NextResponse.json({ job })
+}
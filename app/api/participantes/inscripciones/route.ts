@@ -52,6 +52,10 @@ export async function POST(req: NextRequest) {
     logInfo("Participante inscripto", { module: "inscripciones", action: "enroll", user: session.id, meta: { type, item_id } })
     return NextResponse.json({ ok: true })
   } catch (err: any) {
+    // Taller lleno: el trigger de cupos rechaza el alta (ver init_db.py, 3d)
+    if (err.message?.includes('Cupo completo')) {
+      return NextResponse.json({ error: "No hay cupos disponibles" }, { status: 409 })
+    }
     // Ignore duplicate enrollment errors (integrity constraint)
     if (err.message?.includes('409') || err.message?.includes('already') || err.message?.includes('Integrity')) {
       return NextResponse.json({ ok: true })
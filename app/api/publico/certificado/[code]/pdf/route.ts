@@ -1,5 +1,6 @@
 import { type NextRequest, NextResponse } from "next/server"
-import { getCertificatePdf } from "@/lib/data-manager"
+import { getCertificatePdf, verifyCertificate } from "@/lib/data-manager"
+import { openStoredCertificate, storeCertificateWhileStreaming } from "@/lib/certificate-store"
 import { logError } from "@/lib/logger"
 
 /**
@@ -12,8 +13,10 @@ import { logError } from "@/lib/logger"
  * probando. Pero quien tenga el código puede descargarlo — si algún día hace
  * falta que sea privado, se le suma el chequeo de sesión acá y listo.
  *
- * El PDF no existe como archivo: el backend lo dibuja en el momento a partir
- * del texto que quedó congelado al emitir.
+ * El backend dibuja el PDF a partir del texto que quedó congelado al emitir.
+ * Como ese texto no cambia, el PDF se guarda (lib/certificate-store) y las
+ * descargas siguientes salen del archivo. La verificación se hace SIEMPRE
+ * antes: una anulación se respeta al instante aunque el archivo exista.
  */
 export async function GET(
   _request: NextRequest,
@@ -22,18 +25,35 @@ export async function GET(
   const { code } = await params
 
   try {
-    const upstream = await getCertificatePdf(code)
-    const body = await upstream.arrayBuffer()
+    const verificacion = await verifyCertificate(code)
+    if (verificacion.revoked) {
+      return NextResponse.json({ error: "Este certificado fue anulado" }, { status: 409 })
+    }
+    if (!verificacion.valido) {
+      return NextResponse.json({ error: "Certificado no encontrado" }, { status: 404 })
+    }
 
-    return new NextResponse(body, {
-      status: 200,
-      headers: {
-        "Content-Type": "application/pdf",
-        "Content-Disposition": `inline; filename="certificado-${code.toLowerCase()}.pdf"`,
-        "Cache-Control": "no-store",
-        "Content-Length": String(body.byteLength),
-      },
-    })
+    const headers: Record<string, string> = {
+      "Content-Type": "application/pdf",
+      "Content-Disposition": `inline; filename="certificado-${code.toLowerCase()}.pdf"`,
+      "Cache-Control": "no-store",
+    }
+
+    const guardado = await openStoredCertificate(code, verificacion)
+    if (guardado) {
+      return new NextResponse(guardado.stream, {
+        status: 200,
+        headers: { ...headers, "Content-Length": String(guardado.size) },
+      })
+    }
+
+    const upstream = await getCertificatePdf(code)
+    const length = upstream.headers.get("Content-Length")
+    if (length) headers["Content-Length"] = length
+    const body = upstream.body
+      ? storeCertificateWhileStreaming(code, verificacion, upstream.body)
+      : null
+    return new NextResponse(body, { status: 200, headers })
   } catch (error: any) {
     const message = String(error?.message ?? "")
     if (message.includes("404")) {
@@ -1,19 +1,21 @@
 import { type NextRequest, NextResponse } from "next/server"
-import { getWorkshops, getUserEnrollments, createEnrollment, updateWorkshop, getVolunteerById } from "@/lib/data-manager"
+import { getWorkshops, getUserEnrollments, createEnrollment, getVolunteerById } from "@/lib/data-manager"
 
 export async function POST(request: NextRequest) {
   try {
     const { userId, workshopId } = await request.json()
 
-    // Verify workshop exists and has capacity
+    // Verify workshop exists and has capacity. Es sólo un corte rápido: el
+    // cupo lo reserva el backend al crear la inscripción (409 si se llenó).
     const workshops = await getWorkshops()
     const workshop = workshops.find((w) => w.id === workshopId)
     if (!workshop) {
       return NextResponse.json({ error: "Taller no encontrado" }, { status: 404 })
     }
 
-    if (workshop.enrolled >= workshop.capacity) {
-      return NextResponse.json({ error: "No hay cupos disponibles" }, { status: 400 })
+    // capacity = 0 es "sin cupo", como en el trigger (init_db.py).
+    if (workshop.capacity > 0 && workshop.enrolled >= workshop.capacity) {
+      return NextResponse.json({ error: "No hay cupos disponibles" }, { status: 409 })
     }
 
     // Verify volunteer exists
@@ -28,17 +30,22 @@ export async function POST(request: NextRequest) {
       return NextResponse.json({ error: "Ya está inscrito en este taller" }, { status: 400 })
     }
 
-    // Create enrollment record
-    const enrollment = await createEnrollment({
-      user_id: userId,
-      type: "taller",
-      item_id: workshopId,
-      enrollment_date: new Date().toISOString().split("T")[0],
-      status: "confirmada",
-    })
-
-    // Increment enrolled count
-    await updateWorkshop(workshopId, { enrolled: workshop.enrolled + 1 })
+    // Create enrollment record (enrolled lo suma el backend)
+    let enrollment
+    try {
+      enrollment = await createEnrollment({
+        user_id: userId,
+        type: "taller",
+        item_id: workshopId,
+        enrollment_date: new Date().toISOString().split("T")[0],
+        status: "confirmada",
+      })
+    } catch (error) {
+      if (error instanceof Error && error.message.includes("409")) {
+        return NextResponse.json({ error: "No hay cupos disponibles" }, { status: 409 })
+      }
+      throw error
+    }
 
     // Send confirmation email
     await fetch("/api/emails", {
@@ -67,6 +67,7 @@ export async function PUT(request: NextRequest) {
     const capacity = toOptionalInt(data.capacity)
     const cost = toOptionalInt(data.cost)
 
+    // enrolled no se edita: lo mantienen las inscripciones (init_db.py, 3d).
     const workshop = await updateWorkshop(id, {
       name: data.name,
       description: data.description,
@@ -75,7 +76,6 @@ export async function PUT(request: NextRequest) {
       schedule: data.schedule,
       capacity,
       cost,
-      enrolled: data.enrolled,
       status: data.status,
     })
     logInfo("Taller actualizado", { module: "talleres", action: "edit_workshop", user: session.id, meta: { id } })
@@ -16,13 +16,18 @@ export async function GET(request: NextRequest) {
   try {
     const [summary, personas] = await Promise.all([getActivitySummary(), getPersonas()])
 
+    // Índice por (tipo, id): con miles de usuarios, un find por fila se vuelve cuadrático.
+    const byUser = new Map<string, (typeof personas)[number]>()
+    for (const p of personas) {
+      if (p.volunteer_id != null) byUser.set(`voluntario:${p.volunteer_id}`, p)
+      if (p.participant_id != null) byUser.set(`participante:${p.participant_id}`, p)
+    }
+
     const enriched = summary.map((row) => {
       if (row.user_type === "voluntario" && row.user_id === 0) {
         return { ...row, name: "Administrador", last_name: "(env)" }
       }
-      const persona = personas.find((p) =>
-        row.user_type === "voluntario" ? p.volunteer_id === row.user_id : p.participant_id === row.user_id,
-      )
+      const persona = byUser.get(`${row.user_type}:${row.user_id}`)
       return { ...row, name: persona?.name ?? null, last_name: persona?.last_name ?? null }
     })
 
@@ -0,0 +1,1201 @@
+#!/usr/bin/env python3
+"""
+backend_standin.py — ALMA Platform — Backend de prueba en memoria
+==================================================================
+Un reemplazo liviano de la API FastAPI para correr la app sin MySQL ni el
+backend real: implementa las rutas principales que usa lib/data-manager.ts
+(voluntarios, talleres, grupos, actividades, inventario, inscripciones,
+pendientes, calendario, participantes, archivos y notificaciones) sobre un
+almacén en memoria cargado con los datos de seed_db.py.
+
+    python backend_standin.py                        # :8001, datos de seed_db
+    python backend_standin.py --profile medium       # + cuentas y eventos sintéticos
+    python backend_standin.py --latency 30 --jitter 20 --error-rate 0.02
+    python backend_standin.py --profile large --write-accounts cuentas.csv
+
+Y la app apuntando acá (es el BACKEND_URL por defecto):
+
+    BACKEND_URL=http://localhost:8001 npm start
+    python load_test.py --journeys --accounts cuentas.csv
+
+Perfiles: `seed` son los datos de seed_db.py (más unas notificaciones y
+archivos de muestra); `small`, `medium` y `large` suman voluntarios,
+participantes, eventos en el calendario (del mes pasado a dos meses
+adelante) y archivos. Todas las cuentas usan el PIN por
+defecto de seed_db.py; --write-accounts deja el CSV que lee load_test.py.
+
+Inyección de fallas: --latency / --jitter demoran cada respuesta, y
+--error-rate contesta esa proporción con --error-status (503 por defecto).
+--only limita las dos cosas a los paths que matcheen una regex. Se pueden
+cambiar con la app corriendo:
+
+    curl -X POST localhost:8001/_standin/config -d '{"latency_ms": 200, "only": "^/calendar"}'
+    curl localhost:8001/_standin/stats           # requests por ruta
+
+Lo que no está implementado contesta 404, como una ruta que el backend no
+tiene: la app ya sabe caer a su camino anterior en ese caso.
+
+Solo usa la biblioteca estándar.
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import csv
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import seed_db
+
+GREEN  = "\033[92m"
+RED    = "\033[91m"
+YELLOW = "\033[93m"
+CYAN   = "\033[96m"
+RESET  = "\033[0m"
+BOLD   = "\033[1m"
+DIM    = "\033[2m"
+
+def ok(msg):  print(f"  {GREEN}✓{RESET}  {msg}")
+def err(msg): print(f"  {RED}✗  {msg}{RESET}")
+def info(msg):print(f"  {CYAN}→{RESET}  {msg}")
+def sep():    print(f"  {DIM}{'─' * 50}{RESET}")
+
+# bcrypt de seed_db.DEFAULT_PIN ("1234"), con el mismo costo que usa la app.
+# Fijo: así el stand-in no depende de bcrypt y el login cuesta lo mismo que
+# contra el backend real.
+PIN_HASH = "$2b$12$hI3dguqxQqP0althBUdO4eEzu6ZffhqYoGm0tb.8B/R8Txb/L8hcS"
+
+# ──────────────────────────────────────────────────────────────────
+# 1. Almacén en memoria
+# ──────────────────────────────────────────────────────────────────
+
+def now_iso() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class Store:
+    """Tablas como dict id → fila. Un solo lock: alcanza para un backend de prueba."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.tables: dict[str, dict] = {}
+        self.seq: dict[str, int] = {}
+
+    def table(self, name: str) -> dict:
+        return self.tables.setdefault(name, {})
+
+    def insert(self, name: str, row: dict) -> dict:
+        table = self.table(name)
+        if row.get("id") is None:
+            row["id"] = self.seq[name] = self.seq.get(name, 0) + 1
+        elif isinstance(row["id"], int):
+            self.seq[name] = max(self.seq.get(name, 0), row["id"])
+        table[row["id"]] = row
+        return row
+
+    def rows(self, name: str) -> list[dict]:
+        return list(self.table(name).values())
+
+    def get(self, name: str, row_id) -> dict:
+        row = self.table(name).get(row_id)
+        if row is None:
+            raise HttpError(404, f"{name} {row_id} no encontrado")
+        return row
+
+    def update(self, name: str, row_id, data: dict) -> dict:
+        row = self.get(name, row_id)
+        row.update({k: v for k, v in data.items() if k != "id"})
+        return row
+
+    def delete(self, name: str, row_id) -> None:
+        if self.table(name).pop(row_id, None) is None:
+            raise HttpError(404, f"{name} {row_id} no encontrado")
+
+
+store = Store()
+
+
+def load_seed() -> None:
+    for (vid, name, last, age, gender, phone, email, reg, birth, is_admin, spec) in seed_db.VOLUNTARIOS:
+        store.insert("voluntarios", {
+            "id": vid, "name": name, "last_name": last, "age": age, "gender": gender, "phone": phone,
+            "email": email, "registration_date": reg, "birth_date": birth, "status": "activo",
+            "specialties": json.loads(spec), "is_admin": bool(is_admin), "photo": None, "pin_hash": PIN_HASH,
+        })
+    for (tid, name, desc, instructor, day, schedule, capacity, cost, status) in seed_db.TALLERES:
+        store.insert("talleres", {
+            "id": tid, "name": name, "description": desc, "instructor": instructor, "date": day,
+            "schedule": schedule, "capacity": capacity, "cost": cost, "enrolled": 0, "status": status,
+        })
+    for (gid, name, desc, coordinator, day, schedule, status) in seed_db.GRUPOS:
+        store.insert("grupos", {
+            "id": gid, "name": name, "description": desc, "coordinator": coordinator, "day": day,
+            "schedule": schedule, "participants": 0, "status": status,
+        })
+    for (aid, name, desc, status) in seed_db.ACTIVIDADES:
+        store.insert("actividades", {
+            "id": aid, "name": name, "description": desc, "capacity": 0, "enrolled": 0, "status": status,
+        })
+    for (iid, name, category, qty, minimum, price, supplier, volunteer, entry) in seed_db.INVENTARIO:
+        store.insert("inventario", {
+            "id": iid, "name": name, "category": category, "quantity": qty, "minimum_stock": minimum,
+            "price": price, "supplier": supplier, "assigned_volunteer_id": volunteer, "entry_date": entry,
+        })
+    for (eid, user_id, kind, item_id, enrolled_on, status) in seed_db.INSCRIPCIONES:
+        row = store.insert("inscripciones", {
+            "id": eid, "user_id": user_id, "type": kind, "item_id": item_id,
+            "enrollment_date": enrolled_on, "status": status,
+        })
+        count_enrollment(row, 1)
+    for (pid, desc, volunteer, completed, created) in seed_db.PENDIENTES:
+        store.insert("pendientes", {
+            "id": pid, "description": desc, "assigned_volunteer_id": volunteer,
+            "completed": bool(completed), "created_date": created, "completed_date": None,
+        })
+    for (sid, parent, desc, volunteer, completed, created) in seed_db.PENDING_ITEMS:
+        store.insert("pending_items", {
+            "id": sid, "pending_id": parent, "description": desc, "assigned_volunteer_id": volunteer,
+            "completed": bool(completed), "created_date": created, "completed_date": None,
+        })
+    for (cid, kind, source_id, day, start, end, notes, status) in seed_db.CALENDAR_INSTANCES:
+        add_event(kind, source_id, day, start, end, status, event_id=cid, notes=notes)
+    for (instance_id, role, volunteer_id) in seed_db.CALENDAR_ASSIGNMENTS:
+        store.insert("calendar_assignments", {"instance_id": instance_id, "role": role, "volunteer_id": volunteer_id})
+
+    profiles = {pp[0]: pp for pp in seed_db.PARTICIPANT_PROFILES}
+    for email, active in seed_db.PARTICIPANTES:
+        p = add_participant(email, bool(active))
+        if email in profiles:
+            _, name, last, phone, city, notif, whatsapp = profiles[email]
+            store.insert("participant_profiles", {
+                "participant_id": p["id"], "name": name, "last_name": last, "phone": phone, "city": city,
+                "accepts_notifications": bool(notif), "accepts_whatsapp": bool(whatsapp),
+            })
+
+
+def add_participant(email: str, active: bool = True) -> dict:
+    return store.insert("participants", {
+        "email": email, "is_active": active, "email_verified": True, "pin_hash": PIN_HASH,
+        "created_at": now_iso(),
+    })
+
+
+def add_event(kind: str, source_id, day: str, start: str = "10:00:00", end: str = "12:00:00",
+              status: str = "programado", event_id: int | None = None, notes=None) -> dict:
+    return store.insert("calendar_instances", {
+        "id": event_id, "type": kind, "source_id": source_id, "title": None, "date": day,
+        "start_time": start, "end_time": end, "notes": notes, "status": status,
+        "notify_enabled": False, "reminder_offsets": None, "created_by_volunteer_id": None,
+        "capacity": None, "volunteer_ids": [], "co_coordinator_ids": [],
+    })
+
+
+# nombre → (voluntarios, participantes, eventos por día, archivos)
+PROFILES = {
+    "seed":   (0,     0,      0,  10),
+    "small":  (50,    500,    2,  50),
+    "medium": (300,   5_000,  6,  500),
+    "large":  (1_000, 50_000, 20, 5_000),
+}
+
+# Un PNG de 1×1 y un texto: alcanzan para que /raw devuelva bytes de verdad.
+TINY_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg==")
+
+
+def load_profile(name: str) -> None:
+    volunteers, participants, per_day, files = PROFILES[name]
+    rnd = random.Random(name)  # mismo perfil, mismos datos
+    base_id = max(store.table("voluntarios"), default=0)
+    for n in range(1, volunteers + 1):
+        store.insert("voluntarios", {
+            "id": base_id + n, "name": f"Voluntario{n}", "last_name": "Escala", "age": rnd.randint(20, 75),
+            "gender": rnd.choice(("Femenino", "Masculino")), "phone": None,
+            "email": f"voluntario{n}@scale.alma.test", "registration_date": "2024-01-01", "birth_date": None,
+            "status": "activo", "specialties": [], "is_admin": False, "photo": None, "pin_hash": PIN_HASH,
+        })
+    for n in range(1, participants + 1):
+        add_participant(f"participante{n}@scale.alma.test")
+
+    # Del mes pasado a dos meses adelante: lo que abre el calendario.
+    today = date.today()
+    start = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+    end = today + timedelta(days=62)
+    groups = list(store.table("grupos")) or [None]
+    workshops = list(store.table("talleres")) or [None]
+    day = start
+    while per_day and day <= end:
+        for i in range(per_day):
+            kind = "grupo" if i % 2 == 0 else "taller"
+            source = rnd.choice(groups if kind == "grupo" else workshops)
+            hour = 9 + (i % 9)
+            add_event(kind, source, day.isoformat(), f"{hour:02d}:00:00", f"{hour + 1:02d}:30:00",
+                      "realizado" if day < today else "programado")
+        day += timedelta(days=1)
+
+    # Unas pocas notificaciones por cuenta (hasta 2000 cuentas: alcanza para
+    # que la campanita tenga qué mostrar sin inflar la carga).
+    for v in list(store.rows("voluntarios"))[:1000]:
+        add_notifications("voluntario", v["id"], rnd.randint(0, 8), rnd)
+    for p in list(store.rows("participants"))[:1000]:
+        add_notifications("participante", p["id"], rnd.randint(0, 8), rnd)
+
+    for n in range(1, files + 1):
+        png = n % 2 == 0
+        content = TINY_PNG if png else f"Documento de prueba {n}\n".encode()
+        add_file(f"archivo-{n}.{'png' if png else 'txt'}", "image/png" if png else "text/plain",
+                 content, "general")
+
+
+def add_file(name: str, mime: str, content: bytes, purpose: str,
+             owner_type=None, owner_id=None, uploaded_by=None) -> dict:
+    guid = uuid.uuid4().hex
+    row = store.insert("files", {
+        "guid": guid, "name": name, "mime_type": mime, "extension": name.rsplit(".", 1)[-1] if "." in name else None,
+        "size_bytes": len(content), "checksum_sha256": hashlib.sha256(content).hexdigest(), "purpose": purpose,
+        "owner_type": owner_type, "owner_id": owner_id, "width": None, "height": None, "is_active": True,
+        "uploaded_by_volunteer_id": uploaded_by, "created_at": now_iso(), "updated_at": None,
+    })
+    store.table("file_bytes")[guid] = content
+    return row
+
+
+def add_notifications(user_type: str, user_id: int, count: int, rnd: random.Random) -> None:
+    # Indexadas por usuario: la campanita se pide en cada navegación.
+    inbox = store.table("notifications").setdefault((user_type, user_id), [])
+    events = store.rows("calendar_instances")
+    for _ in range(count):
+        ev = rnd.choice(events) if events else None
+        store.seq["notifications"] = store.seq.get("notifications", 0) + 1
+        inbox.append({
+            "id": store.seq["notifications"], "user_type": user_type, "user_id": user_id,
+            "title": f"Nuevo evento: {event_title(ev) or 'Actividad'}" if ev else "Aviso del sistema",
+            "body": f"El {ev['date']} a las {ev['start_time'][:5]}" if ev else None,
+            "kind": "calendar_new" if ev else "system", "url": "/calendarios" if ev else None,
+            "is_read": rnd.random() < 0.5, "read_at": None, "created_at": now_iso(),
+        })
+
+
+def write_accounts(path: str) -> int:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        out = csv.writer(f)
+        out.writerow(("email", "rol", "pin"))
+        count = 0
+        for v in store.rows("voluntarios"):
+            out.writerow((v["email"], "admin" if v["is_admin"] else "voluntario", seed_db.DEFAULT_PIN))
+            count += 1
+        for p in store.rows("participants"):
+            if p["is_active"]:
+                out.writerow((p["email"], "participante", seed_db.DEFAULT_PIN))
+                count += 1
+    return count
+
+# ──────────────────────────────────────────────────────────────────
+# 2. Rutas
+# ──────────────────────────────────────────────────────────────────
+
+class HttpError(Exception):
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status, self.detail = status, detail
+
+
+class Raw:
+    """Respuesta que no es JSON (los bytes de un archivo)."""
+
+    def __init__(self, body: bytes, content_type: str, status: int = 200, headers: dict | None = None):
+        self.body, self.content_type, self.status, self.headers = body, content_type, status, headers or {}
+
+
+class Request:
+    def __init__(self, method: str, path: str, query: dict, body: bytes, headers):
+        self.method, self.path, self.query, self.body, self.headers = method, path, query, body, headers
+
+    def arg(self, name: str, default=None):
+        return self.query.get(name, [default])[0]
+
+    def int_arg(self, name: str, default=None):
+        value = self.arg(name)
+        return int(value) if value not in (None, "") else default
+
+    def json(self):
+        return json.loads(self.body or b"null")
+
+
+ROUTES: list[tuple[str, str, re.Pattern, object]] = []
+
+
+def route(method: str, pattern: str):
+    """`{id}` es un entero; `{name:str}` cualquier segmento."""
+    def to_regex(m):
+        name, _, kind = m.group(1).partition(":")
+        return f"(?P<{name}>[^/]+)" if kind == "str" else f"(?P<{name}>\\d+)"
+    regex = re.compile("^" + re.sub(r"\{([^}]+)\}", to_regex, pattern.rstrip("/")) + "$")
+
+    def register(fn):
+        ROUTES.append((method, pattern.rstrip("/"), regex, fn))
+        return fn
+    return register
+
+
+def limited(req: Request, rows: list[dict]) -> list[dict]:
+    limit = req.int_arg("limit")
+    return rows[:limit] if limit else rows
+
+
+# ── CRUD genérico: talleres, grupos, actividades, inventario, ideas ──
+
+def crud(prefix: str, table: str) -> None:
+    @route("GET", prefix)
+    def list_rows(req):
+        rows = store.rows(table)
+        if req.arg("status"):
+            rows = [r for r in rows if r.get("status") == req.arg("status")]
+        return limited(req, rows)
+
+    @route("GET", prefix + "/{id}")
+    def get_row(req, id):
+        return store.get(table, int(id))
+
+    @route("POST", prefix)
+    def create_row(req):
+        data = req.json() or {}
+        data.pop("id", None)
+        return store.insert(table, data)
+
+    @route("PUT", prefix + "/{id}")
+    def update_row(req, id):
+        return store.update(table, int(id), req.json() or {})
+
+    @route("DELETE", prefix + "/{id}")
+    def delete_row(req, id):
+        store.delete(table, int(id))
+        return {"ok": True}
+
+
+for _prefix, _table in (("/talleres", "talleres"), ("/grupos", "grupos"), ("/actividades", "actividades"),
+                        ("/inventario", "inventario"), ("/ideas", "ideas")):
+    crud(_prefix, _table)
+
+
+# ── Voluntarios ────────────────────────────────────────────────────
+
+def public_volunteer(v: dict) -> dict:
+    return {k: val for k, val in v.items() if k != "pin_hash"}
+
+
+def volunteer_by_email(email: str) -> dict:
+    email = unquote(email).strip().lower()
+    for v in store.rows("voluntarios"):
+        if (v.get("email") or "").lower() == email:
+            return v
+    raise HttpError(404, "Voluntario no encontrado")
+
+
+@route("GET", "/voluntarios")
+def list_volunteers(req):
+    rows = store.rows("voluntarios")
+    if req.arg("status"):
+        rows = [v for v in rows if v["status"] == req.arg("status")]
+    return [public_volunteer(v) for v in limited(req, rows)]
+
+
+@route("GET", "/voluntarios/{id}")
+def get_volunteer(req, id):
+    return public_volunteer(store.get("voluntarios", int(id)))
+
+
+@route("GET", "/voluntarios/by-email/{email:str}")
+def get_volunteer_by_email(req, email):
+    return public_volunteer(volunteer_by_email(email))
+
+
+@route("GET", "/voluntarios/auth/{email:str}")
+def get_volunteer_for_auth(req, email):
+    return volunteer_by_email(email)
+
+
+@route("POST", "/voluntarios")
+def create_volunteer(req):
+    data = req.json() or {}
+    data.pop("id", None)
+    data.setdefault("status", "activo")
+    data.setdefault("is_admin", False)
+    data.setdefault("registration_date", date.today().isoformat())
+    return public_volunteer(store.insert("voluntarios", data))
+
+
+@route("PUT", "/voluntarios/{id}")
+def update_volunteer(req, id):
+    return public_volunteer(store.update("voluntarios", int(id), req.json() or {}))
+
+
+@route("DELETE", "/voluntarios/{id}")
+def delete_volunteer(req, id):
+    store.delete("voluntarios", int(id))
+    return {"ok": True}
+
+
+# ── Inscripciones a talleres / grupos / actividades ────────────────
+
+# type → (tabla, contador). Igual que los triggers trg_cnt_* de init_db.py:
+# la inscripción cancelada no cuenta y un taller lleno rechaza el alta.
+COUNTERS = {"taller": ("talleres", "enrolled"), "grupo": ("grupos", "participants")}
+
+
+def count_enrollment(row: dict, delta: int) -> None:
+    if row.get("status") == "cancelada" or row.get("type") not in COUNTERS:
+        return
+    table, column = COUNTERS[row["type"]]
+    item = store.table(table).get(row.get("item_id"))
+    if item is None:
+        return
+    if delta > 0 and table == "talleres" and item.get("capacity") and item[column] >= item["capacity"]:
+        raise HttpError(409, "Cupo completo")
+    item[column] = max(item[column] + delta, 0)
+
+
+@route("GET", "/inscripciones")
+def list_enrollments(req):
+    rows = store.rows("inscripciones")
+    user_id = req.int_arg("user_id")
+    if user_id is not None:
+        rows = [r for r in rows if r["user_id"] == user_id]
+    return limited(req, rows)
+
+
+@route("POST", "/inscripciones")
+def create_enrollment(req):
+    data = req.json() or {}
+    data.pop("id", None)
+    data.setdefault("enrollment_date", date.today().isoformat())
+    data.setdefault("status", "confirmada")
+    count_enrollment(data, 1)
+    return store.insert("inscripciones", data)
+
+
+@route("DELETE", "/inscripciones/{id}")
+def delete_enrollment(req, id):
+    count_enrollment(store.get("inscripciones", int(id)), -1)
+    store.delete("inscripciones", int(id))
+    return {"ok": True}
+
+
+# ── Pendientes ─────────────────────────────────────────────────────
+
+@route("GET", "/pendientes")
+def list_pending(req):
+    return limited(req, sorted(store.rows("pendientes"), key=lambda p: p["created_date"]))
+
+
+@route("GET", "/pendientes/{id:str}/items")
+def list_pending_items(req, id):
+    return [s for s in store.rows("pending_items") if s["pending_id"] == id]
+
+
+@route("POST", "/pendientes/sync")
+def sync_pending(req):
+    tasks = (req.json() or {}).get("tasks", [])
+    store.table("pendientes").clear()
+    store.table("pending_items").clear()
+    for t in tasks:
+        subs = t.pop("sub_items", None) or []
+        store.insert("pendientes", t)
+        for s in subs:
+            s.pop("sub_items", None)
+            store.insert("pending_items", {**s, "pending_id": t["id"]})
+    return {"ok": True, "tasks": len(tasks)}
+
+
+# ── Calendario ─────────────────────────────────────────────────────
+
+def volunteer_ref(volunteer_id) -> dict | None:
+    v = store.table("voluntarios").get(volunteer_id)
+    return {"id": v["id"], "name": v["name"], "last_name": v.get("last_name") or ""} if v else None
+
+
+def event_title(ev: dict) -> str | None:
+    """El título propio o, si no tiene, el nombre del grupo / taller de origen."""
+    if ev["title"] or ev["source_id"] is None:
+        return ev["title"]
+    source = store.table({"grupo": "grupos", "taller": "talleres", "actividad": "actividades"}[ev["type"]])
+    return (source.get(ev["source_id"]) or {}).get("name")
+
+
+def event_indexes() -> tuple[dict, dict]:
+    """Asignaciones por evento y anotados por evento, para armar muchos de una vez."""
+    roles: dict[int, dict] = {}
+    for a in store.rows("calendar_assignments"):
+        roles.setdefault(a["instance_id"], {})[a["role"]] = a["volunteer_id"]
+    return roles, store.table("cep_counts")
+
+
+def rich_event(ev: dict, indexes: tuple[dict, dict] | None = None) -> dict:
+    roles_by_event, counts = indexes or event_indexes()
+    roles = roles_by_event.get(ev["id"], {})
+    co_ids = ev["co_coordinator_ids"] or ([roles["co_coordinator"]] if "co_coordinator" in roles else [])
+    co = [r for r in map(volunteer_ref, co_ids) if r]
+    out = {k: v for k, v in ev.items() if k not in ("volunteer_ids", "co_coordinator_ids")}
+    out.update({
+        "title": event_title(ev),
+        "coordinator": volunteer_ref(roles.get("coordinator")),
+        "co_coordinator": co[0] if co else None,
+        "co_coordinators": co,
+        "volunteers": [r for r in map(volunteer_ref, ev["volunteer_ids"]) if r],
+        "participants_count": counts.get(ev["id"], 0),
+    })
+    return out
+
+
+@route("GET", "/calendar/instances-rich")
+def list_events(req):
+    year, month = req.int_arg("year"), req.int_arg("month")
+    prefix = f"{year:04d}-{month:02d}-" if month else f"{year:04d}-"
+    rows = [e for e in store.rows("calendar_instances") if e["date"].startswith(prefix)]
+    if req.arg("type"):
+        rows = [e for e in rows if e["type"] == req.arg("type")]
+    volunteer_id = req.int_arg("volunteer_id")
+    if volunteer_id:
+        assigned = {a["instance_id"] for a in store.rows("calendar_assignments") if a["volunteer_id"] == volunteer_id}
+        rows = [e for e in rows if e["id"] in assigned or volunteer_id in e["volunteer_ids"]
+                or volunteer_id in e["co_coordinator_ids"]]
+    indexes = event_indexes()
+    return [rich_event(e, indexes) for e in sorted(rows, key=lambda e: (e["date"], e["start_time"], e["id"]))]
+
+
+@route("POST", "/calendar/instances")
+def create_event(req):
+    data = req.json() or {}
+    ev = add_event(data.get("type", "actividad"), data.get("source_id"), data["date"],
+                   data.get("start_time", "10:00:00"), data.get("end_time", "12:00:00"),
+                   data.get("status", "programado"), notes=data.get("notes"))
+    ev.update({k: data[k] for k in ("title", "notify_enabled", "reminder_offsets", "created_by_volunteer_id")
+               if k in data})
+    return rich_event(ev)
+
+
+@route("GET", "/calendar/instances/{id}")
+def get_event(req, id):
+    return rich_event(store.get("calendar_instances", int(id)))
+
+
+@route("PUT", "/calendar/instances/{id}")
+def update_event(req, id):
+    return rich_event(store.update("calendar_instances", int(id), req.json() or {}))
+
+
+def remove_event(event_id: int) -> None:
+    store.delete("calendar_instances", event_id)
+    table = store.table("calendar_assignments")
+    for row_id in [k for k, r in table.items() if r["instance_id"] == event_id]:
+        del table[row_id]
+    for row in [r for r in store.rows("calendar_event_participants") if r["event_id"] == event_id]:
+        unenroll(event_id, row["participant_id"])
+
+
+@route("DELETE", "/calendar/instances/{id}")
+def delete_event(req, id):
+    remove_event(int(id))
+    return {"ok": True}
+
+
+# Borrado masivo por tandas (lib/calendar-jobs): los ids que matchean los
+# filtros, y el borrado de un tramo de ids, cada uno en su transacción.
+
+def bulk_matches(ev: dict, filters: dict) -> bool:
+    scope = filters.get("scope")
+    if scope == "month":
+        return ev["date"].startswith(f"{int(filters['year']):04d}-{int(filters['month']):02d}-")
+    if scope in ("type", "series") and ev["type"] != filters.get("type"):
+        return False
+    return scope != "series" or ev["source_id"] == filters.get("source_id")
+
+
+@route("POST", "/calendar/bulk-count")
+def bulk_count(req):
+    filters = req.json() or {}
+    return {"count": sum(1 for e in store.rows("calendar_instances") if bulk_matches(e, filters))}
+
+
+@route("POST", "/calendar/bulk-ids")
+def bulk_ids(req):
+    filters = req.json() or {}
+    return sorted(e["id"] for e in store.rows("calendar_instances") if bulk_matches(e, filters))
+
+
+@route("POST", "/calendar/bulk-delete-range")
+def bulk_delete_range(req):
+    filters = req.json() or {}
+    lo, hi = int(filters["id_from"]), int(filters["id_to"])
+    ids = [e["id"] for e in store.rows("calendar_instances") if lo <= e["id"] <= hi and bulk_matches(e, filters)]
+    for event_id in ids:
+        remove_event(event_id)
+    return {"deleted": len(ids)}
+
+
+@route("PUT", "/calendar/instances/{id}/cocoordinators")
+def set_cocoordinators(req, id):
+    store.update("calendar_instances", int(id), {"co_coordinator_ids": list((req.json() or {}).get("volunteer_ids", []))})
+    return {"ok": True}
+
+
+@route("PUT", "/calendar/instances/{id}/volunteers")
+def set_volunteers(req, id):
+    store.update("calendar_instances", int(id), {"volunteer_ids": list((req.json() or {}).get("volunteer_ids", []))})
+    return {"ok": True}
+
+
+@route("PUT", "/calendar/instances/{id}/assignments/by-role/{role:str}")
+def set_assignment(req, id, role):
+    event_id, role = int(id), unquote(role)
+    store.get("calendar_instances", event_id)
+    for a in store.rows("calendar_assignments"):
+        if a["instance_id"] == event_id and a["role"] == role:
+            a["volunteer_id"] = (req.json() or {})["volunteer_id"]
+            return a
+    return store.insert("calendar_assignments", {
+        "instance_id": event_id, "role": role, "volunteer_id": (req.json() or {})["volunteer_id"]})
+
+
+@route("DELETE", "/calendar/instances/{id}/assignments/by-role/{role:str}")
+def remove_assignment(req, id, role):
+    table = store.table("calendar_assignments")
+    for row_id in [k for k, a in table.items() if a["instance_id"] == int(id) and a["role"] == unquote(role)]:
+        del table[row_id]
+    return {"ok": True}
+
+
+# Anotados a eventos. Lo que en MySQL resuelven uq_cep y el contador con
+# cupo de calendar_month_events (cme_count_add) acá son índices en memoria:
+# (evento, participante) → fila, anotados por evento y eventos por participante.
+
+def event_enrollment(event_id: int, participant_id: int) -> dict | None:
+    row_id = store.table("cep_by_key").get((event_id, participant_id))
+    return store.table("calendar_event_participants").get(row_id) if row_id is not None else None
+
+
+def participant_events(participant_id: int) -> set:
+    return store.table("cep_by_participant").setdefault(participant_id, set())
+
+
+def enroll(event_id: int, participant_id: int) -> dict:
+    """Anota (o reactiva). 409 si el evento llegó a su cupo, como el trigger."""
+    ev = store.get("calendar_instances", event_id)
+    row = event_enrollment(event_id, participant_id)
+    if row and row["status"] != "cancelado":
+        return row
+    counts = store.table("cep_counts")
+    if ev.get("capacity") is not None and counts.get(event_id, 0) >= ev["capacity"]:
+        raise HttpError(409, "Cupo completo")
+    counts[event_id] = counts.get(event_id, 0) + 1
+    participant_events(participant_id).add(event_id)
+    if row:
+        row.update({"status": "inscripto", "updated_at": now_iso()})
+        return row
+    row = store.insert("calendar_event_participants", {
+        "event_id": event_id, "participant_id": participant_id, "status": "inscripto",
+        "created_at": now_iso(), "updated_at": now_iso(),
+    })
+    store.table("cep_by_key")[(event_id, participant_id)] = row["id"]
+    return row
+
+
+def unenroll(event_id: int, participant_id: int) -> bool:
+    row = event_enrollment(event_id, participant_id)
+    if not row:
+        return False
+    store.delete("calendar_event_participants", row["id"])
+    del store.table("cep_by_key")[(event_id, participant_id)]
+    if row["status"] != "cancelado":
+        counts = store.table("cep_counts")
+        counts[event_id] = max(counts.get(event_id, 0) - 1, 0)
+        participant_events(participant_id).discard(event_id)
+    return True
+
+
+@route("GET", "/calendar/participants/{id}/event-ids")
+def participant_event_ids(req, id):
+    return sorted(participant_events(int(id)))
+
+
+@route("POST", "/calendar/participants/{id}/events/batch")
+def batch_event_enrollment(req, id):
+    """{enroll: [ids], unenroll: [ids]} → qué pasó con cada uno y el set final."""
+    pid, data = int(id), req.json() or {}
+    out = {"enrolled": [], "unenrolled": [], "full": [], "not_found": []}
+    for event_id in sorted(set(map(int, data.get("unenroll") or []))):
+        if unenroll(event_id, pid):
+            out["unenrolled"].append(event_id)
+    for event_id in sorted(set(map(int, data.get("enroll") or []))):
+        try:
+            enroll(event_id, pid)
+            out["enrolled"].append(event_id)
+        except HttpError as e:
+            out["full" if e.status == 409 else "not_found"].append(event_id)
+    out["event_ids"] = sorted(participant_events(pid))
+    return out
+
+
+@route("GET", "/calendar/instances/{id}/participants")
+def list_event_participants(req, id):
+    return [p for p in store.rows("calendar_event_participants") if p["event_id"] == int(id)]
+
+
+@route("POST", "/calendar/instances/{id}/participants")
+def enroll_event(req, id):
+    # Misma regla que la UNIQUE (event_id, participant_id): re-anotarse reactiva.
+    return enroll(int(id), int((req.json() or {})["participant_id"]))
+
+
+@route("DELETE", "/calendar/instances/{id}/participants/by-participant/{participant_id}")
+def unenroll_event(req, id, participant_id):
+    if not unenroll(int(id), int(participant_id)):
+        raise HttpError(404, "El participante no está anotado")
+    return {"ok": True}
+
+
+@route("GET", "/calendar/inscripciones")
+def list_event_enrollments(req):
+    out = []
+    for p in store.rows("calendar_event_participants"):
+        ev = store.table("calendar_instances").get(p["event_id"])
+        if not ev or (req.arg("type") and ev["type"] != req.arg("type")):
+            continue
+        if (req.arg("date_from") and ev["date"] < req.arg("date_from")) or \
+           (req.arg("date_to") and ev["date"] > req.arg("date_to")):
+            continue
+        participant = store.table("participants").get(p["participant_id"]) or {}
+        profile = participant_profile(p["participant_id"]) or {}
+        out.append({
+            "id": p["id"], "status": p["status"], "event_id": ev["id"], "type": ev["type"],
+            "event_title": event_title(ev), "event_date": ev["date"], "start_time": ev["start_time"],
+            "person_name": " ".join(filter(None, (profile.get("name"), profile.get("last_name"))))
+                           or participant.get("email", ""),
+            "person_email": participant.get("email"), "enrolled_at": p["created_at"],
+        })
+    return sorted(out, key=lambda r: (r["event_date"], r["start_time"]))
+
+
+# ── Participantes y personas ───────────────────────────────────────
+
+def participant_profile(participant_id: int) -> dict | None:
+    for pp in store.rows("participant_profiles"):
+        if pp["participant_id"] == participant_id:
+            return pp
+    return None
+
+
+def public_participant(p: dict) -> dict:
+    return {k: v for k, v in p.items() if k != "pin_hash"}
+
+
+@route("GET", "/participants")
+def list_participants(req):
+    rows = store.rows("participants")
+    if req.arg("is_active") is not None:
+        active = req.arg("is_active") == "true"
+        rows = [p for p in rows if p["is_active"] == active]
+    return [public_participant(p) for p in limited(req, rows)]
+
+
+@route("GET", "/participants/auth/{email:str}")
+def get_participant_for_auth(req, email):
+    email = unquote(email).strip().lower()
+    for p in store.rows("participants"):
+        if p["email"].lower() == email:
+            return p
+    raise HttpError(404, "Participante no encontrado")
+
+
+@route("POST", "/participants")
+def create_participant(req):
+    data = req.json() or {}
+    p = add_participant(data["email"].strip().lower())
+    p["pin_hash"] = data.get("pin_hash")
+    return public_participant(p)
+
+
+@route("PUT", "/participants/{id}")
+def update_participant(req, id):
+    return public_participant(store.update("participants", int(id), req.json() or {}))
+
+
+@route("GET", "/participants/{id}/profile")
+def get_participant_profile(req, id):
+    profile = participant_profile(int(id))
+    if not profile:
+        raise HttpError(404, "Perfil no encontrado")
+    return profile
+
+
+@route("POST", "/participants/{id}/profile")
+def create_participant_profile(req, id):
+    data = req.json() or {}
+    data.pop("id", None)
+    return store.insert("participant_profiles", {**data, "participant_id": int(id)})
+
+
+@route("PUT", "/participants/{id}/profile")
+def update_participant_profile(req, id):
+    profile = participant_profile(int(id))
+    if not profile:
+        raise HttpError(404, "Perfil no encontrado")
+    return store.update("participant_profiles", profile["id"], req.json() or {})
+
+
+@route("GET", "/personas/counts")
+def personas_counts(req):
+    return {
+        "volunteers": sum(1 for v in store.rows("voluntarios") if v["status"] == "activo"),
+        "participants": sum(1 for p in store.rows("participants") if p["is_active"]),
+    }
+
+
+@route("GET", "/personas")
+def list_personas(req):
+    # La base de personas del backend real es su propia tabla; acá se arma
+    # con voluntarios y participantes, que es lo que hay.
+    rows = []
+    for v in store.rows("voluntarios"):
+        rows.append({"id": v["id"], "volunteer_id": v["id"], "is_volunteer": True, "participant_id": None,
+                     "name": v["name"], "last_name": v.get("last_name"), "email": v.get("email"),
+                     "phone": v.get("phone"), "city": None, "province": None, "cuit": None})
+    offset = max(store.table("voluntarios"), default=0)
+    for p in store.rows("participants"):
+        profile = participant_profile(p["id"]) or {}
+        rows.append({"id": offset + p["id"], "volunteer_id": None, "is_volunteer": False, "participant_id": p["id"],
+                     "name": profile.get("name"), "last_name": profile.get("last_name"), "email": p["email"],
+                     "phone": profile.get("phone"), "city": profile.get("city"), "province": profile.get("province"),
+                     "cuit": None})
+    for field in ("name", "last_name", "cuit", "city", "province"):
+        needle = (req.arg(field) or "").lower()
+        if needle:
+            rows = [r for r in rows if needle in (r.get(field) or "").lower()]
+    return limited(req, rows)
+
+
+# ── Archivos ───────────────────────────────────────────────────────
+
+FILE_PURPOSES = [
+    {"key": "general", "label": "General", "mimes": ["image/png", "image/jpeg", "application/pdf", "text/plain"], "max_mb": 10},
+    {"key": "avatar", "label": "Foto de perfil", "mimes": ["image/png", "image/jpeg", "image/webp"], "max_mb": 2},
+]
+
+
+def file_by_guid(guid: str) -> dict:
+    for f in store.rows("files"):
+        if f["guid"] == guid:
+            return f
+    raise HttpError(404, "Archivo no encontrado")
+
+
+@route("GET", "/files")
+def list_files(req):
+    rows = store.rows("files")
+    if req.arg("include_inactive") != "true":
+        rows = [f for f in rows if f["is_active"]]
+    for field in ("purpose", "owner_type"):
+        if req.arg(field):
+            rows = [f for f in rows if f[field] == req.arg(field)]
+    if req.int_arg("owner_id") is not None:
+        rows = [f for f in rows if f["owner_id"] == req.int_arg("owner_id")]
+    return rows
+
+
+@route("GET", "/files/purposes")
+def file_purposes(req):
+    return FILE_PURPOSES
+
+
+@route("GET", "/files/{guid:str}")
+def get_file(req, guid):
+    return file_by_guid(guid)
+
+
+@route("GET", "/files/{guid:str}/raw")
+def get_file_raw(req, guid):
+    meta = file_by_guid(guid)
+    content = store.table("file_bytes")[guid]
+    etag = f'"{meta["checksum_sha256"]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=31536000, immutable", "Accept-Ranges": "bytes"}
+    if req.headers.get("If-None-Match") == etag:
+        return Raw(b"", meta["mime_type"], 304, headers)
+    m = re.fullmatch(r"bytes=(\d*)-(\d*)", req.headers.get("Range") or "")
+    if m and (m.group(1) or m.group(2)):
+        size = len(content)
+        if m.group(1):
+            start, end = int(m.group(1)), int(m.group(2) or size - 1)
+        else:
+            start, end = max(0, size - int(m.group(2))), size - 1
+        if start >= size:
+            return Raw(b"", meta["mime_type"], 416, {"Content-Range": f"bytes */{size}"})
+        end = min(end, size - 1)
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return Raw(content[start:end + 1], meta["mime_type"], 206, headers)
+    return Raw(content, meta["mime_type"], 200, headers)
+
+
+@route("GET", "/files/{guid:str}/base64")
+def get_file_base64(req, guid):
+    meta = file_by_guid(guid)
+    return {
+        "guid": guid, "name": meta["name"], "mime_type": meta["mime_type"], "size_bytes": meta["size_bytes"],
+        "data_base64": base64.b64encode(store.table("file_bytes")[guid]).decode(),
+    }
+
+
+@route("POST", "/files")
+def create_file(req):
+    data = req.json() or {}
+    content = base64.b64decode(data.get("data_base64") or "")
+    return add_file(data["name"], data.get("mime_type", "application/octet-stream"), content,
+                    data.get("purpose", "general"), data.get("owner_type"), data.get("owner_id"),
+                    data.get("uploaded_by_volunteer_id"))
+
+
+@route("POST", "/files/upload")
+def upload_file(req):
+    # El tipo real viaja en la query: api.postStream siempre manda application/octet-stream.
+    mime = req.arg("mime_type") or req.headers.get("Content-Type", "application/octet-stream")
+    return add_file(req.arg("name"), mime, req.body,
+                    req.arg("purpose", "general"), req.arg("owner_type"), req.int_arg("owner_id"),
+                    req.int_arg("uploaded_by_volunteer_id"))
+
+
+@route("PUT", "/files/{guid:str}")
+def update_file(req, guid):
+    meta = file_by_guid(guid)
+    meta.update({k: v for k, v in (req.json() or {}).items() if k not in ("id", "guid")})
+    meta["updated_at"] = now_iso()
+    return meta
+
+
+@route("DELETE", "/files/{guid:str}")
+def delete_file(req, guid):
+    meta = file_by_guid(guid)
+    if req.arg("purge") == "true":
+        store.delete("files", meta["id"])
+        store.table("file_bytes").pop(guid, None)
+    else:
+        meta["is_active"] = False
+    return {"ok": True}
+
+
+# ── Notificaciones, anuncios y actividad ───────────────────────────
+
+def user_notifications(req) -> list[dict]:
+    return store.table("notifications").get((req.arg("user_type"), req.int_arg("user_id")), [])
+
+
+@route("GET", "/notifications")
+def list_notifications(req):
+    rows = sorted(user_notifications(req), key=lambda n: n["created_at"], reverse=True)
+    return limited(req, rows)
+
+
+@route("GET", "/notifications/unread-count")
+def unread_count(req):
+    return {"unread": sum(1 for n in user_notifications(req) if not n["is_read"])}
+
+
+@route("POST", "/notifications/mark-read")
+def mark_read(req):
+    target = req.int_arg("id")
+    for n in user_notifications(req):
+        if target is None or n["id"] == target:
+            n.update({"is_read": True, "read_at": now_iso()})
+    return {"ok": True}
+
+
+@route("GET", "/announcements/pending")
+def pending_announcement(req):
+    return None
+
+
+@route("POST", "/activity")
+def log_activity(req):
+    return {"ok": True}
+
+
+@route("POST", "/activity/batch")
+def log_activity_batch(req):
+    return {"ok": True, "count": len((req.json() or {}).get("events", []))}
+
+# ──────────────────────────────────────────────────────────────────
+# 3. Servidor, latencia y errores inyectados
+# ──────────────────────────────────────────────────────────────────
+
+class Faults:
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, error_status=503, only=None):
+        self.latency_ms, self.jitter_ms = latency_ms, jitter_ms
+        self.error_rate, self.error_status = error_rate, error_status
+        self.only = re.compile(only) if only else None
+
+    def applies(self, path: str) -> bool:
+        return not self.only or bool(self.only.search(path))
+
+    def as_dict(self) -> dict:
+        return {"latency_ms": self.latency_ms, "jitter_ms": self.jitter_ms, "error_rate": self.error_rate,
+                "error_status": self.error_status, "only": self.only.pattern if self.only else None}
+
+
+faults = Faults()
+stats: dict[str, int] = {}
+stats_lock = threading.Lock()
+API_KEY: str | None = None
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "alma-standin"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_GET(self):    self.dispatch("GET")
+    def do_POST(self):   self.dispatch("POST")
+    def do_PUT(self):    self.dispatch("PUT")
+    def do_PATCH(self):  self.dispatch("PATCH")
+    def do_DELETE(self): self.dispatch("DELETE")
+
+    def send(self, status: int, body: bytes, content_type: str, headers: dict | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def send_json(self, status: int, value) -> None:
+        self.send(status, json.dumps(value, ensure_ascii=False, default=str).encode(), "application/json")
+
+    def dispatch(self, method: str) -> None:
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/") or "/"
+        req = Request(method, path, parse_qs(url.query), self.read_body(), self.headers)
+
+        if path.startswith("/_standin/"):
+            return self.control(req)
+        if API_KEY and self.headers.get("X-API-Key") != API_KEY:
+            return self.send_json(401, {"detail": "API key inválida"})
+
+        if faults.applies(path):
+            delay = faults.latency_ms + random.uniform(0, faults.jitter_ms)
+            if delay > 0:
+                time.sleep(delay / 1000)
+            if faults.error_rate and random.random() < faults.error_rate:
+                self.count(f"{method} (falla inyectada)")
+                return self.send_json(faults.error_status, {"detail": "Falla inyectada por backend_standin"})
+
+        for route_method, pattern, regex, fn in ROUTES:
+            m = regex.match(path) if route_method == method else None
+            if not m:
+                continue
+            self.count(f"{method} {pattern}")
+            try:
+                with store.lock:
+                    result = fn(req, **m.groupdict())
+            except HttpError as e:
+                return self.send_json(e.status, {"detail": e.detail})
+            except (KeyError, TypeError, ValueError, json.JSONDecodeError) as e:
+                return self.send_json(422, {"detail": f"Pedido inválido: {e}"})
+            except Exception as e:  # noqa: BLE001 — un backend de prueba contesta, no se cae
+                return self.send_json(500, {"detail": f"{type(e).__name__}: {e}"})
+            if isinstance(result, Raw):
+                return self.send(result.status, result.body, result.content_type, result.headers)
+            return self.send_json(200, result)
+
+        self.count(f"{method} (sin ruta)")
+        self.send_json(404, {"detail": "Not Found"})
+
+    def read_body(self) -> bytes:
+        # Una subida en stream (fetch con duplex: 'half') llega en chunked, sin Content-Length.
+        if "chunked" not in (self.headers.get("Transfer-Encoding") or "").lower():
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        parts = []
+        while True:
+            size = int(self.rfile.readline().split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(parts)
+            parts.append(self.rfile.read(size))
+            self.rfile.readline()
+
+    def count(self, key: str) -> None:
+        with stats_lock:
+            stats[key] = stats.get(key, 0) + 1
+
+    def control(self, req: Request) -> None:
+        global faults
+        if req.path == "/_standin/config" and req.method == "POST":
+            data = {**faults.as_dict(), **(req.json() or {})}
+            faults = Faults(data["latency_ms"], data["jitter_ms"], data["error_rate"], data["error_status"], data["only"])
+            return self.send_json(200, faults.as_dict())
+        if req.path == "/_standin/config":
+            return self.send_json(200, faults.as_dict())
+        if req.path == "/_standin/stats":
+            with stats_lock:
+                return self.send_json(200, dict(sorted(stats.items(), key=lambda kv: -kv[1])))
+        self.send_json(404, {"detail": "Not Found"})
+
+
+def main() -> int:
+    global faults, API_KEY
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+    parser = argparse.ArgumentParser(description="Backend de prueba en memoria para la app ALMA.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--profile", choices=PROFILES, default="seed", help="cuántos datos sintéticos sumar")
+    parser.add_argument("--write-accounts", metavar="CSV", help="escribe las cuentas para load_test.py --accounts")
+    parser.add_argument("--latency", type=float, default=0, help="demora fija por respuesta, ms")
+    parser.add_argument("--jitter", type=float, default=0, help="demora extra al azar, 0..N ms")
+    parser.add_argument("--error-rate", type=float, default=0, help="proporción de respuestas con error")
+    parser.add_argument("--error-status", type=int, default=503, help="status de los errores inyectados")
+    parser.add_argument("--only", help="regex: inyectar latencia y errores sólo en estos paths")
+    parser.add_argument("--api-key", help="exigir este X-API-Key (INTERNAL_API_KEY de la app)")
+    args = parser.parse_args()
+
+    faults = Faults(args.latency, args.jitter, args.error_rate, args.error_status, args.only)
+    API_KEY = args.api_key
+
+    print(f"\n{BOLD}{CYAN}  ALMA Platform — backend_standin.py{RESET}")
+    started = time.perf_counter()
+    load_seed()
+    load_profile(args.profile)
+    ok(f"perfil {args.profile}: {len(store.table('voluntarios'))} voluntarios · "
+       f"{len(store.table('participants'))} participantes · {len(store.table('calendar_instances'))} eventos · "
+       f"{len(store.table('files'))} archivos  ({time.perf_counter() - started:.1f}s)")
+    if args.write_accounts:
+        ok(f"{write_accounts(args.write_accounts)} cuentas en {args.write_accounts} (PIN {seed_db.DEFAULT_PIN})")
+    if args.latency or args.jitter or args.error_rate:
+        info(f"fallas: {faults.as_dict()}")
+    sep()
+
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    server.daemon_threads = True
+    info(f"escuchando en http://{args.host}:{args.port}  (Ctrl+C para salir)\n")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print()
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
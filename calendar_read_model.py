@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+"""
+calendar_read_model.py — ALMA Platform — Read model mensual del calendario
+===========================================================================
+calendar_month_events (ver init_db.py) guarda cada evento del calendario ya
+armado: origen, coordinador, co-coordinadores y conteo de anotados. Los
+triggers la mantienen al día; este script cubre lo que los triggers no:
+
+    python calendar_read_model.py rebuild            # recalcula todo, por tramos de id
+    python calendar_read_model.py check              # compara contra el JOIN en vivo
+    python calendar_read_model.py bench --years 5    # base descartable + medición
+    python calendar_read_model.py contention         # ráfaga de anotados con cupo
+
+`rebuild` se puede correr con la app andando: no trunca la tabla, reemplaza
+fila por fila en tramos chicos (cada tramo es su propia transacción) y al
+final borra las filas de eventos que ya no existen.
+
+`bench` crea `<DB_NAME>_bench`, le aplica el esquema completo, la puebla con
+varios años de calendario y compara leer un mes con el JOIN de
+/calendar/instances-rich contra leerlo del read model. Al terminar la borra
+(salvo --keep).
+
+`contention` usa la misma base descartable para una ráfaga de participantes
+anotándose a la vez a eventos con cupo (--workers conexiones en paralelo).
+Compara leer el conteo y después insertar (lo que hacía el BFF) contra el
+INSERT que valida el cupo en el trigger (cme_count_add), y opcionalmente el
+lote de varios eventos por participante en una transacción (--batch):
+throughput, latencias, reintentos por deadlock y si alguno se pasó del cupo.
+
+Dependencia única:
+    pip install mysql-connector-python
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+import init_db
+from init_db import (
+    CME_COLUMNS, CME_SELECT, DB_HOST, DB_NAME, DB_PASSWORD, DB_PORT, DB_USER,
+    STATEMENTS,
+)
+
+GREEN  = "\033[92m"
+RED    = "\033[91m"
+YELLOW = "\033[93m"
+CYAN   = "\033[96m"
+RESET  = "\033[0m"
+BOLD   = "\033[1m"
+DIM    = "\033[2m"
+
+def ok(msg):  print(f"  {GREEN}✓{RESET}  {msg}")
+def err(msg): print(f"  {RED}✗  {msg}{RESET}")
+def info(msg):print(f"  {CYAN}→{RESET}  {msg}")
+
+
+def connect(database: str | None = DB_NAME, autocommit: bool = False):
+    return init_db.mysql.connector.connect(
+        host=DB_HOST, port=DB_PORT, user=DB_USER, password=DB_PASSWORD,
+        database=database, charset="utf8mb4", autocommit=autocommit,
+    )
+
+
+# ──────────────────────────────────────────────────────────────────
+# 1. Rebuild
+# ──────────────────────────────────────────────────────────────────
+
+def rebuild(conn, chunk: int = 500) -> int:
+    cursor = conn.cursor()
+    cursor.execute("SELECT COALESCE(MIN(id), 0), COALESCE(MAX(id), 0) FROM calendar_instances")
+    lo, hi = cursor.fetchone()
+
+    sql = f"REPLACE INTO calendar_month_events {CME_COLUMNS} " + CME_SELECT.format(
+        where="ci.id BETWEEN %s AND %s"
+    )
+    for start in range(lo, hi + 1, chunk):
+        cursor.execute(sql, (start, start + chunk - 1))
+        conn.commit()
+
+    cursor.execute("""
+        DELETE cme FROM calendar_month_events cme
+        LEFT JOIN calendar_instances ci ON ci.id = cme.instance_id
+        WHERE ci.id IS NULL
+    """)
+    orphans = cursor.rowcount
+    conn.commit()
+    cursor.close()
+
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM calendar_month_events")
+    (total,) = cursor.fetchone()
+    cursor.close()
+    conn.commit()  # cierra la transacción que abrió la lectura
+    ok(f"{total} eventos en el read model  ({orphans} huérfanos borrados)")
+    return total
+
+
+# ──────────────────────────────────────────────────────────────────
+# 2. Lecturas: JOIN en vivo vs read model
+# ──────────────────────────────────────────────────────────────────
+
+def month_range(year: int, month: int) -> tuple[date, date]:
+    first = date(year, month, 1)
+    nxt = date(year + (month == 12), month % 12 + 1, 1)
+    return first, nxt
+
+
+def read_live(cursor, year: int, month: int) -> list:
+    first, nxt = month_range(year, month)
+    cursor.execute(
+        CME_SELECT.format(where="ci.date >= %s AND ci.date < %s") + " ORDER BY ci.date, ci.start_time",
+        (first, nxt),
+    )
+    return cursor.fetchall()
+
+
+def read_model(cursor, year: int, month: int) -> list:
+    cursor.execute(
+        f"SELECT {CME_COLUMNS.strip('()')} FROM calendar_month_events"
+        " WHERE month_key = %s ORDER BY date, start_time",
+        (year * 100 + month,),
+    )
+    return cursor.fetchall()
+
+
+def months_with_events(cursor) -> list[tuple[int, int]]:
+    cursor.execute("SELECT DISTINCT YEAR(date), MONTH(date) FROM calendar_instances ORDER BY 1, 2")
+    return [(int(y), int(m)) for y, m in cursor.fetchall()]
+
+
+def check(conn) -> bool:
+    """Compara mes por mes: mismos eventos y mismo conteo de anotados."""
+    cursor = conn.cursor()
+    bad = 0
+    for y, m in months_with_events(cursor):
+        live = {r[0]: r[13] for r in read_live(cursor, y, m)}
+        model = {r[0]: r[13] for r in read_model(cursor, y, m)}
+        if live != model:
+            bad += 1
+            missing = set(live) - set(model)
+            extra = set(model) - set(live)
+            counts = [i for i in set(live) & set(model) if live[i] != model[i]]
+            err(f"{y}-{m:02d}: faltan {len(missing)}, sobran {len(extra)}, conteos distintos {len(counts)}")
+    cursor.close()
+    if bad:
+        err(f"{bad} meses con diferencias — correr `rebuild`")
+        return False
+    ok("El read model coincide con el JOIN en vivo")
+    return True
+
+
+# ──────────────────────────────────────────────────────────────────
+# 3. Benchmark
+# ──────────────────────────────────────────────────────────────────
+
+def seed_bench(conn, years: int, per_day: int, volunteers: int, participants: int) -> None:
+    rnd = random.Random(42)
+    cursor = conn.cursor()
+
+    info(f"{volunteers} voluntarios, {participants} participantes, talleres/grupos/actividades")
+    cursor.executemany(
+        "INSERT INTO voluntarios (id, name, last_name, registration_date) VALUES (%s,%s,%s,'2020-01-01')",
+        [(i, f"Vol{i}", f"Apellido{i}") for i in range(1, volunteers + 1)],
+    )
+    for table, n in (("talleres", 20), ("grupos", 12), ("actividades", 30)):
+        cursor.executemany(f"INSERT INTO {table} (id, name) VALUES (%s,%s)",
+                           [(i, f"{table} {i}") for i in range(1, n + 1)])
+    cursor.executemany("INSERT INTO participants (id, email) VALUES (%s,%s)",
+                       [(i, f"p{i}@bench.local") for i in range(1, participants + 1)])
+    conn.commit()
+
+    start = date(date.today().year - years + 1, 1, 1)
+    days = (date(date.today().year + 1, 1, 1) - start).days
+    types = (("taller", 20), ("grupo", 12), ("actividad", 30))
+
+    instances, assignments, enrolled = [], [], []
+    iid = 0
+    for d in range(days):
+        day = start + timedelta(days=d)
+        for slot in range(per_day):
+            iid += 1
+            tipo, n = types[rnd.randrange(3)]
+            instances.append((iid, tipo, rnd.randint(1, n), day, f"{9 + slot}:00:00", f"{10 + slot}:00:00"))
+            coord, co = rnd.sample(range(1, volunteers + 1), 2)
+            assignments += [(iid, coord, "coordinator"), (iid, co, "co_coordinator")]
+            for p in rnd.sample(range(1, participants + 1), rnd.randint(0, 15)):
+                enrolled.append((iid, p, "cancelado" if rnd.random() < 0.1 else "inscripto"))
+
+    info(f"{len(instances)} eventos · {len(assignments)} asignaciones · {len(enrolled)} anotados (triggers activos)")
+    t0 = time.perf_counter()
+    for sql, rows in (
+        ("INSERT INTO calendar_instances (id, type, source_id, date, start_time, end_time) VALUES (%s,%s,%s,%s,%s,%s)", instances),
+        ("INSERT INTO calendar_assignments (instance_id, volunteer_id, role) VALUES (%s,%s,%s)", assignments),
+        ("INSERT INTO calendar_event_participants (event_id, participant_id, status) VALUES (%s,%s,%s)", enrolled),
+    ):
+        for i in range(0, len(rows), 1000):
+            cursor.executemany(sql, rows[i:i + 1000])
+            conn.commit()
+    cursor.close()
+    ok(f"Base de benchmark poblada en {time.perf_counter() - t0:.1f}s")
+
+
+def time_reads(cursor, reader, months, rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        for y, m in months:
+            t0 = time.perf_counter()
+            reader(cursor, y, m)
+            samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def create_bench_db(cur) -> str:
+    bench_db = f"{DB_NAME}_bench"
+    cur.execute(f"DROP DATABASE IF EXISTS `{bench_db}`")
+    cur.execute(f"CREATE DATABASE `{bench_db}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+    cur.execute(f"USE `{bench_db}`")
+    for label, sql in STATEMENTS:
+        cur.execute(sql.strip())
+    ok(f"Esquema aplicado en '{bench_db}' ({len(STATEMENTS)} statements)")
+    return bench_db
+
+
+def bench(args) -> int:
+    admin = connect(database=None, autocommit=True)
+    cur = admin.cursor()
+    bench_db = create_bench_db(cur)
+
+    try:
+        conn = connect(database=bench_db)
+        seed_bench(conn, args.years, args.per_day, args.volunteers, args.participants)
+        if not check(conn):
+            return 1
+
+        cursor = conn.cursor()
+        months = months_with_events(cursor)
+        # Una pasada en frío para que ambos lados arranquen con el buffer pool caliente.
+        time_reads(cursor, read_live, months, 1)
+        time_reads(cursor, read_model, months, 1)
+
+        print(f"\n  {BOLD}Lectura de un mes ({len(months)} meses × {args.rounds} rondas){RESET}")
+        print(f"  {'':<22} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+        results = {}
+        for label, reader in (("JOIN en vivo", read_live), ("read model", read_model)):
+            s = sorted(time_reads(cursor, reader, months, args.rounds))
+            results[label] = statistics.median(s)
+            print(f"  {label:<22} {statistics.median(s):>8.2f} {s[int(len(s) * 0.95) - 1]:>8.2f} {s[-1]:>8.2f}")
+
+        cursor.execute(
+            "EXPLAIN SELECT * FROM calendar_month_events WHERE month_key = %s ORDER BY date, start_time",
+            (months[-1][0] * 100 + months[-1][1],),
+        )
+        cols = [c[0] for c in cursor.description]
+        plan = dict(zip(cols, cursor.fetchone()))
+        print(f"\n  {DIM}EXPLAIN read model: type={plan.get('type')} key={plan.get('key')} extra={plan.get('Extra')}{RESET}")
+        print(f"  {GREEN}{BOLD}✔ {results['JOIN en vivo'] / max(results['read model'], 1e-6):.1f}× más rápido por mes{RESET}\n")
+        cursor.close()
+        conn.close()
+        return 0
+    finally:
+        if not args.keep:
+            cur.execute(f"DROP DATABASE IF EXISTS `{bench_db}`")
+        cur.close()
+        admin.close()
+
+
+# ──────────────────────────────────────────────────────────────────
+# 4. Contención: muchos anotándose a la vez a eventos con cupo
+# ──────────────────────────────────────────────────────────────────
+
+ER_SIGNAL_EXCEPTION = 1644   # el SIGNAL 'Cupo completo' de cme_count_add
+ER_LOCK_DEADLOCK    = 1213
+MAX_RETRIES         = 5
+
+ENROLL_SQL = """
+    INSERT INTO calendar_event_participants (event_id, participant_id, status)
+    VALUES (%s, %s, 'inscripto')
+    ON DUPLICATE KEY UPDATE status = 'inscripto'
+"""
+
+
+def enroll_read_then_write(cursor, event_ids, participant_id, capacity) -> list[bool]:
+    """Lo de antes: leer el conteo y, si hay lugar, insertar. Sin cupo en la base."""
+    out = []
+    for event_id in event_ids:
+        cursor.execute("SELECT participants_count FROM calendar_month_events WHERE instance_id = %s", (event_id,))
+        (count,) = cursor.fetchone()
+        if count >= capacity:
+            out.append(False)
+            continue
+        cursor.execute(ENROLL_SQL, (event_id, participant_id))
+        out.append(True)
+    return out
+
+
+def enroll_conditional(cursor, event_ids, participant_id, capacity) -> list[bool]:
+    """Un INSERT por evento; el trigger decide si hay lugar."""
+    out = []
+    for event_id in event_ids:
+        try:
+            cursor.execute(ENROLL_SQL, (event_id, participant_id))
+            out.append(True)
+        except init_db.MySQLError as e:
+            if e.errno != ER_SIGNAL_EXCEPTION:
+                raise
+            out.append(False)
+    return out
+
+
+# nombre → (función, ¿el cupo lo controla la base?)
+STRATEGIES = {
+    "leer y escribir": (enroll_read_then_write, False),
+    "condicional":     (enroll_conditional,     True),
+}
+
+
+def run_burst(bench_db, strategy, events, participants, capacity, workers, batch) -> dict:
+    enroll, db_capacity = STRATEGIES[strategy]
+    conn = connect(database=bench_db, autocommit=True)
+    cur = conn.cursor()
+    cur.execute("DELETE FROM calendar_event_participants")
+    cur.execute("UPDATE calendar_instances SET capacity = %s", (capacity if db_capacity else None,))
+    cur.close()
+    conn.close()
+
+    # Cada participante pide `batch` eventos (en orden de id, como el lote del
+    # backend); con un solo evento todos van al mismo.
+    rnd = random.Random(7)
+    jobs = [(p, sorted(rnd.sample(events, min(batch, len(events))))) for p in participants]
+    lock = threading.Lock()
+    latencies, stats = [], {"ok": 0, "full": 0, "retries": 0, "errors": 0}
+    start = threading.Barrier(workers + 1)
+
+    def worker(slice_):
+        try:
+            c = connect(database=bench_db, autocommit=batch == 1)
+        except init_db.MySQLError:
+            start.abort()  # sin esto los demás esperan para siempre
+            raise
+        cursor = c.cursor()
+        start.wait()
+        for participant_id, event_ids in slice_:
+            t0 = time.perf_counter()
+            for attempt in range(MAX_RETRIES):
+                try:
+                    result = enroll(cursor, event_ids, participant_id, capacity)
+                    if batch > 1:
+                        c.commit()
+                    break
+                except init_db.MySQLError as e:
+                    if batch > 1:
+                        c.rollback()
+                    if e.errno != ER_LOCK_DEADLOCK or attempt == MAX_RETRIES - 1:
+                        with lock:
+                            stats["errors"] += 1
+                        result = []
+                        break
+                    with lock:
+                        stats["retries"] += 1
+            elapsed = (time.perf_counter() - t0) * 1000
+            with lock:
+                latencies.append(elapsed)
+                stats["ok"] += sum(result)
+                stats["full"] += len(result) - sum(result)
+        cursor.close()
+        c.close()
+
+    threads = [threading.Thread(target=worker, args=(jobs[i::workers],)) for i in range(workers)]
+    for t in threads:
+        t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+
+    conn = connect(database=bench_db)
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT event_id, COUNT(*) FROM calendar_event_participants
+         WHERE status <> 'cancelado' GROUP BY event_id
+    """)
+    per_event = dict(cur.fetchall())
+    cur.close()
+    conn.close()
+
+    latencies.sort()
+    return {
+        **stats,
+        "ops_s": len(latencies) / wall if wall else 0.0,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0,
+        "max": latencies[-1] if latencies else 0.0,
+        "overbooked": sum(max(0, n - capacity) for n in per_event.values()),
+        "enrolled": sum(per_event.values()),
+    }
+
+
+def contention(args) -> int:
+    admin = connect(database=None, autocommit=True)
+    cur = admin.cursor()
+    bench_db = create_bench_db(cur)
+
+    try:
+        conn = connect(database=bench_db)
+        c = conn.cursor()
+        c.executemany("INSERT INTO participants (id, email) VALUES (%s,%s)",
+                      [(i, f"p{i}@bench.local") for i in range(1, args.participants + 1)])
+        c.execute("INSERT INTO talleres (id, name) VALUES (1, 'Taller de prueba')")
+        day = date.today() + timedelta(days=7)
+        c.executemany(
+            "INSERT INTO calendar_instances (id, type, source_id, date) VALUES (%s, 'taller', 1, %s)",
+            [(i, day) for i in range(1, args.events + 1)],
+        )
+        conn.commit()
+        c.close()
+        conn.close()
+        info(f"{args.participants} participantes · {args.events} evento(s) con cupo {args.capacity} · "
+             f"{args.workers} conexiones · {args.batch} evento(s) por pedido")
+
+        participants = list(range(1, args.participants + 1))
+        events = list(range(1, args.events + 1))
+        print(f"\n  {'':<18} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}"
+              f" {'ok':>6} {'llenos':>7} {'reint.':>7} {'err':>5} {'de más':>7}")
+        overbooked = 0
+        for strategy in STRATEGIES:
+            r = run_burst(bench_db, strategy, events, participants, args.capacity, args.workers, args.batch)
+            overbooked += r["overbooked"] if strategy == "condicional" else 0
+            color = RED if r["overbooked"] else GREEN
+            print(f"  {strategy:<18} {r['ops_s']:>8.0f} {r['p50']:>8.2f} {r['p95']:>8.2f} {r['max']:>8.2f}"
+                  f" {r['ok']:>6} {r['full']:>7} {r['retries']:>7} {r['errors']:>5}"
+                  f" {color}{r['overbooked']:>7}{RESET}")
+
+        print()
+        if overbooked:
+            err(f"El camino condicional se pasó del cupo en {overbooked} lugares")
+            return 1
+        ok("El camino condicional nunca se pasó del cupo")
+        return 0
+    finally:
+        if not args.keep:
+            cur.execute(f"DROP DATABASE IF EXISTS `{bench_db}`")
+        cur.close()
+        admin.close()
+
+
+# ──────────────────────────────────────────────────────────────────
+# 5. CLI
+# ──────────────────────────────────────────────────────────────────
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Read model mensual del calendario")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_rebuild = sub.add_parser("rebuild", help="recalcula calendar_month_events desde cero")
+    p_rebuild.add_argument("--chunk", type=int, default=500, help="eventos por transacción")
+    sub.add_parser("check", help="compara el read model contra el JOIN en vivo")
+
+    p_bench = sub.add_parser("bench", help="mide en una base descartable")
+    p_bench.add_argument("--years", type=int, default=3)
+    p_bench.add_argument("--per-day", type=int, default=4, help="eventos por día")
+    p_bench.add_argument("--volunteers", type=int, default=60)
+    p_bench.add_argument("--participants", type=int, default=3000)
+    p_bench.add_argument("--rounds", type=int, default=3)
+    p_bench.add_argument("--keep", action="store_true", help="no borrar la base al terminar")
+
+    p_cont = sub.add_parser("contention", help="ráfaga de anotados a eventos con cupo")
+    p_cont.add_argument("--participants", type=int, default=2000, help="participantes que se anotan")
+    p_cont.add_argument("--events", type=int, default=1, help="eventos en juego")
+    p_cont.add_argument("--capacity", type=int, default=100, help="cupo de cada evento")
+    p_cont.add_argument("--workers", type=int, default=64, help="conexiones en paralelo")
+    p_cont.add_argument("--batch", type=int, default=1, help="eventos por pedido (una transacción)")
+    p_cont.add_argument("--keep", action="store_true", help="no borrar la base al terminar")
+    args = parser.parse_args()
+
+    print(f"\n{BOLD}{CYAN}  ALMA Platform — calendar_read_model.py {args.command}{RESET}")
+    print(f"  Base de datos : {BOLD}{DB_NAME}{RESET}   Host: {DB_HOST}:{DB_PORT}\n")
+
+    init_db.load_dependencies()
+    try:
+        if args.command == "bench":
+            return bench(args)
+        if args.command == "contention":
+            return contention(args)
+        conn = connect()
+        try:
+            if args.command == "rebuild":
+                rebuild(conn, args.chunk)
+                return 0
+            return 0 if check(conn) else 1
+        finally:
+            conn.close()
+    except init_db.MySQLError as e:
+        err(f"ERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
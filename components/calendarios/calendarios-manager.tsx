@@ -48,6 +48,8 @@ interface CalendarInstance {
   co_coordinators: VolunteerRef[]
   volunteers: VolunteerRef[]
   participants_count?: number
+  /** Cupo de participantes; null = sin cupo. */
+  capacity?: number | null
 }
 
 /** Estilo único para nombres de personas en el modal de detalle: mismo tono
@@ -456,8 +458,17 @@ export default function CalendariosManager({ user }: { user: any }) {
             headers: { "Content-Type": "application/json" },
             body: JSON.stringify({ event_id: eventId }),
           })
+      const data = await res.json().catch(() => null)
+      // La respuesta trae el set actualizado: no hace falta volver a pedirlo.
+      if (Array.isArray(data?.event_ids)) setMyEventIds(data.event_ids)
+      if (res.status === 409) {
+        toast({ title: "Sin lugar", description: "Este encuentro ya completó su cupo.", variant: "destructive" })
+        return
+      }
       if (!res.ok) throw new Error()
-      setMyEventIds(prev => enrolled ? prev.filter(id => id !== eventId) : [...prev, eventId])
+      if (!Array.isArray(data?.event_ids)) {
+        setMyEventIds(prev => enrolled ? prev.filter(id => id !== eventId) : [...prev, eventId])
+      }
     } catch {
       // silencioso: el botón no cambia si falló
     } finally {
@@ -488,6 +499,7 @@ export default function CalendariosManager({ user }: { user: any }) {
     reminder_offsets: [] as number[],
     status: "programado",
     notes: "",
+    capacity: "",
   })
   const [saving, setSaving] = useState(false)
   const [volunteersOpen, setVolunteersOpen] = useState(false)
@@ -502,6 +514,7 @@ export default function CalendariosManager({ user }: { user: any }) {
   const [bulkCount, setBulkCount] = useState<number | null>(null)
   const [bulkConfirmed, setBulkConfirmed] = useState(false)
   const [bulkDeleting, setBulkDeleting] = useState(false)
+  const [bulkJob, setBulkJob] = useState<{ id: string; status: string; done: number; total: number; error: string | null } | null>(null)
 
   // Generate dialog
   const [generateOpen, setGenerateOpen] = useState(false)
@@ -729,6 +742,7 @@ export default function CalendariosManager({ user }: { user: any }) {
       reminder_offsets: [],
       status: "programado",
       notes: "",
+      capacity: "",
     })
     setVolunteersOpen(false)
     setInstanceDialogOpen(true)
@@ -753,6 +767,7 @@ export default function CalendariosManager({ user }: { user: any }) {
       reminder_offsets: inst.reminder_offsets || [],
       status: inst.status,
       notes: inst.notes || "",
+      capacity: inst.capacity != null ? String(inst.capacity) : "",
     })
     setVolunteersOpen(false)
     setDetailOpen(false)
@@ -813,6 +828,7 @@ export default function CalendariosManager({ user }: { user: any }) {
         reminder_offsets: instanceForm.notify_enabled ? instanceForm.reminder_offsets : null,
         status: instanceForm.status,
         notes: instanceForm.notes || null,
+        capacity: instanceForm.capacity ? parseInt(instanceForm.capacity) : null,
       })
 
       if (editingInstance) {
@@ -896,6 +912,7 @@ export default function CalendariosManager({ user }: { user: any }) {
     setBulkSourceId("null")
     setBulkCount(null)
     setBulkConfirmed(false)
+    setBulkJob(null)
     setBulkDeleteOpen(true)
   }
 
@@ -919,10 +936,9 @@ export default function CalendariosManager({ user }: { user: any }) {
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify(body),
       })
-      if (res.ok) {
-        setBulkDeleteOpen(false)
-        fetchInstances()
-      }
+      if (!res.ok) return
+      const { job } = await res.json()
+      await followBulkJob(job)
     } catch (e) {
       console.error(e)
     } finally {
@@ -930,6 +946,37 @@ export default function CalendariosManager({ user }: { user: any }) {
     }
   }
 
+  /** El borrado corre en segundo plano por tandas: se sigue el progreso hasta que termina. */
+  async function followBulkJob(job: NonNullable<typeof bulkJob>) {
+    setBulkJob(job)
+    while (job.status === "queued" || job.status === "running") {
+      await new Promise(r => setTimeout(r, 1000))
+      const res = await fetch(`/api/calendarios/jobs?id=${job.id}`)
+      if (!res.ok) return
+      job = (await res.json()).job
+      setBulkJob(job)
+    }
+    fetchInstances()
+    if (job.status === "done") setBulkDeleteOpen(false)
+  }
+
+  async function handleBulkJobAction(action: "cancel" | "resume") {
+    if (!bulkJob) return
+    const res = await fetch("/api/calendarios/jobs", {
+      method: "PATCH",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ id: bulkJob.id, action }),
+    })
+    if (!res.ok) return
+    const { job } = await res.json()
+    if (action === "resume") {
+      setBulkDeleting(true)
+      try { await followBulkJob(job) } finally { setBulkDeleting(false) }
+    } else {
+      setBulkJob(job)
+    }
+  }
+
   function openGenerateDialog() {
     setGenerateResult(null)
     const year = parseInt(almaForm.year) || today.getFullYear()
@@ -1376,6 +1423,7 @@ export default function CalendariosManager({ user }: { user: any }) {
                     <span className="border-b border-gray-100 py-2 text-gray-500">Anotados</span>
                     <span className="border-b border-gray-100 py-2 font-medium">
                       {selectedInstance.participants_count ?? 0}
+                      {selectedInstance.capacity != null && ` / ${selectedInstance.capacity}`}
                     </span>
                   </div>
                 )}
@@ -1405,10 +1453,12 @@ export default function CalendariosManager({ user }: { user: any }) {
                 {/* Participante: se anota / desanota de ESTE encuentro. */}
                 {isParticipant && selectedInstance.status === "programado" && (() => {
                   const enrolled = myEventIds.includes(selectedInstance.id)
+                  const full = !enrolled && selectedInstance.capacity != null &&
+                    (selectedInstance.participants_count ?? 0) >= selectedInstance.capacity
                   return (
                     <Button
                       size="sm"
-                      disabled={enrolling}
+                      disabled={enrolling || full}
                       onClick={() => toggleEnrollment(selectedInstance.id)}
                       className={"col-span-2 " + (enrolled
                         ? "bg-white text-[#0097a7] border border-[#4dd0e1] hover:bg-red-50 hover:text-red-500 hover:border-red-300"
@@ -1417,7 +1467,7 @@ export default function CalendariosManager({ user }: { user: any }) {
                       {enrolling
                         ? <Loader2 className="h-3 w-3 mr-1 animate-spin" />
                         : enrolled ? <Check className="h-3 w-3 mr-1" /> : <Plus className="h-3 w-3 mr-1" />}
-                      {enrolled ? "Anotado — quitarme" : "Me anoto"}
+                      {enrolled ? "Anotado — quitarme" : full ? "Completo" : "Me anoto"}
                     </Button>
                   )
                 })()}
@@ -1648,16 +1698,43 @@ export default function CalendariosManager({ user }: { user: any }) {
                 </Label>
               </div>
             )}
+
+            {/* Progreso del borrado en segundo plano */}
+            {bulkJob && (
+              <div className="space-y-1">
+                <div className="h-2 rounded bg-gray-100 overflow-hidden">
+                  <div
+                    className="h-full bg-red-500 transition-all"
+                    style={{ width: `${bulkJob.total ? Math.min(100, (bulkJob.done / bulkJob.total) * 100) : 100}%` }}
+                  />
+                </div>
+                <p className="text-xs text-gray-500">
+                  {bulkJob.done} de {bulkJob.total} eliminadas
+                  {bulkJob.status === "cancelled" && " — cancelado"}
+                  {bulkJob.status === "failed" && ` — error: ${bulkJob.error}`}
+                </p>
+              </div>
+            )}
           </div>
 
           <DialogFooter>
-            <Button variant="outline" onClick={() => setBulkDeleteOpen(false)}>
-              Cancelar
-            </Button>
+            {bulkJob && (bulkJob.status === "queued" || bulkJob.status === "running") ? (
+              <Button variant="outline" onClick={() => handleBulkJobAction("cancel")}>
+                Detener
+              </Button>
+            ) : bulkJob && (bulkJob.status === "cancelled" || bulkJob.status === "failed") ? (
+              <Button variant="outline" onClick={() => handleBulkJobAction("resume")}>
+                Reanudar
+              </Button>
+            ) : (
+              <Button variant="outline" onClick={() => setBulkDeleteOpen(false)}>
+                Cancelar
+              </Button>
+            )}
             <Button
               variant="destructive"
               onClick={handleBulkDelete}
-              disabled={bulkDeleting || !bulkConfirmed || !bulkCount}
+              disabled={bulkDeleting || !bulkConfirmed || !bulkCount || !!bulkJob}
             >
               <Trash2 className="h-4 w-4 mr-2" />
               {bulkDeleting
@@ -2367,6 +2444,17 @@ export default function CalendariosManager({ user }: { user: any }) {
               />
             </div>
 
+            <div className="space-y-1">
+              <Label>Cupo de participantes (opcional)</Label>
+              <Input
+                type="number"
+                min={1}
+                value={instanceForm.capacity}
+                onChange={e => setInstanceForm(f => ({ ...f, capacity: e.target.value }))}
+                placeholder="Sin cupo"
+              />
+            </div>
+
             <div className="space-y-1">
               <Label>Notas</Label>
               <Textarea
@@ -6,6 +6,7 @@ import { Card, CardContent } from "@/components/ui/card"
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@/components/ui/select"
 import { toast } from "@/hooks/use-toast"
 import type { DeliveryRow, Training } from "@/lib/data-manager"
+import type { CertificateJob } from "@/lib/certificate-jobs"
 import {
   Award, Loader2, Send, Check, ExternalLink, Users, GraduationCap,
 } from "lucide-react"
@@ -40,6 +41,7 @@ export default function EntregaCertificados() {
   const [seleccion, setSeleccion] = useState<Set<number>>(new Set())
   const [cargando, setCargando] = useState(true)
   const [trabajando, setTrabajando] = useState(false)
+  const [emision, setEmision] = useState<CertificateJob | null>(null)
 
   useEffect(() => {
     ;(async () => {
@@ -118,8 +120,12 @@ export default function EntregaCertificados() {
       const data = await res.json()
       if (!res.ok) throw new Error(data?.error || "No se pudo emitir")
 
-      const pedidos = seleccion.size
-      const emitidos = Array.isArray(data) ? data.length : 0
+      setEmision(data.job)
+      const job = await seguirEmision(data.job.id)
+      if (job?.status === "failed") throw new Error(job.error || "La emisión se cortó a la mitad")
+
+      const pedidos = job?.requested ?? seleccion.size
+      const emitidos = job?.issued ?? 0
       toast({
         title: `${emitidos} ${emitidos === 1 ? "certificado emitido" : "certificados emitidos"}`,
         description:
@@ -127,11 +133,24 @@ export default function EntregaCertificados() {
             ? `${pedidos - emitidos} quedaron afuera: revisá que tengan nombre cargado.`
             : undefined,
       })
-      cargarTablero(trainingId)
     } catch (error: any) {
       toast({ title: "Error", description: error?.message, variant: "destructive" })
     } finally {
+      setEmision(null)
       setTrabajando(false)
+      cargarTablero(trainingId)
+    }
+  }
+
+  /** La emisión corre en el servidor: se consulta el avance hasta que termina. */
+  const seguirEmision = async (id: string): Promise<CertificateJob | null> => {
+    for (;;) {
+      await new Promise((r) => setTimeout(r, 1000))
+      const res = await fetch(`/api/certificados/emitir?id=${id}`).catch(() => null)
+      if (!res?.ok) return null
+      const { job } = await res.json()
+      setEmision(job)
+      if (job.status === "done" || job.status === "failed") return job
     }
   }
 
@@ -350,6 +369,17 @@ export default function EntregaCertificados() {
             <span className="text-sm text-gray-600">
               {seleccion.size} {seleccion.size === 1 ? "seleccionada" : "seleccionadas"}
             </span>
+            {emision && (
+              <span className="flex min-w-[180px] flex-1 items-center gap-2 text-xs text-gray-500">
+                <span className="h-1.5 flex-1 overflow-hidden rounded-full bg-gray-100">
+                  <span
+                    className="block h-full bg-[#4dd0e1] transition-[width]"
+                    style={{ width: `${emision.requested ? (emision.processed / emision.requested) * 100 : 0}%` }}
+                  />
+                </span>
+                {emision.processed} de {emision.requested} · {emision.rendered} PDF listos
+              </span>
+            )}
             <Button
               onClick={emitir}
               disabled={trabajando || !seleccion.size}
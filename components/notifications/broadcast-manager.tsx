@@ -20,7 +20,7 @@ import {
   AlertDialogHeader,
   AlertDialogTitle,
 } from "@/components/ui/alert-dialog"
-import { Megaphone, Send, Loader2, CheckCircle2, Bell, Search, Users, Heart, UserCircle, Globe } from "lucide-react"
+import { Megaphone, Send, Loader2, CheckCircle2, AlertCircle, Bell, Search, Users, Heart, UserCircle, Globe } from "lucide-react"
 import { useToast } from "@/hooks/use-toast"
 
 interface VolunteerLite {
@@ -91,7 +91,14 @@ export default function BroadcastManager({ user }: { user: any }) {
   const [sending, setSending] = useState(false)
   const [confirmOpen, setConfirmOpen] = useState(false)
   const [lastResult, setLastResult] = useState<
-    { recipients: number; push_sent: number; emails_queued: number } | null
+    {
+      recipients: number
+      processed: number
+      push_sent: number
+      emails_queued: number
+      status: string
+      error?: string | null
+    } | null
   >(null)
 
   // A quién: voluntarios (con selección por persona), participantes, o todos.
@@ -200,18 +207,13 @@ export default function BroadcastManager({ user }: { user: any }) {
         body: JSON.stringify(payload),
       })
       if (!res.ok) throw new Error(await res.text())
-      const data = await res.json()
-      setLastResult({
-        recipients: data.recipients,
-        push_sent: data.push_sent,
-        emails_queued: data.emails_queued ?? 0,
-      })
+      const { job } = await res.json()
+      setLastResult(job)
       toast({
-        title: "Aviso enviado",
-        description: conMail
-          ? `${data.emails_queued} mail(s) en camino.`
-          : `${data.recipients} destinatario(s). Los push salen en segundo plano.`,
+        title: "Aviso en camino",
+        description: "Se entrega en segundo plano; el avance queda abajo.",
       })
+      void followJob(job.id)
       setTitle("")
       setBody("")
       setConNotificacion(true)
@@ -228,6 +230,18 @@ export default function BroadcastManager({ user }: { user: any }) {
     }
   }
 
+  /** La entrega corre en el servidor: se consulta el avance hasta que termina. */
+  async function followJob(id: string) {
+    for (;;) {
+      await new Promise((r) => setTimeout(r, 1500))
+      const res = await fetch(`/api/notifications/broadcast?id=${id}`).catch(() => null)
+      if (!res?.ok) return
+      const { job } = await res.json()
+      setLastResult(job)
+      if (job.status === "done" || job.status === "failed") return
+    }
+  }
+
   // Audiencia "participante" sin ninguno cargado: no hay a quién mandarle.
   // "Todos" no cuenta, porque ahí siempre están los voluntarios.
   const sinDestinatarios = audienceMode === "participante" && participantes === 0
@@ -507,13 +521,29 @@ export default function BroadcastManager({ user }: { user: any }) {
             {sending ? "Enviando..." : "Enviar aviso"}
           </Button>
 
-          {lastResult && !sending && (
+          {lastResult && !sending && lastResult.status === "failed" && (
+            // Falló entero o se cayeron tandas: nunca en verde, y con cuántos
+            // llegaron de verdad para saber a quién hay que volver a avisarle.
+            <Alert className="border-red-200 bg-red-50">
+              <AlertCircle className="w-4 h-4 text-red-600" />
+              <AlertDescription className="text-red-700">
+                {`El último envío no se completó: llegó a ${lastResult.processed} de ${lastResult.recipients} destinatario(s)`}
+                {lastResult.push_sent > 0 && ` · ${lastResult.push_sent} push`}
+                {lastResult.emails_queued > 0 && ` · ${lastResult.emails_queued} mail(s)`}
+                {lastResult.error && `. ${lastResult.error}`}
+              </AlertDescription>
+            </Alert>
+          )}
+
+          {lastResult && !sending && lastResult.status !== "failed" && (
             <Alert className="border-green-200 bg-green-50">
               <CheckCircle2 className="w-4 h-4 text-green-600" />
               <AlertDescription className="text-green-700">
-                Último envío: {lastResult.recipients} destinatario(s)
-                {lastResult.emails_queued > 0 && ` · ${lastResult.emails_queued} mail(s)`}. Los push
-                y los mails salen en segundo plano.
+                {lastResult.status === "done"
+                  ? `Último envío: ${lastResult.recipients} destinatario(s)`
+                  : `Enviando: ${lastResult.processed} de ${lastResult.recipients || "…"} destinatario(s)`}
+                {lastResult.push_sent > 0 && ` · ${lastResult.push_sent} push`}
+                {lastResult.emails_queued > 0 && ` · ${lastResult.emails_queued} mail(s)`}
               </AlertDescription>
             </Alert>
           )}
@@ -87,17 +87,16 @@ export default function ImageUpload({
     setPreview(dataUrl)
 
     try {
-      const res = await fetch("/api/files", {
+      // Viaja en binario (sin base64): un tercio menos de bytes y el servidor
+      // la pasa en stream sin armarla en memoria.
+      const blob = await (await fetch(dataUrl)).blob()
+      const q = new URLSearchParams({ name, purpose })
+      if (ownerType) q.set("owner_type", ownerType)
+      if (ownerId != null) q.set("owner_id", String(ownerId))
+      const res = await fetch(`/api/files?${q}`, {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({
-          name,
-          mime_type: mime,
-          purpose,
-          owner_type: ownerType,
-          owner_id: ownerId,
-          data_base64: dataUrl.split(",")[1],
-        }),
+        headers: { "Content-Type": mime },
+        body: blob,
       })
 
       const data = await res.json()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+db_tools.py — ALMA Platform — La base de datos en un solo comando
+==================================================================
+init, seed, snapshot y mantenimiento sin preguntas y sobre la misma
+conexión, con el tiempo de cada fase para ver en qué se va el armado de un
+entorno y seguirlo entre corridas.
+
+    python -X utf8 db_tools.py init seed --yes               # base nueva con datos
+    python -X utf8 db_tools.py init seed maintenance --yes --profile
+    python db_tools.py snapshot --out snapshot.json          # filas y checksum por tabla
+    python db_tools.py maintenance --check                   # read models vs datos crudos
+    python db_tools.py init seed --yes --profile timings.jsonl
+
+Los pasos corren en el orden en que se escriben. init y seed borran datos:
+sin --yes piden confirmación, y sin terminal (cron, CI) no corren.
+
+--profile solo imprime el JSON al terminar; con un archivo le agrega una
+línea (JSONL), así cada corrida queda al lado de las anteriores. Las fases:
+
+    import:*              init_db, el conector, seed_db, bcrypt...
+    connect               armado del pool (la conexión que usan todos los pasos)
+    drop_database, create_database, ddl:<statement>
+    truncate, hash_pin, insert:<tabla>
+    snapshot:<tabla>, maintenance:<read model>
+
+`totals` suma las fases por prefijo (todo `ddl`, todo `insert`...).
+
+Dependencias:
+    pip install mysql-connector-python bcrypt      (bcrypt sólo para seed)
+"""
+
+import time
+
+# El import de init_db es la primera fase: se mide antes de tener Timings.
+_import_started = time.perf_counter()
+
+import argparse
+import json
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+
+import init_db
+from init_db import DB_HOST, DB_NAME, DB_PASSWORD, DB_PORT, DB_USER, Timings, confirm
+
+_IMPORT_INIT_DB = time.perf_counter() - _import_started
+
+GREEN  = "\033[92m"
+RED    = "\033[91m"
+YELLOW = "\033[93m"
+CYAN   = "\033[96m"
+RESET  = "\033[0m"
+BOLD   = "\033[1m"
+DIM    = "\033[2m"
+
+def ok(msg):  print(f"  {GREEN}✓{RESET}  {msg}")
+def err(msg): print(f"  {RED}✗  {msg}{RESET}")
+def info(msg):print(f"  {CYAN}→{RESET}  {msg}")
+
+
+# ──────────────────────────────────────────────────────────────────
+# 1. Conexión compartida
+# ──────────────────────────────────────────────────────────────────
+
+class Session:
+    """
+    Un pool de una sola conexión, sin base elegida (init todavía no la
+    creó), que se arma con el primer paso y usan todos. Cada paso la pide,
+    hace USE y la devuelve; al volver al pool se resetea la sesión, así
+    que un SET de un paso (FOREIGN_KEY_CHECKS...) no le llega al siguiente.
+    """
+
+    def __init__(self, timings: Timings):
+        self.timings = timings
+        self.pool = None
+
+    @contextmanager
+    def connection(self, database: str | None = DB_NAME):
+        if self.pool is None:
+            with self.timings.phase("connect"):
+                self.pool = init_db.mysql.connector.pooling.MySQLConnectionPool(
+                    pool_name="alma_db_tools", pool_size=1,
+                    host=DB_HOST, port=DB_PORT, user=DB_USER, password=DB_PASSWORD,
+                    charset="utf8mb4", autocommit=False,
+                )
+        conn = self.pool.get_connection()
+        try:
+            if database:
+                # Por SQL y no con conn.database: el objeto del pool es un
+                # proxy que no pasa las asignaciones a la conexión real.
+                cursor = conn.cursor()
+                cursor.execute(f"USE `{database}`")
+                cursor.close()
+            yield conn
+        finally:
+            conn.close()
+
+
+# ──────────────────────────────────────────────────────────────────
+# 2. Pasos
+# ──────────────────────────────────────────────────────────────────
+
+def step_init(session: Session, args) -> bool:
+    with session.connection(database=None) as conn:
+        done = init_db.create_database(conn, session.timings)
+    ok(f"{done} statements ejecutados")
+    return True
+
+
+def step_seed(session: Session, args) -> bool:
+    with session.timings.phase("import:seed_db"):
+        import seed_db
+    with session.timings.phase("import:bcrypt"):
+        seed_db.load_dependencies()
+    with session.connection() as conn:
+        seed_db.seed(conn, session.timings)
+    ok(f"Datos de prueba cargados  (PIN: {seed_db.DEFAULT_PIN if seed_db.HAS_BCRYPT else 'no configurado'})")
+    return True
+
+
+def step_snapshot(session: Session, args) -> bool:
+    """Filas y CHECKSUM TABLE por tabla: para comparar entornos o un antes/después."""
+    tables = {}
+    with session.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT table_name FROM information_schema.tables
+            WHERE table_schema = %s AND table_type = 'BASE TABLE'
+            ORDER BY table_name
+        """, (DB_NAME,))
+        names = [row[0] for row in cursor.fetchall()]
+        for name in names:
+            with session.timings.phase(f"snapshot:{name}"):
+                cursor.execute(f"SELECT COUNT(*) FROM `{name}`")
+                (rows,) = cursor.fetchone()
+                cursor.execute(f"CHECKSUM TABLE `{name}`")
+                _, checksum = cursor.fetchone()
+            tables[name] = {"rows": rows, "checksum": checksum}
+        cursor.close()
+
+    snapshot = {
+        "database": DB_NAME,
+        "taken_at": datetime.now().isoformat(timespec="seconds"),
+        "tables": tables,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        ok(f"{len(tables)} tablas  →  {args.out}")
+    else:
+        print(json.dumps(snapshot, indent=2, ensure_ascii=False))
+    return True
+
+
+def step_maintenance(session: Session, args) -> bool:
+    """Recalcula (o con --check compara) los read models que mantienen los triggers."""
+    with session.timings.phase("import:maintenance"):
+        import calendar_read_model
+        import rollups
+
+    jobs = [
+        ("calendar_month_events", calendar_read_model.rebuild, calendar_read_model.check),
+        ("activity", rollups.activity_rebuild, rollups.activity_check),
+        ("counters", rollups.counters_rebuild, rollups.counters_check),
+    ]
+    clean = True
+    with session.connection() as conn:
+        for name, rebuild, check in jobs:
+            with session.timings.phase(f"maintenance:{name}"):
+                if args.check:
+                    clean = check(conn) and clean
+                else:
+                    rebuild(conn, args.chunk)
+                # Sin autocommit, la lectura de un job deja abierta una
+                # transacción y el start_transaction del siguiente falla.
+                conn.commit()
+    return clean
+
+
+STEPS = {
+    "init": step_init,
+    "seed": step_seed,
+    "snapshot": step_snapshot,
+    "maintenance": step_maintenance,
+}
+
+
+# ──────────────────────────────────────────────────────────────────
+# 3. Perfil
+# ──────────────────────────────────────────────────────────────────
+
+def profile_report(timings: Timings, steps: list, started_at: str, total: float, status: str) -> dict:
+    totals: dict = {}
+    for name, seconds in timings.phases:
+        kind = name.split(":", 1)[0]
+        totals[kind] = totals.get(kind, 0.0) + seconds
+    return {
+        "started_at": started_at,
+        "steps": steps,
+        "database": DB_NAME,
+        "host": f"{DB_HOST}:{DB_PORT}",
+        "status": status,
+        "total_s": round(total, 4),
+        "totals": {kind: round(s, 4) for kind, s in sorted(totals.items(), key=lambda kv: -kv[1])},
+        "phases": [{"name": name, "seconds": round(s, 4)} for name, s in timings.phases],
+    }
+
+
+def write_profile(report: dict, target: str) -> None:
+    if target == "-":
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+    with open(target, "a", encoding="utf-8") as f:
+        f.write(json.dumps(report, ensure_ascii=False) + "\n")
+    info(f"Tiempos agregados a {target}")
+
+
+# ──────────────────────────────────────────────────────────────────
+# 4. CLI
+# ──────────────────────────────────────────────────────────────────
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="init / seed / snapshot / maintenance de la base")
+    parser.add_argument("steps", nargs="+", choices=list(STEPS), help="pasos, en el orden en que se corren")
+    parser.add_argument("--yes", action="store_true", help="no pedir confirmación para init/seed")
+    parser.add_argument("--profile", nargs="?", const="-", metavar="ARCHIVO",
+                        help="tiempos por fase en JSON; con ARCHIVO se agregan como una línea")
+    parser.add_argument("--out", help="snapshot: archivo de salida (sin esto, a la consola)")
+    parser.add_argument("--check", action="store_true", help="maintenance: sólo comparar, no recalcular")
+    parser.add_argument("--chunk", type=int, default=500, help="maintenance: filas por transacción en los rebuild")
+    args = parser.parse_args()
+
+    started_at = datetime.now().isoformat(timespec="seconds")
+    start = time.perf_counter() - _IMPORT_INIT_DB
+    timings = Timings()
+    timings.phases.append(("import:init_db", _IMPORT_INIT_DB))
+
+    print(f"\n{BOLD}{CYAN}  ALMA Platform — db_tools.py {' '.join(args.steps)}{RESET}")
+    print(f"  Base de datos : {BOLD}{DB_NAME}{RESET}   Host: {DB_HOST}:{DB_PORT}\n")
+
+    if "init" in args.steps:
+        question = f"¿Borrar y recrear '{DB_NAME}'?"
+    elif "seed" in args.steps:
+        question = f"¿Truncar datos existentes y poblar '{DB_NAME}'?"
+    else:
+        question = None
+    if question and not confirm(question, args.yes):
+        print("  Cancelado.\n")
+        return 1
+
+    with timings.phase("import:mysql"):
+        init_db.load_dependencies()
+
+    session = Session(timings)
+    status = "ok"
+    try:
+        for name in args.steps:
+            print(f"\n  {BOLD}▶ {name}{RESET}")
+            if not STEPS[name](session, args):
+                status = f"{name}: con diferencias"
+                break
+    except init_db.MySQLError as e:
+        status = f"{name}: {e}"
+        err(f"ERROR: {e}")
+    finally:
+        if args.profile:
+            write_profile(profile_report(timings, args.steps, started_at, time.perf_counter() - start, status), args.profile)
+
+    if status == "ok":
+        print(f"\n  {GREEN}{BOLD}✔ Listo.{RESET}\n")
+        return 0
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
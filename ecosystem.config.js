@@ -1,3 +1,21 @@
+/**
+ * Next bajo PM2 en modo cluster: PM2 reparte las conexiones del mismo puerto
+ * entre los workers. ALMA_WORKERS fija la cantidad y se les pasa a los
+ * workers para que sepan que están en cluster (ver lib/shared-store.ts).
+ *
+ * Por defecto es UN worker: el modo cluster queda para cuando load_test.py
+ * muestre, contra un build real, que N workers rinden más que uno.
+ *
+ *   pm2 start ecosystem.config.js
+ *   ALMA_WORKERS=4 pm2 start ecosystem.config.js
+ *   pm2 reload alma-platform        # de a un worker: sin cortar el servicio
+ *   pm2 scale alma-platform 4       # cambiar la cantidad en caliente
+ *
+ * Con `scale` la variable ALMA_WORKERS de los workers viejos queda con el
+ * valor anterior; un `pm2 reload alma-platform --update-env` la acomoda.
+ */
+const workers = Number(process.env.ALMA_WORKERS) || 1
+
 /** @type {import('pm2').StartOptions} */
 module.exports = {
   apps: [
@@ -6,13 +24,24 @@ module.exports = {
       script: 'node_modules/.bin/next',
       args: 'start',
       cwd: './',
-      instances: 1,
+      exec_mode: 'cluster',
+      instances: workers,
       autorestart: true,
       watch: false,
+      // Por worker: con N workers la máquina necesita N veces esto.
       max_memory_restart: '512M',
+      // Reload: el worker nuevo tiene hasta listen_timeout para escuchar antes
+      // de que se baje el viejo, y el viejo kill_timeout para terminar sus
+      // requests (y vaciar el buffer del log) antes del SIGKILL.
+      listen_timeout: 15000,
+      kill_timeout: 10000,
       env: {
         NODE_ENV: 'production',
         PORT: 3000,
+        ALMA_WORKERS: workers,
+        // Next no sale solo con SIGINT/SIGTERM: sale lib/shutdown.ts, después
+        // de correr lo que registraron los módulos (la cola de actividad...).
+        NEXT_MANUAL_SIG_HANDLE: 'true',
       },
       log_date_format: 'YYYY-MM-DD HH:mm:ss',
     },
@@ -3,14 +3,20 @@
 init_db.py — ALMA Platform — Inicializador de base de datos
 =====================================================================
 Borra (si existe) y recrea la base de datos con todas las tablas.
-Uso: python init_db.py
+Uso: python init_db.py           # pregunta antes de borrar
+     python init_db.py --yes     # sin preguntar (scripts, CI)
+
+Para encadenarlo con el seed y medir cada fase, ver db_tools.py.
 
 Dependencia única:
     pip install mysql-connector-python
 """
 
+import argparse
 import os
 import sys
+import time
+from contextlib import contextmanager
 
 # ──────────────────────────────────────────────────────────────────
 # 1. Lectura de .env.local  (sin python-dotenv)
@@ -43,14 +49,30 @@ DB_PASSWORD = env.get("DB_PASSWORD", "")
 # ──────────────────────────────────────────────────────────────────
 # 2. Verificar dependencia
 # ──────────────────────────────────────────────────────────────────
+# Se carga al usarla: seed_db.py, db_tools.py, rollups.py,
+# calendar_read_model.py y backend_standin.py importan de acá la
+# configuración y STATEMENTS sin pagar el import del conector (ni tenerlo
+# instalado), y lo piden recién al conectarse (`init_db.mysql`,
+# `init_db.MySQLError`, que pasan por __getattr__). Un
+# `from init_db import mysql` a nivel módulo lo cargaría en el import.
+
+def load_dependencies() -> None:
+    global mysql, MySQLError
+    try:
+        import mysql.connector
+        import mysql.connector.pooling
+        from mysql.connector import Error as MySQLError
+    except ImportError:
+        print("\n  ERROR: mysql-connector-python no está instalado.")
+        print("  Instalalo con:  pip install mysql-connector-python\n")
+        sys.exit(1)
+
 
-try:
-    import mysql.connector
-    from mysql.connector import Error as MySQLError
-except ImportError:
-    print("\n  ERROR: mysql-connector-python no está instalado.")
-    print("  Instalalo con:  pip install mysql-connector-python\n")
-    sys.exit(1)
+def __getattr__(name: str):
+    if name in ("mysql", "MySQLError"):
+        load_dependencies()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ──────────────────────────────────────────────────────────────────
 # 3. Definición del esquema — en orden de dependencia
@@ -299,6 +321,7 @@ STATEMENTS = [
       end_time    TIME NOT NULL DEFAULT '12:00:00',
       notes       TEXT,
       status      ENUM('programado','realizado','cancelado') NOT NULL DEFAULT 'programado',
+      capacity    INT NULL,  -- cupo de participantes; NULL = sin cupo
       created_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
       updated_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
@@ -326,6 +349,7 @@ STATEMENTS = [
     ("idx: inscripciones_type",      "CREATE INDEX idx_inscripciones_type    ON inscripciones(type, item_id)"),
     ("idx: inventario_volunteer",    "CREATE INDEX idx_inventario_volunteer  ON inventario(assigned_volunteer_id)"),
     ("idx: voluntarios_email",       "CREATE INDEX idx_voluntarios_email     ON voluntarios(email)"),
+    ("idx: voluntarios_status",      "CREATE INDEX idx_voluntarios_status    ON voluntarios(status)"),
     ("idx: pending_items_parent",    "CREATE INDEX idx_pending_items_parent  ON pending_items(pending_id)"),
     ("idx: auth_users_email_ver",    "CREATE INDEX idx_auth_users_email_ver  ON auth_users(email_verified)"),
     ("idx: auth_users_volunteer_id", "CREATE INDEX idx_auth_users_vol_id     ON auth_users(volunteer_id)"),
@@ -337,7 +361,6 @@ STATEMENTS = [
     ("idx: ale_success",             "CREATE INDEX idx_ale_success           ON auth_login_events(success)"),
     ("idx: as_auth_user_id",         "CREATE INDEX idx_as_auth_user_id       ON auth_sessions(auth_user_id)"),
     ("idx: as_expires_at",           "CREATE INDEX idx_as_expires_at         ON auth_sessions(expires_at)"),
-
     # ── ALTER TABLE: relación circular voluntarios ↔ auth_users ──
     # Se hace al final porque auth_users ya existe en este punto
 
@@ -423,12 +446,412 @@ STATEMENTS = [
     """),
 
     ("idx: participants_email",   "CREATE INDEX idx_participants_email  ON participants(email)"),
+    ("idx: participants_active",  "CREATE INDEX idx_participants_active ON participants(is_active)"),
     ("idx: pp_participant_id",    "CREATE INDEX idx_pp_participant_id   ON participant_profiles(participant_id)"),
     ("idx: cep_event_id",         "CREATE INDEX idx_cep_event_id        ON calendar_event_participants(event_id)"),
     ("idx: cep_participant_id",   "CREATE INDEX idx_cep_participant_id  ON calendar_event_participants(participant_id)"),
     ("idx: ppe_participant_id",   "CREATE INDEX idx_ppe_participant_id  ON participant_program_enrollments(participant_id)"),
 ]
 
+# ──────────────────────────────────────────────────────────────────
+# 3b. Read model del calendario (calendar_month_events)
+# ──────────────────────────────────────────────────────────────────
+# /calendar/instances-rich arma cada evento juntando calendar_instances con
+# sus asignaciones, el taller/grupo/actividad de origen y el conteo de
+# anotados. Esta tabla guarda ese resultado ya armado, una fila por evento,
+# indexada por mes: leer un mes es un único range scan sobre idx_cme_month.
+#
+# Se mantiene sola con triggers:
+#   · instancias y asignaciones → se recalcula la fila del evento
+#   · anotados                  → participants_count ±1, sin recalcular,
+#                                 con el cupo del evento (ver cme_count_add)
+#   · nombres de voluntarios y de talleres/grupos/actividades → se propagan
+#
+# calendar_read_model.py la reconstruye de cero (rebuild) y mide la
+# diferencia contra el JOIN en vivo (bench).
+
+# El SELECT que arma una fila. Lo comparten el procedimiento (un evento) y el
+# rebuild (un rango de ids): {where} se completa en cada caso.
+CME_SELECT = """
+    SELECT
+      ci.id,
+      YEAR(ci.date) * 100 + MONTH(ci.date),
+      ci.date, ci.start_time, ci.end_time, ci.type, ci.source_id,
+      CASE ci.type WHEN 'taller' THEN t.name WHEN 'grupo' THEN g.name ELSE a.name END,
+      ci.notes, ci.status,
+      (SELECT JSON_OBJECT('id', v.id, 'name', v.name, 'last_name', v.last_name)
+         FROM calendar_assignments ca JOIN voluntarios v ON v.id = ca.volunteer_id
+        WHERE ca.instance_id = ci.id AND ca.role = 'coordinator' LIMIT 1),
+      COALESCE((SELECT JSON_ARRAYAGG(JSON_OBJECT('id', v.id, 'name', v.name, 'last_name', v.last_name))
+         FROM calendar_assignments ca JOIN voluntarios v ON v.id = ca.volunteer_id
+        WHERE ca.instance_id = ci.id AND ca.role = 'co_coordinator'), JSON_ARRAY()),
+      COALESCE((SELECT JSON_ARRAYAGG(ca.volunteer_id)
+         FROM calendar_assignments ca WHERE ca.instance_id = ci.id), JSON_ARRAY()),
+      (SELECT COUNT(*) FROM calendar_event_participants cep
+        WHERE cep.event_id = ci.id AND cep.status <> 'cancelado'),
+      ci.capacity
+    FROM calendar_instances ci
+    LEFT JOIN talleres    t ON ci.type = 'taller'    AND t.id = ci.source_id
+    LEFT JOIN grupos      g ON ci.type = 'grupo'     AND g.id = ci.source_id
+    LEFT JOIN actividades a ON ci.type = 'actividad' AND a.id = ci.source_id
+    WHERE {where}
+"""
+
+CME_COLUMNS = """(instance_id, month_key, date, start_time, end_time, type, source_id,
+     source_name, notes, status, coordinator, co_coordinators, volunteer_ids, participants_count,
+     capacity)"""
+
+# Suma (o resta) un anotado: solo cuentan los no cancelados.
+CEP_ACTIVE = "{row}.status <> 'cancelado'"
+
+STATEMENTS += [
+
+    ("calendar_month_events", """
+    CREATE TABLE calendar_month_events (
+      instance_id        INT PRIMARY KEY,
+      month_key          INT  NOT NULL,
+      date               DATE NOT NULL,
+      start_time         TIME NOT NULL,
+      end_time           TIME NOT NULL,
+      type               ENUM('grupo', 'taller', 'actividad') NOT NULL,
+      source_id          INT NULL,
+      source_name        VARCHAR(200) NULL,
+      notes              TEXT,
+      status             ENUM('programado','realizado','cancelado') NOT NULL,
+      coordinator        JSON NULL,
+      co_coordinators    JSON NOT NULL,
+      volunteer_ids      JSON NOT NULL,
+      participants_count INT  NOT NULL DEFAULT 0,
+      capacity           INT  NULL,
+      refreshed_at       TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+      KEY idx_cme_month  (month_key, date, start_time),
+      KEY idx_cme_source (type, source_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """),
+
+    ("proc: cme_refresh", f"""
+    CREATE PROCEDURE cme_refresh(IN p_instance_id INT)
+    BEGIN
+      DELETE FROM calendar_month_events WHERE instance_id = p_instance_id;
+      INSERT INTO calendar_month_events {CME_COLUMNS}
+      {CME_SELECT.format(where="ci.id = p_instance_id")};
+    END
+    """),
+
+    ("proc: cme_refresh_volunteer", """
+    CREATE PROCEDURE cme_refresh_volunteer(IN p_volunteer_id INT)
+    BEGIN
+      DECLARE done INT DEFAULT 0;
+      DECLARE v_instance INT;
+      DECLARE cur CURSOR FOR
+        SELECT DISTINCT instance_id FROM calendar_assignments WHERE volunteer_id = p_volunteer_id;
+      DECLARE CONTINUE HANDLER FOR NOT FOUND SET done = 1;
+      OPEN cur;
+      refresh_loop: LOOP
+        FETCH cur INTO v_instance;
+        IF done THEN LEAVE refresh_loop; END IF;
+        CALL cme_refresh(v_instance);
+      END LOOP;
+      CLOSE cur;
+    END
+    """),
+
+    ("trg: ci insert", """
+    CREATE TRIGGER trg_cme_ci_insert AFTER INSERT ON calendar_instances
+    FOR EACH ROW CALL cme_refresh(NEW.id)
+    """),
+
+    ("trg: ci update", """
+    CREATE TRIGGER trg_cme_ci_update AFTER UPDATE ON calendar_instances
+    FOR EACH ROW CALL cme_refresh(NEW.id)
+    """),
+
+    # El ON DELETE CASCADE hacia asignaciones y anotados NO dispara sus
+    # triggers: por eso la fila se borra acá y no desde esas tablas.
+    ("trg: ci delete", """
+    CREATE TRIGGER trg_cme_ci_delete AFTER DELETE ON calendar_instances
+    FOR EACH ROW DELETE FROM calendar_month_events WHERE instance_id = OLD.id
+    """),
+
+    ("trg: ca insert", """
+    CREATE TRIGGER trg_cme_ca_insert AFTER INSERT ON calendar_assignments
+    FOR EACH ROW CALL cme_refresh(NEW.instance_id)
+    """),
+
+    ("trg: ca update", """
+    CREATE TRIGGER trg_cme_ca_update AFTER UPDATE ON calendar_assignments
+    FOR EACH ROW
+    BEGIN
+      CALL cme_refresh(NEW.instance_id);
+      IF OLD.instance_id <> NEW.instance_id THEN CALL cme_refresh(OLD.instance_id); END IF;
+    END
+    """),
+
+    ("trg: ca delete", """
+    CREATE TRIGGER trg_cme_ca_delete AFTER DELETE ON calendar_assignments
+    FOR EACH ROW CALL cme_refresh(OLD.instance_id)
+    """),
+
+    # Anotarse es un UPDATE condicional sobre la fila del evento:
+    #   participants_count + 1 WHERE instance_id = ? AND participants_count < capacity
+    # Sin fila afectada el evento está lleno y la sentencia se rechaza con
+    # SQLSTATE 45000 'Cupo completo'. El lock de esa fila ordena a los que se
+    # anotan a la vez (sin leer-y-después-escribir): nunca entra uno de más.
+    # Los triggers son AFTER por lo mismo que los de cupos (sección 3d): un
+    # INSERT … ON DUPLICATE KEY UPDATE que reactiva no suma dos veces.
+    ("proc: cme_count_add", """
+    CREATE PROCEDURE cme_count_add(IN p_event_id INT, IN p_delta INT)
+    BEGIN
+      UPDATE calendar_month_events
+         SET participants_count = GREATEST(participants_count + p_delta, 0)
+       WHERE instance_id = p_event_id
+         AND (p_delta < 0 OR capacity IS NULL OR participants_count < capacity);
+      IF ROW_COUNT() = 0 AND p_delta > 0
+         AND EXISTS (SELECT 1 FROM calendar_month_events WHERE instance_id = p_event_id) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Cupo completo';
+      END IF;
+    END
+    """),
+
+    ("trg: cep insert", f"""
+    CREATE TRIGGER trg_cme_cep_insert AFTER INSERT ON calendar_event_participants
+    FOR EACH ROW
+    BEGIN
+      IF {CEP_ACTIVE.format(row="NEW")} THEN CALL cme_count_add(NEW.event_id, 1); END IF;
+    END
+    """),
+
+    ("trg: cep update", f"""
+    CREATE TRIGGER trg_cme_cep_update AFTER UPDATE ON calendar_event_participants
+    FOR EACH ROW
+    BEGIN
+      IF OLD.event_id <> NEW.event_id OR ({CEP_ACTIVE.format(row="OLD")}) <> ({CEP_ACTIVE.format(row="NEW")}) THEN
+        IF {CEP_ACTIVE.format(row="OLD")} THEN CALL cme_count_add(OLD.event_id, -1); END IF;
+        IF {CEP_ACTIVE.format(row="NEW")} THEN CALL cme_count_add(NEW.event_id, 1); END IF;
+      END IF;
+    END
+    """),
+
+    ("trg: cep delete", f"""
+    CREATE TRIGGER trg_cme_cep_delete AFTER DELETE ON calendar_event_participants
+    FOR EACH ROW
+    BEGIN
+      IF {CEP_ACTIVE.format(row="OLD")} THEN CALL cme_count_add(OLD.event_id, -1); END IF;
+    END
+    """),
+
+    ("trg: voluntarios rename", """
+    CREATE TRIGGER trg_cme_vol_update AFTER UPDATE ON voluntarios
+    FOR EACH ROW
+    BEGIN
+      IF NOT (OLD.name <=> NEW.name) OR NOT (OLD.last_name <=> NEW.last_name) THEN
+        CALL cme_refresh_volunteer(NEW.id);
+      END IF;
+    END
+    """),
+]
+
+# El nombre del origen se propaga con un UPDATE por (type, source_id).
+for _table, _type in (("talleres", "taller"), ("grupos", "grupo"), ("actividades", "actividad")):
+    STATEMENTS.append((f"trg: {_table} rename", f"""
+    CREATE TRIGGER trg_cme_{_table}_update AFTER UPDATE ON {_table}
+    FOR EACH ROW
+      UPDATE calendar_month_events SET source_name = NEW.name
+       WHERE type = '{_type}' AND source_id = NEW.id AND NOT (OLD.name <=> NEW.name)
+    """))
+
+# ──────────────────────────────────────────────────────────────────
+# 3c. Actividad de usuarios y su rollup
+# ──────────────────────────────────────────────────────────────────
+# El BFF junta los eventos en memoria y los manda de a tandas
+# (POST /activity/batch → un INSERT multi-fila). Cada fila que entra suma en
+# activity_user_rollup / activity_user_counts por trigger: el resumen de
+# auditoría lee una fila por usuario en vez de agrupar toda la tabla.
+#
+# rollups.py activity reconstruye el rollup desde los eventos crudos.
+
+STATEMENTS += [
+    ("activity_events", """
+    CREATE TABLE activity_events (
+      id          BIGINT AUTO_INCREMENT PRIMARY KEY,
+      event_type  ENUM('login','view','create','edit','delete') NOT NULL,
+      module      VARCHAR(60)  NULL,
+      action      VARCHAR(100) NULL,
+      user_type   VARCHAR(20)  NOT NULL,
+      user_id     INT          NOT NULL,
+      role        VARCHAR(30)  NOT NULL,
+      created_at  DATETIME(3)  NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+      KEY idx_ae_user_time (user_type, user_id, created_at)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """),
+
+    ("activity_user_rollup", """
+    CREATE TABLE activity_user_rollup (
+      user_type   VARCHAR(20) NOT NULL,
+      user_id     INT         NOT NULL,
+      role        VARCHAR(30) NOT NULL,
+      login_count INT         NOT NULL DEFAULT 0,
+      last_login  DATETIME(3) NULL,
+      last_seen   DATETIME(3) NOT NULL,
+      PRIMARY KEY (user_type, user_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """),
+
+    # kind='view' → name es el módulo; kind='action' → name es create/edit/delete.
+    ("activity_user_counts", """
+    CREATE TABLE activity_user_counts (
+      user_type  VARCHAR(20)             NOT NULL,
+      user_id    INT                     NOT NULL,
+      kind       ENUM('view','action')   NOT NULL,
+      name       VARCHAR(60)             NOT NULL,
+      count      INT                     NOT NULL DEFAULT 0,
+      PRIMARY KEY (user_type, user_id, kind, name)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """),
+
+    ("trg: activity rollup", """
+    CREATE TRIGGER trg_ae_rollup AFTER INSERT ON activity_events
+    FOR EACH ROW
+    BEGIN
+      INSERT INTO activity_user_rollup (user_type, user_id, role, login_count, last_login, last_seen)
+      VALUES (NEW.user_type, NEW.user_id, NEW.role, NEW.event_type = 'login',
+              IF(NEW.event_type = 'login', NEW.created_at, NULL), NEW.created_at)
+      ON DUPLICATE KEY UPDATE
+        role        = NEW.role,
+        login_count = login_count + (NEW.event_type = 'login'),
+        last_login  = IF(NEW.event_type = 'login',
+                         GREATEST(COALESCE(last_login, NEW.created_at), NEW.created_at), last_login),
+        last_seen   = GREATEST(last_seen, NEW.created_at);
+
+      IF NEW.event_type <> 'login' THEN
+        INSERT INTO activity_user_counts (user_type, user_id, kind, name, count)
+        VALUES (NEW.user_type, NEW.user_id,
+                IF(NEW.event_type = 'view', 'view', 'action'),
+                IF(NEW.event_type = 'view', COALESCE(NEW.module, '-'), NEW.event_type), 1)
+        ON DUPLICATE KEY UPDATE count = count + 1;
+      END IF;
+    END
+    """),
+]
+
+# ──────────────────────────────────────────────────────────────────
+# 3d. Cupos de talleres y grupos (talleres.enrolled, grupos.participants)
+# ──────────────────────────────────────────────────────────────────
+# Los contadores se mueven por trigger con cada inscripción: de voluntarios
+# (inscripciones, si no está cancelada) y de participantes
+# (participant_program_enrollments). Nadie los escribe a mano.
+#
+# El alta pasa por un UPDATE condicional sobre la fila del taller:
+#   enrolled = enrolled + 1 WHERE id = ? AND enrolled < capacity
+# Si no toca ninguna fila el taller está lleno y el INSERT se rechaza con
+# SQLSTATE 45000 'Cupo completo' (el backend lo devuelve como 409). El lock
+# de esa fila ordena a los que se anotan a la vez: el chequeo es O(1) y no
+# hay dos que entren al último lugar. capacity = 0 es "sin cupo".
+#
+# Los triggers son AFTER: corren sólo si la fila quedó escrita (un
+# INSERT IGNORE o ON DUPLICATE KEY UPDATE que no inserta no suma; un BEFORE
+# INSERT sí sumaría), y un SIGNAL desde ahí deshace la sentencia entera,
+# fila incluida.
+#
+# rollups.py counters recuenta todo y corrige lo que se haya desviado.
+
+# Qué inscripción cuenta para el cupo.
+INSC_ACTIVE = "{row}.status <> 'cancelada'"
+
+STATEMENTS += [
+
+    ("proc: program_count_add", """
+    CREATE PROCEDURE program_count_add(IN p_type VARCHAR(20), IN p_item_id INT, IN p_delta INT)
+    BEGIN
+      IF p_type = 'taller' THEN
+        UPDATE talleres SET enrolled = GREATEST(enrolled + p_delta, 0)
+         WHERE id = p_item_id AND (p_delta < 0 OR capacity = 0 OR enrolled < capacity);
+        IF ROW_COUNT() = 0 AND p_delta > 0 AND EXISTS (SELECT 1 FROM talleres WHERE id = p_item_id) THEN
+          SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Cupo completo';
+        END IF;
+      ELSEIF p_type = 'grupo' THEN
+        UPDATE grupos SET participants = GREATEST(participants + p_delta, 0)
+         WHERE id = p_item_id;
+      END IF;
+    END
+    """),
+
+    ("trg: inscripciones insert", f"""
+    CREATE TRIGGER trg_cnt_insc_insert AFTER INSERT ON inscripciones
+    FOR EACH ROW
+    BEGIN
+      IF {INSC_ACTIVE.format(row="NEW")} THEN CALL program_count_add(NEW.type, NEW.item_id, 1); END IF;
+    END
+    """),
+
+    # Cancelar o mover de ítem: se libera el lugar viejo y se toma el nuevo
+    # (con chequeo de cupo).
+    ("trg: inscripciones update", f"""
+    CREATE TRIGGER trg_cnt_insc_update AFTER UPDATE ON inscripciones
+    FOR EACH ROW
+    BEGIN
+      IF OLD.type <> NEW.type OR OLD.item_id <> NEW.item_id
+         OR ({INSC_ACTIVE.format(row="OLD")}) <> ({INSC_ACTIVE.format(row="NEW")}) THEN
+        IF {INSC_ACTIVE.format(row="OLD")} THEN CALL program_count_add(OLD.type, OLD.item_id, -1); END IF;
+        IF {INSC_ACTIVE.format(row="NEW")} THEN CALL program_count_add(NEW.type, NEW.item_id, 1); END IF;
+      END IF;
+    END
+    """),
+
+    ("trg: inscripciones delete", f"""
+    CREATE TRIGGER trg_cnt_insc_delete AFTER DELETE ON inscripciones
+    FOR EACH ROW
+    BEGIN
+      IF {INSC_ACTIVE.format(row="OLD")} THEN CALL program_count_add(OLD.type, OLD.item_id, -1); END IF;
+    END
+    """),
+
+    ("trg: ppe insert", """
+    CREATE TRIGGER trg_cnt_ppe_insert AFTER INSERT ON participant_program_enrollments
+    FOR EACH ROW CALL program_count_add(NEW.type, NEW.item_id, 1)
+    """),
+
+    ("trg: ppe update", """
+    CREATE TRIGGER trg_cnt_ppe_update AFTER UPDATE ON participant_program_enrollments
+    FOR EACH ROW
+    BEGIN
+      IF OLD.type <> NEW.type OR OLD.item_id <> NEW.item_id THEN
+        CALL program_count_add(OLD.type, OLD.item_id, -1);
+        CALL program_count_add(NEW.type, NEW.item_id, 1);
+      END IF;
+    END
+    """),
+
+    ("trg: ppe delete", """
+    CREATE TRIGGER trg_cnt_ppe_delete AFTER DELETE ON participant_program_enrollments
+    FOR EACH ROW CALL program_count_add(OLD.type, OLD.item_id, -1)
+    """),
+]
+
+# Borrar un voluntario o un participante se lleva sus inscripciones por
+# ON DELETE CASCADE, que no dispara los triggers de arriba: los lugares se
+# devuelven acá, un UPDATE por tabla con lo agrupado por ítem.
+for _owner, _source, _fk, _where in (
+    ("voluntarios",  "inscripciones",                   "user_id",        INSC_ACTIVE.format(row="s")),
+    ("participants", "participant_program_enrollments", "participant_id", "TRUE"),
+):
+    STATEMENTS.append((f"trg: {_owner} delete → cupos", f"""
+    CREATE TRIGGER trg_cnt_{_owner}_delete BEFORE DELETE ON {_owner}
+    FOR EACH ROW
+    BEGIN
+      UPDATE talleres t
+        JOIN (SELECT s.item_id, COUNT(*) AS n FROM {_source} s
+               WHERE s.{_fk} = OLD.id AND s.type = 'taller' AND {_where}
+               GROUP BY s.item_id) x ON x.item_id = t.id
+         SET t.enrolled = GREATEST(t.enrolled - x.n, 0);
+      UPDATE grupos g
+        JOIN (SELECT s.item_id, COUNT(*) AS n FROM {_source} s
+               WHERE s.{_fk} = OLD.id AND s.type = 'grupo' AND {_where}
+               GROUP BY s.item_id) x ON x.item_id = g.id
+         SET g.participants = GREATEST(g.participants - x.n, 0);
+    END
+    """))
+
 # ──────────────────────────────────────────────────────────────────
 # 4. Ejecución
 # ──────────────────────────────────────────────────────────────────
@@ -441,18 +864,87 @@ RESET  = "\033[0m"
 BOLD   = "\033[1m"
 
 
+class Timings:
+    """
+    Tiempo de cada fase (conexión, cada DDL, truncado, cada tabla...). Medir
+    es un perf_counter por fase, así que se hace siempre; db_tools.py
+    --profile lo vuelca como JSON.
+    """
+
+    def __init__(self):
+        self.phases: list[tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+
+def confirm(question: str, assume_yes: bool = False) -> bool:
+    """Con --yes no pregunta; sin terminal (cron, CI) no se queda esperando un input()."""
+    if assume_yes:
+        return True
+    if not sys.stdin.isatty():
+        print(f"  {YELLOW}No hay terminal para confirmar: pasá --yes.{RESET}")
+        return False
+    return input(f"  {YELLOW}{question} (s/N): {RESET}").strip().lower() == "s"
+
+
+def create_database(conn, timings: Timings | None = None) -> int:
+    """
+    DROP + CREATE de la base y todos los STATEMENTS sobre `conn` (sin base
+    elegida; queda con USE de la nueva). Devuelve cuántos se ejecutaron; el
+    primero que falla corta con MySQLError.
+    """
+    timings = timings or Timings()
+    cursor = conn.cursor()
+    try:
+        print(f"\n  {YELLOW}▶ Borrando base de datos '{DB_NAME}'...{RESET}")
+        with timings.phase("drop_database"):
+            cursor.execute(f"DROP DATABASE IF EXISTS `{DB_NAME}`")
+
+        print(f"  {YELLOW}▶ Creando base de datos '{DB_NAME}'...{RESET}\n")
+        with timings.phase("create_database"):
+            cursor.execute(
+                f"CREATE DATABASE `{DB_NAME}` "
+                "CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"
+            )
+            cursor.execute(f"USE `{DB_NAME}`")
+
+        done = 0
+        for label, sql in STATEMENTS:
+            try:
+                with timings.phase(f"ddl:{label}"):
+                    cursor.execute(sql.strip())
+            except MySQLError:
+                print(f"  {RED}✗  {label}{RESET}")
+                raise
+            print(f"  {GREEN}✓{RESET}  {label}")
+            done += 1
+        return done
+    finally:
+        cursor.close()
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Borra y recrea la base de datos")
+    parser.add_argument("--yes", action="store_true", help="no pedir confirmación")
+    args = parser.parse_args()
+
     print(f"\n{BOLD}{CYAN}  ALMA Platform — init_db.py{RESET}")
     print(f"  Base de datos : {BOLD}{DB_NAME}{RESET}")
     print(f"  Host          : {DB_HOST}:{DB_PORT}")
     print(f"  Usuario       : {DB_USER}\n")
 
     # Confirmación
-    answer = input(f"  {YELLOW}¿Borrar y recrear '{DB_NAME}'? (s/N): {RESET}").strip().lower()
-    if answer != "s":
+    if not confirm(f"¿Borrar y recrear '{DB_NAME}'?", args.yes):
         print("  Cancelado.\n")
         sys.exit(0)
 
+    load_dependencies()
     try:
         conn = mysql.connector.connect(
             host=DB_HOST,
@@ -462,44 +954,22 @@ def main():
             charset="utf8mb4",
             autocommit=True,
         )
-        cursor = conn.cursor()
-
-        # Drop + create database
-        print(f"\n  {YELLOW}▶ Borrando base de datos '{DB_NAME}'...{RESET}")
-        cursor.execute(f"DROP DATABASE IF EXISTS `{DB_NAME}`")
-
-        print(f"  {YELLOW}▶ Creando base de datos '{DB_NAME}'...{RESET}\n")
-        cursor.execute(
-            f"CREATE DATABASE `{DB_NAME}` "
-            "CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"
-        )
-        cursor.execute(f"USE `{DB_NAME}`")
-
-        # Ejecutar statements
-        ok = 0
-        for label, sql in STATEMENTS:
-            try:
-                cursor.execute(sql.strip())
-                print(f"  {GREEN}✓{RESET}  {label}")
-                ok += 1
-            except MySQLError as e:
-                print(f"  {RED}✗  {label}{RESET}")
-                print(f"     {RED}{e}{RESET}")
-                cursor.close()
-                conn.close()
-                sys.exit(1)
-
-        cursor.close()
-        conn.close()
-
-        print(f"\n  {GREEN}{BOLD}✔ Listo — {ok} statements ejecutados sin errores.{RESET}")
-        print(f"  Ya podés correr:  {CYAN}npm run dev{RESET}\n")
-
     except MySQLError as e:
         print(f"\n  {RED}ERROR de conexión: {e}{RESET}")
         print("  Verificá DB_HOST, DB_PORT, DB_USER y DB_PASSWORD en .env.local\n")
         sys.exit(1)
 
+    try:
+        done = create_database(conn)
+    except MySQLError as e:
+        print(f"     {RED}{e}{RESET}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    print(f"\n  {GREEN}{BOLD}✔ Listo — {done} statements ejecutados sin errores.{RESET}")
+    print(f"  Ya podés correr:  {CYAN}npm run dev{RESET}\n")
+
 
 if __name__ == "__main__":
     main()
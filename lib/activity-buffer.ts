@@ -0,0 +1,169 @@
+/**
+ * lib/activity-buffer.ts — Cola en memoria para los eventos de actividad
+ * =======================================================================
+ * Antes cada evento (login, vista de módulo, alta/edición/baja) era un POST
+ * a /activity/ en el camino del request. Ahora se encola y sale de a tandas
+ * a /activity/batch, que el backend escribe con un único INSERT multi-fila.
+ *
+ *   - Tanda: cada `FLUSH_INTERVAL_MS` o al juntar `MAX_BATCH` eventos.
+ *   - Memoria acotada: a lo sumo `MAX_QUEUED` eventos en cola.
+ *   - Back-pressure: con la cola llena, quien encola espera a que la tanda
+ *     en curso libere lugar, pero a lo sumo `MAX_WAIT_MS`. Si se pasa del
+ *     plazo o hay demasiados esperando (el backend está caído), el evento
+ *     se descarta y se cuenta: el tracking nunca puede tirar ni frenar la app.
+ *     Los descartes se loguean juntos, una línea por intervalo con la cuenta.
+ *   - Apagado: al bajar el worker (reload de PM2, SIGINT/SIGTERM) se manda
+ *     lo que quede antes de salir (lib/shutdown).
+ *
+ * Si el backend todavía no tiene /activity/batch (404/405), se vuelve al
+ * POST de a uno sin perder nada.
+ */
+
+import { api } from '@/lib/api-client'
+import { logWarn } from '@/lib/logger'
+import { onShutdown } from '@/lib/shutdown'
+import type { ActivityEventInput } from '@/lib/data-manager'
+
+const MAX_BATCH = 200
+const FLUSH_INTERVAL_MS = 2000
+const MAX_QUEUED = 5000
+/** Encoladores esperando lugar. Pasado esto, se descarta. */
+const MAX_WAITING = 1000
+/** Lo más que un encolador espera lugar antes de que su evento se descarte. */
+const MAX_WAIT_MS = 3000
+
+type QueuedEvent = ActivityEventInput & { created_at: string }
+
+let queue: QueuedEvent[] = []
+interface Waiter {
+  admit: () => void
+  timer: NodeJS.Timeout
+}
+
+let waiting: Waiter[] = []
+let flushing: Promise<void> | null = null
+let batchSupported = true
+const stats = { sent: 0, dropped: 0, batches: 0 }
+/** Descartes todavía no logueados, por motivo. */
+let unreported = { full: 0, timeout: 0 }
+
+const timer = setInterval(() => {
+  reportDrops()
+  void flushActivityEvents()
+}, FLUSH_INTERVAL_MS)
+timer.unref()
+process.once('beforeExit', () => { void flushActivityEvents() })
+onShutdown('activity-buffer', async () => {
+  await flushActivityEvents()
+  reportDrops()
+})
+
+/**
+ * Encola un evento. Resuelve apenas queda en cola (o se descarta): no espera
+ * a que llegue al backend. La hora se toma ahora, no al enviar.
+ */
+export function enqueueActivityEvent(data: ActivityEventInput): Promise<void> {
+  const event: QueuedEvent = { ...data, created_at: new Date().toISOString() }
+
+  if (queue.length < MAX_QUEUED) {
+    queue.push(event)
+    if (queue.length >= MAX_BATCH) void flushActivityEvents()
+    return Promise.resolve()
+  }
+
+  if (waiting.length >= MAX_WAITING) {
+    drop('full')
+    return Promise.resolve()
+  }
+
+  void flushActivityEvents()
+  return new Promise((resolve) => {
+    const waiter: Waiter = {
+      admit: () => {
+        clearTimeout(waiter.timer)
+        queue.push(event)
+        resolve()
+      },
+      // Si el backend no vuelve a tiempo nadie libera lugar: se descarta.
+      timer: setTimeout(() => {
+        waiting = waiting.filter((w) => w !== waiter)
+        drop('timeout')
+        resolve()
+      }, MAX_WAIT_MS),
+    }
+    waiter.timer.unref()
+    waiting.push(waiter)
+  })
+}
+
+function drop(reason: 'full' | 'timeout') {
+  stats.dropped++
+  unreported[reason]++
+}
+
+/** Con el backend caído se descartan miles por segundo: una línea por intervalo. */
+function reportDrops() {
+  const count = unreported.full + unreported.timeout
+  if (count === 0) return
+  logWarn(`Cola de actividad llena: ${count} eventos descartados`, {
+    module: 'tracking', action: 'activity_dropped', meta: { count, ...unreported, total: stats.dropped },
+  })
+  unreported = { full: 0, timeout: 0 }
+}
+
+/** Manda todo lo encolado. Si ya hay un envío en curso, devuelve ese. */
+export function flushActivityEvents(): Promise<void> {
+  if (flushing) return flushing
+  if (queue.length === 0) return Promise.resolve()
+
+  flushing = drain().finally(() => { flushing = null })
+  return flushing
+}
+
+export function activityBufferStats() {
+  return { queued: queue.length, waiting: waiting.length, ...stats }
+}
+
+async function drain(): Promise<void> {
+  while (queue.length > 0) {
+    let sent: number
+    try {
+      sent = await send(queue.slice(0, MAX_BATCH))
+    } catch (err: any) {
+      // Se deja en cola para el próximo intento. Los de atrás (los que
+      // esperaban lugar) siguen esperando hasta su plazo: eso es la
+      // back-pressure.
+      logWarn('No se pudo enviar la tanda de actividad; se reintenta', {
+        module: 'tracking', action: 'activity_flush', meta: { queued: queue.length, error: err?.message },
+      })
+      return
+    }
+    queue = queue.slice(sent)
+    stats.sent += sent
+    stats.batches++
+    admitWaiting()
+  }
+}
+
+/** Devuelve cuántos eventos del principio de la tanda quedaron guardados. */
+async function send(batch: QueuedEvent[]): Promise<number> {
+  if (batchSupported) {
+    try {
+      await api.post('/activity/batch', { events: batch })
+      return batch.length
+    } catch (err: any) {
+      if (!/→ (404|405):/.test(err?.message ?? '')) throw err
+      batchSupported = false
+    }
+  }
+  // De a uno: si falla a mitad, lo ya enviado no se repite.
+  await api.post('/activity/', batch[0])
+  return 1
+}
+
+function admitWaiting() {
+  const free = MAX_QUEUED - queue.length
+  const admitted = waiting.slice(0, free)
+  waiting = waiting.slice(admitted.length)
+  for (const waiter of admitted) waiter.admit()
+}
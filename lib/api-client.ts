@@ -3,54 +3,85 @@
  *
  * Todas las llamadas a la API FastAPI pasan por aquí.
  * La URL base se configura desde BACKEND_URL en .env.local
+ *
+ * Conexiones: el fetch de Node (undici) ya mantiene un pool keep-alive por
+ * origen, así que todas las llamadas al backend reutilizan los mismos sockets.
+ * No se arma un Agent propio: mezclar el undici de npm con el que trae Node
+ * rompe en cuanto las versiones no coinciden.
+ *
+ * Lecturas: los GET idénticos que están en vuelo al mismo tiempo se colapsan
+ * en una sola llamada, y los listados que lo piden (`{ ttlMs }`) quedan en
+ * memoria unos segundos. Cualquier POST/PUT/DELETE invalida la cache del
+ * recurso que toca (el primer segmento del path).
+ *
+ * En cluster cada worker tiene su propia cache: una escritura además toca el
+ * sello del recurso (lib/shared-store), y un acierto en cache sólo vale si
+ * el sello no cambió desde que se pidió el dato.
  */
 
+import { clustered, stampTime, touchStamp } from '@/lib/shared-store'
+
 const BASE_URL = process.env.BACKEND_URL || 'http://localhost:8001'
 const INTERNAL_API_KEY = process.env.INTERNAL_API_KEY || ''
 
 async function request<T>(path: string, options?: RequestInit): Promise<T> {
   const url = `${BASE_URL}${path}`
-
-  const res = await fetch(url, {
-    ...options,
-    headers: {
-      'Content-Type': 'application/json',
-      'X-API-Key': INTERNAL_API_KEY,
-      ...options?.headers,
-    },
-    // No cache en server components de Next.js
-    cache: 'no-store',
-  })
+  const method = options?.method ?? 'GET'
+
+  // Se invalida ANTES de escribir: un GET que arranque mientras tanto ya no
+  // puede dejar en cache la versión vieja (ver `generation`).
+  if (method !== 'GET') invalidate(resourceOf(path))
+
+  let res: Response
+  try {
+    res = await fetch(url, {
+      ...options,
+      headers: {
+        'Content-Type': 'application/json',
+        'X-API-Key': INTERNAL_API_KEY,
+        ...options?.headers,
+      },
+      // No cache en server components de Next.js
+      cache: 'no-store',
+    })
+  } finally {
+    // Después de la escritura: un GET de otro worker que arrancó en el medio
+    // tampoco puede quedar en cache.
+    if (method !== 'GET' && clustered) await touchStamp(resourceOf(path)).catch(() => {})
+  }
 
   if (res.status === 204) return null as T
 
   if (!res.ok) {
-    const rawBody = await res.text()
-    let detail = rawBody
-
-    if (rawBody) {
-      try {
-        const json = JSON.parse(rawBody)
-        const d = json?.detail ?? json
-        // El detail de FastAPI en un 422 es un array de objetos; lo serializamos para que sea legible
-        detail = typeof d === 'string' ? d : JSON.stringify(d)
-      } catch {
-        // Si no es JSON, dejamos el texto crudo para diagnóstico
-      }
-    }
-
-    throw new Error(`API ${options?.method ?? 'GET'} ${path} → ${res.status}: ${detail}`)
+    throw new Error(`API ${method} ${path} → ${res.status}: ${errorDetail(await res.text())}`)
   }
 
   return res.json() as Promise<T>
 }
 
+function errorDetail(rawBody: string): string {
+  if (!rawBody) return rawBody
+  try {
+    const json = JSON.parse(rawBody)
+    const d = json?.detail ?? json
+    // El detail de FastAPI en un 422 es un array de objetos; lo serializamos para que sea legible
+    return typeof d === 'string' ? d : JSON.stringify(d)
+  } catch {
+    // Si no es JSON, dejamos el texto crudo para diagnóstico
+    return rawBody
+  }
+}
+
 /**
  * Variante que devuelve la respuesta cruda, sin parsear JSON.
  * La usa el proxy de archivos (/api/files/[guid]/raw) para pasar los bytes
- * de una imagen tal cual, con su Content-Type y sus headers de cache.
+ * de una imagen tal cual, con su Content-Type y sus headers de cache. Un 304
+ * no es error: se devuelve para que el proxy lo pase al navegador.
  */
 async function requestRaw(path: string, options?: RequestInit): Promise<Response> {
+  const writes = (options?.method ?? 'GET') !== 'GET'
+  if (writes) invalidate(resourceOf(path))
+
   const res = await fetch(`${BASE_URL}${path}`, {
     ...options,
     headers: {
@@ -59,18 +90,131 @@ async function requestRaw(path: string, options?: RequestInit): Promise<Response
     },
     cache: 'no-store',
   })
+  if (writes && clustered) await touchStamp(resourceOf(path)).catch(() => {})
 
-  if (!res.ok) {
-    throw new Error(`API ${options?.method ?? 'GET'} ${path} → ${res.status}: ${await res.text()}`)
+  if (!res.ok && res.status !== 304) {
+    throw new Error(`API ${options?.method ?? 'GET'} ${path} → ${res.status}: ${errorDetail(await res.text())}`)
   }
 
   return res
 }
 
+// ── Lecturas compartidas ────────────────────────────────────────────────────
+
+export interface GetOptions {
+  /**
+   * Milisegundos que la respuesta queda en cache. Sin esto (o 0) no se cachea,
+   * solo se colapsa con otro GET idéntico en vuelo. Usarlo únicamente en
+   * listados que no dependen de quién pregunta.
+   */
+  ttlMs?: number
+}
+
+interface InFlight {
+  promise: Promise<unknown>
+  /** Cuántos llamadores se sumaron a esta misma promesa además del primero. */
+  joined: number
+}
+
+const inFlight = new Map<string, InFlight>()
+const cache = new Map<string, { expires: number; value: unknown; fetchedAt: number }>()
+
+/**
+ * Se incrementa en cada invalidación. Un GET que salió antes de una escritura
+ * vuelve con datos viejos: si la generación cambió mientras tanto, su
+ * respuesta se entrega pero no se guarda.
+ */
+let generation = 0
+
+/** `/voluntarios/3/approve?x=1` → `/voluntarios` */
+function resourceOf(path: string): string {
+  const segment = path.split(/[/?]/).find(Boolean)
+  return segment ? `/${segment}` : '/'
+}
+
+function matches(path: string, prefix: string): boolean {
+  return prefix === '/' || path === prefix || path.startsWith(`${prefix}/`) || path.startsWith(`${prefix}?`)
+}
+
+/**
+ * Descarta la cache (y los GET en vuelo) de un recurso. Sin argumento, de todo.
+ * Las escrituras lo hacen solas con su propio recurso; llamarlo a mano solo
+ * cuando una escritura cambia OTRO recurso (ej: una inscripción mueve el cupo
+ * del taller).
+ */
+function invalidate(prefix = '/'): void {
+  generation++
+  if (clustered) void touchStamp(resourceOf(prefix)).catch(() => {})
+  for (const key of cache.keys()) {
+    if (matches(key, prefix)) cache.delete(key)
+  }
+  for (const key of inFlight.keys()) {
+    if (matches(key, prefix)) inFlight.delete(key)
+  }
+}
+
+/** En cluster: ¿otro worker escribió el recurso (o invalidó todo) desde `since`? */
+async function changedSince(path: string, since: number): Promise<boolean> {
+  const [resource, all] = await Promise.all([stampTime(resourceOf(path)), stampTime('/')])
+  return Math.max(resource, all) >= since
+}
+
+async function sharedGet<T>(path: string, opts?: GetOptions): Promise<T> {
+  const ttlMs = opts?.ttlMs ?? 0
+
+  if (ttlMs > 0) {
+    const hit = cache.get(path)
+    if (hit && hit.expires > Date.now() && !(clustered && (await changedSince(path, hit.fetchedAt)))) {
+      return structuredClone(hit.value) as T
+    }
+  }
+
+  const pending = inFlight.get(path)
+  if (pending) {
+    pending.joined++
+    // Cada llamador recibe su copia: si uno muta la lista, no se la cambia al otro.
+    return structuredClone(await pending.promise) as T
+  }
+
+  const startedAt = generation
+  const fetchedAt = Date.now()
+  const entry: InFlight = { promise: Promise.resolve(), joined: 0 }
+  entry.promise = request<T>(path)
+    .then((value) => {
+      if (ttlMs > 0 && generation === startedAt) {
+        cache.set(path, { expires: Date.now() + ttlMs, value: structuredClone(value), fetchedAt })
+      }
+      return value
+    })
+    .finally(() => {
+      if (inFlight.get(path) === entry) inFlight.delete(path)
+    })
+  inFlight.set(path, entry)
+
+  const value = (await entry.promise) as T
+  return entry.joined > 0 ? structuredClone(value) : value
+}
+
 export const api = {
-  get: <T>(path: string) => request<T>(path),
+  get: <T>(path: string, opts?: GetOptions) => sharedGet<T>(path, opts),
 
-  getRaw: (path: string) => requestRaw(path),
+  /** `headers` permite reenviar Range / If-None-Match del navegador. */
+  getRaw: (path: string, headers?: HeadersInit) => requestRaw(path, { headers }),
+
+  /**
+   * POST con el cuerpo como stream de bytes (subida de archivos): no se arma
+   * el archivo entero en memoria ni se pasa a base64. Devuelve el JSON.
+   */
+  postStream: async <T>(path: string, body: ReadableStream<Uint8Array>, headers?: HeadersInit): Promise<T> => {
+    const res = await requestRaw(path, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/octet-stream', ...headers },
+      body,
+      // Obligatorio en el fetch de Node para mandar un stream.
+      duplex: 'half',
+    } as RequestInit)
+    return res.json() as Promise<T>
+  },
 
   /** POST que devuelve la respuesta cruda. Lo usa la generación de PDFs. */
   postRaw: (path: string, body?: unknown) =>
@@ -87,4 +231,6 @@ export const api = {
     request<T>(path, { method: 'PUT', body: body !== undefined ? JSON.stringify(body) : undefined }),
 
   delete: <T = null>(path: string) => request<T>(path, { method: 'DELETE' }),
+
+  invalidate,
 }
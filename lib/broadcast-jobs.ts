@@ -0,0 +1,274 @@
+/**
+ * lib/broadcast-jobs.ts — Cola de envíos masivos de notificaciones
+ * ==================================================================
+ * Un aviso a toda la audiencia (campanita + push + mail) se hacía entero
+ * dentro del POST del admin: con miles de destinatarios, el request tardaba
+ * minutos o directamente se cortaba. Ahora el POST encola un trabajo y
+ * responde al instante con su id; un worker local lo procesa:
+ *
+ *   1. pide sólo los ids de la audiencia (una consulta)
+ *   2. los parte en tandas de `CHUNK_SIZE`
+ *   3. manda hasta `CONCURRENCY` tandas a la vez a /notifications/broadcast/chunk
+ *      (INSERT multi-fila de notificaciones + push + mails de esa tanda)
+ *   4. una tanda que falla por red o 5xx se reintenta con backoff exponencial;
+ *      la idempotency_key evita duplicar si el primer intento sí llegó
+ *
+ * El progreso (destinatarios procesados, push, mails, tandas fallidas y
+ * destinatarios por segundo) se consulta con getBroadcastJob().
+ *
+ * Si el backend todavía no tiene el envío por tandas (404), el worker manda
+ * el broadcast de siempre en un solo llamado: el admin igual recibe el id al
+ * instante y no espera la entrega.
+ *
+ * En cluster, el progreso de un trabajo de otro worker sale de la foto que
+ * publica su dueño (lib/shared-store).
+ */
+
+import { randomUUID } from 'crypto'
+import {
+  BroadcastPayload,
+  BroadcastRecipient,
+  broadcastNotification,
+  deliverBroadcastChunk,
+  getBroadcastRecipients,
+} from '@/lib/data-manager'
+import { logInfo, logWarn, logError } from '@/lib/logger'
+import { createJobMirror } from '@/lib/shared-store'
+
+const CHUNK_SIZE = 200
+/** Tandas en vuelo a la vez: acota la presión sobre el backend y el servicio de push. */
+const CONCURRENCY = 3
+const MAX_ATTEMPTS = 4
+const BACKOFF_BASE_MS = 500
+/** Trabajos terminados que se conservan para consultar el resultado. */
+const MAX_FINISHED = 50
+
+export type BroadcastJobStatus = 'queued' | 'running' | 'done' | 'failed'
+
+export interface BroadcastJob {
+  id: string
+  status: BroadcastJobStatus
+  audience: string
+  recipients: number
+  processed: number
+  push_sent: number
+  push_failed: number
+  emails_queued: number
+  chunks_total: number
+  chunks_done: number
+  chunks_failed: number
+  retries: number
+  /** Destinatarios por segundo desde que arrancó. */
+  throughput: number
+  error: string | null
+  created_by: number
+  created_at: string
+  started_at: string | null
+  finished_at: string | null
+}
+
+interface JobState {
+  job: BroadcastJob
+  payload: BroadcastPayload
+}
+
+// Mismo criterio que lib/calendar-jobs: el registro sobrevive a las recargas de Next en desarrollo.
+const store = globalThis as unknown as {
+  __broadcastJobs?: Map<string, JobState>
+  __broadcastJobQueue?: string[]
+  __broadcastJobRunning?: boolean
+}
+const jobs = (store.__broadcastJobs ??= new Map<string, JobState>())
+const queue = (store.__broadcastJobQueue ??= [])
+const mirror = createJobMirror<BroadcastJob>('broadcast')
+
+const sleep = (ms: number) => new Promise((r) => setTimeout(r, ms))
+
+function httpStatus(err: unknown): number | null {
+  const m = /→ (\d{3}):/.exec((err as Error)?.message ?? '')
+  return m ? Number(m[1]) : null
+}
+
+export function startBroadcastJob(payload: BroadcastPayload, userId: number): BroadcastJob {
+  const state: JobState = {
+    payload,
+    job: {
+      id: randomUUID(),
+      status: 'queued',
+      audience: payload.audience,
+      recipients: 0,
+      processed: 0,
+      push_sent: 0,
+      push_failed: 0,
+      emails_queued: 0,
+      chunks_total: 0,
+      chunks_done: 0,
+      chunks_failed: 0,
+      retries: 0,
+      throughput: 0,
+      error: null,
+      created_by: userId,
+      created_at: new Date().toISOString(),
+      started_at: null,
+      finished_at: null,
+    },
+  }
+  jobs.set(state.job.id, state)
+  prune()
+  mirror.publish(state.job, true)
+
+  queue.push(state.job.id)
+  void drain()
+  return { ...state.job }
+}
+
+export async function getBroadcastJob(id: string): Promise<BroadcastJob | null> {
+  const state = jobs.get(id)
+  if (!state) return mirror.read(id)
+  updateThroughput(state.job)
+  return { ...state.job }
+}
+
+async function drain() {
+  if (store.__broadcastJobRunning) return
+  store.__broadcastJobRunning = true
+  try {
+    let id: string | undefined
+    while ((id = queue.shift())) {
+      const state = jobs.get(id)
+      if (state) await run(state)
+    }
+  } finally {
+    store.__broadcastJobRunning = false
+  }
+}
+
+async function run(state: JobState) {
+  const { job, payload } = state
+  job.status = 'running'
+  job.started_at = new Date().toISOString()
+  mirror.publish(job, true)
+
+  try {
+    let recipients: BroadcastRecipient[] | null = null
+    try {
+      recipients = await getBroadcastRecipients(payload.audience, payload.volunteer_ids)
+    } catch (err) {
+      if (httpStatus(err) !== 404) throw err
+    }
+
+    if (recipients === null) {
+      await runLegacy(state)
+    } else {
+      await runChunked(state, recipients)
+    }
+
+    job.status = job.chunks_failed > 0 ? 'failed' : 'done'
+    if (job.chunks_failed > 0) job.error = `${job.chunks_failed} tandas no se pudieron entregar`
+  } catch (err: any) {
+    job.status = 'failed'
+    job.error = err?.message ?? String(err)
+    logError('Falló el envío masivo de notificaciones', {
+      module: 'notifications', action: 'broadcast_job', user: job.created_by, error: err, meta: { job: job.id },
+    })
+  }
+
+  job.finished_at = new Date().toISOString()
+  updateThroughput(job)
+  mirror.publish(job, true)
+  logInfo('Envío masivo de notificaciones terminado', {
+    module: 'notifications',
+    action: 'broadcast_job',
+    user: job.created_by,
+    meta: {
+      job: job.id, status: job.status, recipients: job.recipients, push_sent: job.push_sent,
+      emails: job.emails_queued, chunks_failed: job.chunks_failed, retries: job.retries,
+      per_second: job.throughput,
+    },
+  })
+}
+
+async function runLegacy(state: JobState) {
+  const { job } = state
+  job.chunks_total = 1
+  const result = await broadcastNotification(state.payload)
+  job.recipients = result.recipients
+  job.processed = result.recipients
+  job.push_sent = result.push_sent
+  job.emails_queued = result.emails_queued
+  job.chunks_done = 1
+}
+
+async function runChunked(state: JobState, recipients: BroadcastRecipient[]) {
+  const { job, payload } = state
+  const chunks: BroadcastRecipient[][] = []
+  for (let i = 0; i < recipients.length; i += CHUNK_SIZE) chunks.push(recipients.slice(i, i + CHUNK_SIZE))
+  // El popup es por audiencia, no por persona: va sólo en la primera tanda.
+  // Si no hay nadie todavía, igual se crea para los que se sumen después.
+  if (chunks.length === 0 && payload.also_popup) chunks.push([])
+
+  job.recipients = recipients.length
+  job.chunks_total = chunks.length
+
+  let next = 0
+  const worker = async () => {
+    while (next < chunks.length) {
+      const index = next++
+      const chunkPayload = index === 0 ? payload : { ...payload, also_popup: false }
+      await deliverWithRetry(state, chunkPayload, chunks[index], index)
+    }
+  }
+  await Promise.all(Array.from({ length: Math.min(CONCURRENCY, chunks.length) }, worker))
+}
+
+async function deliverWithRetry(
+  state: JobState,
+  payload: BroadcastPayload,
+  recipients: BroadcastRecipient[],
+  index: number,
+) {
+  const { job } = state
+  for (let attempt = 1; ; attempt++) {
+    try {
+      const r = await deliverBroadcastChunk(payload, recipients, `${job.id}:${index}`)
+      job.processed += recipients.length
+      job.push_sent += r.push_sent
+      job.push_failed += r.push_failed
+      job.emails_queued += r.emails_queued
+      job.chunks_done++
+      updateThroughput(job)
+      mirror.publish(job)
+      return
+    } catch (err: any) {
+      const status = httpStatus(err)
+      // 4xx (salvo 429) es un pedido mal armado: reintentar da lo mismo.
+      const retryable = status === null || status >= 500 || status === 429
+      if (!retryable || attempt >= MAX_ATTEMPTS) {
+        job.chunks_failed++
+        logWarn('Tanda de notificaciones descartada', {
+          module: 'notifications', action: 'broadcast_chunk', user: job.created_by,
+          meta: { job: job.id, chunk: index, attempts: attempt, error: err?.message },
+        })
+        return
+      }
+      job.retries++
+      const delay = BACKOFF_BASE_MS * 2 ** (attempt - 1)
+      await sleep(delay + Math.random() * delay * 0.2)
+    }
+  }
+}
+
+function updateThroughput(job: BroadcastJob) {
+  if (!job.started_at) return
+  const end = job.finished_at ? Date.parse(job.finished_at) : Date.now()
+  const seconds = Math.max((end - Date.parse(job.started_at)) / 1000, 0.001)
+  job.throughput = Math.round((job.processed / seconds) * 10) / 10
+}
+
+/** Descarta los trabajos terminados más viejos. Los activos nunca se tocan. */
+function prune() {
+  const finished = [...jobs.values()].filter((s) => s.job.finished_at !== null)
+  for (const s of finished.slice(0, Math.max(0, finished.length - MAX_FINISHED))) {
+    jobs.delete(s.job.id)
+  }
+}
@@ -0,0 +1,413 @@
+/**
+ * lib/calendar-jobs.ts — Borrado y generación masiva del calendario en segundo plano
+ * ===================================================================================
+ * `/calendar/bulk-delete` borra todo el rango en UNA transacción: con un año
+ * de eventos, el cascade sobre calendar_assignments y
+ * calendar_event_participants deja el calendario bloqueado para todos hasta
+ * que termina. Acá el mismo trabajo se parte en tandas chicas por id, cada
+ * una con sus propias transacciones cortas, y entre tanda y tanda se deja
+ * respirar al backend para que las lecturas y escrituras normales pasen.
+ *
+ *   startCalendarJob()  →  { id, status: 'running', done: 0, total: N }
+ *   getCalendarJob(id)  →  progreso (la UI lo consulta cada tanto)
+ *   cancelCalendarJob() →  frena al terminar la tanda en curso
+ *   resumeCalendarJob() →  retoma un trabajo cancelado o fallido desde donde quedó
+ *
+ * Los trabajos corren de a uno por proceso (cola FIFO): dos borrados masivos
+ * en paralelo se pisarían los locks entre ellos. El estado vive en memoria;
+ * si el proceso se reinicia se pierde el registro, pero volver a lanzar el
+ * mismo borrado es seguro porque sólo encuentra lo que falta.
+ *
+ * En cluster (lib/shared-store) el trabajo corre en el worker que lo
+ * recibió; los demás contestan el progreso con la foto que él publica, y un
+ * cancelar / reanudar que les llega se lo dejan anotado.
+ */
+
+import { randomUUID } from 'crypto'
+import {
+  BulkDeleteFilters,
+  countCalendarInstancesBulk,
+  createCalendarInstance,
+  deleteCalendarInstancesBulk,
+  deleteCalendarInstancesRange,
+  generateCalendarInstances,
+  getCalendarInstanceIdsBulk,
+} from '@/lib/data-manager'
+import { logInfo, logError } from '@/lib/logger'
+import { createJobMirror } from '@/lib/shared-store'
+
+/** Instancias por tanda en los borrados y en la generación personalizada. */
+const CHUNK_SIZE = 25
+/**
+ * Encuentros por llamada a /calendar/generate. Par a propósito: cada tramo
+ * arranca con el mismo tipo que el patrón y el backend alterna igual.
+ */
+const PATTERN_WINDOW = 24
+/** Pausa entre tandas para que el tráfico interactivo no haga cola detrás. */
+const CHUNK_PAUSE_MS = 150
+/** Trabajos terminados que se conservan para consultar el resultado. */
+const MAX_FINISHED = 50
+const DAY_MS = 86_400_000
+
+export type CalendarJobKind = 'delete' | 'generate'
+export type CalendarJobStatus = 'queued' | 'running' | 'done' | 'cancelled' | 'failed'
+
+/** Un evento a crear, ya resuelto (fecha, tipo, horario). */
+export interface CalendarJobInstance {
+  date: string
+  type: string
+  source_id?: number | null
+  start_time: string
+  end_time: string
+}
+
+/** El patrón "ALMA Clásico" tal como lo recibe `/calendar/generate`. */
+export interface AlternatingPattern {
+  start_date: string
+  end_date: string
+  first_type: string
+  start_time?: string
+  interval_days?: number
+  source_group_id?: number | null
+  source_workshop_id?: number | null
+}
+
+export type CalendarJobParams =
+  | { kind: 'delete'; filters: BulkDeleteFilters }
+  | { kind: 'generate'; instances: CalendarJobInstance[] }
+  | { kind: 'generate'; pattern: AlternatingPattern }
+
+export interface CalendarJob {
+  id: string
+  kind: CalendarJobKind
+  status: CalendarJobStatus
+  /** Instancias a procesar (estimado al arrancar). */
+  total: number
+  done: number
+  /** Instancias que no se pudieron procesar. */
+  failed: number
+  error: string | null
+  created_by: number
+  created_at: string
+  finished_at: string | null
+}
+
+interface JobState {
+  job: CalendarJob
+  params: CalendarJobParams
+  cancelRequested: boolean
+  /**
+   * Generación: la próxima instancia (personalizada) o el próximo tramo del
+   * patrón. Los borrados no lo usan: cada vuelta vuelve a pedir los ids.
+   */
+  nextIndex: number
+}
+
+// En desarrollo Next recarga los módulos: el registro cuelga de globalThis
+// para no perder de vista un trabajo que sigue corriendo.
+const store = globalThis as unknown as {
+  __calendarJobs?: Map<string, JobState>
+  __calendarJobQueue?: string[]
+  __calendarJobRunning?: boolean
+  __calendarJobWatching?: boolean
+}
+const jobs = (store.__calendarJobs ??= new Map<string, JobState>())
+const queue = (store.__calendarJobQueue ??= [])
+
+const mirror = createJobMirror<CalendarJob>('calendar')
+if (!store.__calendarJobWatching) {
+  store.__calendarJobWatching = true
+  mirror.watch(
+    () => [...jobs.values()].filter((s) => s.job.status !== 'done').map((s) => s.job.id),
+    (id, action) => {
+      if (action === 'cancel') cancelCalendarJob(id)
+      else if (action === 'resume') resumeCalendarJob(id)
+    },
+  )
+}
+
+function publish(state: JobState, force = false) {
+  mirror.publish(state.job, force)
+}
+
+const sleep = (ms: number) => new Promise((r) => setTimeout(r, ms))
+
+/** Backend anterior a los endpoints por tandas. */
+function isMissingEndpoint(err: unknown): boolean {
+  return /→ (404|405):/.test((err as Error)?.message ?? '')
+}
+
+function addDays(day: string, days: number): string {
+  return new Date(Date.parse(`${day}T00:00:00Z`) + days * DAY_MS).toISOString().slice(0, 10)
+}
+
+/** Encuentros que entran en el patrón. Sólo para estimar el total. */
+function patternLength(pattern: AlternatingPattern): number {
+  const interval = pattern.interval_days ?? 14
+  const days = (Date.parse(`${pattern.end_date}T00:00:00Z`) - Date.parse(`${pattern.start_date}T00:00:00Z`)) / DAY_MS
+  return interval > 0 && days >= 0 ? Math.floor(days / interval) + 1 : 0
+}
+
+/**
+ * El tramo `index` del patrón: del encuentro index·PATTERN_WINDOW a los
+ * PATTERN_WINDOW siguientes, como un patrón más chico que el backend expande.
+ */
+function patternWindow(pattern: AlternatingPattern, index: number): AlternatingPattern | null {
+  const interval = pattern.interval_days ?? 14
+  const first = index * PATTERN_WINDOW
+  const count = patternLength(pattern)
+  if (first >= count) return null
+  const last = Math.min(count - 1, first + PATTERN_WINDOW - 1)
+  return {
+    ...pattern,
+    start_date: addDays(pattern.start_date, first * interval),
+    end_date: addDays(pattern.start_date, last * interval),
+  }
+}
+
+export async function startCalendarJob(params: CalendarJobParams, userId: number): Promise<CalendarJob> {
+  const total = params.kind === 'delete'
+    ? await countCalendarInstancesBulk(params.filters)
+    : 'pattern' in params ? patternLength(params.pattern) : params.instances.length
+
+  const state: JobState = {
+    job: {
+      id: randomUUID(),
+      kind: params.kind,
+      status: 'queued',
+      total,
+      done: 0,
+      failed: 0,
+      error: null,
+      created_by: userId,
+      created_at: new Date().toISOString(),
+      finished_at: null,
+    },
+    params,
+    cancelRequested: false,
+    nextIndex: 0,
+  }
+  jobs.set(state.job.id, state)
+  prune()
+
+  if (total === 0) {
+    finish(state, 'done')
+  } else {
+    enqueue(state)
+  }
+  return { ...state.job }
+}
+
+/** El trabajo de este worker o, en cluster, la última foto que publicó su dueño. */
+export async function getCalendarJob(id: string): Promise<CalendarJob | null> {
+  const state = jobs.get(id)
+  return state ? { ...state.job } : mirror.read(id)
+}
+
+/**
+ * Cancelar o reanudar un trabajo de otro worker: se le deja el pedido y se
+ * devuelve la foto actual; el cambio se ve en la próxima consulta.
+ */
+export async function requestCalendarJobAction(
+  id: string,
+  action: 'cancel' | 'resume',
+): Promise<CalendarJob | null> {
+  if (jobs.has(id)) return action === 'cancel' ? cancelCalendarJob(id) : resumeCalendarJob(id)
+  const snapshot = await mirror.read(id)
+  if (snapshot) await mirror.request(id, action)
+  return snapshot
+}
+
+/** Lo frena al final de la tanda en curso (o lo saca de la cola si no arrancó). */
+export function cancelCalendarJob(id: string): CalendarJob | null {
+  const state = jobs.get(id)
+  if (!state) return null
+  if (state.job.status === 'queued') {
+    const idx = queue.indexOf(id)
+    if (idx >= 0) queue.splice(idx, 1)
+    finish(state, 'cancelled')
+  } else if (state.job.status === 'running') {
+    state.cancelRequested = true
+  }
+  return { ...state.job }
+}
+
+/** Retoma un trabajo cancelado o fallido desde la última tanda confirmada. */
+export function resumeCalendarJob(id: string): CalendarJob | null {
+  const state = jobs.get(id)
+  if (!state) return null
+  if (state.job.status === 'cancelled' || state.job.status === 'failed') {
+    state.cancelRequested = false
+    state.job.error = null
+    state.job.failed = 0
+    state.job.finished_at = null
+    enqueue(state)
+  }
+  return { ...state.job }
+}
+
+function enqueue(state: JobState) {
+  state.job.status = 'queued'
+  publish(state, true)
+  queue.push(state.job.id)
+  void drain()
+}
+
+async function drain() {
+  if (store.__calendarJobRunning) return
+  store.__calendarJobRunning = true
+  try {
+    let id: string | undefined
+    while ((id = queue.shift())) {
+      const state = jobs.get(id)
+      if (state) await run(state)
+    }
+  } finally {
+    store.__calendarJobRunning = false
+  }
+}
+
+async function run(state: JobState) {
+  const { job, params } = state
+  job.status = 'running'
+  publish(state, true)
+  logInfo('Trabajo masivo de calendario iniciado', {
+    module: 'calendarios', action: `job_${job.kind}`, user: job.created_by,
+    meta: { job: job.id, total: job.total, done: job.done },
+  })
+
+  try {
+    const finished = params.kind === 'delete'
+      ? await runDelete(state, params.filters)
+      : 'pattern' in params
+        ? await runPattern(state, params.pattern)
+        : await runGenerate(state, params.instances)
+    finish(state, finished ? 'done' : 'cancelled')
+  } catch (err: any) {
+    job.error = err?.message ?? String(err)
+    finish(state, 'failed')
+    logError('Falló un trabajo masivo de calendario', {
+      module: 'calendarios', action: `job_${job.kind}`, user: job.created_by,
+      error: err, meta: { job: job.id, done: job.done },
+    })
+  }
+}
+
+/**
+ * Borrado por tramos de clave primaria: se piden una vez los ids (livianos,
+ * sin JOIN) y se borra de a `CHUNK_SIZE` con `id BETWEEN`, cada tramo en su
+ * transacción. La lista se vuelve a pedir en cada corrida: al reanudar sólo
+ * aparece lo que falta. Devuelve false si se canceló a mitad de camino.
+ */
+async function runDelete(state: JobState, filters: BulkDeleteFilters): Promise<boolean> {
+  const { job } = state
+
+  let ids: number[]
+  try {
+    ids = await getCalendarInstanceIdsBulk(filters)
+  } catch (err) {
+    if (!isMissingEndpoint(err)) throw err
+    return runDeleteWhole(state, filters)
+  }
+  job.total = job.done + ids.length
+  publish(state)
+
+  while (ids.length > 0) {
+    if (state.cancelRequested) return false
+    const chunk = ids.slice(0, CHUNK_SIZE)
+    try {
+      await deleteCalendarInstancesRange(filters, chunk[0], chunk[chunk.length - 1])
+    } catch (err) {
+      if (!isMissingEndpoint(err)) throw err
+      return runDeleteWhole(state, filters)
+    }
+    ids = ids.slice(CHUNK_SIZE)
+    // Lo que ya no estaba (otro lo borró) también cuenta como hecho.
+    job.done += chunk.length
+    publish(state)
+    await sleep(CHUNK_PAUSE_MS)
+  }
+  return true
+}
+
+/** Backend sin borrado por tramos: el bulk de siempre, en una transacción. */
+async function runDeleteWhole(state: JobState, filters: BulkDeleteFilters): Promise<boolean> {
+  const { job } = state
+  logInfo('Backend sin borrado por tramos: se borra en una sola transacción', {
+    module: 'calendarios', action: 'job_delete', user: job.created_by, meta: { job: job.id },
+  })
+  const { deleted } = await deleteCalendarInstancesBulk(filters)
+  job.done += deleted
+  job.total = Math.max(job.total, job.done)
+  return true
+}
+
+/** Lista armada en el frontend: se crea de a una, en tandas. */
+async function runGenerate(state: JobState, instances: CalendarJobInstance[]): Promise<boolean> {
+  const { job } = state
+
+  while (state.nextIndex < instances.length) {
+    if (state.cancelRequested) return false
+    const end = Math.min(state.nextIndex + CHUNK_SIZE, instances.length)
+
+    for (; state.nextIndex < end; state.nextIndex++) {
+      const item = instances[state.nextIndex]
+      await createCalendarInstance({
+        type: item.type,
+        date: item.date,
+        start_time: item.start_time,
+        end_time: item.end_time,
+        source_id: item.source_id ?? null,
+        notes: null,
+        status: 'programado',
+      })
+      job.done++
+    }
+    publish(state)
+    await sleep(CHUNK_PAUSE_MS)
+  }
+  return true
+}
+
+/**
+ * ALMA Clásico: la expansión la sigue haciendo `/calendar/generate`; acá
+ * sólo se le pide de a tramos de `PATTERN_WINDOW` encuentros. Cada llamada
+ * es su propia transacción: un tramo que falla no deja nada y al reanudar
+ * se vuelve a pedir.
+ */
+async function runPattern(state: JobState, pattern: AlternatingPattern): Promise<boolean> {
+  const { job } = state
+
+  for (let window = patternWindow(pattern, state.nextIndex); window; window = patternWindow(pattern, state.nextIndex)) {
+    if (state.cancelRequested) return false
+    const { created } = await generateCalendarInstances(window)
+    job.done += created
+    state.nextIndex++
+    publish(state)
+    await sleep(CHUNK_PAUSE_MS)
+  }
+  // El total era una estimación por fechas; manda lo que creó el backend.
+  job.total = job.done
+  return true
+}
+
+function finish(state: JobState, status: CalendarJobStatus) {
+  state.job.status = status
+  state.job.finished_at = new Date().toISOString()
+  state.cancelRequested = false
+  publish(state, true)
+  if (status !== 'failed') {
+    logInfo('Trabajo masivo de calendario finalizado', {
+      module: 'calendarios', action: `job_${state.job.kind}`, user: state.job.created_by,
+      meta: { job: state.job.id, status, done: state.job.done, total: state.job.total },
+    })
+  }
+}
+
+/** Descarta los trabajos terminados más viejos. Los activos nunca se tocan. */
+function prune() {
+  const finished = [...jobs.values()].filter((s) => s.job.finished_at !== null)
+  for (const s of finished.slice(0, Math.max(0, finished.length - MAX_FINISHED))) {
+    jobs.delete(s.job.id)
+  }
+}
@@ -0,0 +1,218 @@
+/**
+ * lib/certificate-jobs.ts — Emisión masiva de certificados en segundo plano
+ * ===========================================================================
+ * Emitir a todos los que aprobaron una capacitación era UN pedido que emitía
+ * cientos de certificados de una, y después cada descarga volvía a dibujar
+ * el PDF. Ahora el POST encola un trabajo y responde al instante; un worker
+ * local lo procesa en dos etapas que corren a la vez:
+ *
+ *   1. emisión: las personas van en tandas de `ISSUE_CHUNK` a
+ *      /certificados/emitir-masivo, hasta `ISSUE_CONCURRENCY` tandas en vuelo
+ *   2. dibujo: cada certificado emitido entra a una cola que atienden
+ *      `RENDER_CONCURRENCY` workers; piden el PDF y lo guardan en
+ *      lib/certificate-store, así la descarga posterior sale del archivo
+ *
+ * Un PDF que no se pudo dibujar no hace fallar el trabajo: el certificado ya
+ * está emitido y su PDF se dibuja en la primera descarga.
+ *
+ * El tablero de entrega sigue el progreso con getCertificateJob(). En
+ * cluster, el de otro worker sale de la foto que publica (lib/shared-store).
+ */
+
+import { randomUUID } from 'crypto'
+import { Certificate, getCertificatePdf, issueCertificatesBulk } from '@/lib/data-manager'
+import { forgetCertificatePdfs, storeCertificatePdf } from '@/lib/certificate-store'
+import { logInfo, logWarn, logError } from '@/lib/logger'
+import { createJobMirror } from '@/lib/shared-store'
+
+const ISSUE_CHUNK = 25
+const ISSUE_CONCURRENCY = 2
+const RENDER_CONCURRENCY = 4
+/** Trabajos terminados que se conservan para consultar el resultado. */
+const MAX_FINISHED = 50
+
+export type CertificateJobStatus = 'queued' | 'running' | 'done' | 'failed'
+
+export interface CertificateJob {
+  id: string
+  status: CertificateJobStatus
+  training_id: number
+  requested: number
+  /** Personas ya procesadas por la emisión (emitidas o no). */
+  processed: number
+  issued: number
+  rendered: number
+  render_failed: number
+  error: string | null
+  created_by: number
+  created_at: string
+  started_at: string | null
+  finished_at: string | null
+}
+
+interface JobState {
+  job: CertificateJob
+  personIds: number[]
+}
+
+// Mismo criterio que lib/broadcast-jobs: el registro sobrevive a las recargas de Next en desarrollo.
+const store = globalThis as unknown as {
+  __certificateJobs?: Map<string, JobState>
+  __certificateJobQueue?: string[]
+  __certificateJobRunning?: boolean
+}
+const jobs = (store.__certificateJobs ??= new Map<string, JobState>())
+const queue = (store.__certificateJobQueue ??= [])
+const mirror = createJobMirror<CertificateJob>('certificates')
+
+const sleep = (ms: number) => new Promise((r) => setTimeout(r, ms))
+
+export function startCertificateJob(trainingId: number, personIds: number[], userId: number): CertificateJob {
+  const state: JobState = {
+    personIds: [...new Set(personIds)],
+    job: {
+      id: randomUUID(),
+      status: 'queued',
+      training_id: trainingId,
+      requested: 0,
+      processed: 0,
+      issued: 0,
+      rendered: 0,
+      render_failed: 0,
+      error: null,
+      created_by: userId,
+      created_at: new Date().toISOString(),
+      started_at: null,
+      finished_at: null,
+    },
+  }
+  state.job.requested = state.personIds.length
+  jobs.set(state.job.id, state)
+  prune()
+  mirror.publish(state.job, true)
+
+  queue.push(state.job.id)
+  void drain()
+  return { ...state.job }
+}
+
+export async function getCertificateJob(id: string): Promise<CertificateJob | null> {
+  const state = jobs.get(id)
+  return state ? { ...state.job } : mirror.read(id)
+}
+
+async function drain() {
+  if (store.__certificateJobRunning) return
+  store.__certificateJobRunning = true
+  try {
+    let id: string | undefined
+    while ((id = queue.shift())) {
+      const state = jobs.get(id)
+      if (state) await run(state)
+    }
+  } finally {
+    store.__certificateJobRunning = false
+  }
+}
+
+async function run(state: JobState) {
+  const { job, personIds } = state
+  job.status = 'running'
+  job.started_at = new Date().toISOString()
+  mirror.publish(job, true)
+
+  const chunks: number[][] = []
+  for (let i = 0; i < personIds.length; i += ISSUE_CHUNK) chunks.push(personIds.slice(i, i + ISSUE_CHUNK))
+
+  const toRender: Certificate[] = []
+  let issuing = true
+
+  let next = 0
+  let failure: unknown = null
+  const issueWorker = async () => {
+    while (!failure && next < chunks.length) {
+      const chunk = chunks[next++]
+      try {
+        const issued = await issueCertificatesBulk({
+          person_ids: chunk,
+          training_id: job.training_id,
+          issued_by_volunteer_id: job.created_by || null,
+        })
+        job.processed += chunk.length
+        job.issued += issued.length
+        // Una reemisión deja el mismo código: la copia anterior no se sirve
+        // más, aunque después falle el dibujo de la nueva.
+        await Promise.all(issued.map((c) => forgetCertificatePdfs(c.code)))
+        toRender.push(...issued)
+        mirror.publish(job)
+      } catch (err) {
+        failure = err
+      }
+    }
+  }
+
+  const renderWorker = async () => {
+    for (;;) {
+      const cert = toRender.shift()
+      if (cert) {
+        await render(job, cert)
+        continue
+      }
+      if (!issuing) return
+      await sleep(50)
+    }
+  }
+
+  try {
+    const renders = Array.from({ length: RENDER_CONCURRENCY }, renderWorker)
+    await Promise.all(Array.from({ length: Math.min(ISSUE_CONCURRENCY, chunks.length) }, issueWorker))
+    // Aunque la emisión haya fallado, lo que ya se emitió se termina de dibujar.
+    issuing = false
+    await Promise.all(renders)
+    if (failure) throw failure
+    job.status = 'done'
+  } catch (err: any) {
+    job.status = 'failed'
+    job.error = err?.message ?? String(err)
+    logError('Falló la emisión masiva de certificados', {
+      module: 'certificados', action: 'emitir_masivo_job', user: job.created_by, error: err,
+      meta: { job: job.id, training_id: job.training_id, processed: job.processed },
+    })
+  }
+
+  job.finished_at = new Date().toISOString()
+  mirror.publish(job, true)
+  logInfo('Emisión masiva de certificados terminada', {
+    module: 'certificados',
+    action: 'emitir_masivo_job',
+    user: job.created_by,
+    meta: {
+      job: job.id, status: job.status, training_id: job.training_id, requested: job.requested,
+      issued: job.issued, rendered: job.rendered, render_failed: job.render_failed,
+    },
+  })
+}
+
+async function render(job: CertificateJob, cert: Certificate) {
+  try {
+    const upstream = await getCertificatePdf(cert.code)
+    if (!upstream.body) throw new Error('PDF vacío')
+    await storeCertificatePdf(cert.code, cert, upstream.body)
+    job.rendered++
+    mirror.publish(job)
+  } catch (err: any) {
+    job.render_failed++
+    logWarn('No se pudo dibujar el PDF de un certificado', {
+      module: 'certificados', action: 'emitir_masivo_job', user: job.created_by,
+      meta: { job: job.id, code: cert.code, error: err?.message },
+    })
+  }
+}
+
+/** Descarta los trabajos terminados más viejos. Los activos nunca se tocan. */
+function prune() {
+  const finished = [...jobs.values()].filter((s) => s.job.finished_at !== null)
+  for (const s of finished.slice(0, Math.max(0, finished.length - MAX_FINISHED))) {
+    jobs.delete(s.job.id)
+  }
+}
@@ -0,0 +1,110 @@
+/**
+ * lib/certificate-store.ts — PDFs de certificados ya dibujados
+ * =============================================================
+ * El texto de un certificado queda congelado al emitir, así que su PDF es
+ * siempre el mismo: dibujarlo de nuevo en cada descarga era trabajo tirado.
+ * Acá se guarda el PDF en disco con la clave `código + versión`, donde la
+ * versión es un hash de lo que se imprime (titular, capacitación, horas,
+ * fecha). Reemitir conserva el código; si cambia el texto, cambia la versión
+ * y la copia vieja deja de encontrarse. Además quien reemite borra las
+ * copias del código (forgetCertificatePdfs), por si cambia algo impreso que
+ * no está en la versión.
+ *
+ * La anulación NO pasa por acá: quien sirve el archivo tiene que verificar
+ * el certificado antes (es una consulta, no un dibujo).
+ *
+ * Como en lib/file-variants, el directorio se puede borrar en cualquier
+ * momento: lo que falte se vuelve a pedir al backend.
+ */
+
+import crypto from 'crypto'
+import fs from 'fs'
+import os from 'os'
+import path from 'path'
+import { Readable } from 'stream'
+
+const STORE_DIR = process.env.CERTIFICATE_PDF_DIR || path.join(os.tmpdir(), 'alma-certificados')
+
+/** Lo impreso en el PDF que también trae la verificación pública. */
+export interface CertificateContent {
+  holder_name?: string | null
+  training_title?: string | null
+  hours?: string | null
+  issued_at?: string | null
+}
+
+function storeName(code: string): string {
+  // El código viene de la URL: se limpia para que no pueda salir del directorio.
+  return code.replace(/[^a-zA-Z0-9-]/g, '').toUpperCase()
+}
+
+function storePath(code: string, content: CertificateContent): string {
+  const version = crypto
+    .createHash('sha256')
+    .update(JSON.stringify([content.holder_name, content.training_title, content.hours, content.issued_at]))
+    .digest('hex')
+    .slice(0, 16)
+  return path.join(STORE_DIR, `${storeName(code)}_${version}.pdf`)
+}
+
+/** Borra las copias guardadas de un código. Se llama al (re)emitir. */
+export async function forgetCertificatePdfs(code: string): Promise<void> {
+  const prefix = `${storeName(code)}_`
+  const names = await fs.promises.readdir(STORE_DIR).catch(() => [] as string[])
+  await Promise.all(
+    names
+      .filter((n) => n.startsWith(prefix) && n.endsWith('.pdf'))
+      .map((n) => fs.promises.rm(path.join(STORE_DIR, n), { force: true }).catch(() => {})),
+  )
+}
+
+export interface StoredCertificate {
+  stream: ReadableStream<Uint8Array>
+  size: number
+}
+
+export async function openStoredCertificate(
+  code: string,
+  content: CertificateContent,
+): Promise<StoredCertificate | null> {
+  const file = storePath(code, content)
+  try {
+    const stat = await fs.promises.stat(file)
+    return { stream: Readable.toWeb(fs.createReadStream(file)) as ReadableStream<Uint8Array>, size: stat.size }
+  } catch {
+    return null
+  }
+}
+
+/** Guarda el PDF. Escribe a un temporal y renombra: nunca queda uno a medias. */
+export async function storeCertificatePdf(
+  code: string,
+  content: CertificateContent,
+  body: ReadableStream<Uint8Array>,
+): Promise<void> {
+  const file = storePath(code, content)
+  const tmp = `${file}.${process.pid}.${Math.random().toString(36).slice(2)}.tmp`
+  try {
+    await fs.promises.mkdir(STORE_DIR, { recursive: true })
+    await new Promise<void>((resolve, reject) => {
+      const out = fs.createWriteStream(tmp)
+      Readable.fromWeb(body as any).on('error', reject).pipe(out).on('finish', resolve).on('error', reject)
+    })
+    await fs.promises.rename(tmp, file)
+  } catch (err) {
+    await fs.promises.rm(tmp, { force: true }).catch(() => {})
+    throw err
+  }
+}
+
+/** Devuelve el stream para el cliente y, en paralelo, lo guarda para la próxima. */
+export function storeCertificateWhileStreaming(
+  code: string,
+  content: CertificateContent,
+  body: ReadableStream<Uint8Array>,
+): ReadableStream<Uint8Array> {
+  const [toClient, toDisk] = body.tee()
+  // Si no se pudo guardar no pasa nada: la próxima descarga lo vuelve a pedir.
+  storeCertificatePdf(code, content, toDisk).catch(() => {})
+  return toClient
+}
@@ -1,4 +1,36 @@
 import { api } from '@/lib/api-client'
+import { enqueueActivityEvent, flushActivityEvents } from '@/lib/activity-buffer'
+import type { Grant } from '@/lib/access'
+import type { GrantLookup } from '@/lib/permissions'
+import {
+  applyGrant, applyRevoke, cachedMatrixRows, getGrantIndex, GrantIndex,
+  invalidateMatrixRows, knownPersonOf, rememberPersonOf,
+} from '@/lib/grant-index'
+import {
+  dropSurveyResults, invalidateTrainingSummaries, noteTrainingProgress,
+  rememberTrainingItems, surveyResults, trainingSummary,
+} from '@/lib/training-cache'
+import type { TrainingSummary } from '@/lib/training-cache'
+import { noteTrainingView, sharedAccountAlerts } from '@/lib/shared-account-tracker'
+import { cachedEventIds, rememberEventIds } from '@/lib/event-enrollments'
+
+/**
+ * Cuánto viven en la cache del cliente los listados de solo lectura que pide
+ * cada pantalla (voluntarios, talleres, grupos, actividades, ajustes). Las
+ * escrituras sobre el mismo recurso los invalidan al instante; el TTL solo
+ * acota lo que puede tardar en verse un cambio hecho por fuera de este proceso.
+ */
+const LIST_TTL_MS = 30_000
+
+/** El calendario cambia más seguido (anotados, asignaciones): TTL más corto. */
+const CALENDAR_TTL_MS = 10_000
+
+/**
+ * Conteos del encabezado: los pide cada carga del dashboard y ninguna
+ * escritura sobre /personas los invalida (las altas van a /voluntarios y
+ * /participants), así que el TTL es corto.
+ */
+const COUNTS_TTL_MS = 15_000
 
 // ============================================================
 // TypeScript Interfaces (sin cambios — compatibilidad total)
@@ -126,6 +158,8 @@ export interface CalendarInstance {
   volunteers: VolunteerRef[]
   /** Conteo real de participantes anotados a este evento (no cancelados). */
   participants_count?: number
+  /** Cupo de participantes; null = sin cupo (lo hace respetar el backend). */
+  capacity?: number | null
 }
 
 export interface EventEnrollment {
@@ -249,7 +283,7 @@ export interface BulkDeleteFilters {
 // ============================================================
 
 export async function getVolunteers(): Promise<Volunteer[]> {
-  return api.get<Volunteer[]>('/voluntarios/?limit=1000')
+  return api.get<Volunteer[]>('/voluntarios/?limit=1000', { ttlMs: LIST_TTL_MS })
 }
 
 export async function getVolunteerById(id: number): Promise<Volunteer | null> {
@@ -325,7 +359,7 @@ export async function deleteVolunteer(id: number): Promise<void> {
 // ============================================================
 
 export async function getWorkshops(): Promise<Workshop[]> {
-  return api.get<Workshop[]>('/talleres/?limit=1000')
+  return api.get<Workshop[]>('/talleres/?limit=1000', { ttlMs: LIST_TTL_MS })
 }
 
 export async function createWorkshop(data: Partial<Workshop>): Promise<Workshop> {
@@ -345,7 +379,7 @@ export async function deleteWorkshop(id: number): Promise<void> {
 // ============================================================
 
 export async function getGroups(): Promise<Group[]> {
-  return api.get<Group[]>('/grupos/?limit=1000')
+  return api.get<Group[]>('/grupos/?limit=1000', { ttlMs: LIST_TTL_MS })
 }
 
 export async function createGroup(data: Partial<Group>): Promise<Group> {
@@ -365,7 +399,7 @@ export async function deleteGroup(id: number): Promise<void> {
 // ============================================================
 
 export async function getActivities(): Promise<Activity[]> {
-  return api.get<Activity[]>('/actividades/?limit=1000')
+  return api.get<Activity[]>('/actividades/?limit=1000', { ttlMs: LIST_TTL_MS })
 }
 
 export async function createActivity(data: Partial<Activity>): Promise<Activity> {
@@ -413,10 +447,15 @@ export async function getEnrollments(): Promise<Enrollment[]> {
 }
 
 export async function createEnrollment(data: Partial<Enrollment>): Promise<Enrollment> {
-  return api.post<Enrollment>('/inscripciones/', {
+  const created = await api.post<Enrollment>('/inscripciones/', {
     ...data,
     enrollment_date: data.enrollment_date || new Date().toISOString().split('T')[0],
   })
+  // La inscripción mueve el cupo (enrolled / participants) del ítem.
+  api.invalidate('/talleres')
+  api.invalidate('/grupos')
+  api.invalidate('/actividades')
+  return created
 }
 
 export async function getUserEnrollments(
@@ -554,7 +593,9 @@ export async function getCalendarInstances(
   if (month !== null && month !== undefined) params.set('month', String(month))
   if (filters?.type) params.set('type', filters.type)
   if (filters?.volunteer_id) params.set('volunteer_id', String(filters.volunteer_id))
-  return api.get<CalendarInstance[]>(`/calendar/instances-rich?${params}`)
+  // El mes es el mismo para todos los que abren el calendario. Cualquier
+  // escritura bajo /calendar (eventos, asignaciones, inscripciones) lo invalida.
+  return api.get<CalendarInstance[]>(`/calendar/instances-rich?${params}`, { ttlMs: CALENDAR_TTL_MS })
 }
 
 export async function createCalendarInstance(data: {
@@ -568,6 +609,7 @@ export async function createCalendarInstance(data: {
   status?: string
   notify_enabled?: boolean
   reminder_offsets?: number[] | null
+  capacity?: number | null
   created_by_volunteer_id?: number | null
 }): Promise<CalendarInstance> {
   const ci = await api.post<any>('/calendar/instances', {
@@ -601,6 +643,7 @@ export async function updateCalendarInstance(
     status: string
     notify_enabled: boolean
     reminder_offsets: number[] | null
+    capacity: number | null
   }>
 ): Promise<CalendarInstance> {
   const ci = await api.put<any>(`/calendar/instances/${id}`, data)
@@ -637,6 +680,27 @@ export async function deleteCalendarInstancesBulk(
   return api.post<{ deleted: number }>('/calendar/bulk-delete', filters)
 }
 
+/**
+ * Ids (ascendentes) de lo que borraría `/calendar/bulk-delete`. Es un SELECT
+ * de ids sobre calendar_instances, sin los JOIN de instances-rich.
+ */
+export async function getCalendarInstanceIdsBulk(filters: BulkDeleteFilters): Promise<number[]> {
+  return api.post<number[]>('/calendar/bulk-ids', filters)
+}
+
+/**
+ * Borra lo que matchea los filtros con id entre `idFrom` e `idTo` (incluidos):
+ * una transacción corta por tramo, para el borrado por tandas de
+ * lib/calendar-jobs.
+ */
+export async function deleteCalendarInstancesRange(
+  filters: BulkDeleteFilters,
+  idFrom: number,
+  idTo: number,
+): Promise<{ deleted: number }> {
+  return api.post<{ deleted: number }>('/calendar/bulk-delete-range', { ...filters, id_from: idFrom, id_to: idTo })
+}
+
 export async function generateCalendarInstances(params: {
   start_date: string
   end_date: string
@@ -821,7 +885,10 @@ export async function invitePersonToPlatform(profileId: number, registeredByName
 
 /** Quita el rol de voluntario/a de una persona y la vuelve participante (reactiva o invita). */
 export async function revertVolunteerToParticipant(personaId: number, registeredByName?: string | null): Promise<ConversionResult> {
-  return api.post<ConversionResult>("/participants/revert-volunteer", { persona_id: personaId, registered_by_name: registeredByName ?? null })
+  const result = await api.post<ConversionResult>("/participants/revert-volunteer", { persona_id: personaId, registered_by_name: registeredByName ?? null })
+  // Da de baja la ficha de voluntario: el listado de /voluntarios cambia aunque el POST no sea suyo.
+  api.invalidate("/voluntarios")
+  return result
 }
 
 // ============================================================
@@ -997,11 +1064,18 @@ export function toUserType(role: string): string {
   return role === 'participante' ? 'participante' : 'voluntario'
 }
 
+/**
+ * Encola el evento; sale al backend en la próxima tanda (ver lib/activity-buffer).
+ * Resuelve enseguida, salvo que la cola esté llena: ahí espera lugar.
+ */
 export async function logActivityEvent(data: ActivityEventInput): Promise<void> {
-  await api.post('/activity/', data)
+  await enqueueActivityEvent(data)
 }
 
+/** El backend lo lee del rollup (activity_user_rollup), no agrupando los eventos. */
 export async function getActivitySummary(): Promise<ActivityUserSummary[]> {
+  // Lo que esté en cola se manda antes, para que el resumen lo incluya.
+  await flushActivityEvents()
   return api.get<ActivityUserSummary[]>('/activity/summary')
 }
 
@@ -1010,12 +1084,26 @@ export async function getActivityTimeline(
   userId: number,
   limit = 200,
 ): Promise<ActivityEvent[]> {
+  await flushActivityEvents()
   return api.get<ActivityEvent[]>(
     `/activity/?user_type=${encodeURIComponent(userType)}&user_id=${userId}&limit=${limit}`,
   )
 }
 
+/**
+ * Activos de cada lado para el encabezado del dashboard. `/personas/counts`
+ * resuelve los dos con COUNT(*) sobre índices (voluntarios.status,
+ * participants.is_active): cuesta lo mismo con 50 personas que con 50.000.
+ */
 export async function getPersonasCounts(): Promise<{ volunteers: number; participants: number }> {
+  try {
+    return await api.get<{ volunteers: number; participants: number }>('/personas/counts', { ttlMs: COUNTS_TTL_MS })
+  } catch (err: any) {
+    // Backend sin el endpoint todavía: el camino viejo (tope de 1000 incluido).
+    // Ese backend igual rutea GET /personas/{id}, así que "counts" no llega
+    // como 404 sino como 422 (id no numérico) o 405.
+    if (!/→ (404|405|422):/.test(err?.message ?? '')) throw err
+  }
   const [volunteers, participants] = await Promise.all([
     api.get<Volunteer[]>('/voluntarios/?status=activo&limit=1000'),
     api.get<Participant[]>('/participants/?is_active=true&limit=1000'),
@@ -1088,7 +1176,7 @@ export interface BroadcastResult {
   emails_queued: number
 }
 
-export async function broadcastNotification(payload: {
+export interface BroadcastPayload {
   title: string
   body: string
   audience: string
@@ -1102,10 +1190,53 @@ export async function broadcastNotification(payload: {
   email_subject?: string | null
   email_body?: string | null
   volunteer_ids?: number[] | null
-}): Promise<BroadcastResult> {
+}
+
+export interface BroadcastRecipient {
+  user_type: string
+  user_id: number
+}
+
+/** Lo que devuelve el backend por cada tanda de destinatarios. */
+export interface BroadcastChunkResult {
+  notified: number
+  push_sent: number
+  push_failed: number
+  emails_queued: number
+}
+
+/** Todo el envío en un solo request. Lo usa el worker si el backend no tiene el envío por tandas. */
+export async function broadcastNotification(payload: BroadcastPayload): Promise<BroadcastResult> {
   return api.post<BroadcastResult>('/notifications/broadcast', payload)
 }
 
+/** Sólo los ids de la audiencia (una consulta, sin armar nada). */
+export async function getBroadcastRecipients(
+  audience: string,
+  volunteerIds?: number[] | null,
+): Promise<BroadcastRecipient[]> {
+  return api.post<BroadcastRecipient[]>('/notifications/recipients', {
+    audience,
+    volunteer_ids: volunteerIds ?? null,
+  })
+}
+
+/**
+ * Una tanda: INSERT multi-fila de las notificaciones, push y mails de esos
+ * destinatarios. `idempotency_key` deja reintentar sin duplicar.
+ */
+export async function deliverBroadcastChunk(
+  payload: BroadcastPayload,
+  recipients: BroadcastRecipient[],
+  idempotencyKey: string,
+): Promise<BroadcastChunkResult> {
+  return api.post<BroadcastChunkResult>('/notifications/broadcast/chunk', {
+    ...payload,
+    recipients,
+    idempotency_key: idempotencyKey,
+  })
+}
+
 // ============================================================
 // Files (almacén genérico de archivos)
 // Los bytes viven en disco del backend; acá solo viaja la metadata.
@@ -1143,6 +1274,7 @@ export function fileUrl(guid?: string | null): string | null {
   return guid ? `/api/files/${guid}/raw` : null
 }
 
+/** Subida en base64 dentro de un JSON. Para archivos grandes, `uploadFileStream`. */
 export async function uploadFile(payload: {
   name: string
   mime_type: string
@@ -1155,6 +1287,31 @@ export async function uploadFile(payload: {
   return api.post<FileMeta>('/files/', payload)
 }
 
+/**
+ * Subida en binario: los bytes viajan como stream hasta el backend, sin
+ * base64 ni el archivo entero en memoria. La metadata va en la query.
+ */
+export async function uploadFileStream(
+  meta: {
+    name: string
+    mime_type: string
+    purpose: string
+    owner_type?: string | null
+    owner_id?: number | null
+    uploaded_by_volunteer_id?: number | null
+    size_bytes?: number | null
+  },
+  body: ReadableStream<Uint8Array>,
+): Promise<FileMeta> {
+  const q = new URLSearchParams({ name: meta.name, mime_type: meta.mime_type, purpose: meta.purpose })
+  if (meta.owner_type) q.set('owner_type', meta.owner_type)
+  if (meta.owner_id != null) q.set('owner_id', String(meta.owner_id))
+  if (meta.uploaded_by_volunteer_id) q.set('uploaded_by_volunteer_id', String(meta.uploaded_by_volunteer_id))
+  // El tamaño anunciado deja al backend rechazar de entrada lo que supera el máximo.
+  if (meta.size_bytes) q.set('size_bytes', String(meta.size_bytes))
+  return api.postStream<FileMeta>(`/files/upload?${q}`, body)
+}
+
 export async function getFiles(filters?: {
   purpose?: string
   owner_type?: string
@@ -1178,9 +1335,20 @@ export async function getFileMeta(guid: string): Promise<FileMeta> {
   return api.get<FileMeta>(`/files/${guid}`)
 }
 
-/** Bytes crudos del archivo (para el proxy del BFF, no para componentes). */
-export async function getFileRaw(guid: string): Promise<Response> {
-  return api.getRaw(`/files/${guid}/raw`)
+/**
+ * Bytes crudos del archivo (para el proxy del BFF, no para componentes).
+ * `range` / `ifNoneMatch` se reenvían tal cual llegan del navegador; con
+ * `variant` se pide la versión reducida (ver lib/file-variants).
+ */
+export async function getFileRaw(
+  guid: string,
+  opts?: { range?: string | null; ifNoneMatch?: string | null; variant?: { width: number; height: number } },
+): Promise<Response> {
+  const headers: Record<string, string> = {}
+  if (opts?.range) headers['Range'] = opts.range
+  if (opts?.ifNoneMatch) headers['If-None-Match'] = opts.ifNoneMatch
+  const q = opts?.variant ? `?w=${opts.variant.width}&h=${opts.variant.height}` : ''
+  return api.getRaw(`/files/${guid}/raw${q}`, headers)
 }
 
 export async function getFileBase64(guid: string): Promise<{
@@ -1291,11 +1459,17 @@ export async function getTrainings(opts?: {
   if (opts?.userId != null) q.set('user_id', String(opts.userId))
   if (opts?.includeItems) q.set('include_items', 'true')
   const qs = q.toString()
-  return api.get<Training[]>(`/capacitaciones/${qs ? `?${qs}` : ''}`)
+  const trainings = await api.get<Training[]>(`/capacitaciones/${qs ? `?${qs}` : ''}`)
+  for (const t of trainings) rememberTrainingItems(t.items)
+  return trainings
 }
 
 export async function getMyTrainings(userType: string, userId: number): Promise<Training[]> {
-  return api.get<Training[]>(`/capacitaciones/mis?user_type=${encodeURIComponent(userType)}&user_id=${userId}`)
+  const trainings = await api.get<Training[]>(
+    `/capacitaciones/mis?user_type=${encodeURIComponent(userType)}&user_id=${userId}`,
+  )
+  for (const t of trainings) rememberTrainingItems(t.items)
+  return trainings
 }
 
 export async function getTraining(
@@ -1307,7 +1481,9 @@ export async function getTraining(
   if (opts?.userId != null) q.set('user_id', String(opts.userId))
   if (opts?.includeUnpublished) q.set('include_unpublished', 'true')
   const qs = q.toString()
-  return api.get<Training>(`/capacitaciones/${id}${qs ? `?${qs}` : ''}`)
+  const training = await api.get<Training>(`/capacitaciones/${id}${qs ? `?${qs}` : ''}`)
+  rememberTrainingItems(training.items)
+  return training
 }
 
 export async function getPublicTraining(slug: string): Promise<Training> {
@@ -1339,7 +1515,10 @@ export async function createTrainingItem(
   trainingId: number,
   data: Partial<TrainingItem> & { title: string },
 ): Promise<TrainingItem> {
-  return api.post<TrainingItem>(`/capacitaciones/${trainingId}/items`, data)
+  const item = await api.post<TrainingItem>(`/capacitaciones/${trainingId}/items`, data)
+  rememberTrainingItems([item])
+  invalidateTrainingSummaries(trainingId)
+  return item
 }
 
 export async function updateTrainingItem(itemId: number, data: Partial<TrainingItem>): Promise<TrainingItem> {
@@ -1348,6 +1527,7 @@ export async function updateTrainingItem(itemId: number, data: Partial<TrainingI
 
 export async function deleteTrainingItem(itemId: number): Promise<void> {
   await api.delete(`/capacitaciones/items/${itemId}`)
+  invalidateTrainingSummaries()
 }
 
 export async function reorderTrainingItems(trainingId: number, order: number[]): Promise<TrainingItem[]> {
@@ -1358,7 +1538,13 @@ export async function saveTrainingProgress(
   itemId: number,
   payload: { user_type: string; user_id: number; last_position_sec: number; watched_delta: number; completed?: boolean },
 ): Promise<{ training_item_id: number; last_position_sec: number; watched_sec: number; completed_at?: string | null }> {
-  return api.post(`/capacitaciones/items/${itemId}/progress`, payload)
+  // newly_completed: este ping es el que completó el ítem (lo decide el backend).
+  const progress = await api.post<{
+    training_item_id: number; last_position_sec: number; watched_sec: number; completed_at?: string | null
+    newly_completed?: boolean
+  }>(`/capacitaciones/items/${itemId}/progress`, payload)
+  noteTrainingProgress(itemId, progress)
+  return progress
 }
 
 export async function logTrainingView(
@@ -1366,6 +1552,7 @@ export async function logTrainingView(
   payload: { user_type: string; user_id: number; ip?: string | null; user_agent?: string | null },
 ): Promise<void> {
   await api.post(`/capacitaciones/items/${itemId}/view`, payload)
+  noteTrainingView(payload.user_type, payload.user_id, payload.ip)
 }
 
 export interface SharedAccountAlert {
@@ -1376,8 +1563,13 @@ export interface SharedAccountAlert {
   views: number
 }
 
-/** Posibles cuentas compartidas. SOLO informativo: jamás revocar automáticamente. */
+/**
+ * Posibles cuentas compartidas. SOLO informativo: jamás revocar automáticamente.
+ * Sale del resumen diario de IPs (lib/shared-account-tracker) cuando se puede.
+ */
 export async function getSharedAccountAlerts(days = 7, minIps = 4): Promise<SharedAccountAlert[]> {
+  const tracked = await sharedAccountAlerts(days, minIps).catch(() => null)
+  if (tracked) return tracked
   return api.get<SharedAccountAlert[]>(`/capacitaciones/alertas/cuentas-compartidas?days=${days}&min_ips=${minIps}`)
 }
 
@@ -1392,7 +1584,7 @@ export async function getSharedAccountAlerts(days = 7, minIps = 4): Promise<Shar
 export type AppSettings = Record<string, string | null>
 
 export async function getSettings(): Promise<AppSettings> {
-  return api.get<AppSettings>('/configuracion/')
+  return api.get<AppSettings>('/configuracion/', { ttlMs: LIST_TTL_MS })
 }
 
 export async function setSetting(
@@ -1448,16 +1640,9 @@ export async function getCertificateSample(data: Record<string, any>): Promise<R
   return api.postRaw('/certificados/muestra', data)
 }
 
-export async function getTrainingSummary(id: number): Promise<{
-  training_id: number
-  title: string
-  students: number
-  collected: number
-  currency: string
-  items: number
-  completed_items_total: number
-}> {
-  return api.get(`/capacitaciones/${id}/resumen`)
+/** Sale del cache en memoria (lib/training-cache). */
+export async function getTrainingSummary(id: number): Promise<TrainingSummary> {
+  return trainingSummary(id)
 }
 
 // ============================================================
@@ -1527,11 +1712,42 @@ export interface AccessAuditEntry {
   resource_label?: string | null
 }
 
+/**
+ * Habilitaciones vigentes del usuario. Con el índice cargado (lib/grant-index)
+ * y la persona ya conocida, sale de memoria; si no, se le pregunta al backend.
+ */
 export async function getMyAccess(
   userType: string,
   userId: number,
-): Promise<{ person_id: number | null; grants: AccessGrant[] }> {
-  return api.get(`/accesos/mis?user_type=${encodeURIComponent(userType)}&user_id=${userId}`)
+): Promise<{ person_id: number | null; grants: Grant[] }> {
+  const personId = knownPersonOf(userType, userId)
+  if (personId !== undefined) {
+    const index = await getGrantIndex().catch(() => null)
+    if (index) return { person_id: personId, grants: index.personGrants(personId) }
+  }
+  const res = await api.get<{ person_id: number | null; grants: AccessGrant[] }>(
+    `/accesos/mis?user_type=${encodeURIComponent(userType)}&user_id=${userId}`,
+  )
+  rememberPersonOf(userType, userId, res.person_id)
+  return res
+}
+
+/**
+ * La mitad "habilitación" de `can()` para el usuario logueado. Con el índice
+ * cargado sale de memoria; si no, se arma uno chico con sus habilitaciones.
+ */
+export async function getGrantLookup(userType: string, userId: number): Promise<GrantLookup> {
+  const personId = knownPersonOf(userType, userId)
+  if (personId !== undefined) {
+    const index = await getGrantIndex().catch(() => null)
+    if (index) return index.lookup(personId)
+  }
+  const { person_id, grants } = await getMyAccess(userType, userId)
+  const own = new GrantIndex()
+  if (person_id != null) {
+    for (const g of grants) own.set(person_id, g.module_key, g.resource_id ?? 0, g.expires_at ?? null)
+  }
+  return own.lookup(person_id)
 }
 
 export async function getPersonGrants(personId: number): Promise<AccessGrant[]> {
@@ -1548,10 +1764,33 @@ export async function getAccessMatrix(
   moduleKey: string,
   opts?: { search?: string; onlyWithLogin?: boolean },
 ): Promise<AccessMatrixRow[]> {
-  const q = new URLSearchParams({ module_key: moduleKey })
-  if (opts?.search) q.set('search', opts.search)
-  if (opts?.onlyWithLogin) q.set('only_with_login', 'true')
-  return api.get<AccessMatrixRow[]>(`/accesos/matriz?${q.toString()}`)
+  const index = await getGrantIndex().catch(() => null)
+  if (!index) {
+    const q = new URLSearchParams({ module_key: moduleKey })
+    if (opts?.search) q.set('search', opts.search)
+    if (opts?.onlyWithLogin) q.set('only_with_login', 'true')
+    return api.get<AccessMatrixRow[]>(`/accesos/matriz?${q.toString()}`)
+  }
+
+  // Con índice: las filas del módulo se piden una vez y se filtran acá; las
+  // celdas salen del índice, así una habilitación recién dada ya se ve.
+  const rows = await cachedMatrixRows(moduleKey, () =>
+    api.get<AccessMatrixRow[]>(`/accesos/matriz?module_key=${encodeURIComponent(moduleKey)}`),
+  )
+  const needle = opts?.search ? foldText(opts.search.trim()) : ''
+  return rows
+    .filter((r) => !opts?.onlyWithLogin || r.has_login)
+    .filter((r) => !needle || foldText(`${r.name ?? ''} ${r.last_name ?? ''} ${r.email ?? ''}`).includes(needle))
+    .map((r) => {
+      const grants: Record<string, boolean> = {}
+      for (const resourceId of index.resources(r.person_id, moduleKey)) grants[String(resourceId)] = true
+      return { ...r, grants }
+    })
+}
+
+/** Minúsculas y sin acentos, para buscar "Jose" y encontrar "José". */
+function foldText(s: string): string {
+  return s.normalize('NFD').replace(/[\u0300-\u036f]/g, '').toLowerCase()
 }
 
 export async function grantAccess(payload: {
@@ -1574,7 +1813,11 @@ export async function grantAccess(payload: {
     notes?: string | null
   } | null
 }): Promise<AccessGrant> {
-  return api.post<AccessGrant>('/accesos/', payload)
+  const grant = await api.post<AccessGrant>('/accesos/', payload)
+  applyGrant(grant)
+  if (payload.payment) invalidateMatrixRows()
+  invalidateTrainingSummaries()
+  return grant
 }
 
 export async function grantAccessBulk(payload: {
@@ -1587,7 +1830,10 @@ export async function grantAccessBulk(payload: {
   actor_type?: string
   actor_id?: number
 }): Promise<AccessGrant[]> {
-  return api.post<AccessGrant[]>('/accesos/bulk', payload)
+  const grants = await api.post<AccessGrant[]>('/accesos/bulk', payload)
+  for (const g of grants) applyGrant(g)
+  invalidateTrainingSummaries()
+  return grants
 }
 
 export async function revokeAccess(payload: {
@@ -1599,6 +1845,8 @@ export async function revokeAccess(payload: {
   actor_id?: number
 }): Promise<void> {
   await api.post('/accesos/revocar', payload)
+  applyRevoke(payload.person_id, payload.module_key, payload.resource_id ?? 0)
+  invalidateTrainingSummaries()
 }
 
 export async function getAccessAudit(opts?: {
@@ -1644,11 +1892,16 @@ export async function createPersonPayment(payload: {
   registered_by_volunteer_id?: number | null
   notes?: string | null
 }): Promise<PersonPayment> {
-  return api.post<PersonPayment>('/accesos/pagos', payload)
+  const payment = await api.post<PersonPayment>('/accesos/pagos', payload)
+  invalidateMatrixRows()
+  invalidateTrainingSummaries()
+  return payment
 }
 
 export async function deletePersonPayment(paymentId: number, volunteerId?: number): Promise<void> {
   await api.delete(`/accesos/pagos/${paymentId}${volunteerId != null ? `?volunteer_id=${volunteerId}` : ''}`)
+  invalidateMatrixRows()
+  invalidateTrainingSummaries()
 }
 
 export async function getPersonPaymentsSummary(opts?: {
@@ -1695,21 +1948,97 @@ export async function setParticipantePin(participantId: number, hashedPin: strin
 
 /** Ids de eventos a los que un participante está anotado (para marcar en el calendario). */
 export async function getParticipantEventIds(participantId: number): Promise<number[]> {
-  return api.get<number[]>(`/calendar/participants/${participantId}/event-ids`)
+  return cachedEventIds(participantId, () =>
+    api.get<number[]>(`/calendar/participants/${participantId}/event-ids`),
+  )
+}
+
+export interface EventEnrollmentResult {
+  /** Eventos en los que quedó anotado / de los que se bajó con este pedido. */
+  enrolled: number[]
+  unenrolled: number[]
+  /** Sin lugar: el evento ya llegó a su cupo. */
+  full: number[]
+  /** El evento no existe (o ya no). */
+  not_found: number[]
+  /** Todos los eventos del participante después del cambio. */
+  event_ids: number[]
+}
+
+/** false = el backend no tiene el endpoint en lote: se va de a un evento. */
+let eventBatchSupported = true
+
+/**
+ * Anota y/o desanota a un participante de varios eventos en un solo pedido.
+ * El backend resuelve cada alta con un INSERT … ON DUPLICATE KEY UPDATE y el
+ * trigger de cupo (cme_count_add en init_db.py) la rechaza si el evento está
+ * lleno: no hay leer-y-después-escribir, así que una ráfaga de anotados a un
+ * evento popular nunca se pasa del cupo. Los eventos van en orden de id para
+ * que dos lotes que se cruzan tomen los locks en el mismo orden.
+ *
+ * La respuesta trae el set completo de eventos del participante, que queda
+ * en memoria (lib/event-enrollments) sin volver a pedirlo.
+ */
+export async function updateEventEnrollments(
+  participantId: number,
+  changes: { enroll?: number[]; unenroll?: number[] },
+): Promise<EventEnrollmentResult> {
+  const enroll = [...new Set(changes.enroll ?? [])].sort((a, b) => a - b)
+  const unenroll = [...new Set(changes.unenroll ?? [])].sort((a, b) => a - b)
+
+  if (eventBatchSupported) {
+    try {
+      const result = await api.post<EventEnrollmentResult>(
+        `/calendar/participants/${participantId}/events/batch`,
+        { enroll, unenroll },
+      )
+      await rememberEventIds(participantId, result.event_ids)
+      return result
+    } catch (err: any) {
+      // Solo la ruta inexistente apaga el lote; otro 404 es del participante.
+      if (!/→ 404: Not Found$/.test(err?.message ?? '')) throw err
+      eventBatchSupported = false
+    }
+  }
+
+  const result: EventEnrollmentResult = { enrolled: [], unenrolled: [], full: [], not_found: [], event_ids: [] }
+  for (const eventId of unenroll) {
+    try {
+      await unenrollFromEvent(eventId, participantId)
+      result.unenrolled.push(eventId)
+    } catch (err: any) {
+      if (!/→ 404:/.test(err?.message ?? '')) throw err
+    }
+  }
+  for (const eventId of enroll) {
+    try {
+      await enrollInEvent(eventId, participantId)
+      result.enrolled.push(eventId)
+    } catch (err: any) {
+      const message = err?.message ?? ''
+      if (/→ 409:/.test(message)) result.full.push(eventId)
+      else if (/→ 404:/.test(message)) result.not_found.push(eventId)
+      else throw err
+    }
+  }
+  result.event_ids = await getParticipantEventIds(participantId)
+  return result
 }
 
-/** Anota a un participante a un evento puntual (idempotente en el backend). */
+/** Anota a un participante a un evento puntual (idempotente en el backend; 409 si está lleno). */
 export async function enrollInEvent(eventId: number, participantId: number): Promise<void> {
   await api.post(`/calendar/instances/${eventId}/participants`, {
     event_id: eventId,
     participant_id: participantId,
     status: "inscripto",
   })
+  await rememberEventIds(participantId, { add: [eventId] })
 }
 
 /** Desanota a un participante de un evento. */
 export async function unenrollFromEvent(eventId: number, participantId: number): Promise<void> {
   await api.delete(`/calendar/instances/${eventId}/participants/by-participant/${participantId}`)
+  await rememberEventIds(participantId, { remove: [eventId] })
 }
 
 /** Anotados de un evento (para que el staff vea quién va). */
@@ -1854,11 +2183,14 @@ export async function updateSurvey(id: number, data: Record<string, any>): Promi
 
 export async function deleteSurvey(id: number): Promise<void> {
   await api.delete(`/encuestas/${id}`)
+  dropSurveyResults(id)
 }
 
 /** Guarda TODAS las preguntas de una: el backend resuelve qué crear y borrar. */
 export async function saveSurveyQuestions(id: number, questions: any[]): Promise<Survey> {
-  return api.put<Survey>(`/encuestas/${id}/preguntas`, questions)
+  const survey = await api.put<Survey>(`/encuestas/${id}/preguntas`, questions)
+  dropSurveyResults(id)
+  return survey
 }
 
 /** La encuesta de un ítem, lista para rendir. null si no tiene o está en borrador. */
@@ -1879,16 +2211,20 @@ export async function submitSurvey(
   id: number,
   data: { user_type: string; user_id: number; answers: any[] },
 ): Promise<SurveyResult> {
-  return api.post<SurveyResult>(`/encuestas/${id}/responder`, data)
+  const result = await api.post<SurveyResult>(`/encuestas/${id}/responder`, data)
+  dropSurveyResults(id)
+  return result
 }
 
+/** Sale del cache en memoria (lib/training-cache). */
 export async function getSurveyResults(id: number): Promise<SurveyAttemptRow[]> {
-  return api.get<SurveyAttemptRow[]>(`/encuestas/${id}/resultados`)
+  return surveyResults(id)
 }
 
 // ============================================================
 // Certificados emitidos
-// El PDF no se guarda: se regenera desde el texto congelado.
+// El PDF se dibuja desde el texto congelado; lib/certificate-store guarda el
+// resultado para no volver a dibujarlo en cada descarga.
 // ============================================================
 
 export interface Certificate {
@@ -0,0 +1,104 @@
+/**
+ * lib/event-enrollments.ts — Eventos a los que está anotado cada participante
+ * ============================================================================
+ * El calendario del participante pide sus ids de eventos en cada carga (para
+ * marcar "Anotado" en los botones) y antes se volvían a pedir después de cada
+ * alta o baja. Acá quedan en memoria, un set por participante:
+ *
+ *   - se cargan del backend la primera vez y pasado TTL_MS;
+ *   - una inscripción o baja hecha desde este proceso deja el set que
+ *     contestó el backend (o aplica el cambio), sin volver a pedirlo;
+ *   - en cluster, la escritura toca el sello del participante en
+ *     lib/shared-store: si otro worker lo cambió, se recarga antes de contestar.
+ *
+ * El set es una cache: quien decide si hay lugar es el backend (ver
+ * cme_count_add en init_db.py).
+ */
+
+import { clustered, stampTime, touchStamp } from '@/lib/shared-store'
+
+const TTL_MS = 5 * 60_000
+/** Participantes recordados a la vez; se va el que hace más que no se usa. */
+const MAX_ENTRIES = 10_000
+
+interface Entry {
+  ids: Set<number>
+  loadedAt: number
+  /** Sello del participante cuando se armó el set (0 fuera de cluster). */
+  stamp: number
+}
+
+const entries = new Map<number, Entry>()
+/** Cargas en vuelo. Una escritura saca la del participante: su respuesta ya no se guarda. */
+const loading = new Map<number, { promise: Promise<number[]> }>()
+
+const stampName = (participantId: number) => `event-ids-${participantId}`
+
+function store(participantId: number, ids: Iterable<number>, stamp: number) {
+  // delete + set: el Map queda en orden de uso y el primero es el más viejo.
+  entries.delete(participantId)
+  entries.set(participantId, { ids: new Set(ids), loadedAt: Date.now(), stamp })
+  while (entries.size > MAX_ENTRIES) entries.delete(entries.keys().next().value as number)
+}
+
+/** Los ids de eventos del participante; `loader` los pide al backend si hace falta. */
+export async function cachedEventIds(participantId: number, loader: () => Promise<number[]>): Promise<number[]> {
+  const hit = entries.get(participantId)
+  if (hit && Date.now() - hit.loadedAt < TTL_MS) {
+    if (!clustered || (await stampTime(stampName(participantId))) === hit.stamp) {
+      entries.delete(participantId)
+      entries.set(participantId, hit)
+      return [...hit.ids]
+    }
+  }
+
+  let pending = loading.get(participantId)
+  if (!pending) {
+    const entry = { promise: Promise.resolve<number[]>([]) }
+    entry.promise = (async () => {
+      // El sello se lee ANTES de pedir: un cambio mientras viaja la respuesta
+      // deja un sello distinto y la próxima lectura recarga.
+      const stamp = clustered ? await stampTime(stampName(participantId)) : 0
+      const ids = await loader()
+      if (loading.get(participantId) === entry) store(participantId, ids, stamp)
+      return ids
+    })().finally(() => {
+      if (loading.get(participantId) === entry) loading.delete(participantId)
+    })
+    loading.set(participantId, entry)
+    pending = entry
+  }
+  return [...(await pending.promise)]
+}
+
+/**
+ * Después de escribir: `ids` es el set completo que devolvió el backend, o
+ * un cambio puntual (`{ add, remove }`) sobre el que ya había. Sin set en
+ * memoria, el cambio puntual solo lo descarta: la próxima lectura lo pide.
+ */
+export async function rememberEventIds(
+  participantId: number,
+  ids: number[] | { add?: number[]; remove?: number[] },
+): Promise<void> {
+  loading.delete(participantId)
+
+  let next: Set<number> | null = null
+  if (Array.isArray(ids)) {
+    next = new Set(ids)
+  } else {
+    const current = entries.get(participantId)
+    if (current) {
+      next = new Set(current.ids)
+      for (const id of ids.add ?? []) next.add(id)
+      for (const id of ids.remove ?? []) next.delete(id)
+    }
+  }
+
+  let stamp = 0
+  if (clustered) {
+    await touchStamp(stampName(participantId)).catch(() => {})
+    stamp = await stampTime(stampName(participantId))
+  }
+  if (next) store(participantId, next, stamp)
+  else entries.delete(participantId)
+}
@@ -0,0 +1,118 @@
+/**
+ * lib/file-variants.ts — Versiones reducidas de las imágenes (miniaturas)
+ * ========================================================================
+ * Una grilla de fotos no necesita la imagen de 2000px: pide
+ * `/api/files/<guid>/raw?w=320`. El ancho se redondea hacia arriba a uno de
+ * `VARIANT_WIDTHS` (así la cache no se llena de tamaños sueltos), el alto
+ * sale de las dimensiones guardadas del archivo, y nunca se agranda: si el
+ * original ya es más chico, se sirve el original.
+ *
+ * El backend hace el recorte; acá se guarda el resultado en disco y las
+ * siguientes veces sale de ahí sin pasar por el backend. Como el guid es
+ * inmutable, una variante nunca vence. El directorio se puede borrar en
+ * cualquier momento: se vuelve a armar solo.
+ */
+
+import fs from 'fs'
+import os from 'os'
+import path from 'path'
+import { Readable } from 'stream'
+
+export const VARIANT_WIDTHS = [160, 320, 640, 1280]
+
+const CACHE_DIR = process.env.FILE_VARIANT_CACHE_DIR || path.join(os.tmpdir(), 'alma-file-variants')
+
+export interface VariantSize {
+  width: number
+  height: number
+}
+
+/** El ancho pedido, redondeado hacia arriba a uno de VARIANT_WIDTHS. */
+export function snapWidth(requested: number): number {
+  return VARIANT_WIDTHS.find((w) => w >= requested) ?? VARIANT_WIDTHS[VARIANT_WIDTHS.length - 1]
+}
+
+/** null = servir el original (sin dimensiones guardadas, o ya es chico). */
+export function variantSize(
+  meta: { width?: number | null; height?: number | null },
+  requested: number,
+): VariantSize | null {
+  if (!meta.width || !meta.height || requested <= 0) return null
+  const width = snapWidth(requested)
+  if (width >= meta.width) return null
+  return { width, height: Math.max(1, Math.round((meta.height * width) / meta.width)) }
+}
+
+/**
+ * ¿La respuesta del backend es de verdad la variante? Un backend que no
+ * entiende `?w=&h=` contesta el original, y guardarlo dejaría la imagen
+ * entera como "miniatura" para siempre. Vale si lo dice el header
+ * `X-Variant-Width` o si pesa menos que el original.
+ */
+export function isVariantResponse(headers: Headers, width: number, originalBytes: number): boolean {
+  const declared = headers.get('X-Variant-Width')
+  if (declared !== null) return Number(declared) === width
+  const length = Number(headers.get('Content-Length') ?? NaN)
+  return Number.isFinite(length) && length < originalBytes
+}
+
+function cachePath(guid: string, width: number): string {
+  // El guid viene de la URL: se limpia para que no pueda salir del directorio.
+  return path.join(CACHE_DIR, `${guid.replace(/[^a-zA-Z0-9-]/g, '')}_${width}`)
+}
+
+export interface CachedVariant {
+  stream: ReadableStream<Uint8Array>
+  size: number
+  contentType: string
+}
+
+export async function openCachedVariant(guid: string, width: number): Promise<CachedVariant | null> {
+  const file = cachePath(guid, width)
+  try {
+    const [stat, contentType] = await Promise.all([
+      fs.promises.stat(file),
+      fs.promises.readFile(`${file}.type`, 'utf8'),
+    ])
+    return {
+      stream: Readable.toWeb(fs.createReadStream(file)) as ReadableStream<Uint8Array>,
+      size: stat.size,
+      contentType,
+    }
+  } catch {
+    return null
+  }
+}
+
+/**
+ * Devuelve un stream para el navegador y, en paralelo, escribe la misma
+ * variante en disco. Se escribe a un temporal y se renombra al final: una
+ * descarga cortada a la mitad nunca queda como variante válida.
+ */
+export function cacheVariantWhileStreaming(
+  guid: string,
+  width: number,
+  contentType: string,
+  body: ReadableStream<Uint8Array>,
+): ReadableStream<Uint8Array> {
+  const [toClient, toDisk] = body.tee()
+  const file = cachePath(guid, width)
+  const tmp = `${file}.${process.pid}.tmp`
+
+  void (async () => {
+    try {
+      await fs.promises.mkdir(CACHE_DIR, { recursive: true })
+      await new Promise<void>((resolve, reject) => {
+        const out = fs.createWriteStream(tmp)
+        Readable.fromWeb(toDisk as any).on('error', reject).pipe(out).on('finish', resolve).on('error', reject)
+      })
+      await fs.promises.writeFile(`${file}.type`, contentType, 'utf8')
+      await fs.promises.rename(tmp, file)
+    } catch {
+      // Sin cache no pasa nada: la próxima vez se vuelve a pedir al backend.
+      await fs.promises.rm(tmp, { force: true }).catch(() => {})
+    }
+  })()
+
+  return toClient
+}
@@ -0,0 +1,307 @@
+/**
+ * lib/grant-index.ts — Índice en memoria de las habilitaciones vigentes
+ * ======================================================================
+ * /accesos/mios (cada carga del dashboard) y la matriz del ABM volvían a
+ * consultar y evaluar person_access_grants en cada llamado. Acá se carga UNA
+ * vez la lista compacta de habilitaciones vigentes (persona, módulo, recurso,
+ * vencimiento) y después todo es una búsqueda en memoria:
+ *
+ *   persona → módulo (interno, un entero) → recurso → vence (ms, o Infinity)
+ *
+ * Se mantiene así:
+ *   - grantAccess / grantAccessBulk / revokeAccess de este proceso lo
+ *     actualizan en el momento (applyGrant / applyRevoke);
+ *   - los vencimientos van a una cola ordenada por fecha (min-heap): antes de
+ *     cada lectura se sacan los que ya vencieron, sin recorrer todo;
+ *   - cada `REFRESH_MS` se recarga entero en segundo plano, para levantar lo
+ *     que se haya escrito por fuera de este proceso;
+ *   - en cluster, si otro worker escribió en /accesos (su sello en
+ *     lib/shared-store es posterior a la carga), se recarga antes de contestar.
+ *
+ * La matriz del ABM usa el índice para las celdas y guarda aparte las filas
+ * (personas, login, total pagado), que cambian mucho menos: se piden una vez
+ * por módulo y se filtran en memoria. Un pago las invalida.
+ *
+ * Los vencimientos llegan como DATETIME sin zona: se leen en la de la base
+ * (`DB_TIMEZONE`, por defecto la del servidor, igual que
+ * lib/shared-account-tracker). Si traen offset o Z, se respeta.
+ *
+ * Si el backend no tiene /accesos/vigentes (404), el índice queda apagado y
+ * data-manager consulta al backend como siempre.
+ */
+
+import { api } from '@/lib/api-client'
+import type { GrantLookup } from '@/lib/permissions'
+import { clustered, stampTime } from '@/lib/shared-store'
+
+const REFRESH_MS = 5 * 60_000
+/** Filas base de la matriz (sin las celdas, que salen del índice). */
+const MATRIX_ROWS_TTL_MS = 60_000
+/** Zona horaria de los DATETIME de la base. Sin esto, la local. */
+const DB_TIMEZONE = process.env.DB_TIMEZONE || undefined
+
+const NAIVE_DATETIME = /^(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2}):(\d{2})(?::(\d{2}))?(?:\.\d+)?)?$/
+
+const zoneFormat = new Intl.DateTimeFormat('en-US', {
+  timeZone: DB_TIMEZONE, hourCycle: 'h23',
+  year: 'numeric', month: '2-digit', day: '2-digit', hour: '2-digit', minute: '2-digit', second: '2-digit',
+})
+
+/** Cuánto adelanta la zona de la base respecto de UTC en el instante `ms`. */
+function zoneOffset(ms: number): number {
+  const p: Record<string, number> = {}
+  for (const { type, value } of zoneFormat.formatToParts(new Date(ms))) p[type] = Number(value)
+  return Date.UTC(p.year, p.month - 1, p.day, p.hour, p.minute, p.second) - Math.floor(ms / 1000) * 1000
+}
+
+/**
+ * Un DATETIME (o DATE) de la base a ms. Sin offset se toma como hora de
+ * `DB_TIMEZONE`: `Date.parse` lo leería en la zona del proceso Node, que no
+ * tiene por qué ser la de MySQL.
+ */
+export function parseDbDateTime(value: string): number {
+  const m = NAIVE_DATETIME.exec(value.trim())
+  if (!m) return Date.parse(value)
+  const [y, mo, d, h = 0, mi = 0, s = 0] = m.slice(1).map((v) => (v === undefined ? undefined : Number(v)))
+  const wall = Date.UTC(y!, mo! - 1, d!, h, mi, s)
+  // Dos pasadas: el offset es el del instante buscado, no el de `wall`
+  // (cambian de un lado al otro de un cambio de horario).
+  const guess = wall - zoneOffset(wall)
+  return wall - zoneOffset(guess)
+}
+
+interface LiveGrantRow {
+  person_id: number
+  module_key: string
+  resource_id: number
+  expires_at: string | null
+}
+
+interface ExpiryEntry {
+  at: number
+  person: number
+  module: number
+  resource: number
+}
+
+/** Min-heap por `at`: el próximo vencimiento siempre está arriba. */
+export class ExpiryQueue {
+  private heap: ExpiryEntry[] = []
+
+  get size() { return this.heap.length }
+
+  push(e: ExpiryEntry) {
+    const h = this.heap
+    h.push(e)
+    let i = h.length - 1
+    while (i > 0) {
+      const p = (i - 1) >> 1
+      if (h[p].at <= h[i].at) break
+      ;[h[p], h[i]] = [h[i], h[p]]
+      i = p
+    }
+  }
+
+  /** Saca y devuelve todos los que vencen hasta `now`, en orden. */
+  popDue(now: number): ExpiryEntry[] {
+    const out: ExpiryEntry[] = []
+    const h = this.heap
+    while (h.length && h[0].at <= now) {
+      out.push(h[0])
+      const last = h.pop()!
+      if (!h.length) break
+      h[0] = last
+      let i = 0
+      for (;;) {
+        const l = 2 * i + 1
+        const r = l + 1
+        let m = i
+        if (l < h.length && h[l].at < h[m].at) m = l
+        if (r < h.length && h[r].at < h[m].at) m = r
+        if (m === i) break
+        ;[h[m], h[i]] = [h[i], h[m]]
+        i = m
+      }
+    }
+    return out
+  }
+}
+
+export class GrantIndex {
+  /** module_key ↔ entero: cada persona guarda enteros, no strings repetidos. */
+  private moduleIds = new Map<string, number>()
+  private moduleKeys: string[] = []
+  private byPerson = new Map<number, Map<number, Map<number, number>>>()
+  private expiry = new ExpiryQueue()
+
+  moduleId(key: string): number {
+    let id = this.moduleIds.get(key)
+    if (id === undefined) {
+      id = this.moduleKeys.length
+      this.moduleIds.set(key, id)
+      this.moduleKeys.push(key)
+    }
+    return id
+  }
+
+  set(person: number, moduleKey: string, resource: number, expiresAt: string | null) {
+    const at = expiresAt ? parseDbDateTime(expiresAt) : Infinity
+    if (at <= Date.now()) return this.remove(person, moduleKey, resource)
+
+    const module = this.moduleId(moduleKey)
+    let modules = this.byPerson.get(person)
+    if (!modules) this.byPerson.set(person, (modules = new Map()))
+    let resources = modules.get(module)
+    if (!resources) modules.set(module, (resources = new Map()))
+    resources.set(resource, at)
+    if (at !== Infinity) this.expiry.push({ at, person, module, resource })
+  }
+
+  remove(person: number, moduleKey: string, resource: number) {
+    const module = this.moduleIds.get(moduleKey)
+    if (module !== undefined) this.drop(person, module, resource)
+  }
+
+  /** Saca lo vencido. Una renovación deja una entrada vieja en la cola: se ignora. */
+  sweep(now = Date.now()) {
+    for (const e of this.expiry.popDue(now)) {
+      if (this.byPerson.get(e.person)?.get(e.module)?.get(e.resource) === e.at) {
+        this.drop(e.person, e.module, e.resource)
+      }
+    }
+  }
+
+  /** Habilitaciones vigentes de una persona, en el formato de lib/access (Grant). */
+  personGrants(person: number) {
+    this.sweep()
+    const out: Array<{ person_id: number; module_key: string; resource_id: number; expires_at: string | null; is_live: true }> = []
+    for (const [module, resources] of this.byPerson.get(person) ?? []) {
+      for (const [resource, at] of resources) {
+        out.push({
+          person_id: person,
+          module_key: this.moduleKeys[module],
+          resource_id: resource,
+          expires_at: at === Infinity ? null : new Date(at).toISOString(),
+          is_live: true,
+        })
+      }
+    }
+    return out
+  }
+
+  /** Recursos vigentes de una persona en un módulo (vacío si no tiene). */
+  resources(person: number, moduleKey: string): Iterable<number> {
+    this.sweep()
+    const module = this.moduleIds.get(moduleKey)
+    if (module === undefined) return []
+    return this.byPerson.get(person)?.get(module)?.keys() ?? []
+  }
+
+  /** La mitad "habilitación" de `can()` para una persona (null: ninguna). */
+  lookup(person: number | null): GrantLookup {
+    return {
+      has: (moduleKey, resourceId) => {
+        if (person === null) return false
+        this.sweep()
+        const module = this.moduleIds.get(moduleKey)
+        const resources = module === undefined ? undefined : this.byPerson.get(person)?.get(module)
+        if (!resources) return false
+        return resourceId === undefined || resources.has(resourceId)
+      },
+    }
+  }
+
+  private drop(person: number, module: number, resource: number) {
+    const modules = this.byPerson.get(person)
+    const resources = modules?.get(module)
+    if (!resources) return
+    resources.delete(resource)
+    if (!resources.size) modules!.delete(module)
+    if (!modules!.size) this.byPerson.delete(person)
+  }
+}
+
+let index: GrantIndex | null = null
+let loadedAt = 0
+let loading: Promise<GrantIndex | null> | null = null
+/** false = el backend no tiene /accesos/vigentes: índice apagado. */
+let supported = true
+
+async function load(): Promise<GrantIndex | null> {
+  // Se toma al PEDIR: lo que otro worker escriba mientras viaja la respuesta
+  // queda con un sello posterior y fuerza otra recarga.
+  const startedAt = Date.now()
+  try {
+    const rows = await api.get<LiveGrantRow[]>('/accesos/vigentes')
+    const fresh = new GrantIndex()
+    for (const r of rows) fresh.set(r.person_id, r.module_key, r.resource_id ?? 0, r.expires_at)
+    index = fresh
+    loadedAt = startedAt
+  } catch (err: any) {
+    if (/→ 404:/.test(err?.message ?? '')) supported = false
+    else if (!index) throw err
+    // Con un índice ya armado, un fallo de la recarga no corta nada: se
+    // sigue con el que hay y se reintenta en la próxima lectura.
+  }
+  return index
+}
+
+/**
+ * El índice listo para consultar, o null si el backend no lo soporta.
+ * Vencido el REFRESH_MS, se devuelve el actual y se recarga por detrás.
+ */
+export async function getGrantIndex(): Promise<GrantIndex | null> {
+  if (!supported) return null
+  const stale = clustered && index !== null && (await stampTime('/accesos')) >= loadedAt
+  if (index && !stale && Date.now() - loadedAt < REFRESH_MS) return index
+
+  if (!loading) loading = load().finally(() => { loading = null })
+  // Un cambio de otro worker no se contesta con el índice viejo: se espera la recarga.
+  return stale ? loading : index ?? loading
+}
+
+/** Refleja en el índice una habilitación recién creada o renovada. */
+export function applyGrant(g: { person_id?: number; module_key: string; resource_id?: number; expires_at?: string | null; is_live?: boolean }) {
+  if (!index || g.person_id == null) return
+  if (g.is_live === false) index.remove(g.person_id, g.module_key, g.resource_id ?? 0)
+  else index.set(g.person_id, g.module_key, g.resource_id ?? 0, g.expires_at ?? null)
+}
+
+export function applyRevoke(personId: number, moduleKey: string, resourceId = 0) {
+  index?.remove(personId, moduleKey, resourceId)
+}
+
+// ── Usuario → persona ─────────────────────────────────────────────────────
+// El vínculo no cambia, así que /accesos/mios sólo le pregunta al backend la
+// primera vez; después responde con el índice.
+
+const personOfUser = new Map<string, number>()
+
+export function knownPersonOf(userType: string, userId: number): number | undefined {
+  return personOfUser.get(`${userType}:${userId}`)
+}
+
+export function rememberPersonOf(userType: string, userId: number, personId: number | null) {
+  // Sin persona todavía no se recuerda: se puede crear más adelante.
+  if (personId != null) personOfUser.set(`${userType}:${userId}`, personId)
+}
+
+// ── Filas base de la matriz ───────────────────────────────────────────────
+
+const matrixRows = new Map<string, { expires: number; rows: Promise<any[]> }>()
+
+/** Las filas del módulo, pedidas con `loader` a lo sumo una vez por MATRIX_ROWS_TTL_MS. */
+export function cachedMatrixRows<T>(moduleKey: string, loader: () => Promise<T[]>): Promise<T[]> {
+  const hit = matrixRows.get(moduleKey)
+  if (hit && hit.expires > Date.now()) return hit.rows as Promise<T[]>
+  const rows = loader()
+  matrixRows.set(moduleKey, { expires: Date.now() + MATRIX_ROWS_TTL_MS, rows })
+  rows.catch(() => {
+    if (matrixRows.get(moduleKey)?.rows === rows) matrixRows.delete(moduleKey)
+  })
+  return rows
+}
+
+export function invalidateMatrixRows() {
+  matrixRows.clear()
+}
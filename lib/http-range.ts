@@ -0,0 +1,76 @@
+/**
+ * lib/http-range.ts — Pedidos parciales (HTTP Range) sobre un stream
+ * ===================================================================
+ * Un <video> o un visor de PDF no bajan el archivo entero: piden de a
+ * pedazos (`Range: bytes=1048576-`). Si el backend ya responde 206 se pasa
+ * tal cual; si responde el archivo completo, acá se recorta el stream al
+ * vuelo, sin juntar los bytes en memoria.
+ *
+ * Sólo se soporta UN rango por pedido (lo que usan los navegadores). Un
+ * pedido con varios rangos se contesta con el archivo entero, que es lo que
+ * permite la RFC.
+ */
+
+export interface ByteRange {
+  start: number
+  /** Inclusivo, como en Content-Range. */
+  end: number
+}
+
+/**
+ * `bytes=0-499`, `bytes=500-`, `bytes=-500` (los últimos 500).
+ * null = sin Range utilizable (se manda todo); 'unsatisfiable' = 416
+ * (arranca pasado el final, o `bytes=-0`).
+ */
+export function parseRange(header: string | null, size: number): ByteRange | null | 'unsatisfiable' {
+  if (!header) return null
+  const m = /^bytes=(\d*)-(\d*)$/.exec(header.trim())
+  if (!m || (m[1] === '' && m[2] === '')) return null
+  // `bytes=5-2` está mal escrito (no es un rango vacío): se ignora, como manda la RFC.
+  if (m[1] !== '' && m[2] !== '' && Number(m[2]) < Number(m[1])) return null
+
+  let start: number
+  let end: number
+  if (m[1] === '') {
+    start = Math.max(size - Number(m[2]), 0)
+    end = size - 1
+  } else {
+    start = Number(m[1])
+    end = m[2] === '' ? size - 1 : Math.min(Number(m[2]), size - 1)
+  }
+  if (start >= size || start > end) return 'unsatisfiable'
+  return { start, end }
+}
+
+/** Deja pasar sólo los bytes [start, end] del stream y corta el resto. */
+export function sliceStream(stream: ReadableStream<Uint8Array>, { start, end }: ByteRange): ReadableStream<Uint8Array> {
+  let offset = 0
+  const reader = stream.getReader()
+
+  return new ReadableStream<Uint8Array>({
+    async pull(controller) {
+      for (;;) {
+        const { done, value } = await reader.read()
+        if (done) {
+          controller.close()
+          return
+        }
+        const chunkStart = offset
+        offset += value.byteLength
+        if (offset <= start) continue
+
+        const from = Math.max(start - chunkStart, 0)
+        const to = Math.min(end + 1 - chunkStart, value.byteLength)
+        controller.enqueue(value.subarray(from, to))
+        if (offset > end) {
+          controller.close()
+          await reader.cancel()
+        }
+        return
+      }
+    },
+    cancel(reason) {
+      return reader.cancel(reason)
+    },
+  })
+}
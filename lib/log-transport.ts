@@ -0,0 +1,206 @@
+/**
+ * lib/log-transport.ts — Transporte de archivo con buffer para winston
+ * =====================================================================
+ * El File de winston escribe línea por línea. Este junta las líneas en
+ * memoria y las baja al disco de a tandas (por cantidad o por tiempo), con
+ * escrituras asincrónicas que nunca bloquean el request.
+ *
+ * Rotación por tamaño: cuando app.log pasa `maxsize`, se renombra (eso sí
+ * en la cadena de escrituras, es instantáneo) y se comprime en una cadena
+ * aparte: las tandas siguientes no esperan al gzip. Quedan hasta `maxFiles`
+ * comprimidos:
+ *
+ *   app.log  →  app.log.1.gz  →  app.log.2.gz  → …  (el más viejo se borra)
+ *
+ * Un renombrado que no llegó a comprimirse (el proceso se cayó en el medio)
+ * queda como app.log.rotating.<ms>; el próximo arranque lo comprime.
+ *
+ * Si el proceso termina con líneas sin escribir —en el buffer o en tandas
+ * que esperan en la cadena— se escriben sincrónicamente en el `exit`: perder
+ * el último error antes de una caída es justo lo que no puede pasar. Una
+ * tanda que estaba a mitad de escribirse puede quedar repetida; es el precio
+ * de no perderla.
+ *
+ * Varios procesos sobre el mismo archivo (`shared`): el tamaño se mira con
+ * stat después de cada tanda, porque los demás también escriben, y sólo
+ * rota el que tiene `rotate`. Los otros siguen escribiendo por nombre: tras
+ * la rotación, su próxima tanda ya cae en el app.log nuevo.
+ */
+
+import winston from 'winston'
+import fs from 'fs'
+import path from 'path'
+import zlib from 'zlib'
+import { pipeline } from 'stream/promises'
+
+/** La línea ya formateada que deja winston en cada `info`. */
+const MESSAGE = Symbol.for('message')
+
+/** Transportes abiertos: un solo listener de `exit` para todos. */
+const live = new Set<BufferedFileTransport>()
+let exitHooked = false
+
+export interface BufferedFileOptions {
+  filename: string
+  level?: string
+  format?: winston.Logform.Format
+  /** Líneas acumuladas que disparan un flush inmediato. */
+  maxBufferLines?: number
+  /** Cada cuánto se baja lo que haya, aunque sea una sola línea. */
+  flushIntervalMs?: number
+  /** Tamaño (bytes) a partir del cual se rota el archivo. */
+  maxsize?: number
+  /** Cuántos archivos rotados (.gz) se conservan. */
+  maxFiles?: number
+  /** Otros procesos escriben el mismo archivo (cluster). */
+  shared?: boolean
+  /** Si este proceso rota el archivo. Con `shared`, uno solo. */
+  rotate?: boolean
+}
+
+export class BufferedFileTransport extends winston.Transport {
+  private readonly filename: string
+  private readonly maxBufferLines: number
+  private readonly maxsize: number
+  private readonly maxFiles: number
+  private readonly shared: boolean
+  private readonly rotates: boolean
+
+  private buffer: string[] = []
+  /** Tandas ya pasadas a la cadena que todavía no se escribieron, en orden. */
+  private queued: string[] = []
+  /** Tamaño actual de app.log; -1 hasta el primer stat. */
+  private size = -1
+  /** Cadena de escrituras: garantiza orden sin bloquear a quien loguea. */
+  private chain: Promise<void> = Promise.resolve()
+  /** Compresión de los rotados, aparte de `chain`. */
+  private gzipChain: Promise<void> = Promise.resolve()
+  private readonly timer: NodeJS.Timeout
+
+  constructor(opts: BufferedFileOptions) {
+    super({ level: opts.level, format: opts.format })
+    this.filename = opts.filename
+    this.maxBufferLines = opts.maxBufferLines ?? 200
+    this.maxsize = opts.maxsize ?? 10 * 1024 * 1024
+    this.maxFiles = opts.maxFiles ?? 5
+    this.shared = opts.shared ?? false
+    this.rotates = opts.rotate ?? true
+
+    this.timer = setInterval(() => this.flush(), opts.flushIntervalMs ?? 1000)
+    // El timer no tiene que mantener vivo al proceso.
+    this.timer.unref()
+
+    live.add(this)
+    if (!exitHooked) {
+      exitHooked = true
+      process.once('exit', () => {
+        for (const transport of live) transport.flushSync()
+      })
+    }
+    if (this.rotates) this.compressLeftovers()
+  }
+
+  log(info: any, callback: () => void): void {
+    this.buffer.push(`${info[MESSAGE]}\n`)
+    if (this.buffer.length >= this.maxBufferLines) this.flush()
+    callback()
+  }
+
+  /** Baja el buffer al disco. Devuelve cuándo terminó (útil en tests y al cerrar). */
+  flush(): Promise<void> {
+    if (this.buffer.length === 0) return this.chain
+    const chunk = this.buffer.join('')
+    this.buffer = []
+    this.queued.push(chunk)
+
+    this.chain = this.chain
+      .then(() => this.write(chunk))
+      .catch((err) => {
+        // Un disco lleno no puede tirar la app: se avisa por consola y se sigue.
+        console.error('[logger] no se pudo escribir el log:', err?.message ?? err)
+      })
+      .finally(() => {
+        // Escrita o perdida por un error de disco: ya no se reintenta al salir.
+        if (this.queued[0] === chunk) this.queued.shift()
+      })
+    return this.chain
+  }
+
+  close(): void {
+    clearInterval(this.timer)
+    void this.flush().then(() => live.delete(this))
+  }
+
+  private async write(chunk: string): Promise<void> {
+    if (this.size < 0) {
+      this.size = await fs.promises.stat(this.filename).then((s) => s.size, () => 0)
+    }
+    await fs.promises.appendFile(this.filename, chunk, 'utf8')
+    if (!this.rotates) return
+    this.size = this.shared
+      ? await fs.promises.stat(this.filename).then((s) => s.size, () => 0)
+      : this.size + Buffer.byteLength(chunk)
+    if (this.size >= this.maxsize) await this.rotate()
+  }
+
+  /**
+   * Sólo el renombrado: las líneas nuevas ya van al app.log vacío. El nombre
+   * lleva la hora para que un rotado que todavía no se comprimió no se pise
+   * con el siguiente.
+   */
+  private async rotate(): Promise<void> {
+    const pending = `${this.filename}.rotating.${Date.now()}`
+    await fs.promises.rename(this.filename, pending)
+    this.size = 0
+    this.compress(pending)
+  }
+
+  /** Encola la compresión de `pending` como app.log.1.gz (corriendo los demás). */
+  private compress(pending: string): void {
+    const dir = path.dirname(this.filename)
+    const base = path.basename(this.filename)
+    const rotated = (n: number) => path.join(dir, `${base}.${n}.gz`)
+
+    this.gzipChain = this.gzipChain
+      .then(async () => {
+        await fs.promises.rm(rotated(this.maxFiles), { force: true })
+        for (let n = this.maxFiles - 1; n >= 1; n--) {
+          await fs.promises.rename(rotated(n), rotated(n + 1)).catch(() => {})
+        }
+        await pipeline(fs.createReadStream(pending), zlib.createGzip(), fs.createWriteStream(rotated(1)))
+        await fs.promises.rm(pending, { force: true })
+      })
+      .catch((err) => {
+        // Queda el .rotating sin comprimir: lo retoma el próximo arranque.
+        console.error('[logger] no se pudo comprimir el log rotado:', err?.message ?? err)
+      })
+  }
+
+  /** Rotados que quedaron sin comprimir de una corrida anterior, del más viejo al más nuevo. */
+  private compressLeftovers(): void {
+    const dir = path.dirname(this.filename)
+    const prefix = `${path.basename(this.filename)}.rotating`
+    void fs.promises
+      .readdir(dir)
+      .then((names) => {
+        const leftovers = names.filter((n) => n.startsWith(prefix))
+        // `.rotating` a secas es el nombre de antes de llevar la hora: va primero.
+        const stamp = (n: string) => Number(n.slice(prefix.length + 1)) || 0
+        leftovers.sort((a, b) => stamp(a) - stamp(b))
+        for (const name of leftovers) this.compress(path.join(dir, name))
+      })
+      .catch(() => {})
+  }
+
+  private flushSync(): void {
+    const pending = this.queued.join('') + this.buffer.join('')
+    this.queued = []
+    this.buffer = []
+    if (!pending) return
+    try {
+      fs.appendFileSync(this.filename, pending, 'utf8')
+    } catch {
+      // Saliendo del proceso ya no hay a quién avisarle.
+    }
+  }
+}
@@ -6,12 +6,23 @@
  * Formato: timestamp | LEVEL | user=X | module=Y | action=Z | message=... | meta={...}
  *
  * Dev  → logs/dev/app.log  + consola colorizada
- * Prod → logs/prod/app.log + consola sin color
+ * Prod → logs/prod/app.log + consola solo desde warn (LOG_CONSOLE_LEVEL)
+ *
+ * El archivo se escribe con un transporte con buffer (lib/log-transport.ts):
+ * el request nunca espera al disco. Los info/debug repetidos se recortan por
+ * segundo (LOG_RATE_LIMIT); warn y error pasan siempre.
+ *
+ * En cluster (ALMA_WORKERS > 1) todos los workers escriben el mismo app.log:
+ * cada tanda sale en una sola escritura en modo append, así que las líneas
+ * de distintos procesos se intercalan enteras, nunca cortadas. Rota sólo el
+ * worker 0, y el límite por segundo se reparte entre los workers.
  */
 
 import winston from 'winston'
 import path from 'path'
 import fs from 'fs'
+import { BufferedFileTransport } from '@/lib/log-transport'
+import { WORKERS, WORKER_INDEX, clustered } from '@/lib/shared-store'
 
 const isDev = (process.env.NODE_ENV || 'development') !== 'production'
 const logDir = path.join(process.cwd(), 'logs', isDev ? 'dev' : 'prod')
@@ -23,15 +34,51 @@ try {
   // ignorar si ya existe o hay error de permisos
 }
 
+// ── Recorte de eventos repetidos ────────────────────────────────────────────
+// Hasta LOG_RATE_LIMIT líneas info/debug por segundo para cada module+action.
+// Lo que se descarta no se pierde del todo: la primera línea del segundo
+// siguiente lleva `suppressed=N` en su meta. 0 desactiva el recorte.
+const RATE_LIMIT = Math.ceil(Number(process.env.LOG_RATE_LIMIT ?? (isDev ? 0 : 50)) / WORKERS)
+const rateWindows = new Map<string, { second: number; count: number; suppressed: number }>()
+
+const rateLimit = winston.format((info) => {
+  if (RATE_LIMIT <= 0 || (info.level !== 'info' && info.level !== 'debug')) return info
+
+  const key = `${info.level}|${info.module ?? ''}|${info.action ?? ''}`
+  const second = Math.floor(Date.now() / 1000)
+  const win = rateWindows.get(key)
+
+  if (!win || win.second !== second) {
+    const suppressed = win?.suppressed ?? 0
+    rateWindows.set(key, { second, count: 1, suppressed: 0 })
+    if (suppressed > 0) info.meta = { ...(info.meta as object | undefined), suppressed }
+    return info
+  }
+  if (win.count < RATE_LIMIT) {
+    win.count++
+    return info
+  }
+  win.suppressed++
+  return false
+})
+
+// ── Meta serializada UNA vez ────────────────────────────────────────────────
+// Consola y archivo usan el mismo texto: sin esto cada línea hacía dos
+// JSON.stringify del mismo objeto.
+const serializeMeta = winston.format((info) => {
+  info.metaStr = info.meta ? JSON.stringify(info.meta) : ''
+  return info
+})
+
 // ── Formato de archivo ──────────────────────────────────────────────────────
 const fileFormat = winston.format.combine(
   winston.format.timestamp(),
-  winston.format.printf(({ level, message, timestamp, user, module: mod, action, meta }) => {
+  winston.format.printf(({ level, message, timestamp, user, module: mod, action, metaStr }) => {
     const levelStr = String(level).toUpperCase().padEnd(5)
     const userPart = user != null ? `user=${user}` : 'user=anonymous'
     const modulePart = mod ? ` | module=${mod}` : ''
     const actionPart = action ? ` | action=${action}` : ''
-    const metaPart = meta ? ` | meta=${JSON.stringify(meta)}` : ''
+    const metaPart = metaStr ? ` | meta=${metaStr}` : ''
     return `${timestamp} | ${levelStr} | ${userPart}${modulePart}${actionPart} | message=${message}${metaPart}`
   })
 )
@@ -40,29 +87,37 @@ const fileFormat = winston.format.combine(
 const consoleFormat = winston.format.combine(
   winston.format.colorize(),
   winston.format.timestamp({ format: 'HH:mm:ss.SSS' }),
-  winston.format.printf(({ level, message, timestamp, user, module: mod, action, meta }) => {
+  winston.format.printf(({ level, message, timestamp, user, module: mod, action, metaStr }) => {
     const userPart = user != null ? `user=${user}` : 'user=anonymous'
     const parts: string[] = [String(timestamp), level, userPart]
     if (mod) parts.push(`module=${mod}`)
     if (action) parts.push(`action=${action}`)
     parts.push(String(message))
-    if (meta) parts.push(JSON.stringify(meta))
+    if (metaStr) parts.push(String(metaStr))
     return parts.join(' | ')
   })
 )
 
 // ── Logger de winston ───────────────────────────────────────────────────────
+const fileTransport = new BufferedFileTransport({
+  filename: path.join(logDir, 'app.log'),
+  format: fileFormat,
+  maxsize: 10 * 1024 * 1024, // 10 MB por archivo
+  maxFiles: 5,
+  shared: clustered,
+  rotate: WORKER_INDEX === 0,
+})
+
 const winstonLogger = winston.createLogger({
-  level: isDev ? 'debug' : 'info',
+  level: process.env.LOG_LEVEL || (isDev ? 'debug' : 'info'),
+  format: winston.format.combine(rateLimit(), serializeMeta()),
   transports: [
-    new winston.transports.Console({ format: consoleFormat }),
-    new winston.transports.File({
-      filename: path.join(logDir, 'app.log'),
-      format: fileFormat,
-      maxsize: 10 * 1024 * 1024, // 10 MB por archivo
-      maxFiles: 5,
-      tailable: true,
+    new winston.transports.Console({
+      format: consoleFormat,
+      // En prod la consola la captura PM2 en otro archivo: duplicar cada info ahí es puro I/O.
+      level: process.env.LOG_CONSOLE_LEVEL || (isDev ? 'debug' : 'warn'),
     }),
+    fileTransport,
   ],
 })
 
@@ -105,4 +160,9 @@ export function logDebug(message: string, ctx: LogContext = {}): void {
   winstonLogger.debug(message, ctx)
 }
 
+/** Baja al disco lo que esté en el buffer. Para cierres ordenados y tests. */
+export function flushLogs(): Promise<void> {
+  return fileTransport.flush()
+}
+
 export default winstonLogger
@@ -1,3 +1,5 @@
+import { MODULES_BY_KEY } from "@/lib/modules"
+
 export type Action =
   | "calendar:create"
   | "calendar:edit"
@@ -35,6 +37,16 @@ export type Action =
   | "accesos:view"
   | "accesos:manage"
 
+/**
+ * La mitad "habilitación" del acceso efectivo (ver lib/access.ts), ya
+ * resuelta para una persona. En el servidor sale del índice de
+ * lib/grant-index (GrantIndex.lookup); la UI no la pasa y decide el rol.
+ */
+export interface GrantLookup {
+  /** ¿Tiene habilitado el ítem `resourceId`? Sin ítem: cualquiera del módulo. */
+  has(moduleKey: string, resourceId?: number): boolean
+}
+
 /**
  * Returns true if the given user is allowed to perform the given action.
  * Pass null for unauthenticated users — always returns false.
@@ -43,9 +55,30 @@ export type Action =
  *   "admin"        — full access
  *   "voluntario"   — can edit calendar/grupos/talleres; cannot create/delete grupos/talleres
  *   "participante" — read-only on all modules; can only edit their own profile
+ *
+ * Con `grants`, el acceso efectivo: rol OR habilitación vigente. Una
+ * habilitación sólo da `<módulo>:view` de un módulo habilitable. Con
+ * `resourceId` la pregunta es por ese ítem puntual: el staff lo abre por rol
+ * y el participante necesita la habilitación del ítem (como canSeeItem).
  */
-export function can(user: { role: string } | null, action: Action): boolean {
+export function can(
+  user: { role: string } | null,
+  action: Action,
+  grants?: GrantLookup,
+  resourceId?: number,
+): boolean {
   if (!user) return false
+  const granted = (item?: number) => {
+    const [moduleKey, verb] = action.split(":")
+    return verb === "view" && !!MODULES_BY_KEY[moduleKey]?.grantable && !!grants?.has(moduleKey, item)
+  }
+
+  if (resourceId === undefined) return roleAllows(user, action) || granted()
+  if (user.role === "admin" || user.role === "voluntario") return roleAllows(user, action)
+  return granted(resourceId)
+}
+
+function roleAllows(user: { role: string }, action: Action): boolean {
 
   const isAdmin = user.role === "admin"
   const isParticipant = user.role === "participante"
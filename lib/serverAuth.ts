@@ -1,5 +1,7 @@
 import { type NextRequest } from "next/server"
 import jwt from "jsonwebtoken"
+import { createHash } from "crypto"
+import { VerifiedTokenCache } from "@/lib/verified-tokens"
 
 export interface SessionUser {
   id: number
@@ -26,6 +28,9 @@ export interface SessionPayload extends SessionUser {
  */
 const MIN_TOKEN_VERSION = parseInt(process.env.APP_TOKEN_VERSION || "1")
 
+/** Payloads ya verificados, por SHA-256 del token (ver lib/verified-tokens). */
+const verified = new VerifiedTokenCache<any>()
+
 export function getSessionUser(request: NextRequest): SessionUser | null {
   const payload = getSessionPayload(request)
   if (!payload) return null
@@ -48,7 +53,12 @@ export function getSessionPayload(request: NextRequest): SessionPayload | null {
     const secret = process.env.JWT_SECRET
     if (!secret) return null
 
-    const payload = jwt.verify(token, secret) as any
+    const digest = createHash("sha256").update(token).digest("hex")
+    let payload = verified.get(digest)
+    if (!payload) {
+      payload = jwt.verify(token, secret) as any
+      verified.set(digest, payload, payload.exp)
+    }
 
     // Rechazar tokens emitidos antes de la versión mínima requerida
     if ((payload.tv ?? 0) < MIN_TOKEN_VERSION) return null
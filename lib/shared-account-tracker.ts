@@ -0,0 +1,214 @@
+/**
+ * lib/shared-account-tracker.ts — IPs distintas por cuenta, día por día
+ * ======================================================================
+ * La alerta de cuentas compartidas le pedía al backend recorrer todas las
+ * reproducciones de la ventana (7, 30 días) y contar IPs distintas por
+ * persona, en cada consulta: cuanto más tráfico y más larga la ventana, más
+ * tardaba.
+ *
+ * Acá se guarda, por cuenta y por día, el CONJUNTO de IPs desde las que
+ * reprodujo y cuántas reproducciones hubo. Una alerta une los conjuntos de
+ * los días de la ventana: son unas decenas de entradas por persona, no miles
+ * de eventos.
+ *
+ *   - Al arrancar se carga el resumen de los últimos `MAX_DAYS` días
+ *     (/capacitaciones/alertas/ips-diarias, una sola vez).
+ *   - Cada reproducción que pasa por logTrainingView se suma en el momento.
+ *   - Cada `TODAY_REFRESH_MS` se vuelve a pedir sólo el día de hoy, para
+ *     sumar lo que registraron otros procesos (el primer refresco después
+ *     de medianoche pide también ayer, para no perder sus últimos minutos).
+ *     Unir conjuntos es idempotente: volver a sumar la misma IP no cambia nada.
+ *
+ * Los días son los de la base (DATE en su zona horaria, `DB_TIMEZONE`; por
+ * defecto la del servidor), no UTC: si no, cerca de medianoche un día de acá
+ * y el mismo día del backend serían baldes distintos.
+ *
+ * Los conjuntos son exactos pero con tope (`MAX_IPS_PER_DAY`): el umbral de
+ * la alerta es de pocas IPs, y una cuenta que llega al tope ya salta igual.
+ *
+ * Si el backend no tiene el resumen (404), o se pide una ventana más larga
+ * que MAX_DAYS, se consulta la alerta al backend como siempre.
+ */
+
+import { api } from '@/lib/api-client'
+import type { SharedAccountAlert } from '@/lib/data-manager'
+
+const MAX_DAYS = 30
+const MAX_IPS_PER_DAY = 64
+const TODAY_REFRESH_MS = 5 * 60_000
+/** Zona horaria en la que la base agrupa por día. Sin esto, la local. */
+const DB_TIMEZONE = process.env.DB_TIMEZONE || undefined
+
+interface DailyIpsRow {
+  person_id: number
+  user_type: string
+  user_id: number
+  person_name?: string | null
+  person_email?: string | null
+  /** YYYY-MM-DD */
+  day: string
+  ips: string[]
+  views: number
+}
+
+interface DayBucket {
+  ips: Set<string>
+  views: number
+}
+
+interface Account {
+  person_id: number | null
+  person_name?: string | null
+  person_email?: string | null
+  days: Map<string, DayBucket>
+}
+
+const accounts = new Map<string, Account>()
+let seededAt = 0
+let todayRefreshedAt = 0
+/** Día (de la base) del último refresco: si cambió, se pide también ayer. */
+let refreshedDay = ''
+let loading: Promise<boolean> | null = null
+/** false = el backend no tiene el resumen diario: siempre se le pregunta la alerta. */
+let supported = true
+
+// en-CA formatea como YYYY-MM-DD, igual que un DATE de MySQL.
+const dayFormat = new Intl.DateTimeFormat('en-CA', {
+  timeZone: DB_TIMEZONE, year: 'numeric', month: '2-digit', day: '2-digit',
+})
+
+function dayOf(date: Date): string {
+  return dayFormat.format(date)
+}
+
+/** Hoy menos `n` días de calendario (sin pasar por horas: un cambio de horario no lo corre). */
+function daysAgo(n: number): string {
+  const [y, m, d] = dayOf(new Date()).split('-').map(Number)
+  return new Date(Date.UTC(y, m - 1, d - n)).toISOString().slice(0, 10)
+}
+
+function account(userType: string, userId: number): Account {
+  const key = `${userType}:${userId}`
+  let acc = accounts.get(key)
+  if (!acc) accounts.set(key, (acc = { person_id: null, days: new Map() }))
+  return acc
+}
+
+function bucket(acc: Account, day: string): DayBucket {
+  let b = acc.days.get(day)
+  if (!b) acc.days.set(day, (b = { ips: new Set(), views: 0 }))
+  return b
+}
+
+function addIp(b: DayBucket, ip: string) {
+  if (b.ips.size < MAX_IPS_PER_DAY) b.ips.add(ip)
+}
+
+function merge(rows: DailyIpsRow[]) {
+  for (const r of rows) {
+    const acc = account(r.user_type, r.user_id)
+    acc.person_id = r.person_id
+    acc.person_name = r.person_name
+    acc.person_email = r.person_email
+    const b = bucket(acc, r.day)
+    for (const ip of r.ips) addIp(b, ip)
+    // Las vistas sí se pisan: el backend tiene el total del día, que ya
+    // incluye las que se sumaron acá.
+    b.views = Math.max(b.views, r.views)
+  }
+}
+
+/** Descarta los días que ya salieron de la ventana más larga. */
+function prune() {
+  const oldest = daysAgo(MAX_DAYS)
+  for (const [key, acc] of accounts) {
+    for (const day of acc.days.keys()) if (day < oldest) acc.days.delete(day)
+    if (!acc.days.size) accounts.delete(key)
+  }
+}
+
+async function fetchDays(days: number): Promise<boolean> {
+  try {
+    merge(await api.get<DailyIpsRow[]>(`/capacitaciones/alertas/ips-diarias?days=${days}`))
+    return true
+  } catch (err: any) {
+    if (/→ 404:/.test(err?.message ?? '')) supported = false
+    else throw err
+    return false
+  }
+}
+
+/** true = el tracker está al día y puede contestar. */
+async function ready(): Promise<boolean> {
+  if (!supported) return false
+  if (loading) return loading
+
+  const now = Date.now()
+  const today = dayOf(new Date(now))
+  if (!seededAt) {
+    loading = fetchDays(MAX_DAYS).then((ok) => {
+      if (ok) {
+        seededAt = todayRefreshedAt = now
+        refreshedDay = today
+      }
+      return ok
+    })
+  } else if (now - todayRefreshedAt > TODAY_REFRESH_MS || today !== refreshedDay) {
+    loading = fetchDays(today === refreshedDay ? 1 : 2).then((ok) => {
+      if (ok) {
+        todayRefreshedAt = now
+        refreshedDay = today
+      }
+      prune()
+      return ok
+    })
+  } else {
+    return true
+  }
+  return loading.finally(() => { loading = null })
+}
+
+/** Suma una reproducción. Sin IP (no vino del proxy) no hay nada que contar. */
+export function noteTrainingView(userType: string, userId: number, ip: string | null | undefined) {
+  if (!ip || !seededAt) return
+  const b = bucket(account(userType, userId), dayOf(new Date()))
+  addIp(b, ip)
+  b.views++
+}
+
+/** null = el tracker no puede contestar esta ventana: preguntarle al backend. */
+export async function sharedAccountAlerts(days: number, minIps: number): Promise<SharedAccountAlert[] | null> {
+  if (days > MAX_DAYS || !(await ready())) return null
+
+  const from = daysAgo(days - 1)
+  const byPerson = new Map<number, { alert: SharedAccountAlert; ips: Set<string> }>()
+
+  for (const acc of accounts.values()) {
+    // Una cuenta que todavía no se asoció a una persona se resuelve en el
+    // próximo refresco del día.
+    if (acc.person_id == null) continue
+    let entry = byPerson.get(acc.person_id)
+    for (const [day, b] of acc.days) {
+      if (day < from) continue
+      if (!entry) {
+        entry = {
+          alert: {
+            person_id: acc.person_id, person_name: acc.person_name, person_email: acc.person_email,
+            distinct_ips: 0, views: 0,
+          },
+          ips: new Set(),
+        }
+        byPerson.set(acc.person_id, entry)
+      }
+      for (const ip of b.ips) entry.ips.add(ip)
+      entry.alert.views += b.views
+    }
+  }
+
+  const alerts: SharedAccountAlert[] = []
+  for (const { alert, ips } of byPerson.values()) {
+    alert.distinct_ips = ips.size
+    if (alert.distinct_ips >= minIps) alerts.push(alert)
+  }
+  return alerts.sort((a, b) => b.distinct_ips - a.distinct_ips || b.views - a.views)
+}
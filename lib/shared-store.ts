@@ -0,0 +1,253 @@
+/**
+ * lib/shared-store.ts — Estado compartido entre los workers del cluster
+ * ======================================================================
+ * Con PM2 en modo cluster (ver ecosystem.config.js) hay un proceso de Next
+ * por núcleo y cada request cae en cualquiera. Lo que vive en memoria de un
+ * proceso (caches, trabajos en segundo plano) los otros no lo ven. Acá hay
+ * un almacén local mínimo, en disco, para lo poco que sí tiene que verse:
+ *
+ *   - Sellos: un archivo vacío por recurso cuya fecha de modificación dice
+ *     "esto cambió a tal hora". Quien escribe lo toca; quien tiene algo en
+ *     cache compara contra el momento en que lo leyó.
+ *   - Documentos: JSON chicos (el estado de un trabajo), escritos de forma
+ *     atómica (temporal + rename) para que nunca se lea uno a medias.
+ *
+ * Con un solo proceso (`ALMA_WORKERS` sin definir o 1) todo esto queda
+ * apagado: `clustered` es false y quien lo usa sigue como siempre.
+ */
+
+import fs from 'fs'
+import os from 'os'
+import path from 'path'
+import { onShutdown, shuttingDown } from '@/lib/shutdown'
+
+/** Cantidad de workers que levantó PM2 (lo define ecosystem.config.js). */
+export const WORKERS = Math.max(1, Number(process.env.ALMA_WORKERS) || 1)
+export const clustered = WORKERS > 1
+
+/** Número de este worker (0…N-1). PM2 lo pone en NODE_APP_INSTANCE. */
+export const WORKER_INDEX = Number(process.env.NODE_APP_INSTANCE) || 0
+
+const DIR = process.env.ALMA_SHARED_DIR || path.join(os.tmpdir(), `alma-shared-${process.env.PORT || 3000}`)
+
+function fileFor(kind: string, name: string): string {
+  return path.join(DIR, kind, name.replace(/[^a-zA-Z0-9_-]/g, '_'))
+}
+
+async function ensureDir(file: string) {
+  await fs.promises.mkdir(path.dirname(file), { recursive: true })
+}
+
+// ── Sellos ────────────────────────────────────────────────────────────────
+
+/** Marca que `name` cambió ahora. */
+export async function touchStamp(name: string): Promise<void> {
+  const file = fileFor('stamps', name)
+  const now = new Date()
+  try {
+    await fs.promises.utimes(file, now, now)
+  } catch {
+    await ensureDir(file)
+    await fs.promises.writeFile(file, '')
+  }
+}
+
+/** Cuándo cambió `name` por última vez (ms), 0 si nunca. */
+export async function stampTime(name: string): Promise<number> {
+  try {
+    return (await fs.promises.stat(fileFor('stamps', name))).mtimeMs
+  } catch {
+    return 0
+  }
+}
+
+// ── Documentos ────────────────────────────────────────────────────────────
+
+let tmpSeq = 0
+
+export async function writeShared(kind: string, id: string, value: unknown): Promise<void> {
+  const file = fileFor(kind, id)
+  const tmp = `${file}.${process.pid}.${++tmpSeq}.tmp`
+  await ensureDir(file)
+  await fs.promises.writeFile(tmp, JSON.stringify(value), 'utf8')
+  await fs.promises.rename(tmp, file)
+}
+
+export async function readShared<T>(kind: string, id: string): Promise<T | null> {
+  try {
+    return JSON.parse(await fs.promises.readFile(fileFor(kind, id), 'utf8')) as T
+  } catch {
+    return null
+  }
+}
+
+export async function removeShared(kind: string, id: string): Promise<void> {
+  await fs.promises.rm(fileFor(kind, id), { force: true })
+}
+
+/** Lee y borra en un paso (rename): dos workers nunca toman el mismo pedido. */
+export async function takeShared<T>(kind: string, id: string): Promise<T | null> {
+  const file = fileFor(kind, id)
+  const claimed = `${file}.${process.pid}.taken`
+  try {
+    await fs.promises.rename(file, claimed)
+  } catch {
+    return null
+  }
+  try {
+    return JSON.parse(await fs.promises.readFile(claimed, 'utf8')) as T
+  } catch {
+    return null
+  } finally {
+    await fs.promises.rm(claimed, { force: true }).catch(() => {})
+  }
+}
+
+/** Borra los documentos de `kind` más viejos que `maxAgeMs`. */
+export async function pruneShared(kind: string, maxAgeMs: number): Promise<void> {
+  const dir = path.join(DIR, kind)
+  const limit = Date.now() - maxAgeMs
+  let names: string[]
+  try {
+    names = await fs.promises.readdir(dir)
+  } catch {
+    return
+  }
+  for (const name of names) {
+    const file = path.join(dir, name)
+    const stat = await fs.promises.stat(file).catch(() => null)
+    if (stat && stat.mtimeMs < limit) await fs.promises.rm(file, { force: true }).catch(() => {})
+  }
+}
+
+// ── Trabajos en segundo plano ─────────────────────────────────────────────
+// Un trabajo corre en el worker que lo recibió, pero la UI consulta su
+// progreso con requests que pueden caer en otro. El dueño publica una foto
+// del estado; los demás la leen. Los pedidos (cancelar, reanudar) que llegan
+// a otro worker se dejan anotados y el dueño los levanta.
+//
+// Un worker que se baja (pm2 reload) publica sus trabajos sin terminar como
+// fallidos antes de salir. Si murió sin poder hacerlo (SIGKILL, un crash),
+// la foto lleva el pid del dueño: con el proceso muerto se lee como fallida
+// en vez de quedar "running" para siempre.
+
+/** Cada cuánto, como mucho, se publica el progreso de un mismo trabajo. */
+const PUBLISH_EVERY_MS = 500
+/** Cada cuánto el dueño mira si hay pedidos para sus trabajos. */
+const CONTROL_POLL_MS = 2_000
+/** Fotos de trabajos que se conservan en disco. */
+const SNAPSHOT_MAX_AGE_MS = 24 * 60 * 60_000
+/** El error de un trabajo que se cortó con su worker. */
+const INTERRUPTED = 'El servidor se reinició con el trabajo en curso: quedó a medias'
+
+/** Lo mínimo que tienen en común los trabajos de calendar-, broadcast- y certificate-jobs. */
+interface MirroredJob {
+  id: string
+  status: string
+  error: string | null
+  finished_at: string | null
+}
+
+interface Snapshot<J> {
+  owner: number
+  job: J
+}
+
+function processAlive(pid: number): boolean {
+  try {
+    process.kill(pid, 0)
+    return true
+  } catch (err: any) {
+    return err?.code === 'EPERM'
+  }
+}
+
+function interrupted<J extends MirroredJob>(job: J): J {
+  return { ...job, status: 'failed', error: INTERRUPTED, finished_at: job.finished_at ?? new Date().toISOString() }
+}
+
+export interface JobMirror<J> {
+  /** Publica la foto (con throttle salvo `force`, que se usa al terminar). */
+  publish(job: J, force?: boolean): void
+  /** La foto publicada por otro worker, o null. */
+  read(id: string): Promise<J | null>
+  /** Deja un pedido para el dueño del trabajo. */
+  request(id: string, action: string): Promise<void>
+  /**
+   * Revisa cada tanto los pedidos para los trabajos de `ids()` y se los pasa
+   * a `apply`. Sólo corre en cluster.
+   */
+  watch(ids: () => Iterable<string>, apply: (id: string, action: string) => void): void
+}
+
+export function createJobMirror<J extends MirroredJob>(name: string): JobMirror<J> {
+  const kind = `jobs-${name}`
+  const controlKind = `jobs-${name}-control`
+  const lastPublish = new Map<string, number>()
+  /** Escrituras en orden por trabajo: la foto final nunca la pisa una anterior. */
+  const writes = new Map<string, Promise<void>>()
+  /** Trabajos publicados sin terminar: los que hay que cerrar si el worker se baja. */
+  const unfinished = new Map<string, J>()
+  let pruned = false
+  let hooked = false
+
+  const mirror: JobMirror<J> = {
+    publish(job, force = false) {
+      if (!clustered) return
+      // Saliendo, el trabajo ya quedó publicado como cortado: un avance que
+      // llegue después no lo vuelve a poner en curso.
+      if (shuttingDown() && job.finished_at === null) return
+      if (job.finished_at === null) unfinished.set(job.id, job)
+      else unfinished.delete(job.id)
+      if (!hooked) {
+        hooked = true
+        onShutdown(kind, async () => {
+          for (const job of [...unfinished.values()]) mirror.publish(interrupted(job), true)
+          await Promise.all(writes.values())
+        })
+      }
+      const now = Date.now()
+      if (!force && now - (lastPublish.get(job.id) ?? 0) < PUBLISH_EVERY_MS) return
+      lastPublish.set(job.id, now)
+      if (!pruned) {
+        pruned = true
+        void pruneShared(kind, SNAPSHOT_MAX_AGE_MS)
+      }
+      const snapshot: Snapshot<J> = { owner: process.pid, job: { ...job } }
+      const next = (writes.get(job.id) ?? Promise.resolve())
+        .then(() => writeShared(kind, job.id, snapshot))
+        .catch(() => {})
+      writes.set(job.id, next)
+      void next.then(() => {
+        if (writes.get(job.id) === next) {
+          writes.delete(job.id)
+          if (force) lastPublish.delete(job.id)
+        }
+      })
+    },
+
+    async read(id) {
+      if (!clustered) return null
+      const snapshot = await readShared<Snapshot<J>>(kind, id)
+      if (!snapshot?.job) return null
+      const { job, owner } = snapshot
+      return job.finished_at === null && !processAlive(owner) ? interrupted(job) : job
+    },
+
+    async request(id, action) {
+      if (clustered) await writeShared(controlKind, id, { action })
+    },
+
+    watch(ids, apply) {
+      if (!clustered) return
+      const timer = setInterval(async () => {
+        for (const id of ids()) {
+          const req = await takeShared<{ action: string }>(controlKind, id)
+          if (req) apply(id, req.action)
+        }
+      }, CONTROL_POLL_MS)
+      timer.unref()
+    },
+  }
+  return mirror
+}
@@ -0,0 +1,47 @@
+/**
+ * lib/shutdown.ts — Apagado ordenado de un worker
+ * ================================================
+ * PM2 baja un worker (reload, stop, scale) con SIGINT y, si pasado
+ * `kill_timeout` sigue vivo, con SIGKILL (ver ecosystem.config.js). Lo que
+ * un módulo tiene sólo en memoria —la cola de actividad, los trabajos en
+ * curso— se pierde si no se atiende en ese rato.
+ *
+ * Cada módulo registra con `onShutdown` lo que hay que hacer antes de morir.
+ * Al llegar SIGINT o SIGTERM se corren todos a la vez, con un plazo de
+ * `DEADLINE_MS` (menos que kill_timeout), y recién ahí se sale.
+ *
+ * Next sale por su cuenta apenas le llega la señal, salvo que corra con
+ * NEXT_MANUAL_SIG_HANDLE=true (así lo arranca ecosystem.config.js). Sin eso
+ * los hooks pueden quedar a medio correr y sólo se garantiza lo que se hace
+ * sincrónicamente en el `exit` (como el log, lib/log-transport).
+ */
+
+/** Lo más que se espera a los hooks. Menos que kill_timeout (10 s). */
+const DEADLINE_MS = 8000
+
+const hooks = new Map<string, () => Promise<void> | void>()
+let hooked = false
+let stopping = false
+
+/** Registra (o reemplaza, por nombre) algo a correr antes de salir. */
+export function onShutdown(name: string, fn: () => Promise<void> | void) {
+  hooks.set(name, fn)
+  if (hooked) return
+  hooked = true
+  process.once('SIGINT', () => { void shutdown() })
+  process.once('SIGTERM', () => { void shutdown() })
+}
+
+/** ¿Ya llegó la señal? Para no arrancar trabajo nuevo mientras se sale. */
+export function shuttingDown(): boolean {
+  return stopping
+}
+
+async function shutdown() {
+  if (stopping) return
+  stopping = true
+  const deadline = new Promise<void>((resolve) => setTimeout(resolve, DEADLINE_MS).unref())
+  const done = Promise.allSettled([...hooks.values()].map((fn) => Promise.resolve().then(fn)))
+  await Promise.race([done, deadline])
+  process.exit(0)
+}
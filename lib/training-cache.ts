@@ -0,0 +1,138 @@
+/**
+ * lib/training-cache.ts — Cache de resultados de encuestas y resumen de capacitaciones
+ * ===================================================================================
+ * /encuestas/{id}/resultados y /capacitaciones/{id}/resumen los calcula el
+ * backend desde las tablas crudas (intentos, progreso, vistas). Esto NO los
+ * vuelve de costo constante: es un cache en memoria de esas respuestas, que
+ * ahorra el pedido mientras nada cambió.
+ *
+ *   - Resultados de una encuesta: la lista entera, hasta que alguien rinde
+ *     (submitSurvey), cambian las preguntas o se borra la encuesta. Después
+ *     de cada entrega la próxima lectura vuelve a pedir la lista completa:
+ *     en una encuesta muy rendida el costo sigue creciendo con los intentos.
+ *   - Resumen de una capacitación: cada ítem que alguien termina por primera
+ *     vez suma en completed_items_total sin volver a preguntar, pero sólo si
+ *     el backend lo dice (`newly_completed`); si no lo manda, ante un
+ *     completed_at se descarta el resumen y se vuelve a pedir.
+ *
+ * Los agregados incrementales de verdad (tablas de rollup que se actualizan
+ * con cada intento y progreso, con su reconstrucción) van en el esquema del
+ * backend, donde viven esas tablas; no en este repo.
+ *
+ * En cluster cada worker tiene su copia: toda escritura toca el sello de la
+ * encuesta o capacitación (lib/shared-store) y una copia armada antes del
+ * sello se vuelve a pedir. Cada `TTL_MS` se pide igual, para levantar lo
+ * escrito por fuera de la app (cargas o correcciones a mano).
+ */
+
+import { api } from '@/lib/api-client'
+import { clustered, stampTime, touchStamp } from '@/lib/shared-store'
+import type { SurveyAttemptRow, TrainingItem } from '@/lib/data-manager'
+
+const TTL_MS = 10 * 60_000
+
+export interface TrainingSummary {
+  training_id: number
+  title: string
+  students: number
+  collected: number
+  currency: string
+  items: number
+  completed_items_total: number
+}
+
+interface Cached<T> {
+  value: T
+  builtAt: number
+}
+
+/** ¿La copia sigue valiendo? Vencida, o en cluster con un sello posterior, no. */
+async function fresh(cached: Cached<unknown> | undefined, stamp: string): Promise<boolean> {
+  if (!cached || Date.now() - cached.builtAt > TTL_MS) return false
+  return !clustered || (await stampTime(stamp)) < cached.builtAt
+}
+
+function touch(stamp: string) {
+  if (clustered) void touchStamp(stamp).catch(() => {})
+}
+
+// ── Resultados de encuestas ───────────────────────────────────────────────
+
+const surveys = new Map<number, Cached<SurveyAttemptRow[]>>()
+const surveyStamp = (surveyId: number) => `survey-results-${surveyId}`
+
+export async function surveyResults(surveyId: number): Promise<SurveyAttemptRow[]> {
+  const hit = surveys.get(surveyId)
+  if (await fresh(hit, surveyStamp(surveyId))) return structuredClone(hit!.value)
+
+  // Se toma al PEDIR: un intento que entre mientras viaja la respuesta deja
+  // un sello posterior y la próxima lectura vuelve a pedir.
+  const builtAt = Date.now()
+  const rows = await api.get<SurveyAttemptRow[]>(`/encuestas/${surveyId}/resultados`)
+  surveys.set(surveyId, { value: rows, builtAt })
+  return structuredClone(rows)
+}
+
+/** Alguien rindió, cambiaron las preguntas o se borró la encuesta. */
+export function dropSurveyResults(surveyId: number) {
+  surveys.delete(surveyId)
+  touch(surveyStamp(surveyId))
+}
+
+// ── Resumen de capacitaciones ─────────────────────────────────────────────
+
+const summaries = new Map<number, Cached<TrainingSummary>>()
+/** Ítem → capacitación, aprendido de las lecturas que traen los ítems. */
+const itemTraining = new Map<number, number>()
+const summaryStamp = (trainingId: number) => `training-summary-${trainingId}`
+const ALL_SUMMARIES = 'training-summary-all'
+
+export async function trainingSummary(trainingId: number): Promise<TrainingSummary> {
+  const hit = summaries.get(trainingId)
+  if ((await fresh(hit, summaryStamp(trainingId))) && (await fresh(hit, ALL_SUMMARIES))) {
+    return { ...hit!.value }
+  }
+
+  const builtAt = Date.now()
+  const summary = await api.get<TrainingSummary>(`/capacitaciones/${trainingId}/resumen`)
+  summaries.set(trainingId, { value: summary, builtAt })
+  return { ...summary }
+}
+
+export function rememberTrainingItems(items: Pick<TrainingItem, 'id' | 'training_id'>[] | undefined) {
+  for (const item of items ?? []) itemTraining.set(item.id, item.training_id)
+}
+
+/**
+ * Suma una terminación al resumen si el ping que acaba de volver es el que
+ * completó el ítem. Un backend que no manda `newly_completed` no deja
+ * saberlo: ante un completed_at se descarta el resumen.
+ */
+export function noteTrainingProgress(
+  itemId: number,
+  progress: { completed_at?: string | null; newly_completed?: boolean },
+) {
+  if (progress.newly_completed === false || !progress.completed_at) return
+
+  const trainingId = itemTraining.get(itemId)
+  if (trainingId === undefined) {
+    // Sin saber de qué capacitación es, no queda otra que descartar todos.
+    if (progress.newly_completed) invalidateTrainingSummaries()
+    return
+  }
+  const hit = summaries.get(trainingId)
+  if (hit && progress.newly_completed) hit.value.completed_items_total++
+  else summaries.delete(trainingId)
+  touch(summaryStamp(trainingId))
+}
+
+/** Habilitaciones, pagos o ítems cambiaron: el próximo resumen se recalcula. */
+export function invalidateTrainingSummaries(trainingId?: number) {
+  if (trainingId === undefined) {
+    summaries.clear()
+    touch(ALL_SUMMARIES)
+  } else {
+    summaries.delete(trainingId)
+    touch(summaryStamp(trainingId))
+  }
+}
@@ -0,0 +1,71 @@
+/**
+ * lib/verified-tokens.ts — Lo que se repite en cada request autenticado
+ * ======================================================================
+ * El middleware (y getSessionUser en cada API route) verificaba la firma del
+ * MISMO token en cada navegación, y recorría la lista de rutas protegidas
+ * una por una. Acá están las dos piezas para no repetirlo:
+ *
+ *   - VerifiedTokenCache: LRU acotado de tokens ya verificados. La clave es
+ *     el SHA-256 del token entero (no sólo la firma: con la firma sola, un
+ *     payload cambiado pegado a una firma válida acertaría en la cache). Una
+ *     entrada vence con el `exp` del token o a los `maxAgeMs`, lo que llegue
+ *     antes.
+ *   - compilePrefixMatcher: la lista de prefijos pasa a un Set del primer
+ *     segmento del path; chequear una ruta es una búsqueda, no un recorrido.
+ *
+ * Sin imports de Node: el middleware corre en el runtime Edge.
+ */
+
+export class VerifiedTokenCache<T> {
+  private entries = new Map<string, { expires: number; payload: T }>()
+
+  constructor(private readonly max = 500, private readonly maxAgeMs = 5 * 60_000) {}
+
+  get(digest: string, now = Date.now()): T | undefined {
+    const hit = this.entries.get(digest)
+    if (!hit) return undefined
+    if (hit.expires <= now) {
+      this.entries.delete(digest)
+      return undefined
+    }
+    // Reinsertar lo deja al final: el Map queda ordenado del menos al más usado.
+    this.entries.delete(digest)
+    this.entries.set(digest, hit)
+    return hit.payload
+  }
+
+  /** `exp` en segundos, como viene en el JWT. Sin exp, sólo manda maxAgeMs. */
+  set(digest: string, payload: T, exp?: number, now = Date.now()) {
+    const expires = Math.min(exp ? exp * 1000 : Infinity, now + this.maxAgeMs)
+    if (expires <= now) return
+    this.entries.delete(digest)
+    this.entries.set(digest, { expires, payload })
+    if (this.entries.size > this.max) {
+      this.entries.delete(this.entries.keys().next().value as string)
+    }
+  }
+
+  get size() {
+    return this.entries.size
+  }
+}
+
+/** SHA-256 del token en hex, con Web Crypto (sirve en Edge y en Node). */
+export async function tokenDigest(token: string): Promise<string> {
+  const hash = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(token))
+  let hex = ''
+  for (const b of new Uint8Array(hash)) hex += b.toString(16).padStart(2, '0')
+  return hex
+}
+
+/**
+ * `['/inventario', '/voluntarios']` → función que dice si un path es alguno
+ * de esos o está debajo. Los prefijos tienen que ser de un solo segmento.
+ */
+export function compilePrefixMatcher(prefixes: readonly string[]): (pathname: string) => boolean {
+  const heads = new Set(prefixes)
+  return (pathname) => {
+    const cut = pathname.indexOf('/', 1)
+    return heads.has(cut === -1 ? pathname : pathname.slice(0, cut))
+  }
+}
@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+"""
+load_test.py — ALMA Platform — Prueba de carga contra `next start`
+===================================================================
+Mantiene N conexiones abiertas (keep-alive) pidiendo las mismas URLs durante
+un tiempo fijo y reporta requests por segundo, errores y percentiles de
+latencia. Sirve para comparar el modo cluster contra un solo proceso:
+
+    npm run build && pm2 start ecosystem.config.js          # un worker
+    python load_test.py --seconds 30
+    pm2 delete alma-platform && ALMA_WORKERS=4 pm2 start ecosystem.config.js
+    python load_test.py --seconds 30
+
+Con la app sin más cambios, el throughput tiene que crecer con los workers
+hasta que el cuello pase a ser el backend o la red.
+
+    python load_test.py --url http://localhost:3000 --path /login --path /api/health
+    python load_test.py --concurrency 200 --seconds 60 --cookie alma_token=...
+
+Con --journeys, en vez de URLs fijas se simulan usuarios: cada uno inicia
+sesión con una cuenta sembrada (voluntarios y participantes de seed_db.py,
+con su PIN por defecto, o las de un CSV generado para una carga grande) y
+recorre caminos reales de la app, elegidos al azar según su peso:
+
+    calendar       abre el mes en el calendario
+    enroll         se anota (o se desanota) a un evento      [participantes]
+    personas       conteo y listado de personas               [staff]
+    notifications  la campanita
+    download       lista archivos y baja uno
+
+    python load_test.py --journeys --concurrency 40 --seconds 60
+    python load_test.py --journeys --rate 25 --mix calendar=5,enroll=2,download=1
+    python load_test.py --journeys --accounts cuentas.csv     # email,rol[,pin]
+
+--concurrency es el modelo cerrado: N usuarios que encadenan caminos con
+una pausa (--think) entre uno y otro. --rate es el modelo abierto: llegan
+tantas sesiones por segundo (Poisson) sin importar cuánto tarde la app, y
+--concurrency pasa a ser el tope de sesiones en curso. El reporte trae
+throughput, percentiles de latencia y errores por endpoint.
+
+Todo local: contra `next start` y, detrás, el backend real o el de prueba
+en memoria (backend_standin.py, que también escribe el CSV de cuentas).
+
+Solo usa la biblioteca estándar (asyncio sobre sockets, HTTP/1.1 a mano).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import random
+import sys
+import time
+from datetime import date
+from urllib.parse import urlsplit
+
+GREEN  = "\033[92m"
+RED    = "\033[91m"
+YELLOW = "\033[93m"
+CYAN   = "\033[96m"
+RESET  = "\033[0m"
+BOLD   = "\033[1m"
+DIM    = "\033[2m"
+
+def ok(msg):  print(f"  {GREEN}✓{RESET}  {msg}")
+def err(msg): print(f"  {RED}✗  {msg}{RESET}")
+def info(msg):print(f"  {CYAN}→{RESET}  {msg}")
+def sep():    print(f"  {DIM}{'─' * 50}{RESET}")
+
+# ──────────────────────────────────────────────────────────────────
+# Cliente HTTP/1.1 mínimo
+# ──────────────────────────────────────────────────────────────────
+
+class HttpConnection:
+    """Una conexión keep-alive. Se reabre sola si el servidor la cierra."""
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+
+    async def close(self) -> None:
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, method: str, path: str, body: bytes = b"",
+                      headers: dict[str, str] | None = None) -> tuple[int, dict[str, str], bytes]:
+        reused = self.writer is not None
+        try:
+            return await self._request(method, path, body, headers)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            await self.close()
+            # Una conexión reusada puede haberla cerrado el servidor por
+            # inactividad (keep-alive timeout): se reintenta una vez en limpio.
+            if not reused:
+                raise
+            return await self._request(method, path, body, headers)
+
+    async def _request(self, method, path, body, headers):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                 f"Content-Length: {len(body)}"]
+        lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            await self.close()
+            raise ConnectionError("el servidor cerró la conexión")
+        version, status = status_line.split()[0], int(status_line.split()[1])
+        resp_headers: dict[str, str] = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            k, _, v = line.decode("latin-1").partition(":")
+            key = k.strip().lower()
+            # Set-Cookie puede venir repetido: se juntan.
+            resp_headers[key] = f"{resp_headers[key]}\n{v.strip()}" if key in resp_headers else v.strip()
+
+        if resp_headers.get("transfer-encoding", "").lower() == "chunked":
+            data = bytearray()
+            while size := int((await self.reader.readline()).split(b";")[0], 16):
+                data += await self.reader.readexactly(size)
+                await self.reader.readexactly(2)
+            await self.reader.readline()
+            payload = bytes(data)
+        elif "content-length" in resp_headers:
+            payload = await self.reader.readexactly(int(resp_headers["content-length"]))
+        else:
+            payload = await self.reader.read()
+            await self.close()
+
+        connection = resp_headers.get("connection", "").lower()
+        if connection == "close" or (version == b"HTTP/1.0" and connection != "keep-alive"):
+            await self.close()
+        return status, resp_headers, payload
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+# ──────────────────────────────────────────────────────────────────
+# Carga
+# ──────────────────────────────────────────────────────────────────
+
+async def worker(host: str, port: int, paths: list[str], headers: dict[str, str],
+                 deadline: float, latencies: list[float], errors: dict[str, int], offset: int) -> None:
+    conn = HttpConnection(host, port)
+    i = offset
+    try:
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                status, _, _ = await conn.request("GET", path, headers=headers)
+            except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                await conn.close()
+                continue
+            if status >= 500:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+            else:
+                latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        await conn.close()
+
+
+async def run(args) -> int:
+    url = urlsplit(args.url)
+    host, port = url.hostname or "localhost", url.port or 80
+    paths = args.path or ["/login"]
+    headers = {"Cookie": args.cookie} if args.cookie else {}
+
+    print(f"\n{BOLD}Prueba de carga ALMA{RESET}")
+    info(f"{args.url} · {', '.join(paths)}")
+    info(f"{args.concurrency} conexiones · {args.seconds}s (+{args.warmup}s de calentamiento)")
+    sep()
+
+    if args.warmup:
+        # El primer request a cada ruta compila / llena caches: no se mide.
+        await asyncio.gather(*(worker(host, port, paths, headers, time.perf_counter() + args.warmup, [], {}, n)
+                               for n in range(min(args.concurrency, 8))))
+
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+    started = time.perf_counter()
+    deadline = started + args.seconds
+    await asyncio.gather(*(worker(host, port, paths, headers, deadline, latencies, errors, n)
+                           for n in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    failed = sum(errors.values())
+    total = len(latencies) + failed
+    if not total:
+        err("No se completó ningún request. ¿Está levantada la app?")
+        return 1
+
+    ok(f"{len(latencies)} ok · {total / elapsed:,.0f} req/s")
+    info("latencia ms  p50 {:.1f} · p90 {:.1f} · p99 {:.1f} · máx {:.1f}".format(
+        percentile(latencies, 50), percentile(latencies, 90), percentile(latencies, 99),
+        latencies[-1] if latencies else 0.0))
+    if failed:
+        detail = ", ".join(f"{k}×{v}" for k, v in sorted(errors.items()))
+        print(f"  {YELLOW}!{RESET}  {failed} errores ({failed / total:.1%}): {detail}")
+    print()
+    return 0 if failed / total < args.max_error_rate else 1
+
+
+# ──────────────────────────────────────────────────────────────────
+# Recorridos de usuario (--journeys)
+# ──────────────────────────────────────────────────────────────────
+
+STAFF_ROLES = ("admin", "voluntario")
+
+
+class Account:
+    def __init__(self, email: str, role: str, pin: str):
+        self.email, self.role, self.pin = email, role, pin
+        self.cookie: str | None = None
+        self.login_lock = asyncio.Lock()
+
+
+def seed_accounts() -> list[Account]:
+    """Las cuentas de seed_db.py, con su PIN por defecto."""
+    import seed_db
+    accounts = [Account(v[6], "admin" if v[9] else "voluntario", seed_db.DEFAULT_PIN) for v in seed_db.VOLUNTARIOS]
+    accounts += [Account(email, "participante", seed_db.DEFAULT_PIN)
+                 for email, active in seed_db.PARTICIPANTES if active]
+    return accounts
+
+
+def csv_accounts(path: str, default_pin: str) -> list[Account]:
+    """Una cuenta por línea: email,rol[,pin]. Las líneas con # se saltean."""
+    accounts = []
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if not row or row[0].lstrip().startswith("#") or row[0].strip().lower() == "email":
+                continue
+            pin = row[2].strip() if len(row) > 2 and row[2].strip() else default_pin
+            accounts.append(Account(row[0].strip().lower(), row[1].strip().lower(), pin))
+    return accounts
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.client_errors = 0
+        self.errors: dict[str, int] = {}
+
+    @property
+    def failed(self) -> int:
+        return sum(self.errors.values())
+
+
+class JourneyError(Exception):
+    """El camino no puede seguir (login rechazado, error del servidor)."""
+
+
+class Session:
+    """Un usuario recorriendo la app: su cuenta, una conexión y las métricas."""
+
+    def __init__(self, conn: HttpConnection, account: Account, stats: dict[str, EndpointStats]):
+        self.conn, self.account, self.stats = conn, account, stats
+
+    async def call(self, label: str, method: str, path: str, payload=None, login: bool = False):
+        st = self.stats.setdefault(label, EndpointStats())
+        headers = {}
+        body = b""
+        if payload is not None:
+            body = json.dumps(payload).encode()
+            headers["Content-Type"] = "application/json"
+        if not login:
+            await self.ensure_login()
+            headers["Cookie"] = self.account.cookie
+        start = time.perf_counter()
+        try:
+            status, resp_headers, data = await self.conn.request(method, path, body, headers)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            st.errors[type(e).__name__] = st.errors.get(type(e).__name__, 0) + 1
+            await self.conn.close()
+            raise JourneyError(label) from e
+        elapsed = (time.perf_counter() - start) * 1000
+        if status >= 500:
+            st.errors[str(status)] = st.errors.get(str(status), 0) + 1
+            raise JourneyError(label)
+        st.latencies.append(elapsed)
+        if status >= 400:
+            st.client_errors += 1
+        if status == 401 and not login:
+            # El token venció o se invalidó: el próximo camino vuelve a entrar.
+            self.account.cookie = None
+            raise JourneyError(label)
+        if "application/json" in resp_headers.get("content-type", ""):
+            return status, resp_headers, json.loads(data or b"null")
+        return status, resp_headers, data
+
+    async def ensure_login(self) -> None:
+        # Una sesión por cuenta, como un navegador: el login (bcrypt) no se
+        # repite en cada camino, y dos usuarios con la misma cuenta esperan
+        # al primero en vez de loguearse los dos.
+        if self.account.cookie:
+            return
+        async with self.account.login_lock:
+            if self.account.cookie:
+                return
+            status, headers, _ = await self.call(
+                "POST /api/auth", "POST", "/api/auth",
+                {"email": self.account.email, "pin": self.account.pin, "remember": False}, login=True)
+            for cookie in headers.get("set-cookie", "").split("\n"):
+                if cookie.startswith("alma_token="):
+                    self.account.cookie = cookie.split(";", 1)[0]
+            if status != 200 or not self.account.cookie:
+                raise JourneyError(f"login rechazado para {self.account.email} ({status})")
+
+
+def some_month() -> tuple[int, int]:
+    """Casi siempre el mes actual; a veces el anterior o el siguiente."""
+    today = date.today()
+    shift = random.choices((-1, 0, 1), weights=(1, 6, 2))[0]
+    month = today.month + shift
+    year = today.year + (month > 12) - (month < 1)
+    return year, (month - 1) % 12 + 1
+
+
+async def journey_calendar(s: Session) -> None:
+    year, month = some_month()
+    await s.call("GET /api/calendarios", "GET", f"/api/calendarios?year={year}&month={month}")
+    await s.call("GET /api/calendarios/inscripcion", "GET", "/api/calendarios/inscripcion")
+
+
+async def journey_enroll(s: Session) -> None:
+    today = date.today()
+    _, _, events = await s.call("GET /api/calendarios", "GET",
+                                f"/api/calendarios?year={today.year}&month={today.month}")
+    _, _, mine = await s.call("GET /api/calendarios/inscripcion", "GET", "/api/calendarios/inscripcion")
+    if not isinstance(events, list) or not events:
+        return
+    event_id = random.choice(events)["id"]
+    # Alterna: si ya estaba anotado se desanota, así la carga no llena los cupos.
+    if isinstance(mine, list) and event_id in mine:
+        await s.call("DELETE /api/calendarios/inscripcion", "DELETE",
+                     f"/api/calendarios/inscripcion?event_id={event_id}")
+    else:
+        await s.call("POST /api/calendarios/inscripcion", "POST", "/api/calendarios/inscripcion",
+                     {"event_id": event_id})
+
+
+async def journey_personas(s: Session) -> None:
+    await s.call("GET /api/personas", "GET", "/api/personas")
+    await s.call("GET /api/personas/registros", "GET", "/api/personas/registros")
+
+
+async def journey_notifications(s: Session) -> None:
+    await s.call("GET /api/notifications", "GET", "/api/notifications")
+
+
+async def journey_download(s: Session) -> None:
+    _, _, files = await s.call("GET /api/files", "GET", "/api/files")
+    if isinstance(files, list) and files:
+        guid = random.choice(files)["guid"]
+        await s.call("GET /api/files/[guid]/raw", "GET", f"/api/files/{guid}/raw")
+
+
+# nombre → (función, roles que lo recorren, peso por defecto)
+JOURNEYS = {
+    "calendar":      (journey_calendar,      None,                 4),
+    "enroll":        (journey_enroll,        ("participante",),    2),
+    "personas":      (journey_personas,      STAFF_ROLES,          2),
+    "notifications": (journey_notifications, None,                 3),
+    "download":      (journey_download,      None,                 1),
+}
+
+
+def parse_mix(text: str | None) -> dict[str, float]:
+    weights = {name: float(w) for name, (_, _, w) in JOURNEYS.items()}
+    for part in filter(None, (text or "").split(",")):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in JOURNEYS:
+            raise SystemExit(f"Recorrido desconocido: {name} (hay: {', '.join(JOURNEYS)})")
+        weights[name] = float(weight or 1)
+    return {k: v for k, v in weights.items() if v > 0}
+
+
+class JourneyRunner:
+    def __init__(self, host: str, port: int, accounts: list[Account], mix: dict[str, float]):
+        self.host, self.port = host, port
+        self.accounts, self.mix = accounts, mix
+        self.stats: dict[str, EndpointStats] = {}
+        self.journeys_ok = 0
+        self.journeys_failed = 0
+
+    def pick(self) -> tuple[str, Account] | None:
+        name = random.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        roles = JOURNEYS[name][1]
+        candidates = [a for a in self.accounts if roles is None or a.role in roles]
+        if not candidates:
+            return None
+        return name, random.choice(candidates)
+
+    async def one(self, conn: HttpConnection) -> None:
+        picked = self.pick()
+        if not picked:
+            return
+        name, account = picked
+        try:
+            await JOURNEYS[name][0](Session(conn, account, self.stats))
+            self.journeys_ok += 1
+        except JourneyError:
+            self.journeys_failed += 1
+
+    async def closed(self, users: int, deadline: float, think_ms: float) -> None:
+        async def user():
+            conn = HttpConnection(self.host, self.port)
+            try:
+                while time.perf_counter() < deadline:
+                    await self.one(conn)
+                    if think_ms:
+                        await asyncio.sleep(random.expovariate(1000 / think_ms))
+            finally:
+                await conn.close()
+        await asyncio.gather(*(user() for _ in range(users)))
+
+    async def open(self, rate: float, deadline: float, max_sessions: int) -> int:
+        """Devuelve cuántas llegadas se descartaron por el tope de sesiones."""
+        pool: asyncio.Queue[HttpConnection] = asyncio.Queue()
+        for _ in range(max_sessions):
+            pool.put_nowait(HttpConnection(self.host, self.port))
+        tasks: set[asyncio.Task] = set()
+        dropped = 0
+
+        async def arrival(conn: HttpConnection):
+            try:
+                await self.one(conn)
+            finally:
+                pool.put_nowait(conn)
+
+        while (now := time.perf_counter()) < deadline:
+            await asyncio.sleep(min(random.expovariate(rate), deadline - now))
+            if pool.empty():
+                # Sin lugar: en el modelo abierto la llegada no espera.
+                dropped += 1
+                continue
+            task = asyncio.create_task(arrival(pool.get_nowait()))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        while not pool.empty():
+            await pool.get_nowait().close()
+        return dropped
+
+
+def report_endpoints(stats: dict[str, EndpointStats], elapsed: float) -> tuple[int, int]:
+    print(f"  {'endpoint':<38} {'req':>7} {'req/s':>7} {'p50':>7} {'p90':>7} {'p99':>7} {'4xx':>5} {'err':>6}")
+    total = failed = 0
+    for label in sorted(stats):
+        st = stats[label]
+        lat = sorted(st.latencies)
+        n = len(lat) + st.failed
+        total += n
+        failed += st.failed
+        color = RED if st.failed else ""
+        print(f"  {label:<38} {n:>7} {n / elapsed:>7.1f} {percentile(lat, 50):>7.1f} "
+              f"{percentile(lat, 90):>7.1f} {percentile(lat, 99):>7.1f} {st.client_errors:>5} "
+              f"{color}{st.failed / n if n else 0:>6.1%}{RESET}")
+    return total, failed
+
+
+async def run_journeys(args) -> int:
+    url = urlsplit(args.url)
+    host, port = url.hostname or "localhost", url.port or 80
+    accounts = csv_accounts(args.accounts, args.pin) if args.accounts else seed_accounts()
+    mix = parse_mix(args.mix)
+
+    print(f"\n{BOLD}Prueba de carga ALMA — recorridos{RESET}")
+    roles = {}
+    for a in accounts:
+        roles[a.role] = roles.get(a.role, 0) + 1
+    info(f"{args.url} · {len(accounts)} cuentas ({', '.join(f'{n} {r}' for r, n in sorted(roles.items()))})")
+    info("mezcla: " + ", ".join(f"{k}={v:g}" for k, v in mix.items()))
+    if args.rate:
+        info(f"modelo abierto: {args.rate:g} sesiones/s · tope {args.concurrency} en curso · {args.seconds}s")
+    else:
+        info(f"modelo cerrado: {args.concurrency} usuarios · pausa ~{args.think:g}ms · {args.seconds}s")
+    sep()
+
+    if args.warmup:
+        # Logins y primeras compilaciones fuera de la medición. Las cookies
+        # quedan: la medición arranca con las sesiones ya abiertas.
+        warm = JourneyRunner(host, port, accounts, mix)
+        await warm.closed(min(args.concurrency, 8), time.perf_counter() + args.warmup, 0)
+
+    runner = JourneyRunner(host, port, accounts, mix)
+    started = time.perf_counter()
+    deadline = started + args.seconds
+    dropped = 0
+    if args.rate:
+        dropped = await runner.open(args.rate, deadline, args.concurrency)
+    else:
+        await runner.closed(args.concurrency, deadline, args.think)
+    elapsed = time.perf_counter() - started
+
+    total, failed = report_endpoints(runner.stats, elapsed)
+    sep()
+    if not total:
+        err("No se completó ningún request. ¿Está levantada la app?")
+        return 1
+    journeys = runner.journeys_ok + runner.journeys_failed
+    ok(f"{total} requests · {total / elapsed:,.1f} req/s · {journeys / elapsed:,.1f} recorridos/s")
+    if runner.journeys_failed:
+        print(f"  {YELLOW}!{RESET}  {runner.journeys_failed} recorridos cortados por error "
+              f"({runner.journeys_failed / journeys:.1%})")
+    if dropped:
+        print(f"  {YELLOW}!{RESET}  {dropped} llegadas descartadas: tope de {args.concurrency} sesiones en curso")
+    print()
+    return 0 if failed / total < args.max_error_rate else 1
+
+
+def main() -> int:
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+    parser = argparse.ArgumentParser(description="Prueba de carga contra la app Next.")
+    parser.add_argument("--url", default="http://localhost:3000", help="base de la app (solo http)")
+    parser.add_argument("--path", action="append", help="ruta a pedir; se puede repetir (default /login)")
+    parser.add_argument("--concurrency", type=int, default=50, help="conexiones simultáneas")
+    parser.add_argument("--seconds", type=float, default=20, help="duración de la medición")
+    parser.add_argument("--warmup", type=float, default=3, help="segundos sin medir al principio")
+    parser.add_argument("--cookie", help="header Cookie para rutas autenticadas (alma_token=...)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01,
+                        help="por encima de esta proporción de errores sale con código 1")
+    journeys = parser.add_argument_group("recorridos")
+    journeys.add_argument("--journeys", action="store_true", help="simular usuarios en vez de URLs fijas")
+    journeys.add_argument("--mix", help="pesos por recorrido: calendar=4,enroll=2,... (0 lo apaga)")
+    journeys.add_argument("--rate", type=float, default=0, help="sesiones nuevas por segundo (modelo abierto)")
+    journeys.add_argument("--think", type=float, default=500, help="pausa media entre recorridos, ms (modelo cerrado)")
+    journeys.add_argument("--accounts", help="CSV email,rol[,pin] en vez de las cuentas de seed_db.py")
+    journeys.add_argument("--pin", default="1234", help="PIN de las cuentas del CSV que no traen uno")
+    args = parser.parse_args()
+    if urlsplit(args.url).scheme != "http":
+        err("Solo http: apuntá al puerto de next start, no al proxy TLS.")
+        return 2
+    try:
+        return asyncio.run(run_journeys(args) if args.journeys else run(args))
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
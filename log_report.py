@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+log_report.py — ALMA Platform — Reporte de los logs de la app
+===============================================================
+Lee los app.log que escribe lib/logger.ts (también los rotados .gz) y arma
+un resumen por módulo / acción / usuario y por ventana de tiempo: cantidad de
+líneas, tasa de errores y latencia cuando la meta trae una duración.
+
+    python log_report.py                              # logs/prod, por módulo
+    python log_report.py logs/dev --by module,action
+    python log_report.py app.log app.log.1.gz --window 15m --top 20
+    python log_report.py logs/prod --csv reporte.csv  # una fila por ventana y grupo
+
+Formato de línea (ver lib/logger.ts):
+
+    timestamp | LEVEL | user=X | module=Y | action=Z | message=... | meta={...}
+
+Nunca carga un archivo entero en memoria: los .gz se leen como stream y los
+archivos planos grandes se parten en tramos (mmap) que se procesan en
+paralelo, uno por núcleo. Solo usa la biblioteca estándar.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import gzip
+import mmap
+import os
+import re
+import sys
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+GROUP_FIELDS = ("module", "action", "user")
+
+# Claves de la meta que se leen como duración en milisegundos.
+LATENCY_RE = re.compile(rb'"(?:duration_ms|latency_ms|elapsed_ms|ms)"\s*:\s*(-?\d+(?:\.\d+)?)')
+
+# Histograma fijo para la latencia: se puede sumar entre procesos y alcanza
+# para un p95 aproximado sin guardar cada muestra.
+LATENCY_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+# Archivos planos más grandes que esto se parten en tramos paralelos.
+SPLIT_THRESHOLD = 64 * 1024 * 1024
+
+
+# ──────────────────────────────────────────────────────────────────
+# 1. Acumulador
+# ──────────────────────────────────────────────────────────────────
+
+def new_stats() -> list:
+    # [líneas, errores, warnings, n latencia, suma latencia, max latencia, histograma]
+    return [0, 0, 0, 0, 0.0, 0.0, [0] * (len(LATENCY_BOUNDS) + 1)]
+
+
+def merge_into(total: dict, part: dict) -> None:
+    for key, s in part.items():
+        t = total.get(key)
+        if t is None:
+            total[key] = s
+            continue
+        for i in range(4):
+            t[i] += s[i]
+        t[4] += s[4]
+        t[5] = max(t[5], s[5])
+        t[6] = [a + b for a, b in zip(t[6], s[6])]
+
+
+def percentile(hist: list, q: float, maximum: float) -> float | None:
+    """Cota superior del bucket donde cae el percentil, sin pasarse del máximo visto."""
+    n = sum(hist)
+    if not n:
+        return None
+    target = q * n
+    seen = 0
+    for i, c in enumerate(hist):
+        seen += c
+        if seen >= target:
+            return min(float(LATENCY_BOUNDS[i]), maximum) if i < len(LATENCY_BOUNDS) else maximum
+    return None
+
+
+# ──────────────────────────────────────────────────────────────────
+# 2. Parseo
+# ──────────────────────────────────────────────────────────────────
+
+def parse_lines(lines, group_by: tuple, window_s: int, since: float | None, until: float | None) -> dict:
+    """Agrega un iterable de líneas (bytes). Devuelve {(ventana, grupo): stats}."""
+    stats: dict = {}
+    minute_cache: dict = {}
+
+    for line in lines:
+        parts = line.rstrip(b"\r\n").split(b" | ")
+        if len(parts) < 4:
+            continue
+
+        # Se cachea el epoch por minuto: parsear la fecha entera en cada línea
+        # es lo más caro del loop y en un log hay miles de líneas por minuto.
+        ts = parts[0]
+        minute = ts[:16]
+        base = minute_cache.get(minute)
+        if base is None:
+            try:
+                base = datetime.fromisoformat(minute.decode() + ":00+00:00").timestamp()
+            except ValueError:
+                continue
+            minute_cache[minute] = base
+        try:
+            epoch = base + float(ts[17:19] or 0)
+        except ValueError:
+            epoch = base
+        if since is not None and epoch < since:
+            continue
+        if until is not None and epoch >= until:
+            continue
+
+        fields = {"user": parts[2][5:] if parts[2].startswith(b"user=") else b"?", "module": b"-", "action": b"-"}
+        for p in parts[3:5]:
+            if p.startswith(b"module="):
+                fields["module"] = p[7:]
+            elif p.startswith(b"action="):
+                fields["action"] = p[7:]
+
+        key = (int(epoch // window_s * window_s), b",".join(fields[g] for g in group_by))
+        s = stats.get(key)
+        if s is None:
+            s = stats[key] = new_stats()
+
+        s[0] += 1
+        level = parts[1].rstrip()
+        if level == b"ERROR":
+            s[1] += 1
+        elif level == b"WARN":
+            s[2] += 1
+
+        if b"_ms" in parts[-1] or b'"ms"' in parts[-1]:
+            m = LATENCY_RE.search(parts[-1])
+            if m:
+                ms = float(m.group(1))
+                s[3] += 1
+                s[4] += ms
+                if ms > s[5]:
+                    s[5] = ms
+                s[6][bisect_left(LATENCY_BOUNDS, ms)] += 1
+
+    return stats
+
+
+def iter_range(path: str, start: int, end: int):
+    """Líneas completas de un tramo [start, end) de un archivo plano, vía mmap."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # Cada tramo arranca en la línea siguiente al corte; la que queda
+        # partida la procesa el tramo anterior, que lee hasta su final.
+        if start > 0:
+            nl = mm.find(b"\n", start - 1)
+            if nl < 0:
+                return
+            start = nl + 1
+        pos = start
+        while pos < end:
+            nl = mm.find(b"\n", pos)
+            if nl < 0:
+                yield mm[pos:]
+                return
+            yield mm[pos:nl + 1]
+            pos = nl + 1
+
+
+def process_task(task: tuple) -> dict:
+    path, start, end, group_by, window_s, since, until = task
+    if path.endswith(".gz"):
+        with gzip.open(path, "rb") as f:
+            return parse_lines(f, group_by, window_s, since, until)
+    if start is None:
+        with open(path, "rb") as f:
+            return parse_lines(f, group_by, window_s, since, until)
+    return parse_lines(iter_range(path, start, end), group_by, window_s, since, until)
+
+
+# ──────────────────────────────────────────────────────────────────
+# 3. Entrada / salida
+# ──────────────────────────────────────────────────────────────────
+
+def collect_files(paths: list[str]) -> list[str]:
+    files = []
+    for raw in paths:
+        p = Path(raw)
+        if p.is_dir():
+            files.extend(sorted(str(f) for f in p.iterdir() if f.name.startswith("app.log") and f.is_file()))
+        elif p.is_file():
+            files.append(str(p))
+        else:
+            print(f"  No existe: {raw}", file=sys.stderr)
+    return files
+
+
+def parse_window(text: str) -> int:
+    m = re.fullmatch(r"(\d+)([smhd])", text.strip())
+    if not m:
+        raise argparse.ArgumentTypeError("ventana inválida (ej: 30s, 15m, 1h, 1d)")
+    return int(m.group(1)) * {"s": 1, "m": 60, "h": 3600, "d": 86400}[m.group(2)]
+
+
+def parse_date(text: str) -> float:
+    dt = datetime.fromisoformat(text)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def build_tasks(files: list[str], workers: int, args, group_by: tuple) -> list[tuple]:
+    tasks = []
+    for path in files:
+        size = os.path.getsize(path)
+        if path.endswith(".gz") or size < SPLIT_THRESHOLD or size == 0:
+            tasks.append((path, None, None, group_by, args.window, args.since, args.until))
+            continue
+        chunk = -(-size // workers)
+        for start in range(0, size, chunk):
+            tasks.append((path, start, min(start + chunk, size), group_by, args.window, args.since, args.until))
+    return tasks
+
+
+def fmt_ms(value: float | None) -> str:
+    if value is None:
+        return "-"
+    return f"{value:.0f}"
+
+
+def print_report(stats: dict, group_by: tuple, top: int, window_s: int) -> None:
+    totals: dict = {}
+    for (_, group), s in stats.items():
+        merge_into(totals, {group: [*s[:6], list(s[6])]})
+
+    lines = sum(s[0] for s in totals.values())
+    errors = sum(s[1] for s in totals.values())
+    print(f"\n  Líneas: {lines:,}   Errores: {errors:,} ({(errors / lines * 100) if lines else 0:.2f}%)")
+    print(f"  Agrupado por: {','.join(group_by)}   Ventana: {window_s}s\n")
+
+    header = f"  {'grupo':<40} {'líneas':>10} {'%err':>6} {'warn':>7} {'ms avg':>7} {'ms p95':>7} {'ms max':>8}"
+    print(header)
+    print("  " + "─" * (len(header) - 2))
+    ranked = sorted(totals.items(), key=lambda kv: kv[1][0], reverse=True)[:top]
+    for group, s in ranked:
+        avg = s[4] / s[3] if s[3] else None
+        print(
+            f"  {group.decode(errors='replace')[:40]:<40} {s[0]:>10,} {s[1] / s[0] * 100:>6.2f} {s[2]:>7,}"
+            f" {fmt_ms(avg):>7} {fmt_ms(percentile(s[6], 0.95, s[5])):>7} {fmt_ms(s[5] if s[3] else None):>8}"
+        )
+
+    # La ventana más cargada de cada uno de los grupos de arriba: dónde mirar primero.
+    print("\n  Pico por grupo:")
+    for group, _ in ranked[: min(top, 10)]:
+        peak = max(((w, s[0]) for (w, g), s in stats.items() if g == group), key=lambda x: x[1])
+        when = datetime.fromtimestamp(peak[0], tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
+        print(f"    {group.decode(errors='replace')[:40]:<40} {peak[1]:>8,} líneas  @ {when} UTC")
+    print()
+
+
+def write_csv(stats: dict, group_by: tuple, out: str) -> None:
+    with open(out, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["window_start", *group_by, "lines", "errors", "warnings", "error_rate",
+                    "latency_n", "latency_avg_ms", "latency_p95_ms", "latency_max_ms"])
+        for (window, group), s in sorted(stats.items()):
+            when = datetime.fromtimestamp(window, tz=timezone.utc).isoformat()
+            values = group.decode(errors="replace").split(",")
+            p95 = percentile(s[6], 0.95, s[5])
+            w.writerow([
+                when, *values, s[0], s[1], s[2], round(s[1] / s[0], 4),
+                s[3], round(s[4] / s[3], 1) if s[3] else "", "" if p95 is None else p95,
+                s[5] if s[3] else "",
+            ])
+
+
+def main() -> int:
+    # La consola de Windows arranca en cp1252 y se ahoga con los acentos.
+    if hasattr(sys.stdout, "reconfigure"):
+        sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+    parser = argparse.ArgumentParser(description="Resumen de los app.log de ALMA")
+    parser.add_argument("paths", nargs="*", default=[str(ROOT / "logs" / "prod")],
+                        help="archivos o carpetas (por defecto logs/prod)")
+    parser.add_argument("--by", default="module", help="module, action, user o combinación: module,action")
+    parser.add_argument("--window", type=parse_window, default=parse_window("1h"), help="30s, 15m, 1h, 1d…")
+    parser.add_argument("--since", type=parse_date, help="desde (ISO, UTC si no trae zona)")
+    parser.add_argument("--until", type=parse_date, help="hasta (ISO, excluido)")
+    parser.add_argument("--top", type=int, default=15, help="grupos a mostrar en el reporte")
+    parser.add_argument("--csv", help="en vez del reporte, escribe una fila por ventana y grupo")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    group_by = tuple(g.strip() for g in args.by.split(",") if g.strip())
+    bad = [g for g in group_by if g not in GROUP_FIELDS]
+    if not group_by or bad:
+        parser.error(f"--by acepta: {', '.join(GROUP_FIELDS)}")
+
+    files = collect_files(args.paths)
+    if not files:
+        print("  No hay logs para leer.", file=sys.stderr)
+        return 1
+
+    tasks = build_tasks(files, max(1, args.workers), args, group_by)
+    stats: dict = {}
+    if len(tasks) == 1 or args.workers <= 1:
+        for t in tasks:
+            merge_into(stats, process_task(t))
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for part in pool.map(process_task, tasks):
+                merge_into(stats, part)
+
+    if not stats:
+        print("  Ninguna línea coincide.", file=sys.stderr)
+        return 1
+
+    if args.csv:
+        write_csv(stats, group_by, args.csv)
+        print(f"  {len(stats):,} filas → {args.csv}")
+    else:
+        print_report(stats, group_by, args.top, args.window)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 import { NextRequest, NextResponse } from 'next/server'
 import { jwtVerify } from 'jose'
+import { VerifiedTokenCache, compilePrefixMatcher, tokenDigest } from '@/lib/verified-tokens'
 
 const PROTECTED_PATHS = [
   '/inventario',
@@ -25,14 +26,34 @@ const PROTECTED_PATHS = [
   '/inscripciones',
 ]
 
+const isProtected = compilePrefixMatcher(PROTECTED_PATHS)
+
+/** Tokens ya verificados: una navegación tras otra no vuelve a chequear la firma. */
+const verified = new VerifiedTokenCache<true>()
+
+// La clave HMAC se importa una vez como CryptoKey (y de nuevo sólo si cambia
+// JWT_SECRET): con los bytes crudos, jose la importaba en cada verificación.
+let key: { secret: string; key: Promise<CryptoKey> } | null = null
+
+function keyFor(secret: string): Promise<CryptoKey> {
+  if (key?.secret !== secret) {
+    const entry = {
+      secret,
+      key: crypto.subtle.importKey(
+        'raw', new TextEncoder().encode(secret), { name: 'HMAC', hash: 'SHA-256' }, false, ['verify'],
+      ),
+    }
+    // Si falla, el próximo request lo vuelve a intentar.
+    entry.key.catch(() => { if (key === entry) key = null })
+    key = entry
+  }
+  return key.key
+}
+
 export async function middleware(request: NextRequest) {
   const { pathname } = request.nextUrl
 
-  const isProtected = PROTECTED_PATHS.some(
-    (p) => pathname === p || pathname.startsWith(p + '/')
-  )
-
-  if (!isProtected) return NextResponse.next()
+  if (!isProtected(pathname)) return NextResponse.next()
 
   const token = request.cookies.get('alma_token')?.value
 
@@ -47,7 +68,11 @@ export async function middleware(request: NextRequest) {
     if (!secret) {
       return NextResponse.redirect(new URL('/?sesion=vencida', request.url))
     }
-    await jwtVerify(token, new TextEncoder().encode(secret))
+    const digest = await tokenDigest(token)
+    if (verified.get(digest)) return NextResponse.next()
+
+    const { payload } = await jwtVerify(token, await keyFor(secret))
+    verified.set(digest, true, payload.exp)
     return NextResponse.next()
   } catch {
     // Token inválido o expirado → redirigir al login y limpiar cookie
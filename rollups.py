@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+rollups.py — ALMA Platform — Reconstrucción de los rollups
+===========================================================
+Los rollups (ver init_db.py) se mantienen solos con triggers a medida que
+entran filas. Este script los recalcula desde los datos crudos cuando hace
+falta: después de cargar datos a mano, de restaurar un backup o si `check`
+encuentra diferencias.
+
+    python rollups.py activity rebuild     # activity_user_rollup / _counts
+    python rollups.py activity check       # compara contra GROUP BY en vivo
+    python rollups.py counters rebuild     # talleres.enrolled / grupos.participants
+    python rollups.py counters check
+
+El rebuild de actividad va por tramos de user_id, cada tramo en su propia
+transacción; el de contadores es una sola transacción corta. Los dos se
+pueden correr con la app andando.
+
+Dependencia única:
+    pip install mysql-connector-python
+"""
+
+import argparse
+import sys
+
+import init_db
+from init_db import DB_HOST, DB_NAME, DB_PASSWORD, DB_PORT, DB_USER
+
+GREEN  = "\033[92m"
+RED    = "\033[91m"
+YELLOW = "\033[93m"
+CYAN   = "\033[96m"
+RESET  = "\033[0m"
+BOLD   = "\033[1m"
+DIM    = "\033[2m"
+
+def ok(msg):  print(f"  {GREEN}✓{RESET}  {msg}")
+def err(msg): print(f"  {RED}✗  {msg}{RESET}")
+def info(msg):print(f"  {CYAN}→{RESET}  {msg}")
+
+
+def connect(database: str | None = DB_NAME, autocommit: bool = False):
+    return init_db.mysql.connector.connect(
+        host=DB_HOST, port=DB_PORT, user=DB_USER, password=DB_PASSWORD,
+        database=database, charset="utf8mb4", autocommit=autocommit,
+    )
+
+
+def id_chunks(cursor, sql: str, chunk: int):
+    cursor.execute(sql)
+    lo, hi = cursor.fetchone()
+    for start in range(lo, hi + 1, chunk):
+        yield start, start + chunk - 1
+
+
+# ──────────────────────────────────────────────────────────────────
+# 1. Actividad (activity_user_rollup / activity_user_counts)
+# ──────────────────────────────────────────────────────────────────
+
+# Mismas reglas que el trigger trg_ae_rollup.
+ACTIVITY_ROLLUP_SELECT = """
+    SELECT user_type, user_id,
+           SUBSTRING_INDEX(GROUP_CONCAT(role ORDER BY created_at DESC, id DESC), ',', 1),
+           SUM(event_type = 'login'),
+           MAX(IF(event_type = 'login', created_at, NULL)),
+           MAX(created_at)
+      FROM activity_events
+     WHERE {where}
+     GROUP BY user_type, user_id
+"""
+
+ACTIVITY_COUNTS_SELECT = """
+    SELECT user_type, user_id,
+           IF(event_type = 'view', 'view', 'action') AS kind,
+           IF(event_type = 'view', COALESCE(module, '-'), event_type) AS name,
+           COUNT(*)
+      FROM activity_events
+     WHERE event_type <> 'login' AND {where}
+     GROUP BY user_type, user_id, kind, name
+"""
+
+
+def activity_rebuild(conn, chunk: int = 500) -> None:
+    cursor = conn.cursor()
+    where = "user_id BETWEEN %s AND %s"
+    ranges = list(id_chunks(
+        cursor, "SELECT COALESCE(MIN(user_id), 0), COALESCE(MAX(user_id), 0) FROM activity_events", chunk,
+    ))
+
+    for lo, hi in ranges:
+        cursor.execute(f"DELETE FROM activity_user_rollup WHERE {where}", (lo, hi))
+        cursor.execute(f"DELETE FROM activity_user_counts WHERE {where}", (lo, hi))
+        cursor.execute(
+            "INSERT INTO activity_user_rollup (user_type, user_id, role, login_count, last_login, last_seen) "
+            + ACTIVITY_ROLLUP_SELECT.format(where=where), (lo, hi),
+        )
+        cursor.execute(
+            "INSERT INTO activity_user_counts (user_type, user_id, kind, name, count) "
+            + ACTIVITY_COUNTS_SELECT.format(where=where), (lo, hi),
+        )
+        conn.commit()
+
+    # Usuarios que ya no tienen eventos (fuera de todo tramo).
+    cursor.execute("""
+        DELETE r FROM activity_user_rollup r
+        LEFT JOIN activity_events e ON e.user_type = r.user_type AND e.user_id = r.user_id
+        WHERE e.id IS NULL
+    """)
+    orphans = cursor.rowcount
+    conn.commit()
+
+    cursor.execute("SELECT COUNT(*) FROM activity_user_rollup")
+    (users,) = cursor.fetchone()
+    cursor.close()
+    conn.commit()  # cierra la transacción que abrió la lectura
+    ok(f"{users} usuarios en el rollup de actividad  ({orphans} huérfanos borrados)")
+
+
+def activity_check(conn) -> bool:
+    cursor = conn.cursor()
+
+    cursor.execute(ACTIVITY_ROLLUP_SELECT.format(where="1 = 1"))
+    live = {(r[0], r[1]): (int(r[3]), r[4]) for r in cursor.fetchall()}
+    cursor.execute("SELECT user_type, user_id, login_count, last_login FROM activity_user_rollup")
+    model = {(r[0], r[1]): (int(r[2]), r[3]) for r in cursor.fetchall()}
+
+    cursor.execute(ACTIVITY_COUNTS_SELECT.format(where="1 = 1"))
+    live_counts = {tuple(r[:4]): int(r[4]) for r in cursor.fetchall()}
+    cursor.execute("SELECT user_type, user_id, kind, name, count FROM activity_user_counts")
+    model_counts = {tuple(r[:4]): int(r[4]) for r in cursor.fetchall()}
+    cursor.close()
+
+    bad_users = [k for k in live.keys() | model.keys() if live.get(k) != model.get(k)]
+    bad_counts = [k for k in live_counts.keys() | model_counts.keys()
+                  if live_counts.get(k) != model_counts.get(k)]
+
+    if not bad_users and not bad_counts:
+        ok(f"{len(live)} usuarios y {len(live_counts)} contadores coinciden")
+        return True
+    for k in sorted(bad_users)[:10]:
+        err(f"{k[0]} {k[1]}: eventos={live.get(k)}  rollup={model.get(k)}")
+    for k in sorted(bad_counts)[:10]:
+        err(f"{k[0]} {k[1]} {k[2]}:{k[3]}: eventos={live_counts.get(k)}  rollup={model_counts.get(k)}")
+    info(f"{len(bad_users)} usuarios y {len(bad_counts)} contadores distintos — correr `rebuild`")
+    return False
+
+
+# ──────────────────────────────────────────────────────────────────
+# 2. Cupos (talleres.enrolled / grupos.participants)
+# ──────────────────────────────────────────────────────────────────
+
+# (tabla de inscripciones, qué fila cuenta) — mismas reglas que los
+# triggers trg_cnt_* de init_db.py.
+COUNTER_SOURCES = (
+    ("inscripciones",                   "status <> 'cancelada'"),
+    ("participant_program_enrollments", "1 = 1"),
+)
+
+# type → (tabla, columna del contador)
+COUNTER_TARGETS = {
+    "taller": ("talleres", "enrolled"),
+    "grupo":  ("grupos",   "participants"),
+}
+
+
+def live_counters(cursor) -> dict:
+    """(type, item_id) → inscripciones que cuentan. Un GROUP BY por tabla."""
+    counts: dict = {}
+    types = ", ".join(f"'{t}'" for t in COUNTER_TARGETS)
+    for table, active in COUNTER_SOURCES:
+        cursor.execute(f"""
+            SELECT type, item_id, COUNT(*) FROM {table}
+             WHERE type IN ({types}) AND {active}
+             GROUP BY type, item_id
+        """)
+        for type_, item_id, n in cursor.fetchall():
+            counts[(type_, item_id)] = counts.get((type_, item_id), 0) + int(n)
+    return counts
+
+
+def stored_counters(cursor, lock: bool = False) -> dict:
+    """(type, id) → valor guardado en el contador, para todos los ítems."""
+    stored = {}
+    for type_, (table, column) in COUNTER_TARGETS.items():
+        cursor.execute(f"SELECT id, {column} FROM {table}" + (" FOR UPDATE" if lock else ""))
+        stored.update({(type_, item_id): int(value) for item_id, value in cursor.fetchall()})
+    return stored
+
+
+def counter_drift(stored: dict, live: dict) -> dict:
+    """Los ítems cuyo contador no coincide → el valor correcto."""
+    return {k: live.get(k, 0) for k, value in stored.items() if value != live.get(k, 0)}
+
+
+def counters_rebuild(conn, chunk: int = 500) -> None:
+    # Primero se bloquean las filas de talleres y grupos: mientras dura la
+    # transacción ningún trigger mueve un contador. Con READ COMMITTED el
+    # recuento ve todo lo confirmado; una inscripción a medio escribir no se
+    # cuenta y su trigger suma (o resta) recién después del commit.
+    conn.start_transaction(isolation_level="READ COMMITTED")
+    cursor = conn.cursor()
+    try:
+        stored = stored_counters(cursor, lock=True)
+        drift = counter_drift(stored, live_counters(cursor))
+        for type_, (table, column) in COUNTER_TARGETS.items():
+            rows = [(value, item_id) for (t, item_id), value in drift.items() if t == type_]
+            if rows:
+                cursor.executemany(f"UPDATE {table} SET {column} = %s WHERE id = %s", rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    for (type_, item_id), value in sorted(drift.items())[:10]:
+        info(f"{type_} {item_id}: {stored[(type_, item_id)]} → {value}")
+    ok(f"{len(stored)} contadores revisados  ({len(drift)} corregidos)")
+
+
+def counters_check(conn) -> bool:
+    cursor = conn.cursor()
+    stored = stored_counters(cursor)
+    live = live_counters(cursor)
+    cursor.close()
+
+    drift = counter_drift(stored, live)
+    if not drift:
+        ok(f"{len(stored)} contadores coinciden")
+        return True
+    for (type_, item_id), value in sorted(drift.items())[:10]:
+        err(f"{type_} {item_id}: inscripciones={value}  contador={stored[(type_, item_id)]}")
+    info(f"{len(drift)} contadores distintos — correr `rebuild`")
+    return False
+
+
+# ──────────────────────────────────────────────────────────────────
+# 3. CLI
+# ──────────────────────────────────────────────────────────────────
+
+ROLLUPS = {
+    "activity": (activity_rebuild, activity_check),
+    "counters": (counters_rebuild, counters_check),
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Reconstrucción de los rollups")
+    parser.add_argument("rollup", choices=sorted(ROLLUPS))
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--chunk", type=int, default=500, help="ids por transacción en el rebuild")
+    args = parser.parse_args()
+
+    print(f"\n{BOLD}{CYAN}  ALMA Platform — rollups.py {args.rollup} {args.command}{RESET}")
+    print(f"  Base de datos : {BOLD}{DB_NAME}{RESET}   Host: {DB_HOST}:{DB_PORT}\n")
+
+    init_db.load_dependencies()
+    rebuild, check = ROLLUPS[args.rollup]
+    try:
+        conn = connect()
+        try:
+            if args.command == "rebuild":
+                rebuild(conn, args.chunk)
+                return 0
+            return 0 if check(conn) else 1
+        finally:
+            conn.close()
+    except init_db.MySQLError as e:
+        err(f"ERROR: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
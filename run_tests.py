@@ -5,6 +5,7 @@ run_tests.py — corre la suite de tests del frontend.
     python run_tests.py                       # todo
     python run_tests.py tests/permissions      # los que matcheen ese nombre
     python run_tests.py --watch                # re-corre al guardar
+    python run_tests.py --standin              # además, contra backend_standin.py
 
 Cualquier argumento extra se le pasa tal cual a vitest.
 
@@ -12,7 +13,10 @@ Existe para que el comando sea el MISMO en los dos repos (el backend tiene su
 propio run_tests.py). Por debajo esto es vitest; si preferís, `npx vitest run`
 hace exactamente lo mismo.
 
-Los tests no salen a la red: las llamadas al backend están mockeadas.
+Los tests no salen a la red: las llamadas al backend están mockeadas. La
+única excepción es tests/backend-standin.test.ts, que levanta
+backend_standin.py en un puerto de localhost (necesita Python): sólo corre
+con --standin (o con ALMA_STANDIN_TESTS=1), nunca en la corrida de siempre.
 
 La primera vez:  npm install
 """
@@ -42,15 +46,24 @@ def main() -> int:
         return 1
 
     args = sys.argv[1:]
+    standin = "--standin" in args
+    args = [a for a in args if a != "--standin"]
+    env = dict(os.environ)
+    if standin:
+        env["ALMA_STANDIN_TESTS"] = "1"
+    standin = bool(env.get("ALMA_STANDIN_TESTS"))
     # Sin argumentos, vitest se queda en modo watch: `run` lo hace de una pasada.
     if not any(a in ("--watch", "-w") for a in args):
         args = ["run", *args]
 
     print("── Tests del frontend ALMA ────────────────────────────────────")
-    print("Backend: mockeado · Sin llamadas de red reales")
+    if standin:
+        print("Backend: mockeado + backend_standin.py en localhost")
+    else:
+        print("Backend: mockeado · Sin llamadas de red reales")
     print()
 
-    return subprocess.call([npx, "vitest", *args], cwd=ROOT, shell=False)
+    return subprocess.call([npx, "vitest", *args], cwd=ROOT, env=env, shell=False)
 
 
 if __name__ == "__main__":
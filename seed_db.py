@@ -6,64 +6,56 @@ Trunca las tablas de datos e inserta registros realistas de ejemplo.
 Los datos son ficticios pero representativos del uso real de ALMA Rosario.
 
 Uso:
-    python -X utf8 seed_db.py
+    python -X utf8 seed_db.py           # pregunta antes de truncar
+    python -X utf8 seed_db.py --yes     # sin preguntar (scripts, CI)
+
+Para encadenarlo con init_db y medir cada tabla, ver db_tools.py.
 
 Dependencias:
     pip install mysql-connector-python bcrypt
 """
 
-import os
+import argparse
+import json
 import sys
 from datetime import date, timedelta
 
 # ──────────────────────────────────────────────────────────────────
-# 1. Lectura de .env.local
+# 1. Configuración (.env.local, la lee init_db.py)
 # ──────────────────────────────────────────────────────────────────
 
-def load_env(path: str) -> dict:
-    env = {}
-    if not os.path.exists(path):
-        return env
-    with open(path, encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            if "=" in line:
-                key, _, value = line.partition("=")
-                env[key.strip()] = value.strip()
-    return env
-
-
-ENV_PATH = os.path.join(os.path.dirname(__file__), ".env.local")
-env = load_env(ENV_PATH)
-
-DB_HOST     = env.get("DB_HOST", "localhost")
-DB_PORT     = int(env.get("DB_PORT", "3306"))
-DB_NAME     = env.get("DB_NAME", "alma_platform")
-DB_USER     = env.get("DB_USER", "root")
-DB_PASSWORD = env.get("DB_PASSWORD", "")
+from init_db import DB_HOST, DB_NAME, DB_PASSWORD, DB_PORT, DB_USER, Timings, confirm
 
 # ──────────────────────────────────────────────────────────────────
 # 2. Verificar dependencias
 # ──────────────────────────────────────────────────────────────────
+# Se cargan al correr el script, no al importarlo: backend_standin.py y
+# load_test.py importan los datos de prueba de acá sin tener MySQL.
+
+mysql = None
+MySQLError = Exception
+bcryptlib = None
+HAS_BCRYPT = False
+
 
-try:
-    import mysql.connector
-    from mysql.connector import Error as MySQLError
-except ImportError:
-    print("\n  ERROR: mysql-connector-python no está instalado.")
-    print("  Instalalo con:  pip install mysql-connector-python\n")
-    sys.exit(1)
-
-try:
-    import bcrypt as bcryptlib
-    HAS_BCRYPT = True
-except ImportError:
-    HAS_BCRYPT = False
-    print("\n  ADVERTENCIA: bcrypt no está instalado.")
-    print("  Los voluntarios se crearán SIN PIN (no podrán iniciar sesión).")
-    print("  Para habilitarlo:  pip install bcrypt\n")
+def load_dependencies() -> None:
+    global mysql, MySQLError, bcryptlib, HAS_BCRYPT
+    try:
+        import mysql.connector
+        from mysql.connector import Error as MySQLError
+    except ImportError:
+        print("\n  ERROR: mysql-connector-python no está instalado.")
+        print("  Instalalo con:  pip install mysql-connector-python\n")
+        sys.exit(1)
+
+    try:
+        import bcrypt as bcryptlib
+        HAS_BCRYPT = True
+    except ImportError:
+        HAS_BCRYPT = False
+        print("\n  ADVERTENCIA: bcrypt no está instalado.")
+        print("  Los voluntarios se crearán SIN PIN (no podrán iniciar sesión).")
+        print("  Para habilitarlo:  pip install bcrypt\n")
 
 # ──────────────────────────────────────────────────────────────────
 # 3. Colores de consola
@@ -116,39 +108,41 @@ VOLUNTARIOS = [
 
 # ── Talleres ────────────────────────────────────────────────────────
 TALLERES = [
-    # id, name, description, instructor, date, schedule, capacity, cost, enrolled, status
+    # id, name, description, instructor, date, schedule, capacity, cost, status
+    # (enrolled lo cuentan los triggers a partir de las inscripciones)
     (1, "Arte y Memoria",
         "Taller de expresión artística para estimular la memoria a través del dibujo y la pintura.",
-        "Ana López", "2025-03-15", "10:00 - 12:00", 15, 0, 9, "activo"),
+        "Ana López", "2025-03-15", "10:00 - 12:00", 15, 0, "activo"),
     (2, "Musicoterapia",
         "Sesiones de musicoterapia para trabajar las emociones y mejorar el bienestar general.",
-        "José Rodríguez", "2025-04-20", "14:00 - 16:00", 12, 500, 7, "activo"),
+        "José Rodríguez", "2025-04-20", "14:00 - 16:00", 12, 500, "activo"),
     (3, "Yoga Suave",
         "Práctica de yoga adaptada para personas mayores, con énfasis en respiración y equilibrio.",
-        "Ana López", "2025-02-10", "09:00 - 10:30", 10, 300, 10, "activo"),
+        "Ana López", "2025-02-10", "09:00 - 10:30", 10, 300, "activo"),
     (4, "Taller de Lectura",
         "Lectura compartida y análisis de textos para estimular las funciones cognitivas.",
-        "Pedro González", "2025-05-08", "15:00 - 17:00", 20, 0, 5, "activo"),
+        "Pedro González", "2025-05-08", "15:00 - 17:00", 20, 0, "activo"),
     (5, "Cocina Terapéutica",
         "Preparación de recetas simples como herramienta de estimulación cognitiva y socialización.",
-        "Laura Sánchez", "2025-06-12", "11:00 - 13:00", 8, 800, 6, "activo"),
+        "Laura Sánchez", "2025-06-12", "11:00 - 13:00", 8, 800, "activo"),
 ]
 
 # ── Grupos ──────────────────────────────────────────────────────────
 GRUPOS = [
-    # id, name, description, coordinator, day, schedule, participants, status
+    # id, name, description, coordinator, day, schedule, status
+    # (participants lo cuentan los triggers a partir de las inscripciones)
     (1, "Grupo de Apoyo Familiar",
         "Espacio de contención y orientación para familiares de personas con Alzheimer.",
-        "María García", "Lunes", "10:00 - 12:00", 15, "activo"),
+        "María García", "Lunes", "10:00 - 12:00", "activo"),
     (2, "Estimulación Cognitiva",
         "Actividades y juegos diseñados para mantener y mejorar las funciones cognitivas.",
-        "Carlos Martínez", "Martes y Jueves", "15:00 - 17:00", 10, "activo"),
+        "Carlos Martínez", "Martes y Jueves", "15:00 - 17:00", "activo"),
     (3, "Actividad Física Adaptada",
         "Ejercicios físicos suaves y adaptados a las necesidades de cada participante.",
-        "Ana López", "Miércoles", "09:00 - 10:30", 12, "activo"),
+        "Ana López", "Miércoles", "09:00 - 10:30", "activo"),
     (4, "Grupo de Conversación",
         "Encuentro semanal para compartir experiencias y fomentar la comunicación.",
-        "Valentina Álvarez", "Viernes", "14:00 - 16:00", 8, "activo"),
+        "Valentina Álvarez", "Viernes", "14:00 - 16:00", "activo"),
 ]
 
 # ── Actividades ─────────────────────────────────────────────────────
@@ -345,180 +339,169 @@ PARTICIPANT_PROFILES = [
 # 6. Ejecución principal
 # ──────────────────────────────────────────────────────────────────
 
-def main():
-    print(f"\n{BOLD}{CYAN}  ALMA Platform — seed_db.py{RESET}")
-    print(f"  Base de datos : {BOLD}{DB_NAME}{RESET}")
-    print(f"  Host          : {DB_HOST}:{DB_PORT}")
-    print(f"  PIN por defecto para voluntarios: {BOLD}{DEFAULT_PIN}{RESET}\n")
-
-    if not HAS_BCRYPT:
-        print(f"  {YELLOW}⚠ bcrypt no disponible — los voluntarios no tendrán PIN.{RESET}")
-        print(f"  {YELLOW}  Instalalo con: pip install bcrypt{RESET}\n")
+# Orden inverso de FK (igual se apagan los checks mientras se trunca).
+TRUNCATE_TABLES = [
+    # Read models y rollups: TRUNCATE no dispara triggers, así que se vacían
+    # a mano. calendar_month_events se vuelve a llenar con el trigger de
+    # calendar_instances; la actividad arranca vacía.
+    "calendar_month_events",
+    "activity_user_counts", "activity_user_rollup", "activity_events",
+    "calendar_event_participants",
+    "calendar_assignments", "calendar_instances",
+    "pending_items", "pendientes",
+    # participant_program_enrollments mueve talleres.enrolled y
+    # grupos.participants con sus triggers: si quedara, los contadores
+    # recién sembrados no coincidirían con sus filas.
+    "inscripciones", "participant_program_enrollments", "pagos", "inventario",
+    "actividades", "grupos", "talleres", "voluntarios",
+    "participant_profiles", "participants",
+]
 
-    answer = input(f"  {YELLOW}¿Truncar datos existentes y poblar '{DB_NAME}'? (s/N): {RESET}").strip().lower()
-    if answer != "s":
-        print("  Cancelado.\n")
-        sys.exit(0)
 
-    try:
-        conn = mysql.connector.connect(
-            host=DB_HOST, port=DB_PORT, user=DB_USER,
-            password=DB_PASSWORD, database=DB_NAME,
-            charset="utf8mb4", autocommit=False,
-        )
+def insert_rows(conn, timings: Timings, table: str, sql: str, rows: list) -> None:
+    """Una tabla entera en un executemany (el conector lo manda como un solo INSERT) y su commit."""
+    with timings.phase(f"insert:{table}"):
         cursor = conn.cursor()
+        cursor.executemany(sql, rows)
+        cursor.close()
+        conn.commit()
 
-        # ── Truncar en orden inverso de FK ─────────────────────────
-        print(f"\n  {YELLOW}▶ Truncando tablas existentes...{RESET}")
+
+def seed(conn, timings: Timings | None = None) -> None:
+    """
+    Trunca e inserta los datos de prueba sobre `conn` (ya con la base
+    elegida). Requiere load_dependencies(); un error corta con MySQLError.
+    """
+    timings = timings or Timings()
+    cursor = conn.cursor()
+
+    # ── Truncar en orden inverso de FK ─────────────────────────
+    print(f"\n  {YELLOW}▶ Truncando tablas existentes...{RESET}")
+    with timings.phase("truncate"):
         cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
-        for tabla in [
-            "calendar_event_participants",
-            "calendar_assignments", "calendar_instances",
-            "pending_items", "pendientes",
-            "inscripciones", "pagos", "inventario",
-            "actividades", "grupos", "talleres", "voluntarios",
-            "participant_profiles", "participants",
-        ]:
+        for tabla in TRUNCATE_TABLES:
             cursor.execute(f"TRUNCATE TABLE `{tabla}`")
             cursor.execute(f"ALTER TABLE `{tabla}` AUTO_INCREMENT = 1")
         cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
         conn.commit()
-        ok("Tablas truncadas")
-        sep()
+    ok("Tablas truncadas")
+    sep()
 
-        # ── Hash del PIN por defecto ────────────────────────────────
+    # ── Hash del PIN por defecto ────────────────────────────────
+    with timings.phase("hash_pin"):
         pin_hash = hash_pin(DEFAULT_PIN) if HAS_BCRYPT else None
 
-        # ── Voluntarios ─────────────────────────────────────────────
-        # Tuple layout: (id, name, last_name, age, gender, phone, email,
-        #                reg_date, birth_date, is_admin, specialties)
-        print(f"\n  {CYAN}Insertando voluntarios...{RESET}")
-        import json as _json
-        for v in VOLUNTARIOS:
-            vid, vname, vlast, vage, vgender, vphone, vemail, vreg, vbirth, vis_admin, vspec = v
-            specialties_json = _json.dumps(_json.loads(vspec), ensure_ascii=False)
-            cursor.execute("""
-                INSERT INTO voluntarios
-                  (id, name, last_name, age, gender, phone, email,
-                   registration_date, birth_date, status, specialties, is_admin, pin_hash)
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,'activo',%s,%s,%s)
-            """, (vid, vname, vlast, vage, vgender, vphone, vemail, vreg, vbirth,
-                  specialties_json, vis_admin, pin_hash))
-        conn.commit()
-        ok(f"{len(VOLUNTARIOS)} voluntarios  (PIN: {DEFAULT_PIN if HAS_BCRYPT else 'no configurado'})")
-
-        # ── Talleres ─────────────────────────────────────────────────
-        print(f"\n  {CYAN}Insertando talleres...{RESET}")
-        for t in TALLERES:
-            cursor.execute("""
-                INSERT INTO talleres
-                  (id, name, description, instructor, date, schedule,
-                   capacity, cost, enrolled, status)
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-            """, t)
-        conn.commit()
-        ok(f"{len(TALLERES)} talleres")
-
-        # ── Grupos ───────────────────────────────────────────────────
-        print(f"\n  {CYAN}Insertando grupos...{RESET}")
-        for g in GRUPOS:
-            cursor.execute("""
-                INSERT INTO grupos
-                  (id, name, description, coordinator, day, schedule, participants, status)
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
-            """, g)
-        conn.commit()
-        ok(f"{len(GRUPOS)} grupos")
-
-        # ── Actividades ──────────────────────────────────────────────
-        print(f"\n  {CYAN}Insertando actividades...{RESET}")
-        for a in ACTIVIDADES:
-            cursor.execute("""
-                INSERT INTO actividades
-                  (id, name, description, status)
-                VALUES (%s,%s,%s,%s)
-            """, a)
-        conn.commit()
-        ok(f"{len(ACTIVIDADES)} actividades")
-
-        # ── Inventario ───────────────────────────────────────────────
-        print(f"\n  {CYAN}Insertando inventario...{RESET}")
-        for item in INVENTARIO:
-            cursor.execute("""
-                INSERT INTO inventario
-                  (id, name, category, quantity, minimum_stock, price,
-                   supplier, assigned_volunteer_id, entry_date)
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
-            """, item)
-        conn.commit()
-        ok(f"{len(INVENTARIO)} ítems de inventario")
-
-        # ── Inscripciones ────────────────────────────────────────────
-        print(f"\n  {CYAN}Insertando inscripciones...{RESET}")
-        for ins in INSCRIPCIONES:
-            cursor.execute("""
-                INSERT INTO inscripciones
-                  (id, user_id, type, item_id, enrollment_date, status)
-                VALUES (%s,%s,%s,%s,%s,%s)
-            """, ins)
-        conn.commit()
-        ok(f"{len(INSCRIPCIONES)} inscripciones")
-
-        # ── Pagos ────────────────────────────────────────────────────
-        print(f"\n  {CYAN}Insertando pagos...{RESET}")
-        for p in PAGOS:
-            cursor.execute("""
-                INSERT INTO pagos
-                  (id, user_id, concept, amount, due_date,
-                   payment_method, status, payment_date)
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
-            """, p)
-        conn.commit()
-        ok(f"{len(PAGOS)} pagos")
-
-        # ── Pendientes ───────────────────────────────────────────────
-        print(f"\n  {CYAN}Insertando pendientes...{RESET}")
-        for p in PENDIENTES:
-            cursor.execute("""
-                INSERT INTO pendientes
-                  (id, description, assigned_volunteer_id, completed, created_date)
-                VALUES (%s,%s,%s,%s,%s)
-            """, p)
-        for s in PENDING_ITEMS:
-            cursor.execute("""
-                INSERT INTO pending_items
-                  (id, pending_id, description, assigned_volunteer_id, completed, created_date)
-                VALUES (%s,%s,%s,%s,%s,%s)
-            """, s)
-        conn.commit()
-        ok(f"{len(PENDIENTES)} categorías  /  {len(PENDING_ITEMS)} sub-tareas")
-
-        # ── Calendar instances ────────────────────────────────────────
-        print(f"\n  {CYAN}Insertando instancias de calendario...{RESET}")
-        for ci in CALENDAR_INSTANCES:
-            cursor.execute("""
-                INSERT INTO calendar_instances
-                  (id, type, source_id, date, start_time, end_time, notes, status)
-                VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
-            """, ci)
-        conn.commit()
-        ok(f"{len(CALENDAR_INSTANCES)} instancias  (marzo–noviembre 2025, cada 14 días)")
-
-        # ── Calendar assignments ──────────────────────────────────────
-        print(f"\n  {CYAN}Insertando asignaciones de calendario...{RESET}")
-        for ca in CALENDAR_ASSIGNMENTS:
-            # Tuple: (instance_id, role, volunteer_id)
-            cursor.execute("""
-                INSERT INTO calendar_assignments (instance_id, role, volunteer_id)
-                VALUES (%s,%s,%s)
-                ON DUPLICATE KEY UPDATE volunteer_id = VALUES(volunteer_id)
-            """, ca)
-        conn.commit()
-        ok(f"{len(CALENDAR_ASSIGNMENTS)} asignaciones (coordinadores y co-coordinadores)")
-
-        # ── Participantes ─────────────────────────────────────────────
-        print(f"\n  {CYAN}Insertando participantes...{RESET}")
-        participant_ids: dict = {}  # email → id
+    # ── Voluntarios ─────────────────────────────────────────────
+    # Tuple layout: (id, name, last_name, age, gender, phone, email,
+    #                reg_date, birth_date, is_admin, specialties)
+    print(f"\n  {CYAN}Insertando voluntarios...{RESET}")
+    insert_rows(conn, timings, "voluntarios", """
+        INSERT INTO voluntarios
+          (id, name, last_name, age, gender, phone, email,
+           registration_date, birth_date, status, specialties, is_admin, pin_hash)
+        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,'activo',%s,%s,%s)
+    """, [
+        (vid, vname, vlast, vage, vgender, vphone, vemail, vreg, vbirth,
+         json.dumps(json.loads(vspec), ensure_ascii=False), vis_admin, pin_hash)
+        for vid, vname, vlast, vage, vgender, vphone, vemail, vreg, vbirth, vis_admin, vspec in VOLUNTARIOS
+    ])
+    ok(f"{len(VOLUNTARIOS)} voluntarios  (PIN: {DEFAULT_PIN if HAS_BCRYPT else 'no configurado'})")
+
+    # ── Talleres ─────────────────────────────────────────────────
+    print(f"\n  {CYAN}Insertando talleres...{RESET}")
+    insert_rows(conn, timings, "talleres", """
+        INSERT INTO talleres
+          (id, name, description, instructor, date, schedule,
+           capacity, cost, status)
+        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
+    """, TALLERES)
+    ok(f"{len(TALLERES)} talleres")
+
+    # ── Grupos ───────────────────────────────────────────────────
+    print(f"\n  {CYAN}Insertando grupos...{RESET}")
+    insert_rows(conn, timings, "grupos", """
+        INSERT INTO grupos
+          (id, name, description, coordinator, day, schedule, status)
+        VALUES (%s,%s,%s,%s,%s,%s,%s)
+    """, GRUPOS)
+    ok(f"{len(GRUPOS)} grupos")
+
+    # ── Actividades ──────────────────────────────────────────────
+    print(f"\n  {CYAN}Insertando actividades...{RESET}")
+    insert_rows(conn, timings, "actividades", """
+        INSERT INTO actividades
+          (id, name, description, status)
+        VALUES (%s,%s,%s,%s)
+    """, ACTIVIDADES)
+    ok(f"{len(ACTIVIDADES)} actividades")
+
+    # ── Inventario ───────────────────────────────────────────────
+    print(f"\n  {CYAN}Insertando inventario...{RESET}")
+    insert_rows(conn, timings, "inventario", """
+        INSERT INTO inventario
+          (id, name, category, quantity, minimum_stock, price,
+           supplier, assigned_volunteer_id, entry_date)
+        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
+    """, INVENTARIO)
+    ok(f"{len(INVENTARIO)} ítems de inventario")
+
+    # ── Inscripciones ────────────────────────────────────────────
+    print(f"\n  {CYAN}Insertando inscripciones...{RESET}")
+    insert_rows(conn, timings, "inscripciones", """
+        INSERT INTO inscripciones
+          (id, user_id, type, item_id, enrollment_date, status)
+        VALUES (%s,%s,%s,%s,%s,%s)
+    """, INSCRIPCIONES)
+    ok(f"{len(INSCRIPCIONES)} inscripciones")
+
+    # ── Pagos ────────────────────────────────────────────────────
+    print(f"\n  {CYAN}Insertando pagos...{RESET}")
+    insert_rows(conn, timings, "pagos", """
+        INSERT INTO pagos
+          (id, user_id, concept, amount, due_date,
+           payment_method, status, payment_date)
+        VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
+    """, PAGOS)
+    ok(f"{len(PAGOS)} pagos")
+
+    # ── Pendientes ───────────────────────────────────────────────
+    print(f"\n  {CYAN}Insertando pendientes...{RESET}")
+    insert_rows(conn, timings, "pendientes", """
+        INSERT INTO pendientes
+          (id, description, assigned_volunteer_id, completed, created_date)
+        VALUES (%s,%s,%s,%s,%s)
+    """, PENDIENTES)
+    insert_rows(conn, timings, "pending_items", """
+        INSERT INTO pending_items
+          (id, pending_id, description, assigned_volunteer_id, completed, created_date)
+        VALUES (%s,%s,%s,%s,%s,%s)
+    """, PENDING_ITEMS)
+    ok(f"{len(PENDIENTES)} categorías  /  {len(PENDING_ITEMS)} sub-tareas")
+
+    # ── Calendar instances ────────────────────────────────────────
+    print(f"\n  {CYAN}Insertando instancias de calendario...{RESET}")
+    insert_rows(conn, timings, "calendar_instances", """
+        INSERT INTO calendar_instances
+          (id, type, source_id, date, start_time, end_time, notes, status)
+        VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
+    """, CALENDAR_INSTANCES)
+    ok(f"{len(CALENDAR_INSTANCES)} instancias  (marzo–noviembre 2025, cada 14 días)")
+
+    # ── Calendar assignments ──────────────────────────────────────
+    # Tuple: (instance_id, role, volunteer_id)
+    print(f"\n  {CYAN}Insertando asignaciones de calendario...{RESET}")
+    insert_rows(conn, timings, "calendar_assignments", """
+        INSERT INTO calendar_assignments (instance_id, role, volunteer_id)
+        VALUES (%s,%s,%s)
+        ON DUPLICATE KEY UPDATE volunteer_id = VALUES(volunteer_id)
+    """, CALENDAR_ASSIGNMENTS)
+    ok(f"{len(CALENDAR_ASSIGNMENTS)} asignaciones (coordinadores y co-coordinadores)")
+
+    # ── Participantes ─────────────────────────────────────────────
+    # De a uno: el perfil necesita el id que devuelve cada INSERT.
+    print(f"\n  {CYAN}Insertando participantes...{RESET}")
+    participant_ids: dict = {}  # email → id
+    with timings.phase("insert:participants"):
         for p_email, p_active in PARTICIPANTES:
             cursor.execute("""
                 INSERT INTO participants (email, pin_hash, is_active)
@@ -526,38 +509,68 @@ def main():
             """, (p_email, pin_hash, p_active))
             participant_ids[p_email] = cursor.lastrowid
         conn.commit()
-        ok(f"{len(PARTICIPANTES)} participantes  (PIN: {DEFAULT_PIN if HAS_BCRYPT else 'no configurado'})")
-
-        # ── Perfiles de participantes ─────────────────────────────────
-        print(f"\n  {CYAN}Insertando perfiles de participantes...{RESET}")
-        for pp in PARTICIPANT_PROFILES:
-            p_email, p_name, p_last, p_phone, p_city, p_notif, p_wa = pp
-            p_id = participant_ids.get(p_email)
-            if p_id:
-                cursor.execute("""
-                    INSERT INTO participant_profiles
-                      (participant_id, name, last_name, phone, city, accepts_notifications, accepts_whatsapp)
-                    VALUES (%s,%s,%s,%s,%s,%s,%s)
-                """, (p_id, p_name, p_last, p_phone, p_city, p_notif, p_wa))
-        conn.commit()
-        ok(f"{len(PARTICIPANT_PROFILES)} perfiles de participantes")
-
-        # ── Resumen final ─────────────────────────────────────────────
-        sep()
-        print(f"\n  {GREEN}{BOLD}✔ Base de datos poblada correctamente.{RESET}\n")
-        print(f"  {DIM}Voluntarios creados:{RESET}")
-        for v in VOLUNTARIOS:
-            rol = "admin" if v[9] else "voluntario"
-            print(f"    {DIM}·{RESET} {v[1]} {v[2]}  ←  {v[6]}  /  PIN: {DEFAULT_PIN if HAS_BCRYPT else 'N/A'}  [{rol}]")
-        print()
-        print(f"  {DIM}Participantes creados:{RESET}")
-        for p_email, _ in PARTICIPANTES:
-            print(f"    {DIM}·{RESET} {p_email}  /  PIN: {DEFAULT_PIN if HAS_BCRYPT else 'N/A'}  [participante]")
-        print()
-        print(f"  {DIM}Ya podés correr:{RESET}  {CYAN}npm run dev{RESET}\n")
+    ok(f"{len(PARTICIPANTES)} participantes  (PIN: {DEFAULT_PIN if HAS_BCRYPT else 'no configurado'})")
+
+    # ── Perfiles de participantes ─────────────────────────────────
+    print(f"\n  {CYAN}Insertando perfiles de participantes...{RESET}")
+    insert_rows(conn, timings, "participant_profiles", """
+        INSERT INTO participant_profiles
+          (participant_id, name, last_name, phone, city, accepts_notifications, accepts_whatsapp)
+        VALUES (%s,%s,%s,%s,%s,%s,%s)
+    """, [
+        (participant_ids[p_email], p_name, p_last, p_phone, p_city, p_notif, p_wa)
+        for p_email, p_name, p_last, p_phone, p_city, p_notif, p_wa in PARTICIPANT_PROFILES
+        if p_email in participant_ids
+    ])
+    ok(f"{len(PARTICIPANT_PROFILES)} perfiles de participantes")
+    cursor.close()
+
+
+def print_summary() -> None:
+    sep()
+    print(f"\n  {GREEN}{BOLD}✔ Base de datos poblada correctamente.{RESET}\n")
+    print(f"  {DIM}Voluntarios creados:{RESET}")
+    for v in VOLUNTARIOS:
+        rol = "admin" if v[9] else "voluntario"
+        print(f"    {DIM}·{RESET} {v[1]} {v[2]}  ←  {v[6]}  /  PIN: {DEFAULT_PIN if HAS_BCRYPT else 'N/A'}  [{rol}]")
+    print()
+    print(f"  {DIM}Participantes creados:{RESET}")
+    for p_email, _ in PARTICIPANTES:
+        print(f"    {DIM}·{RESET} {p_email}  /  PIN: {DEFAULT_PIN if HAS_BCRYPT else 'N/A'}  [participante]")
+    print()
+    print(f"  {DIM}Ya podés correr:{RESET}  {CYAN}npm run dev{RESET}\n")
 
-        cursor.close()
-        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Puebla la base con datos de prueba")
+    parser.add_argument("--yes", action="store_true", help="no pedir confirmación")
+    args = parser.parse_args()
+
+    load_dependencies()
+    print(f"\n{BOLD}{CYAN}  ALMA Platform — seed_db.py{RESET}")
+    print(f"  Base de datos : {BOLD}{DB_NAME}{RESET}")
+    print(f"  Host          : {DB_HOST}:{DB_PORT}")
+    print(f"  PIN por defecto para voluntarios: {BOLD}{DEFAULT_PIN}{RESET}\n")
+
+    if not HAS_BCRYPT:
+        print(f"  {YELLOW}⚠ bcrypt no disponible — los voluntarios no tendrán PIN.{RESET}")
+        print(f"  {YELLOW}  Instalalo con: pip install bcrypt{RESET}\n")
+
+    if not confirm(f"¿Truncar datos existentes y poblar '{DB_NAME}'?", args.yes):
+        print("  Cancelado.\n")
+        sys.exit(0)
+
+    try:
+        conn = mysql.connector.connect(
+            host=DB_HOST, port=DB_PORT, user=DB_USER,
+            password=DB_PASSWORD, database=DB_NAME,
+            charset="utf8mb4", autocommit=False,
+        )
+        try:
+            seed(conn)
+        finally:
+            conn.close()
+        print_summary()
 
     except MySQLError as e:
         print(f"\n  {RED}ERROR: {e}{RESET}\n")
@@ -0,0 +1,152 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from "vitest"
+import type { ActivityEventInput } from "@/lib/data-manager"
+
+/**
+ * Tests de la cola de actividad: cuándo sale una tanda, la vuelta al POST de
+ * a uno, los reintentos y la back-pressure con el backend caído.
+ *
+ * La cola es estado del módulo: cada test lo importa de nuevo
+ * (vi.resetModules) con el reloj de mentira ya puesto, así el setInterval
+ * del módulo también es de mentira.
+ */
+
+const { post, logWarn, onShutdown } = vi.hoisted(() => ({
+  post: vi.fn(),
+  logWarn: vi.fn(),
+  onShutdown: vi.fn(),
+}))
+
+vi.mock("@/lib/api-client", () => ({ api: { post } }))
+vi.mock("@/lib/logger", () => ({ logWarn, logInfo: vi.fn(), logError: vi.fn() }))
+vi.mock("@/lib/shutdown", () => ({ onShutdown }))
+
+const event = (user_id = 1): ActivityEventInput => ({
+  event_type: "view", module: "talleres", user_type: "voluntario", user_id, role: "voluntario",
+})
+
+let buffer: typeof import("@/lib/activity-buffer")
+
+beforeEach(async () => {
+  vi.useFakeTimers()
+  post.mockReset().mockResolvedValue(null)
+  logWarn.mockReset()
+  onShutdown.mockReset()
+  vi.resetModules()
+  buffer = await import("@/lib/activity-buffer")
+})
+
+afterEach(() => {
+  vi.useRealTimers()
+})
+
+/** Los `events` de cada POST a /activity/batch, en orden. */
+const batches = () => post.mock.calls.filter(([path]) => path === "/activity/batch").map(([, body]) => body.events)
+
+describe("tandas", () => {
+  it("sale sola al juntar 200 eventos, sin esperar el intervalo", async () => {
+    for (let i = 0; i < 199; i++) await buffer.enqueueActivityEvent(event(i))
+    expect(post).not.toHaveBeenCalled()
+
+    await buffer.enqueueActivityEvent(event(199))
+    expect(batches()).toHaveLength(1)
+    await buffer.flushActivityEvents()
+    expect(batches()[0]).toHaveLength(200)
+    expect(buffer.activityBufferStats()).toMatchObject({ queued: 0, sent: 200, batches: 1 })
+  })
+
+  it("con menos de 200, sale en el próximo intervalo", async () => {
+    for (let i = 0; i < 3; i++) await buffer.enqueueActivityEvent(event(i))
+    expect(post).not.toHaveBeenCalled()
+
+    await vi.advanceTimersByTimeAsync(2000)
+    expect(batches()).toHaveLength(1)
+    expect(batches()[0].map((e: any) => e.user_id)).toEqual([0, 1, 2])
+    expect(batches()[0][0].created_at).toEqual(expect.any(String))
+  })
+
+  it("al apagarse el worker manda lo que quedó", async () => {
+    await buffer.enqueueActivityEvent(event())
+    const [[, hook]] = onShutdown.mock.calls
+
+    await hook()
+    expect(batches()).toHaveLength(1)
+  })
+})
+
+describe("backend sin /activity/batch", () => {
+  it.each([404, 405])("con %i vuelve al POST de a uno y no reintenta la tanda", async (status) => {
+    post.mockImplementation(async (path: string) => {
+      if (path === "/activity/batch") throw new Error(`API POST /activity/batch → ${status}: Not Found`)
+      return null
+    })
+    for (let i = 0; i < 3; i++) await buffer.enqueueActivityEvent(event(i))
+
+    await buffer.flushActivityEvents()
+    const single = () => post.mock.calls.filter(([path]) => path === "/activity/")
+    expect(single().map(([, body]) => body.user_id)).toEqual([0, 1, 2])
+
+    await buffer.enqueueActivityEvent(event(3))
+    await buffer.flushActivityEvents()
+    expect(batches()).toHaveLength(1)
+    expect(single()).toHaveLength(4)
+    expect(buffer.activityBufferStats()).toMatchObject({ queued: 0, sent: 4 })
+  })
+})
+
+describe("backend caído", () => {
+  it("una tanda que falla queda en cola y sale entera en el próximo intento", async () => {
+    post.mockRejectedValueOnce(new Error("API POST /activity/batch → 503: Service Unavailable"))
+    for (let i = 0; i < 3; i++) await buffer.enqueueActivityEvent(event(i))
+
+    await buffer.flushActivityEvents()
+    expect(buffer.activityBufferStats()).toMatchObject({ queued: 3, sent: 0 })
+
+    await buffer.flushActivityEvents()
+    expect(batches()).toHaveLength(2)
+    expect(batches()[1].map((e: any) => e.user_id)).toEqual([0, 1, 2])
+    expect(buffer.activityBufferStats()).toMatchObject({ queued: 0, sent: 3 })
+  })
+
+  /** Llena la cola con la tanda en curso colgada; devuelve cómo liberarla. */
+  async function fillWithHungBackend() {
+    let release!: () => void
+    post.mockImplementationOnce(() => new Promise<void>((resolve) => { release = resolve }))
+    for (let i = 0; i < 5000; i++) await buffer.enqueueActivityEvent(event(i))
+    return () => release()
+  }
+
+  it("con la cola llena, quien encola espera y se descarta pasado el plazo", async () => {
+    await fillWithHungBackend()
+
+    let settled = 0
+    for (let i = 0; i < 3; i++) void buffer.enqueueActivityEvent(event()).then(() => settled++)
+    await vi.advanceTimersByTimeAsync(1000)
+    expect(settled).toBe(0)
+    expect(buffer.activityBufferStats().waiting).toBe(3)
+
+    await vi.advanceTimersByTimeAsync(2000)
+    expect(settled).toBe(3)
+    expect(buffer.activityBufferStats()).toMatchObject({ waiting: 0, dropped: 3, queued: 5000 })
+  })
+
+  it("si la tanda vuelve a tiempo, los que esperaban entran a la cola", async () => {
+    const release = await fillWithHungBackend()
+
+    const admitted = buffer.enqueueActivityEvent(event(9999))
+    release()
+    await admitted
+    expect(buffer.activityBufferStats()).toMatchObject({ waiting: 0, dropped: 0 })
+  })
+
+  it("los descartes se loguean juntos, una línea por intervalo", async () => {
+    await fillWithHungBackend()
+    for (let i = 0; i < 50; i++) void buffer.enqueueActivityEvent(event())
+    await vi.advanceTimersByTimeAsync(3000)
+    expect(logWarn).not.toHaveBeenCalledWith(expect.stringContaining("descartad"), expect.anything())
+
+    await vi.advanceTimersByTimeAsync(1000)
+    const drops = logWarn.mock.calls.filter(([msg]) => msg.includes("descartad"))
+    expect(drops).toHaveLength(1)
+    expect(drops[0][1].meta).toMatchObject({ count: 50, timeout: 50 })
+  })
+})
@@ -0,0 +1,101 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from "vitest"
+import { api } from "@/lib/api-client"
+
+/**
+ * Tests de la cache del cliente HTTP.
+ *
+ * Acá no se mockea lib/api-client (es lo que se prueba): se reemplaza el
+ * `fetch` global, así que tampoco sale nada a la red.
+ */
+
+const respuesta = (body: unknown) =>
+  new Response(JSON.stringify(body), { status: 200, headers: { "Content-Type": "application/json" } })
+
+let fetchMock: ReturnType<typeof vi.fn>
+
+beforeEach(() => {
+  api.invalidate()
+  fetchMock = vi.fn(async () => respuesta([{ id: 1, name: "Arte y Memoria" }]))
+  vi.stubGlobal("fetch", fetchMock)
+})
+
+afterEach(() => {
+  vi.unstubAllGlobals()
+})
+
+describe("api.get — GETs en vuelo", () => {
+  it("dos GET idénticos simultáneos salen una sola vez al backend", async () => {
+    const [a, b] = await Promise.all([api.get("/talleres/"), api.get("/talleres/")])
+
+    expect(fetchMock).toHaveBeenCalledTimes(1)
+    expect(a).toEqual(b)
+  })
+
+  it("cada llamador recibe su propia copia", async () => {
+    const [a, b] = await Promise.all([api.get<any[]>("/talleres/"), api.get<any[]>("/talleres/")])
+
+    a[0].name = "cambiado"
+    expect(b[0].name).toBe("Arte y Memoria")
+  })
+
+  it("sin ttlMs no cachea: el siguiente GET vuelve a salir", async () => {
+    await api.get("/talleres/")
+    await api.get("/talleres/")
+
+    expect(fetchMock).toHaveBeenCalledTimes(2)
+  })
+})
+
+describe("api.get — cache con ttlMs", () => {
+  it("dentro del TTL responde de memoria", async () => {
+    await api.get("/talleres/", { ttlMs: 10_000 })
+    const again = await api.get("/talleres/", { ttlMs: 10_000 })
+
+    expect(fetchMock).toHaveBeenCalledTimes(1)
+    expect(again).toEqual([{ id: 1, name: "Arte y Memoria" }])
+  })
+
+  it("vencido el TTL vuelve a pedir", async () => {
+    vi.useFakeTimers()
+    try {
+      await api.get("/talleres/", { ttlMs: 1_000 })
+      vi.advanceTimersByTime(1_500)
+      await api.get("/talleres/", { ttlMs: 1_000 })
+    } finally {
+      vi.useRealTimers()
+    }
+
+    expect(fetchMock).toHaveBeenCalledTimes(2)
+  })
+
+  it("una escritura sobre el recurso invalida su cache", async () => {
+    await api.get("/talleres/?limit=1000", { ttlMs: 10_000 })
+    await api.put("/talleres/1", { name: "Nuevo" })
+    await api.get("/talleres/?limit=1000", { ttlMs: 10_000 })
+
+    // GET + PUT + GET de nuevo
+    expect(fetchMock).toHaveBeenCalledTimes(3)
+  })
+
+  it("una escritura sobre OTRO recurso no toca la cache", async () => {
+    await api.get("/talleres/", { ttlMs: 10_000 })
+    await api.post("/grupos/", { name: "Nuevo" })
+    await api.get("/talleres/", { ttlMs: 10_000 })
+
+    expect(fetchMock).toHaveBeenCalledTimes(2)
+  })
+
+  it("un GET que vuelve después de una escritura no deja datos viejos en cache", async () => {
+    let release!: (r: Response) => void
+    fetchMock.mockImplementationOnce(() => new Promise<Response>((r) => (release = r)))
+
+    const viejo = api.get("/talleres/", { ttlMs: 10_000 })
+    await api.delete("/talleres/1")
+    release(respuesta([{ id: 1, name: "viejo" }]))
+    await viejo
+
+    await api.get("/talleres/", { ttlMs: 10_000 })
+    // GET viejo + DELETE + GET nuevo (el viejo no quedó guardado)
+    expect(fetchMock).toHaveBeenCalledTimes(3)
+  })
+})
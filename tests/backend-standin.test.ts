@@ -0,0 +1,111 @@
+import { describe, it, expect, beforeAll, afterAll } from "vitest"
+import { spawn, type ChildProcess } from "node:child_process"
+import { createServer } from "node:net"
+import path from "node:path"
+
+/**
+ * Ida y vuelta de archivos contra backend_standin.py.
+ *
+ * A diferencia del resto, acá sí hay red: se levanta el stand-in en un
+ * puerto libre de localhost y se le habla con las funciones de
+ * lib/data-manager, para que el contrato de /files no se vuelva a separar
+ * entre los dos lados.
+ *
+ * Por eso no corre en `npm test`: sólo con `python run_tests.py --standin`
+ * (o ALMA_STANDIN_TESTS=1), que además necesita Python en el PATH.
+ */
+
+const enabled = Boolean(process.env.ALMA_STANDIN_TESTS)
+
+let standin: ChildProcess
+let dm: typeof import("@/lib/data-manager")
+
+function freePort(): Promise<number> {
+  return new Promise((resolve, reject) => {
+    const server = createServer()
+    server.once("error", reject)
+    server.listen(0, "127.0.0.1", () => {
+      const { port } = server.address() as { port: number }
+      server.close(() => resolve(port))
+    })
+  })
+}
+
+async function waitUp(base: string) {
+  const deadline = Date.now() + 15_000
+  for (;;) {
+    try {
+      if ((await fetch(`${base}/_standin/stats`)).ok) return
+    } catch {
+      // Todavía no escucha.
+    }
+    if (Date.now() > deadline) throw new Error("backend_standin.py no levantó")
+    await new Promise((r) => setTimeout(r, 100))
+  }
+}
+
+function streamOf(chunks: number[][]): ReadableStream<Uint8Array> {
+  let i = 0
+  return new ReadableStream<Uint8Array>({
+    pull(controller) {
+      if (i < chunks.length) controller.enqueue(new Uint8Array(chunks[i++]))
+      else controller.close()
+    },
+  })
+}
+
+describe.skipIf(!enabled)("backend_standin.py — archivos", () => {
+  beforeAll(async () => {
+    const port = await freePort()
+    const python = process.env.PYTHON || (process.platform === "win32" ? "python" : "python3")
+    standin = spawn(python, ["-X", "utf8", "backend_standin.py", "--port", String(port)], {
+      cwd: path.resolve(__dirname, ".."),
+      stdio: "ignore",
+    })
+    const base = `http://127.0.0.1:${port}`
+    await waitUp(base)
+
+    // api-client lee BACKEND_URL al cargarse: se importa recién ahora.
+    process.env.BACKEND_URL = base
+    dm = await import("@/lib/data-manager")
+  }, 20_000)
+
+  afterAll(() => {
+    standin?.kill()
+  })
+
+  it("uploadFile (data_base64) vuelve igual por getFileBase64", async () => {
+    const data = Buffer.from("Constancia de asistencia — taller de memoria")
+    const meta = await dm.uploadFile({
+      name: "constancia.txt",
+      mime_type: "text/plain",
+      purpose: "general",
+      data_base64: data.toString("base64"),
+    })
+    expect(meta.size_bytes).toBe(data.length)
+
+    const back = await dm.getFileBase64(meta.guid)
+    expect(back).toEqual({
+      guid: meta.guid,
+      name: "constancia.txt",
+      mime_type: "text/plain",
+      size_bytes: data.length,
+      data_base64: data.toString("base64"),
+    })
+  })
+
+  it("uploadFileStream guarda el mime_type pedido y todos los bytes", async () => {
+    const meta = await dm.uploadFileStream(
+      { name: "foto.png", mime_type: "image/png", purpose: "general" },
+      streamOf([[137, 80, 78, 71], [13, 10, 26, 10], [0, 1, 2]]),
+    )
+    expect(meta.mime_type).toBe("image/png")
+    expect(meta.size_bytes).toBe(11)
+
+    const stored = await dm.getFileMeta(meta.guid)
+    expect(stored.mime_type).toBe("image/png")
+
+    const raw = await dm.getFileRaw(meta.guid)
+    expect([...new Uint8Array(await raw.arrayBuffer())]).toEqual([137, 80, 78, 71, 13, 10, 26, 10, 0, 1, 2])
+  })
+})
@@ -0,0 +1,77 @@
+import { describe, it, expect, vi, beforeEach } from "vitest"
+import type { BroadcastPayload } from "@/lib/data-manager"
+
+/**
+ * Tests de la cola de envíos masivos: el conteo de tandas y el estado final.
+ *
+ * El registro cuelga de globalThis: cada test lo limpia e importa el módulo
+ * de nuevo.
+ */
+
+const dm = vi.hoisted(() => ({
+  broadcastNotification: vi.fn(),
+  deliverBroadcastChunk: vi.fn(),
+  getBroadcastRecipients: vi.fn(),
+}))
+
+vi.mock("@/lib/data-manager", () => dm)
+vi.mock("@/lib/logger", () => ({ logInfo: vi.fn(), logWarn: vi.fn(), logError: vi.fn() }))
+vi.mock("@/lib/shared-store", () => ({
+  createJobMirror: () => ({ publish: vi.fn(), read: vi.fn() }),
+}))
+
+const delivered = { notified: 0, push_sent: 0, push_failed: 0, emails_queued: 0 }
+
+const payload = (audience: string, also_popup = false): BroadcastPayload => ({
+  title: "Aviso", body: "Mañana no hay taller", audience, notify: true, also_popup, send_email: false,
+})
+
+let broadcast: typeof import("@/lib/broadcast-jobs")
+
+beforeEach(async () => {
+  for (const fn of Object.values(dm)) fn.mockReset()
+  dm.deliverBroadcastChunk.mockResolvedValue(delivered)
+  const store = globalThis as Record<string, unknown>
+  for (const key of ["__broadcastJobs", "__broadcastJobQueue", "__broadcastJobRunning"]) delete store[key]
+  vi.resetModules()
+  broadcast = await import("@/lib/broadcast-jobs")
+})
+
+async function settle(id: string) {
+  await vi.waitFor(async () => {
+    expect((await broadcast.getBroadcastJob(id))!.status).not.toMatch(/queued|running/)
+  })
+  return (await broadcast.getBroadcastJob(id))!
+}
+
+describe("tandas", () => {
+  it("audiencia vacía con popup: la tanda del popup cuenta en el total", async () => {
+    dm.getBroadcastRecipients.mockResolvedValue([])
+
+    const job = broadcast.startBroadcastJob(payload("participante", true), 1)
+    expect(await settle(job.id)).toMatchObject({ status: "done", chunks_total: 1, chunks_done: 1, recipients: 0 })
+    expect(dm.deliverBroadcastChunk).toHaveBeenCalledTimes(1)
+  })
+
+  it("audiencia vacía sin popup: no hay nada que mandar", async () => {
+    dm.getBroadcastRecipients.mockResolvedValue([])
+
+    const job = broadcast.startBroadcastJob(payload("participante"), 1)
+    expect(await settle(job.id)).toMatchObject({ status: "done", chunks_total: 0, chunks_done: 0 })
+    expect(dm.deliverBroadcastChunk).not.toHaveBeenCalled()
+  })
+
+  it("una tanda rechazada deja el trabajo fallido, con lo que sí se entregó", async () => {
+    dm.getBroadcastRecipients.mockResolvedValue(
+      Array.from({ length: 250 }, (_, i) => ({ user_type: "voluntario", user_id: i })),
+    )
+    dm.deliverBroadcastChunk
+      .mockResolvedValueOnce(delivered)
+      .mockRejectedValueOnce(new Error("API POST /notifications/broadcast/chunk → 400: Bad Request"))
+
+    const job = broadcast.startBroadcastJob(payload("voluntario"), 1)
+    const done = await settle(job.id)
+    expect(done).toMatchObject({ status: "failed", chunks_total: 2, chunks_done: 1, chunks_failed: 1, processed: 200 })
+    expect(done.error).toMatch(/1 tandas/)
+  })
+})
@@ -0,0 +1,199 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from "vitest"
+
+/**
+ * Tests de los trabajos masivos de calendario: borrado por tramos de id,
+ * generación por tramos del patrón, cancelar / reanudar y la cola.
+ *
+ * El registro cuelga de globalThis: cada test lo limpia e importa el módulo
+ * de nuevo, con el reloj de mentira para las pausas entre tandas.
+ */
+
+const dm = vi.hoisted(() => ({
+  countCalendarInstancesBulk: vi.fn(),
+  createCalendarInstance: vi.fn(),
+  deleteCalendarInstancesBulk: vi.fn(),
+  deleteCalendarInstancesRange: vi.fn(),
+  generateCalendarInstances: vi.fn(),
+  getCalendarInstanceIdsBulk: vi.fn(),
+}))
+
+vi.mock("@/lib/data-manager", () => dm)
+vi.mock("@/lib/logger", () => ({ logInfo: vi.fn(), logWarn: vi.fn(), logError: vi.fn() }))
+vi.mock("@/lib/shared-store", () => ({
+  createJobMirror: () => ({ publish: vi.fn(), read: vi.fn(), request: vi.fn(), watch: vi.fn() }),
+}))
+
+const filters = { scope: "type" as const, type: "grupo" }
+const range = (from: number, to: number) => Array.from({ length: to - from + 1 }, (_, i) => from + i)
+
+let jobs: typeof import("@/lib/calendar-jobs")
+
+beforeEach(async () => {
+  vi.useFakeTimers()
+  for (const fn of Object.values(dm)) fn.mockReset()
+  dm.deleteCalendarInstancesRange.mockImplementation(async (_f, from: number, to: number) => ({ deleted: to - from + 1 }))
+  const store = globalThis as Record<string, unknown>
+  for (const key of ["__calendarJobs", "__calendarJobQueue", "__calendarJobRunning", "__calendarJobWatching"]) {
+    delete store[key]
+  }
+  vi.resetModules()
+  jobs = await import("@/lib/calendar-jobs")
+})
+
+afterEach(() => {
+  vi.useRealTimers()
+})
+
+/** Deja correr las tandas (y sus pausas) hasta que el trabajo se asiente. */
+async function settle(id: string) {
+  await vi.waitFor(async () => {
+    await vi.advanceTimersByTimeAsync(1000)
+    expect((await jobs.getCalendarJob(id))!.status).not.toMatch(/queued|running/)
+  })
+  return (await jobs.getCalendarJob(id))!
+}
+
+describe("borrado", () => {
+  it("borra por tramos de 25 ids con BETWEEN, sin el bulk monolítico", async () => {
+    dm.countCalendarInstancesBulk.mockResolvedValue(60)
+    dm.getCalendarInstanceIdsBulk.mockResolvedValue(range(101, 160))
+
+    const job = await jobs.startCalendarJob({ kind: "delete", filters }, 7)
+    expect(await settle(job.id)).toMatchObject({ status: "done", done: 60, total: 60 })
+
+    expect(dm.deleteCalendarInstancesRange.mock.calls.map(([, from, to]) => [from, to])).toEqual([
+      [101, 125], [126, 150], [151, 160],
+    ])
+    expect(dm.deleteCalendarInstancesBulk).not.toHaveBeenCalled()
+  })
+
+  it("cancelado a mitad, al reanudar sólo borra lo que falta", async () => {
+    dm.countCalendarInstancesBulk.mockResolvedValue(60)
+    dm.getCalendarInstanceIdsBulk.mockResolvedValueOnce(range(101, 160)).mockResolvedValueOnce(range(126, 160))
+    let release!: () => void
+    dm.deleteCalendarInstancesRange.mockImplementationOnce(
+      () => new Promise((resolve) => { release = () => resolve({ deleted: 25 }) }),
+    )
+
+    const job = await jobs.startCalendarJob({ kind: "delete", filters }, 7)
+    await vi.waitFor(() => expect(release).toBeDefined())
+    jobs.cancelCalendarJob(job.id)
+    release()
+    expect(await settle(job.id)).toMatchObject({ status: "cancelled", done: 25 })
+
+    jobs.resumeCalendarJob(job.id)
+    expect(await settle(job.id)).toMatchObject({ status: "done", done: 60, total: 60 })
+    expect(dm.deleteCalendarInstancesRange.mock.calls.slice(1).map(([, from, to]) => [from, to])).toEqual([
+      [126, 150], [151, 160],
+    ])
+  })
+
+  it("un tramo que falla deja el trabajo fallido y reanudable", async () => {
+    dm.countCalendarInstancesBulk.mockResolvedValue(30)
+    dm.getCalendarInstanceIdsBulk.mockResolvedValueOnce(range(1, 30)).mockResolvedValueOnce(range(26, 30))
+    dm.deleteCalendarInstancesRange
+      .mockResolvedValueOnce({ deleted: 25 })
+      .mockRejectedValueOnce(new Error("API POST /calendar/bulk-delete-range → 500: Lock wait timeout"))
+
+    const job = await jobs.startCalendarJob({ kind: "delete", filters }, 7)
+    const failed = await settle(job.id)
+    expect(failed).toMatchObject({ status: "failed", done: 25 })
+    expect(failed.error).toMatch(/Lock wait timeout/)
+
+    jobs.resumeCalendarJob(job.id)
+    expect(await settle(job.id)).toMatchObject({ status: "done", done: 30, error: null })
+  })
+
+  it.each([404, 405])("backend sin tramos (%i): vuelve al bulk de siempre", async (status) => {
+    dm.countCalendarInstancesBulk.mockResolvedValue(40)
+    dm.getCalendarInstanceIdsBulk.mockRejectedValue(new Error(`API POST /calendar/bulk-ids → ${status}: Not Found`))
+    dm.deleteCalendarInstancesBulk.mockResolvedValue({ deleted: 40 })
+
+    const job = await jobs.startCalendarJob({ kind: "delete", filters }, 7)
+    expect(await settle(job.id)).toMatchObject({ status: "done", done: 40 })
+    expect(dm.deleteCalendarInstancesBulk).toHaveBeenCalledWith(filters)
+    expect(dm.deleteCalendarInstancesRange).not.toHaveBeenCalled()
+  })
+})
+
+describe("generación ALMA Clásico", () => {
+  const pattern = {
+    start_date: "2026-01-05",
+    end_date: "2027-12-27",
+    first_type: "grupo",
+    interval_days: 7,
+  }
+
+  it("le pide el patrón a /calendar/generate por tramos de fechas", async () => {
+    dm.generateCalendarInstances.mockResolvedValue({ created: 24, instances: [] })
+
+    const job = await jobs.startCalendarJob({ kind: "generate", pattern }, 7)
+    expect(job.total).toBe(104)
+    await settle(job.id)
+
+    expect(dm.generateCalendarInstances.mock.calls.map(([w]) => [w.start_date, w.end_date, w.first_type])).toEqual([
+      ["2026-01-05", "2026-06-15", "grupo"],
+      ["2026-06-22", "2026-11-30", "grupo"],
+      ["2026-12-07", "2027-05-17", "grupo"],
+      ["2027-05-24", "2027-11-01", "grupo"],
+      ["2027-11-08", "2027-12-27", "grupo"],
+    ])
+    expect(dm.createCalendarInstance).not.toHaveBeenCalled()
+  })
+
+  it("el total final es lo que creó el backend", async () => {
+    dm.generateCalendarInstances.mockResolvedValue({ created: 20, instances: [] })
+
+    const job = await jobs.startCalendarJob({ kind: "generate", pattern }, 7)
+    expect(await settle(job.id)).toMatchObject({ status: "done", done: 100, total: 100 })
+  })
+
+  it("un tramo que falla se vuelve a pedir al reanudar, y los anteriores no", async () => {
+    dm.generateCalendarInstances
+      .mockResolvedValueOnce({ created: 24, instances: [] })
+      .mockRejectedValueOnce(new Error("API POST /calendar/generate → 503: Service Unavailable"))
+      .mockResolvedValue({ created: 24, instances: [] })
+
+    const job = await jobs.startCalendarJob({ kind: "generate", pattern }, 7)
+    expect(await settle(job.id)).toMatchObject({ status: "failed", done: 24 })
+
+    jobs.resumeCalendarJob(job.id)
+    await settle(job.id)
+    const starts = dm.generateCalendarInstances.mock.calls.map(([w]) => w.start_date)
+    expect(starts.slice(0, 3)).toEqual(["2026-01-05", "2026-06-22", "2026-06-22"])
+    expect(starts).toHaveLength(6)
+  })
+})
+
+describe("cola", () => {
+  it("cancelar uno en cola lo saca sin tocar a los demás", async () => {
+    let release!: () => void
+    dm.countCalendarInstancesBulk.mockResolvedValue(1)
+    dm.getCalendarInstanceIdsBulk.mockResolvedValue([1])
+    dm.deleteCalendarInstancesRange.mockImplementationOnce(
+      () => new Promise((resolve) => { release = () => resolve({ deleted: 1 }) }),
+    )
+
+    const first = await jobs.startCalendarJob({ kind: "delete", filters }, 7)
+    const second = await jobs.startCalendarJob({ kind: "delete", filters }, 7)
+    const third = await jobs.startCalendarJob({ kind: "delete", filters }, 7)
+    await vi.waitFor(() => expect(release).toBeDefined())
+
+    expect(jobs.cancelCalendarJob(second.id)).toMatchObject({ status: "cancelled" })
+    // Un segundo cancelar no hace nada.
+    expect(jobs.cancelCalendarJob(second.id)).toMatchObject({ status: "cancelled" })
+
+    release()
+    expect(await settle(first.id)).toMatchObject({ status: "done" })
+    expect(await settle(third.id)).toMatchObject({ status: "done", done: 1 })
+    expect(dm.getCalendarInstanceIdsBulk).toHaveBeenCalledTimes(2)
+  })
+
+  it("sin nada que procesar termina en el acto", async () => {
+    dm.countCalendarInstancesBulk.mockResolvedValue(0)
+
+    const job = await jobs.startCalendarJob({ kind: "delete", filters }, 7)
+    expect(job).toMatchObject({ status: "done", total: 0 })
+    expect(dm.getCalendarInstanceIdsBulk).not.toHaveBeenCalled()
+  })
+})
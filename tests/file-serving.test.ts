@@ -0,0 +1,123 @@
+import { describe, it, expect } from "vitest"
+import { parseRange, sliceStream } from "@/lib/http-range"
+import { isVariantResponse, snapWidth, variantSize, VARIANT_WIDTHS } from "@/lib/file-variants"
+
+/**
+ * Tests de lo que decide el proxy de archivos sin tocar red ni disco:
+ * qué rango se sirve, cómo se recorta el stream y qué miniatura se pide.
+ */
+
+/** Un stream que entrega `chunks` tal cual, uno por read(). */
+function streamOf(chunks: number[][]): ReadableStream<Uint8Array> {
+  let i = 0
+  return new ReadableStream<Uint8Array>({
+    pull(controller) {
+      if (i < chunks.length) controller.enqueue(new Uint8Array(chunks[i++]))
+      else controller.close()
+    },
+  })
+}
+
+async function bytesOf(stream: ReadableStream<Uint8Array>): Promise<number[]> {
+  const out: number[] = []
+  const reader = stream.getReader()
+  for (;;) {
+    const { done, value } = await reader.read()
+    if (done) return out
+    out.push(...value)
+  }
+}
+
+describe("parseRange", () => {
+  it("rangos comunes", () => {
+    expect(parseRange("bytes=0-499", 1000)).toEqual({ start: 0, end: 499 })
+    expect(parseRange("bytes=500-", 1000)).toEqual({ start: 500, end: 999 })
+    expect(parseRange("bytes=-100", 1000)).toEqual({ start: 900, end: 999 })
+    expect(parseRange("bytes=900-5000", 1000)).toEqual({ start: 900, end: 999 })
+  })
+
+  it("sin header o sin números: se manda todo", () => {
+    expect(parseRange(null, 1000)).toBeNull()
+    expect(parseRange("bytes=-", 1000)).toBeNull()
+    expect(parseRange("items=0-5", 1000)).toBeNull()
+  })
+
+  it("bytes=-0 no pide nada: 416", () => {
+    expect(parseRange("bytes=-0", 1000)).toBe("unsatisfiable")
+  })
+
+  it("bytes=5-2 está mal escrito: se ignora", () => {
+    expect(parseRange("bytes=5-2", 1000)).toBeNull()
+  })
+
+  it("arrancar en el final o después: 416", () => {
+    expect(parseRange("bytes=1000-", 1000)).toBe("unsatisfiable")
+    expect(parseRange("bytes=2000-2100", 1000)).toBe("unsatisfiable")
+    expect(parseRange("bytes=0-", 0)).toBe("unsatisfiable")
+  })
+
+  it("un sufijo más largo que el archivo es el archivo entero", () => {
+    expect(parseRange("bytes=-5000", 1000)).toEqual({ start: 0, end: 999 })
+  })
+
+  it("varios rangos: se manda todo", () => {
+    expect(parseRange("bytes=0-1,5-6", 1000)).toBeNull()
+  })
+})
+
+describe("sliceStream", () => {
+  const chunks = [
+    [0, 1, 2, 3],
+    [4, 5, 6, 7],
+    [8, 9, 10, 11],
+  ]
+
+  it("un rango que cruza varios pedazos", async () => {
+    expect(await bytesOf(sliceStream(streamOf(chunks), { start: 2, end: 9 }))).toEqual([2, 3, 4, 5, 6, 7, 8, 9])
+  })
+
+  it("empezando y terminando justo en los bordes de un pedazo", async () => {
+    expect(await bytesOf(sliceStream(streamOf(chunks), { start: 4, end: 7 }))).toEqual([4, 5, 6, 7])
+  })
+
+  it("dentro de un solo pedazo", async () => {
+    expect(await bytesOf(sliceStream(streamOf(chunks), { start: 9, end: 10 }))).toEqual([9, 10])
+  })
+
+  it("hasta el final", async () => {
+    expect(await bytesOf(sliceStream(streamOf(chunks), { start: 10, end: 11 }))).toEqual([10, 11])
+  })
+})
+
+describe("miniaturas", () => {
+  it("snapWidth redondea hacia arriba y se queda en el más grande", () => {
+    expect(snapWidth(1)).toBe(VARIANT_WIDTHS[0])
+    expect(snapWidth(160)).toBe(160)
+    expect(snapWidth(161)).toBe(320)
+    expect(snapWidth(99999)).toBe(VARIANT_WIDTHS[VARIANT_WIDTHS.length - 1])
+  })
+
+  it("variantSize respeta la proporción", () => {
+    expect(variantSize({ width: 2000, height: 1000 }, 300)).toEqual({ width: 320, height: 160 })
+  })
+
+  it("variantSize nunca agranda: si el original ya es chico, va el original", () => {
+    expect(variantSize({ width: 300, height: 200 }, 300)).toBeNull()
+    expect(variantSize({ width: 320, height: 200 }, 320)).toBeNull()
+    expect(variantSize({ width: 200, height: 200 }, 1280)).toBeNull()
+  })
+
+  it("variantSize sin dimensiones guardadas: va el original", () => {
+    expect(variantSize({ width: null, height: null }, 320)).toBeNull()
+    expect(variantSize({ width: 2000, height: 1000 }, 0)).toBeNull()
+  })
+
+  it("sólo se guarda como variante lo que el backend realmente recortó", () => {
+    expect(isVariantResponse(new Headers({ "X-Variant-Width": "320" }), 320, 1000)).toBe(true)
+    expect(isVariantResponse(new Headers({ "X-Variant-Width": "2000" }), 320, 1000)).toBe(false)
+    expect(isVariantResponse(new Headers({ "Content-Length": "400" }), 320, 1000)).toBe(true)
+    // El original entero (backend sin ?w=), o sin largo conocido: no.
+    expect(isVariantResponse(new Headers({ "Content-Length": "1000" }), 320, 1000)).toBe(false)
+    expect(isVariantResponse(new Headers(), 320, 1000)).toBe(false)
+  })
+})
@@ -0,0 +1,182 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from "vitest"
+import { ExpiryQueue, GrantIndex } from "@/lib/grant-index"
+
+/**
+ * Tests del índice de habilitaciones: la cola de vencimientos y cómo
+ * convive con renovaciones y bajas. El reloj es de mentira (vi.setSystemTime).
+ */
+
+const T0 = Date.parse("2025-06-01T12:00:00Z")
+const HOUR = 3_600_000
+const at = (ms: number) => new Date(ms).toISOString()
+
+const entry = (ms: number, resource = 0) => ({ at: ms, person: 1, module: 0, resource })
+
+beforeEach(() => {
+  vi.useFakeTimers()
+  vi.setSystemTime(T0)
+})
+
+afterEach(() => {
+  vi.useRealTimers()
+})
+
+describe("ExpiryQueue", () => {
+  it("saca los vencidos en orden de vencimiento, sin importar el orden de entrada", () => {
+    const q = new ExpiryQueue()
+    for (const ms of [50, 10, 40, 30, 20, 60, 5, 45]) q.push(entry(ms, ms))
+
+    expect(q.popDue(40).map((e) => e.at)).toEqual([5, 10, 20, 30, 40])
+    expect(q.size).toBe(3)
+    expect(q.popDue(1000).map((e) => e.at)).toEqual([45, 50, 60])
+    expect(q.size).toBe(0)
+  })
+
+  it("no saca nada que todavía no venció", () => {
+    const q = new ExpiryQueue()
+    q.push(entry(100))
+    expect(q.popDue(99)).toEqual([])
+    expect(q.size).toBe(1)
+  })
+})
+
+describe("GrantIndex — vencimientos", () => {
+  it("una habilitación desaparece al vencer", () => {
+    const idx = new GrantIndex()
+    idx.set(1, "talleres", 5, at(T0 + HOUR))
+
+    expect([...idx.resources(1, "talleres")]).toEqual([5])
+    vi.setSystemTime(T0 + HOUR + 1)
+    expect([...idx.resources(1, "talleres")]).toEqual([])
+    expect(idx.personGrants(1)).toEqual([])
+  })
+
+  it("una ya vencida no entra", () => {
+    const idx = new GrantIndex()
+    idx.set(1, "talleres", 5, at(T0 - 1))
+    expect([...idx.resources(1, "talleres")]).toEqual([])
+  })
+
+  it("las que no vencen quedan", () => {
+    const idx = new GrantIndex()
+    idx.set(1, "talleres", 5, null)
+    vi.setSystemTime(T0 + 1000 * HOUR)
+    expect([...idx.resources(1, "talleres")]).toEqual([5])
+  })
+
+  it("vencen de a una, en orden", () => {
+    const idx = new GrantIndex()
+    idx.set(1, "talleres", 7, at(T0 + 3 * HOUR))
+    idx.set(1, "talleres", 5, at(T0 + 1 * HOUR))
+    idx.set(1, "talleres", 6, at(T0 + 2 * HOUR))
+
+    vi.setSystemTime(T0 + 1.5 * HOUR)
+    expect([...idx.resources(1, "talleres")].sort()).toEqual([6, 7])
+    vi.setSystemTime(T0 + 2.5 * HOUR)
+    expect([...idx.resources(1, "talleres")]).toEqual([7])
+  })
+})
+
+describe("GrantIndex — renovaciones y bajas", () => {
+  it("una renovación no se pierde cuando vence la fecha vieja", () => {
+    const idx = new GrantIndex()
+    idx.set(1, "talleres", 5, at(T0 + HOUR))
+    idx.set(1, "talleres", 5, at(T0 + 5 * HOUR))
+
+    vi.setSystemTime(T0 + 2 * HOUR)
+    expect([...idx.resources(1, "talleres")]).toEqual([5])
+    vi.setSystemTime(T0 + 5 * HOUR + 1)
+    expect([...idx.resources(1, "talleres")]).toEqual([])
+  })
+
+  it("renovar a sin vencimiento la deja para siempre", () => {
+    const idx = new GrantIndex()
+    idx.set(1, "talleres", 5, at(T0 + HOUR))
+    idx.set(1, "talleres", 5, null)
+
+    vi.setSystemTime(T0 + 10 * HOUR)
+    expect([...idx.resources(1, "talleres")]).toEqual([5])
+  })
+
+  it("dada de baja y vuelta a dar: la fecha vieja no se lleva la nueva", () => {
+    const idx = new GrantIndex()
+    idx.set(1, "talleres", 5, at(T0 + HOUR))
+    idx.remove(1, "talleres", 5)
+    expect([...idx.resources(1, "talleres")]).toEqual([])
+
+    idx.set(1, "talleres", 5, at(T0 + 3 * HOUR))
+    vi.setSystemTime(T0 + 2 * HOUR)
+    expect([...idx.resources(1, "talleres")]).toEqual([5])
+    vi.setSystemTime(T0 + 3 * HOUR + 1)
+    expect([...idx.resources(1, "talleres")]).toEqual([])
+  })
+
+  it("dada de baja: al llegar su vencimiento no toca a las demás", () => {
+    const idx = new GrantIndex()
+    idx.set(1, "talleres", 5, at(T0 + HOUR))
+    idx.set(1, "talleres", 6, null)
+    idx.set(2, "talleres", 5, null)
+    idx.remove(1, "talleres", 5)
+
+    vi.setSystemTime(T0 + 2 * HOUR)
+    expect([...idx.resources(1, "talleres")]).toEqual([6])
+    expect([...idx.resources(2, "talleres")]).toEqual([5])
+  })
+})
+
+describe("GrantIndex.lookup — la mitad habilitación de can()", () => {
+  it("responde por el módulo entero o por un ítem puntual", () => {
+    const idx = new GrantIndex()
+    idx.set(1, "capacitaciones", 7, null)
+    const lookup = idx.lookup(1)
+
+    expect(lookup.has("capacitaciones")).toBe(true)
+    expect(lookup.has("capacitaciones", 7)).toBe(true)
+    expect(lookup.has("capacitaciones", 8)).toBe(false)
+    expect(idx.lookup(2).has("capacitaciones")).toBe(false)
+    expect(idx.lookup(null).has("capacitaciones")).toBe(false)
+  })
+
+  it("lo vencido deja de contar sin recargar nada", () => {
+    const idx = new GrantIndex()
+    idx.set(1, "capacitaciones", 7, at(T0 + HOUR))
+    const lookup = idx.lookup(1)
+
+    vi.setSystemTime(T0 + HOUR + 1)
+    expect(lookup.has("capacitaciones", 7)).toBe(false)
+  })
+})
+
+describe("vencimientos sin zona (DATETIME de MySQL)", () => {
+  let grantIndex: typeof import("@/lib/grant-index")
+
+  beforeEach(async () => {
+    process.env.DB_TIMEZONE = "America/Argentina/Buenos_Aires"
+    vi.resetModules()
+    grantIndex = await import("@/lib/grant-index")
+  })
+
+  afterEach(() => {
+    delete process.env.DB_TIMEZONE
+  })
+
+  it("se leen en DB_TIMEZONE, no en la zona del proceso", () => {
+    expect(grantIndex.parseDbDateTime("2025-06-01 12:00:00")).toBe(Date.parse("2025-06-01T15:00:00Z"))
+    expect(grantIndex.parseDbDateTime("2025-06-01")).toBe(Date.parse("2025-06-01T03:00:00Z"))
+  })
+
+  it("con offset o Z se respeta lo que dicen", () => {
+    expect(grantIndex.parseDbDateTime("2025-06-01T12:00:00Z")).toBe(Date.parse("2025-06-01T12:00:00Z"))
+    expect(grantIndex.parseDbDateTime("2025-06-01T12:00:00+02:00")).toBe(Date.parse("2025-06-01T10:00:00Z"))
+  })
+
+  it("una habilitación vence a la hora de la base", () => {
+    const idx = new grantIndex.GrantIndex()
+    // 12:00 en Buenos Aires son las 15:00 UTC: a las 14:00 UTC sigue vigente.
+    idx.set(1, "capacitaciones", 7, "2025-06-01 12:00:00")
+    vi.setSystemTime(Date.parse("2025-06-01T14:00:00Z"))
+    expect([...idx.resources(1, "capacitaciones")]).toEqual([7])
+    vi.setSystemTime(Date.parse("2025-06-01T15:00:01Z"))
+    expect([...idx.resources(1, "capacitaciones")]).toEqual([])
+  })
+})
@@ -0,0 +1,61 @@
+import { bench, describe } from "vitest"
+import { SignJWT, jwtVerify } from "jose"
+import { VerifiedTokenCache, compilePrefixMatcher, tokenDigest } from "@/lib/verified-tokens"
+
+/**
+ * Microbenchmark del trabajo que hace middleware.ts en cada navegación.
+ *
+ *   npm run bench
+ *
+ * "antes" es lo que hacía el middleware: recorrer la lista de prefijos,
+ * codificar el secreto y verificar la firma del token. "ahora" es el camino
+ * rápido: búsqueda en el Set de prefijos, SHA-256 del token y acierto en la
+ * cache. La diferencia entre los dos es lo que se ahorra por request.
+ */
+
+const SECRET = "bench-secret-de-al-menos-32-caracteres!!"
+
+const PREFIXES = [
+  "/inventario", "/voluntarios", "/pendientes", "/calendarios", "/talleres", "/grupos",
+  "/actividades", "/ajustes", "/mis-datos", "/capacitaciones", "/accesos", "/certificados",
+  "/link-de-pago", "/encuestas", "/pagos-capacitaciones", "/auditoria", "/alertas",
+  "/emision", "/historial-certificados", "/participantes", "/inscripciones",
+]
+// El peor caso del recorrido lineal: el último de la lista.
+const PATH = "/inscripciones/42/detalle"
+
+const token = await new SignJWT({ id: 1, email: "bench@alma.test", role: "admin", is_admin: true, tv: 1 })
+  .setProtectedHeader({ alg: "HS256" })
+  .setExpirationTime("1h")
+  .sign(new TextEncoder().encode(SECRET))
+
+const isProtected = compilePrefixMatcher(PREFIXES)
+const cache = new VerifiedTokenCache<true>()
+const key = await crypto.subtle.importKey(
+  "raw", new TextEncoder().encode(SECRET), { name: "HMAC", hash: "SHA-256" }, false, ["verify"],
+)
+cache.set(await tokenDigest(token), true, Math.floor(Date.now() / 1000) + 3600)
+
+describe("middleware: ruta protegida", () => {
+  bench("antes: some() lineal", () => {
+    PREFIXES.some((p) => PATH === p || PATH.startsWith(p + "/"))
+  })
+
+  bench("ahora: Set del primer segmento", () => {
+    isProtected(PATH)
+  })
+})
+
+describe("middleware: verificación del token", () => {
+  bench("antes: encode del secreto + jwtVerify", async () => {
+    await jwtVerify(token, new TextEncoder().encode(SECRET))
+  })
+
+  bench("CryptoKey importada una vez + jwtVerify", async () => {
+    await jwtVerify(token, key)
+  })
+
+  bench("ahora: SHA-256 + acierto en la cache", async () => {
+    if (!cache.get(await tokenDigest(token))) throw new Error("se esperaba un acierto")
+  })
+})
@@ -122,6 +122,37 @@ describe("can() — casos raros", () => {
   })
 })
 
+describe("can() — con habilitaciones (rol OR habilitación)", () => {
+  /** Un participante con la capacitación 7 habilitada. */
+  const grants = {
+    has: (moduleKey: string, resourceId?: number) =>
+      moduleKey === "capacitaciones" && (resourceId === undefined || resourceId === 7),
+  }
+
+  it("sin ítem, la habilitación no cambia lo que ya decide el rol", () => {
+    expect(can(participante, "capacitaciones:view", grants)).toBe(true)
+    expect(can(participante, "capacitaciones:manage", grants)).toBe(false)
+  })
+
+  it("el participante abre el ítem habilitado y ningún otro", () => {
+    expect(can(participante, "capacitaciones:view", grants, 7)).toBe(true)
+    expect(can(participante, "capacitaciones:view", grants, 8)).toBe(false)
+    expect(can(participante, "capacitaciones:view", undefined, 7)).toBe(false)
+  })
+
+  it("el staff abre cualquier ítem por rol, sin habilitación", () => {
+    expect(can(voluntario, "capacitaciones:view", undefined, 8)).toBe(true)
+    expect(can(admin, "capacitaciones:view", undefined, 8)).toBe(true)
+  })
+
+  it("una habilitación sólo da ver, y sólo en módulos habilitables", () => {
+    const everything = { has: () => true }
+    expect(can(participante, "personas:view", everything)).toBe(false)
+    expect(can(participante, "capacitaciones:report", everything)).toBe(false)
+    expect(can(null, "capacitaciones:view", everything, 7)).toBe(false)
+  })
+})
+
 describe("canDeleteCalendarInstance()", () => {
   it("el admin borra cualquier evento", () => {
     expect(canDeleteCalendarInstance(admin, { created_by_volunteer_id: 999 })).toBe(true)
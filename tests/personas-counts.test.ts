@@ -0,0 +1,62 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from "vitest"
+import { api } from "@/lib/api-client"
+import { getPersonasCounts } from "@/lib/data-manager"
+
+/**
+ * getPersonasCounts contra un backend con y sin /personas/counts.
+ *
+ * Como en api-client.test.ts se reemplaza el `fetch` global: no sale nada
+ * a la red.
+ */
+
+const json = (body: unknown, status = 200) =>
+  new Response(JSON.stringify(body), { status, headers: { "Content-Type": "application/json" } })
+
+/** Backend que contesta `counts` a /personas/counts y listas de 3 y 2 al camino viejo. */
+function backend(counts: () => Response) {
+  return vi.fn(async (url: string) => {
+    if (url.includes("/personas/counts")) return counts()
+    if (url.includes("/voluntarios/")) return json([{ id: 1 }, { id: 2 }, { id: 3 }])
+    if (url.includes("/participants/")) return json([{ id: 1 }, { id: 2 }])
+    return json({ detail: "Not Found" }, 404)
+  })
+}
+
+beforeEach(() => {
+  api.invalidate()
+})
+
+afterEach(() => {
+  vi.unstubAllGlobals()
+})
+
+describe("getPersonasCounts", () => {
+  it("usa /personas/counts cuando el backend lo tiene", async () => {
+    const fetchMock = backend(() => json({ volunteers: 40, participants: 12 }))
+    vi.stubGlobal("fetch", fetchMock)
+
+    expect(await getPersonasCounts()).toEqual({ volunteers: 40, participants: 12 })
+    expect(fetchMock).toHaveBeenCalledTimes(1)
+  })
+
+  it("422 (el backend lo toma como /personas/{id}): cae a las listas", async () => {
+    const detail = [{ loc: ["path", "id"], msg: "value is not a valid integer", type: "type_error.integer" }]
+    vi.stubGlobal("fetch", backend(() => json({ detail }, 422)))
+
+    expect(await getPersonasCounts()).toEqual({ volunteers: 3, participants: 2 })
+  })
+
+  it("404 o 405: también cae a las listas", async () => {
+    vi.stubGlobal("fetch", backend(() => json({ detail: "Not Found" }, 404)))
+    expect(await getPersonasCounts()).toEqual({ volunteers: 3, participants: 2 })
+
+    api.invalidate()
+    vi.stubGlobal("fetch", backend(() => json({ detail: "Method Not Allowed" }, 405)))
+    expect(await getPersonasCounts()).toEqual({ volunteers: 3, participants: 2 })
+  })
+
+  it("cualquier otro error se propaga", async () => {
+    vi.stubGlobal("fetch", backend(() => json({ detail: "boom" }, 500)))
+    await expect(getPersonasCounts()).rejects.toThrow(/→ 500:/)
+  })
+})
@@ -0,0 +1,75 @@
+import { describe, it, expect, vi, beforeAll, afterAll } from "vitest"
+import { spawnSync } from "node:child_process"
+import fs from "node:fs"
+import os from "node:os"
+import path from "node:path"
+
+/**
+ * Tests de las fotos de trabajos en cluster: que un trabajo cuyo worker se
+ * bajó (o murió) no quede "running" para siempre.
+ *
+ * El almacén va a un directorio temporal y ALMA_WORKERS se define antes de
+ * importar el módulo, que lo lee al cargarse.
+ */
+
+const { onShutdown } = vi.hoisted(() => ({ onShutdown: vi.fn() }))
+vi.mock("@/lib/shutdown", () => ({ onShutdown, shuttingDown: () => false }))
+
+interface TestJob {
+  id: string
+  status: string
+  done: number
+  error: string | null
+  finished_at: string | null
+}
+
+const job = (id: string): TestJob => ({ id, status: "running", done: 3, error: null, finished_at: null })
+
+let dir: string
+let store: typeof import("@/lib/shared-store")
+
+beforeAll(async () => {
+  dir = fs.mkdtempSync(path.join(os.tmpdir(), "alma-shared-test-"))
+  process.env.ALMA_SHARED_DIR = dir
+  process.env.ALMA_WORKERS = "2"
+  vi.resetModules()
+  store = await import("@/lib/shared-store")
+})
+
+afterAll(() => {
+  delete process.env.ALMA_SHARED_DIR
+  delete process.env.ALMA_WORKERS
+  fs.rmSync(dir, { recursive: true, force: true })
+})
+
+describe("createJobMirror", () => {
+  it("otro worker lee la foto tal cual la publicó el dueño", async () => {
+    const mirror = store.createJobMirror<TestJob>("publish")
+    mirror.publish(job("a"), true)
+
+    await vi.waitFor(async () => expect(await mirror.read("a")).toEqual(job("a")))
+  })
+
+  it("un trabajo sin terminar de un proceso que ya no existe se lee como fallido", async () => {
+    const dead = spawnSync(process.execPath, ["-e", ""]).pid!
+    await store.writeShared("jobs-dead", "b", { owner: dead, job: job("b") })
+
+    const read = await store.createJobMirror<TestJob>("dead").read("b")
+    expect(read).toMatchObject({ id: "b", status: "failed", done: 3 })
+    expect(read!.error).toMatch(/reinició/)
+    expect(read!.finished_at).not.toBeNull()
+  })
+
+  it("al bajarse el worker publica sus trabajos en curso como fallidos", async () => {
+    const mirror = store.createJobMirror<TestJob>("shutdown")
+    const running = job("c")
+    mirror.publish(running, true)
+    mirror.publish({ ...job("d"), status: "done", finished_at: new Date().toISOString() }, true)
+
+    const [, hook] = onShutdown.mock.calls.find(([name]) => name === "jobs-shutdown")!
+    await hook()
+
+    expect(await mirror.read("c")).toMatchObject({ status: "failed", done: 3 })
+    expect(await mirror.read("d")).toMatchObject({ status: "done", error: null })
+  })
+})
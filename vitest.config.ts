@@ -6,7 +6,9 @@ import path from "node:path"
  *
  * El front NUNCA toca MySQL (todo pasa por el backend), así que acá no hay base
  * de datos que aislar. Lo que sí se aísla es la RED: los tests mockean
- * lib/api-client, así que ninguna llamada sale realmente al backend.
+ * lib/api-client, así que ninguna llamada sale realmente al backend. La
+ * excepción, tests/backend-standin.test.ts, se salta salvo que se pida con
+ * ALMA_STANDIN_TESTS (ver run_tests.py --standin).
  */
 export default defineConfig({
   test: {